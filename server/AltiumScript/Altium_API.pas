@@ -12,6 +12,9 @@ var
 	REQUEST_FILE : String;
     RESPONSE_FILE : String;
     ROOT_DIR: String;
+    RESIDENT_STOP_FILE : String;
+    RESIDENT_HEARTBEAT_FILE : String;
+    ServedCount : Integer;
 
 {..............................................................................}
 { Initialize file paths using a fixed exchange directory.                      }
@@ -30,6 +33,8 @@ begin
     // Set the file paths
     REQUEST_FILE := ROOT_DIR + 'request.json';
     RESPONSE_FILE := ROOT_DIR + 'response.json';
+    RESIDENT_STOP_FILE := ROOT_DIR + 'resident_stop';
+    RESIDENT_HEARTBEAT_FILE := ROOT_DIR + 'resident_heartbeat.txt';
 end;
 
 // Extract the component pins logic
@@ -38,6 +43,7 @@ var
     ParamValue: String;
     i: Integer;
     DesignatorsList: TStringList;
+    Board: IPCB_Board;
 begin
     DesignatorsList := TStringList.Create;
     try
@@ -69,14 +75,24 @@ begin
             end;
         end;
         
+        // No designators: use the components selected on the board, so a
+        // batch can fetch pins for the selection without a separate call
+        if DesignatorsList.Count = 0 then
+        begin
+            Board := GetBoardSafe(0);
+            if Board <> nil then
+                for i := 0 to Board.SelectecObjectCount - 1 do
+                    if (Board.SelectecObject[i].ObjectId = eComponentObject) then
+                        DesignatorsList.Add(Board.SelectecObject[i].Name.Text);
+        end;
+
         if DesignatorsList.Count > 0 then
         begin
             Result := GetComponentPinsFromList(ROOT_DIR, DesignatorsList);
         end
         else
         begin
-            ShowMessage('Error: No designators found for get_component_pins');
-            Result := '';
+            Result := 'ERROR: No designators given and no components selected for get_component_pins';
         end;
     finally
         DesignatorsList.Free;
@@ -657,14 +673,55 @@ begin
 end;
 
 // Extract the check placement logic
+// Export component geometry for the server's local clearance check
+function ExecuteGetComponentGeometry(RequestData: TStringList): String;
+var
+    ParamValue: String;
+    i: Integer;
+    DesignatorsList: TStringList;
+begin
+    DesignatorsList := TStringList.Create;
+    try
+        // Optional designators array - empty means every component
+        for i := 0 to RequestData.Count - 1 do
+        begin
+            if (Pos('"designators"', RequestData[i]) > 0) then
+            begin
+                i := i + 1;
+
+                while (i < RequestData.Count) and (Pos(']', RequestData[i]) = 0) do
+                begin
+                    ParamValue := RequestData[i];
+                    ParamValue := StringReplace(ParamValue, '"', '', REPLACEALL);
+                    ParamValue := StringReplace(ParamValue, ',', '', REPLACEALL);
+                    ParamValue := Trim(ParamValue);
+
+                    if (ParamValue <> '') and (ParamValue <> '[') then
+                        DesignatorsList.Add(ParamValue);
+
+                    i := i + 1;
+                end;
+
+                break;
+            end;
+        end;
+
+        Result := GetComponentGeometry(ROOT_DIR, DesignatorsList);
+    finally
+        DesignatorsList.Free;
+    end;
+end;
+
 function ExecuteCheckPlacement(RequestData: TStringList): String;
 var
     ParamValue: String;
     i, ValueStart: Integer;
     DesignatorsList: TStringList;
+    PairsList: TStringList;
     ClearanceMils: Double;
 begin
     DesignatorsList := TStringList.Create;
+    PairsList := TStringList.Create;
     ClearanceMils := 6;
 
     try
@@ -690,6 +747,25 @@ begin
                     i := i + 1;
                 end;
             end
+            // Look for pairs array (optional - "A|B" entries from the server's
+            // spatial prefilter; only these pairs are measured)
+            else if (Pos('"pairs"', RequestData[i]) > 0) then
+            begin
+                i := i + 1;
+
+                while (i < RequestData.Count) and (Pos(']', RequestData[i]) = 0) do
+                begin
+                    ParamValue := RequestData[i];
+                    ParamValue := StringReplace(ParamValue, '"', '', REPLACEALL);
+                    ParamValue := StringReplace(ParamValue, ',', '', REPLACEALL);
+                    ParamValue := Trim(ParamValue);
+
+                    if (ParamValue <> '') and (ParamValue <> '[') then
+                        PairsList.Add(ParamValue);
+
+                    i := i + 1;
+                end;
+            end
             // Look for clearance_mils
             else if (Pos('"clearance_mils"', RequestData[i]) > 0) then
             begin
@@ -700,9 +776,10 @@ begin
             end;
         end;
 
-        Result := CheckPlacement(DesignatorsList, ClearanceMils);
+        Result := CheckPlacement(DesignatorsList, PairsList, ClearanceMils);
     finally
         DesignatorsList.Free;
+        PairsList.Free;
     end;
 end;
 
@@ -1026,7 +1103,7 @@ begin
         'create_net_class':
             Result := ExecuteCreateNetClass(RequestData);            
         'get_all_component_data':
-            Result := GetAllComponentData(ROOT_DIR, False);            
+            Result := GetAllComponentData(ROOT_DIR, False, Params.Values['delta'] = 'true', Params.Values['since']);
         'take_view_screenshot':
             Result := ExecuteTakeViewScreenshot(RequestData);            
         'get_library_symbol_reference':
@@ -1051,6 +1128,8 @@ begin
             Result := ExecutePlaceComponents(RequestData);
         'check_placement':
             Result := ExecuteCheckPlacement(RequestData);
+        'get_component_geometry':
+            Result := ExecuteGetComponentGeometry(RequestData);
         'get_net_connections':
             Result := ExecuteGetNetConnections(RequestData);
         'get_symbol_primitives':
@@ -1075,6 +1154,8 @@ begin
             Result := ExecuteSearchLibrarySymbol(RequestData);
         'create_pcb_footprint':
             Result := ExecuteCreatePCBFootprint(RequestData);
+        'batch':
+            Result := ExecuteBatch(RequestData);
     else
         ShowMessage('Error: Unknown command: ' + CommandName);
     end;
@@ -1113,7 +1194,8 @@ begin
         Params.Add(ParamName + '=' + ParamValue);
 end;
 
-procedure WriteResponse(Success: Boolean; Data: String; ErrorMsg: String);
+// Build the {success, result|error} object for one command's output
+function BuildResponseJSON(Success: Boolean; Data: String; ErrorMsg: String; CommandName: String = ''): String;
 var
     ActualSuccess: Boolean;
     ActualErrorMsg: String;
@@ -1131,11 +1213,11 @@ begin
         ActualErrorMsg := ErrorMsg;
     end;
 
-    // Create response props
     ResultProps := TStringList.Create;
-    ResponseData := TStringList.Create;
-    
     try
+        if CommandName <> '' then
+            AddJSONProperty(ResultProps, 'command', CommandName);
+
         // Add properties
         AddJSONBoolean(ResultProps, 'success', ActualSuccess);
         
@@ -1151,35 +1233,140 @@ begin
         begin
             AddJSONProperty(ResultProps, 'error', ActualErrorMsg);
         end;
-        
-        // Build response
-        ResponseData.Text := BuildJSONObject(ResultProps);
-        ResponseData.SaveToFile(RESPONSE_FILE);
+
+        Result := BuildJSONObject(ResultProps);
     finally
         ResultProps.Free;
+    end;
+end;
+
+procedure WriteResponse(Success: Boolean; Data: String; ErrorMsg: String);
+begin
+    ResponseData := TStringList.Create;
+    
+    try
+        // Build response
+        ResponseData.Text := BuildResponseJSON(Success, Data, ErrorMsg);
+
+        // Save under a temp name and rename, so the Python side (which
+        // polls for the response file) never reads a half-written file
+        if FileExists(RESPONSE_FILE + '.tmp') then
+            DeleteFile(RESPONSE_FILE + '.tmp');
+        ResponseData.SaveToFile(RESPONSE_FILE + '.tmp');
+        if FileExists(RESPONSE_FILE) then
+            DeleteFile(RESPONSE_FILE);
+        RenameFile(RESPONSE_FILE + '.tmp', RESPONSE_FILE);
+    finally
         ResponseData.Free;
     end;
 end;
 
-// Main procedure to run the bridge
-procedure Run;
+// Parse the loaded RequestData into Params and return the command name
+function ParseRequest(Dummy: Integer): String;
 var
-    CommandType: String;
-    Result: String;
     i: Integer;
     Line: String;
     ValueStart: Integer;
 begin
-    // Initialize file paths based on script location
-    InitializeFilePaths();
-
-    // Check if request file exists
-    if not FileExists(REQUEST_FILE) then
+    Result := '';
+    for i := 0 to RequestData.Count - 1 do
     begin
-        ShowMessage('Error: No request file found at ' + REQUEST_FILE);
-        Exit;
+        Line := RequestData[i];
+
+        // Extract command
+        if Pos('"command":', Line) > 0 then
+        begin
+            ValueStart := Pos(':', Line) + 1;
+            Result := Copy(Line, ValueStart, Length(Line) - ValueStart + 1);
+            Result := TrimJSON(Result);
+        end
+        else
+        begin
+            // Extract all other parameters
+            ExtractParameter(Line);
+        end;
+    end;
+end;
+
+// Run several commands in one script invocation. The request lists
+// sub-request files (written next to request.json, one command each, in
+// the usual one-key-per-line format) under "batch_files"; the result is a
+// JSON array with one {command, success, result|error} object per file.
+function ExecuteBatch(BatchData: TStringList): String;
+var
+    FileNames: TStringList;
+    Items: TStringList;
+    BatchParams: TStringList;
+    ParamValue: String;
+    CommandName: String;
+    Data: String;
+    i, j: Integer;
+begin
+    FileNames := TStringList.Create;
+    Items := TStringList.Create;
+    BatchParams := Params;
+    try
+        for i := 0 to BatchData.Count - 1 do
+        begin
+            if (Pos('"batch_files"', BatchData[i]) > 0) then
+            begin
+                i := i + 1;
+                while (i < BatchData.Count) and (Pos(']', BatchData[i]) = 0) do
+                begin
+                    ParamValue := TrimJSON(BatchData[i]);
+                    if (ParamValue <> '') and (ParamValue <> '[') then
+                        FileNames.Add(ParamValue);
+                    i := i + 1;
+                end;
+                break;
+            end;
+        end;
+
+        for j := 0 to FileNames.Count - 1 do
+        begin
+            // Each sub-request gets fresh globals, as if run on its own
+            RequestData := TStringList.Create;
+            Params := TStringList.Create;
+            Params.Delimiter := '=';
+            try
+                CommandName := '';
+                if FileExists(ROOT_DIR + FileNames[j]) then
+                begin
+                    RequestData.LoadFromFile(ROOT_DIR + FileNames[j]);
+                    CommandName := ParseRequest(0);
+                end;
+
+                if CommandName = '' then
+                    Items.Add(BuildResponseJSON(False, '', 'No command in ' + FileNames[j]))
+                else
+                begin
+                    Data := ExecuteCommand(CommandName);
+                    if Data <> '' then
+                        Items.Add(BuildResponseJSON(True, Data, '', CommandName))
+                    else
+                        Items.Add(BuildResponseJSON(False, '', 'Command execution failed', CommandName));
+                end;
+            finally
+                RequestData.Free;
+                Params.Free;
+            end;
+        end;
+
+        Result := BuildJSONArray(Items);
+    finally
+        RequestData := BatchData;
+        Params := BatchParams;
+        FileNames.Free;
+        Items.Free;
     end;
+end;
 
+// Parse and execute one request file, writing RESPONSE_FILE
+procedure ProcessRequest(RequestPath: String);
+var
+    CommandType: String;
+    Result: String;
+begin
     try
         // Initialize parameters list
         Params := TStringList.Create;
@@ -1188,29 +1375,10 @@ begin
         // Read the request file
         RequestData := TStringList.Create;
         try
-            RequestData.LoadFromFile(REQUEST_FILE);
-
-            // Default command type
-            CommandType := '';
+            RequestData.LoadFromFile(RequestPath);
 
             // Parse command and parameters
-            for i := 0 to RequestData.Count - 1 do
-            begin
-                Line := RequestData[i];
-
-                // Extract command
-                if Pos('"command":', Line) > 0 then
-                begin
-                    ValueStart := Pos(':', Line) + 1;
-                    CommandType := Copy(Line, ValueStart, Length(Line) - ValueStart + 1);
-                    CommandType := TrimJSON(CommandType);
-                end
-                else
-                begin
-                    // Extract all other parameters
-                    ExtractParameter(Line);
-                end;
-            end;
+            CommandType := ParseRequest(0);
 
             // Execute the command if valid
             if CommandType <> '' then
@@ -1243,4 +1411,90 @@ begin
     end;
 end;
 
+// Main procedure to run the bridge
+procedure Run;
+begin
+    // Initialize file paths based on script location
+    InitializeFilePaths();
+
+    // Check if request file exists
+    if not FileExists(REQUEST_FILE) then
+    begin
+        ShowMessage('Error: No request file found at ' + REQUEST_FILE);
+        Exit;
+    end;
+
+    ProcessRequest(REQUEST_FILE);
+end;
 
+// Touch the heartbeat file so the Python side knows the loop is alive
+procedure WriteHeartbeat;
+var
+    Beat: TStringList;
+begin
+    Beat := TStringList.Create;
+    try
+        Beat.Add('served=' + IntToStr(ServedCount));
+        Beat.SaveToFile(RESIDENT_HEARTBEAT_FILE);
+    finally
+        Beat.Free;
+    end;
+end;
+
+// Resident mode: stay running and serve requests from a mailbox file, so
+// each command skips the X2.EXE launch and script compile. The Python side
+// writes resident_request.json; the loop claims it by renaming it to
+// resident_active.json, runs it and writes resident_response.json. While
+// idle the heartbeat file is rewritten every ~0.5 s. Creating
+// resident_stop ends the loop.
+procedure Serve;
+var
+    ActiveFile: String;
+    Ticks: Integer;
+begin
+    InitializeFilePaths();
+    REQUEST_FILE := ROOT_DIR + 'resident_request.json';
+    RESPONSE_FILE := ROOT_DIR + 'resident_response.json';
+    ActiveFile := ROOT_DIR + 'resident_active.json';
+
+    if FileExists(RESIDENT_STOP_FILE) then
+        DeleteFile(RESIDENT_STOP_FILE);
+
+    ServedCount := 0;
+    Ticks := 0;
+    WriteHeartbeat;
+
+    while not FileExists(RESIDENT_STOP_FILE) do
+    begin
+        if FileExists(REQUEST_FILE) then
+        begin
+            if FileExists(ActiveFile) then
+                DeleteFile(ActiveFile);
+
+            // The rename is the claim: if Python withdrew the request in
+            // the meantime it fails and there is nothing to do
+            if RenameFile(REQUEST_FILE, ActiveFile) then
+            begin
+                ProcessRequest(ActiveFile);
+                DeleteFile(ActiveFile);
+                ServedCount := ServedCount + 1;
+
+                // A long command leaves the last heartbeat stale; refresh it
+                // right away so the next request is not sent to the fallback
+                WriteHeartbeat;
+            end;
+        end;
+
+        Ticks := Ticks + 1;
+        if Ticks >= 25 then
+        begin
+            WriteHeartbeat;
+            Ticks := 0;
+        end;
+
+        Application.ProcessMessages;
+        Sleep(20);
+    end;
+
+    DeleteFile(RESIDENT_STOP_FILE);
+end;
@@ -151,6 +151,7 @@ begin
        (CommandName = 'move_components')                     or
        (CommandName = 'place_components')                    or
        (CommandName = 'check_placement')                     or
+       (CommandName = 'get_component_geometry')              or
        (CommandName = 'get_net_connections')                 or
        (CommandName = 'set_component_position')              or
        (CommandName = 'set_pcb_layer_visibility')            or
@@ -336,8 +337,9 @@ end;
 
 // Zoom the current PCB view to the union bounding box of the given
 // components (plus a margin) so a following screenshot shows them clearly.
-// Returns the number of components found.
-function ZoomToComponents(DesignatorsList: TStringList): Integer;
+// Returns the number of components found; ZoomWidth/ZoomHeight receive the
+// size of the zoomed rectangle in mils, so the server can crop to it.
+function ZoomToComponents(DesignatorsList: TStringList; var ZoomWidth: Double; var ZoomHeight: Double): Integer;
 var
     Board      : IPCB_Board;
     Component  : IPCB_Component;
@@ -349,6 +351,8 @@ var
 begin
     Result := 0;
     HaveBounds := False;
+    ZoomWidth := 0;
+    ZoomHeight := 0;
 
     Board := GetBoardSafe(0);
     if (Board = nil) then Exit;
@@ -388,6 +392,8 @@ begin
 
         Board.GraphicalView_ZoomOnRect(MinX - Margin, MinY - Margin, MaxX + Margin, MaxY + Margin);
         Board.GraphicalView_ZoomRedraw;
+        ZoomWidth := CoordToMils(MaxX - MinX + 2 * Margin);
+        ZoomHeight := CoordToMils(MaxY - MinY + 2 * Margin);
     end;
 end;
 
@@ -404,6 +410,8 @@ var
     DocType        : String;
     WindowFound    : Boolean;
     ZoomedCount    : Integer;
+    ZoomWidth      : Double;
+    ZoomHeight     : Double;
 
     // For screenshot thread
     ThreadStarted  : Boolean;
@@ -431,8 +439,10 @@ begin
 
     // Optionally zoom to the requested components before capture
     ZoomedCount := 0;
+    ZoomWidth := 0;
+    ZoomHeight := 0;
     if (DocType = 'PCB') and (DesignatorsList <> nil) and (DesignatorsList.Count > 0) then
-        ZoomedCount := ZoomToComponents(DesignatorsList);
+        ZoomedCount := ZoomToComponents(DesignatorsList, ZoomWidth, ZoomHeight);
 
     // Build the command to call the external screenshot utility
     // This part depends on how your C# server calls Altium for screenshots
@@ -446,6 +456,11 @@ begin
         AddJSONProperty(ResultProps, 'class_filter', ClassName);
         AddJSONBoolean(ResultProps, 'window_found', WindowFound);
         AddJSONInteger(ResultProps, 'zoomed_component_count', ZoomedCount);
+        if ZoomedCount > 0 then
+        begin
+            AddJSONNumber(ResultProps, 'zoom_width_mils', ZoomWidth);
+            AddJSONNumber(ResultProps, 'zoom_height_mils', ZoomHeight);
+        end;
         
         // Add signal to the server that it can now capture the screenshot
         AddJSONBoolean(ResultProps, 'ready_for_capture', True);
@@ -1418,14 +1418,116 @@ begin
     end;
 end;
 
-// Function to get all component data from the PCB
-function GetAllComponentData(ROOT_DIR: String, SelectedOnly: Boolean = False): String;
+// Compare the current components against the snapshot saved by the last
+// delta request and return {stamp, full, components, removed}. Components
+// holds one-line JSON objects, Designators the matching names in the same
+// order. The snapshot file is the stamp line followed by one
+// "designator<TAB>json" line per component.
+function BuildComponentDelta(ROOT_DIR: String, Since: String, Designators: TStringList, Components: TStringList): String;
+var
+    SnapshotFile, OldStamp, NewStamp, Name : String;
+    Old, CurrentNames, Changed, Removed, Snapshot, ResultProps : TStringList;
+    Full, Duplicates : Boolean;
+    i, TabPos : Integer;
+begin
+    SnapshotFile := ROOT_DIR + 'component_snapshot.txt';
+    Old := TStringList.Create;
+    CurrentNames := TStringList.Create;
+    Changed := TStringList.Create;
+    Removed := TStringList.Create;
+    ResultProps := TStringList.Create;
+    try
+        OldStamp := '';
+        if FileExists(SnapshotFile) then
+        begin
+            Old.LoadFromFile(SnapshotFile);
+            if Old.Count > 0 then
+            begin
+                OldStamp := Old[0];
+                Old.Delete(0);
+            end;
+        end;
+        // Sorted lists make IndexOf a binary search
+        Old.CaseSensitive := True;
+        Old.Sorted := True;
+        CurrentNames.CaseSensitive := True;
+        CurrentNames.Sorted := True;
+
+        // Duplicate designators make a per-designator delta ambiguous: send
+        // everything and drop the snapshot so the next request is full too
+        Duplicates := False;
+        for i := 0 to Designators.Count - 1 do
+        begin
+            if CurrentNames.IndexOf(Designators[i]) >= 0 then
+                Duplicates := True
+            else
+                CurrentNames.Add(Designators[i]);
+        end;
+
+        Full := (Since = '') or (Since <> OldStamp) or Duplicates;
+
+        for i := 0 to Components.Count - 1 do
+        begin
+            if Full or (Old.IndexOf(Designators[i] + #9 + Components[i]) < 0) then
+                Changed.Add(Components[i]);
+        end;
+
+        if not Full then
+        begin
+            for i := 0 to Old.Count - 1 do
+            begin
+                TabPos := Pos(#9, Old[i]);
+                Name := Copy(Old[i], 1, TabPos - 1);
+                if CurrentNames.IndexOf(Name) < 0 then
+                    Removed.Add('"' + JSONEscapeString(Name) + '"');
+            end;
+        end;
+
+        if Duplicates then
+        begin
+            NewStamp := '';
+            if FileExists(SnapshotFile) then
+                DeleteFile(SnapshotFile);
+        end
+        else
+        begin
+            NewStamp := FormatDateTime('yyyymmddhhnnsszzz', Now);
+            Snapshot := TStringList.Create;
+            try
+                Snapshot.Add(NewStamp);
+                for i := 0 to Components.Count - 1 do
+                    Snapshot.Add(Designators[i] + #9 + Components[i]);
+                Snapshot.SaveToFile(SnapshotFile);
+            finally
+                Snapshot.Free;
+            end;
+        end;
+
+        AddJSONProperty(ResultProps, 'stamp', NewStamp);
+        AddJSONBoolean(ResultProps, 'full', Full);
+        ResultProps.Add(BuildJSONArray(Changed, 'components', 1));
+        ResultProps.Add(BuildJSONArray(Removed, 'removed', 1));
+        Result := BuildJSONObject(ResultProps);
+    finally
+        Old.Free;
+        CurrentNames.Free;
+        Changed.Free;
+        Removed.Free;
+        ResultProps.Free;
+    end;
+end;
+
+// Function to get all component data from the PCB. With Delta set, only
+// components changed since the snapshot stamped Since are returned (see
+// BuildComponentDelta)
+function GetAllComponentData(ROOT_DIR: String, SelectedOnly: Boolean = False, Delta: Boolean = False, Since: String = ''): String;
 var
     Board       : IPCB_Board;
     Iterator    : IPCB_BoardIterator;
     Component   : IPCB_Component;
     ComponentsArray : TStringList;
     ComponentProps : TStringList;
+    Designators : TStringList;
     Rect        : TCoordRect;
     xorigin, yorigin : Integer;
     i           : Integer;
@@ -1446,6 +1548,7 @@ begin
 
     // Create array for components
     ComponentsArray := TStringList.Create;
+    Designators := TStringList.Create;
     
     try
         // Create an iterator to find all components
@@ -1477,10 +1580,19 @@ begin
                     AddJSONNumber(ComponentProps, 'y', CoordToMils(Component.y - yorigin));
                     AddJSONNumber(ComponentProps, 'width', CoordToMils(Rect.Right - Rect.Left));
                     AddJSONNumber(ComponentProps, 'height', CoordToMils(Rect.Top - Rect.Bottom));
+                    // Box corner, so the server can index boxes that are not centered on x/y
+                    AddJSONNumber(ComponentProps, 'box_left', CoordToMils(Rect.Left - xorigin));
+                    AddJSONNumber(ComponentProps, 'box_bottom', CoordToMils(Rect.Bottom - yorigin));
                     AddJSONNumber(ComponentProps, 'rotation', Component.Rotation);
 
-                    // Add to components array
-                    ComponentsArray.Add(BuildJSONObject(ComponentProps, 1));
+                    // Add to components array (one line per component for delta comparison)
+                    if Delta then
+                    begin
+                        ComponentsArray.Add(StringReplace(BuildJSONObject(ComponentProps, 0), #13#10, ' ', REPLACEALL));
+                        Designators.Add(Component.Name.Text);
+                    end
+                    else
+                        ComponentsArray.Add(BuildJSONObject(ComponentProps, 1));
                 finally
                     ComponentProps.Free;
                 end;
@@ -1496,13 +1608,17 @@ begin
         // Build the final JSON array
         OutputLines := TStringList.Create;
         try
-            OutputLines.Text := BuildJSONArray(ComponentsArray);
+            if Delta then
+                OutputLines.Text := BuildComponentDelta(ROOT_DIR, Since, Designators, ComponentsArray)
+            else
+                OutputLines.Text := BuildJSONArray(ComponentsArray);
             Result := WriteJSONToFile(OutputLines, ROOT_DIR+'\temp_component_data.json');
         finally
             OutputLines.Free;
         end;
     finally
         ComponentsArray.Free;
+        Designators.Free;
     end;
 end;
 
@@ -2125,6 +2241,206 @@ begin
     end;
 end;
 
+// One primitive of a placed component as a single-line JSON object in mils
+// relative to the board origin, for get_component_geometry. Text and 3D
+// bodies return '' (skipped, as in ComponentMinDistance).
+function PrimitiveGeometryJSON(Prim: IPCB_Primitive; xorigin, yorigin: Integer): String;
+var
+    Props       : TStringList;
+    PointsArray : TStringList;
+    V           : Integer;
+begin
+    Result := '';
+    Props := TStringList.Create;
+    try
+        case Prim.ObjectId of
+            ePadObject:
+            begin
+                AddJSONProperty(Props, 'type', 'pad');
+                AddJSONProperty(Props, 'name', Prim.Name);
+                AddJSONNumber(Props, 'x', CoordToMils(Prim.x - xorigin));
+                AddJSONNumber(Props, 'y', CoordToMils(Prim.y - yorigin));
+                AddJSONNumber(Props, 'rotation', Prim.Rotation);
+                AddJSONNumber(Props, 'width', CoordToMils(Prim.XSizeOnLayer[Prim.Layer]));
+                AddJSONNumber(Props, 'height', CoordToMils(Prim.YSizeOnLayer[Prim.Layer]));
+                AddJSONProperty(Props, 'shape', ShapeToString(Prim.ShapeOnLayer[Prim.Layer]));
+                if (Prim.ShapeOnLayer[Prim.Layer] = eRoundedRectangular) then
+                    AddJSONInteger(Props, 'corner_pct', Prim.StackCRPctOnLayer[Prim.Layer]);
+                AddJSONProperty(Props, 'layer', Layer2String(Prim.Layer));
+            end;
+            eTrackObject:
+            begin
+                AddJSONProperty(Props, 'type', 'track');
+                AddJSONNumber(Props, 'x1', CoordToMils(Prim.x1 - xorigin));
+                AddJSONNumber(Props, 'y1', CoordToMils(Prim.y1 - yorigin));
+                AddJSONNumber(Props, 'x2', CoordToMils(Prim.x2 - xorigin));
+                AddJSONNumber(Props, 'y2', CoordToMils(Prim.y2 - yorigin));
+                AddJSONNumber(Props, 'width', CoordToMils(Prim.Width));
+                AddJSONProperty(Props, 'layer', Layer2String(Prim.Layer));
+            end;
+            eArcObject:
+            begin
+                AddJSONProperty(Props, 'type', 'arc');
+                AddJSONNumber(Props, 'cx', CoordToMils(Prim.XCenter - xorigin));
+                AddJSONNumber(Props, 'cy', CoordToMils(Prim.YCenter - yorigin));
+                AddJSONNumber(Props, 'radius', CoordToMils(Prim.Radius));
+                AddJSONNumber(Props, 'start_angle', Prim.StartAngle);
+                AddJSONNumber(Props, 'end_angle', Prim.EndAngle);
+                AddJSONNumber(Props, 'width', CoordToMils(Prim.LineWidth));
+                AddJSONProperty(Props, 'layer', Layer2String(Prim.Layer));
+            end;
+            eFillObject:
+            begin
+                AddJSONProperty(Props, 'type', 'fill');
+                AddJSONNumber(Props, 'x1', CoordToMils(Prim.x1Location - xorigin));
+                AddJSONNumber(Props, 'y1', CoordToMils(Prim.y1Location - yorigin));
+                AddJSONNumber(Props, 'x2', CoordToMils(Prim.x2Location - xorigin));
+                AddJSONNumber(Props, 'y2', CoordToMils(Prim.y2Location - yorigin));
+                AddJSONNumber(Props, 'rotation', Prim.Rotation);
+                AddJSONProperty(Props, 'layer', Layer2String(Prim.Layer));
+            end;
+            eRegionObject:
+            begin
+                AddJSONProperty(Props, 'type', 'region');
+                AddJSONProperty(Props, 'layer', Layer2String(Prim.Layer));
+                PointsArray := TStringList.Create;
+                try
+                    for V := 1 to Prim.MainContour.Count do
+                        PointsArray.Add('[' +
+                            StringReplace(FloatToStr(CoordToMils(Prim.MainContour.x[V] - xorigin)), ',', '.', REPLACEALL) + ', ' +
+                            StringReplace(FloatToStr(CoordToMils(Prim.MainContour.y[V] - yorigin)), ',', '.', REPLACEALL) + ']');
+                    Props.Add('"vertices": [' + StringReplace(Trim(PointsArray.Text), #13#10, ', ', REPLACEALL) + ']');
+                finally
+                    PointsArray.Free;
+                end;
+            end;
+            eViaObject:
+            begin
+                AddJSONProperty(Props, 'type', 'via');
+                AddJSONNumber(Props, 'x', CoordToMils(Prim.x - xorigin));
+                AddJSONNumber(Props, 'y', CoordToMils(Prim.y - yorigin));
+                AddJSONNumber(Props, 'size', CoordToMils(Prim.Size));
+                AddJSONProperty(Props, 'layer', 'Multi-Layer');
+            end;
+        end;
+
+        if (Props.Count > 0) then
+            Result := StringReplace(Trim(BuildJSONObject(Props, 0)), #13#10, ' ', REPLACEALL);
+    finally
+        Props.Free;
+    end;
+end;
+
+// Export the geometry of placed components (all of them when the list is
+// empty): placement, bounding box and every pad, track, arc, fill and region
+// in mils relative to the board origin, one primitive per line. The server
+// checks clearances on this locally (see clearance.py).
+function GetComponentGeometry(ROOT_DIR: String; DesignatorsList: TStringList): String;
+var
+    Board           : IPCB_Board;
+    Iterator        : IPCB_BoardIterator;
+    Component       : IPCB_Component;
+    Targets         : TStringList;
+    GrpIter         : IPCB_GroupIterator;
+    Prim            : IPCB_Primitive;
+    ComponentsArray : TStringList;
+    CompProps       : TStringList;
+    PrimsArray      : TStringList;
+    OutputLines     : TStringList;
+    Rect            : TCoordRect;
+    PrimJSON        : String;
+    xorigin, yorigin : Integer;
+    i               : Integer;
+begin
+    Board := GetBoardSafe(0);
+    if (Board = nil) then
+    begin
+        Result := 'ERROR: No PCB document is currently active';
+        Exit;
+    end;
+    xorigin := Board.XOrigin;
+    yorigin := Board.YOrigin;
+
+    Targets := TStringList.Create;
+    ComponentsArray := TStringList.Create;
+    try
+        if (DesignatorsList.Count > 0) then
+        begin
+            for i := 0 to DesignatorsList.Count - 1 do
+                Targets.Add(Trim(DesignatorsList[i]));
+        end
+        else
+        begin
+            Iterator := Board.BoardIterator_Create;
+            Iterator.AddFilter_ObjectSet(MkSet(eComponentObject));
+            Iterator.AddFilter_IPCB_LayerSet(LayerSet.AllLayers);
+            Iterator.AddFilter_Method(eProcessAll);
+            Component := Iterator.FirstPCBObject;
+            while (Component <> nil) do
+            begin
+                Targets.Add(Component.Name.Text);
+                Component := Iterator.NextPCBObject;
+            end;
+            Board.BoardIterator_Destroy(Iterator);
+        end;
+
+        for i := 0 to Targets.Count - 1 do
+        begin
+            Component := Board.GetPcbComponentByRefDes(Targets[i]);
+            if (Component = nil) then
+                Continue;
+            Rect := Component.BoundingRectangleNoNameComment;
+            CompProps := TStringList.Create;
+            PrimsArray := TStringList.Create;
+            try
+                AddJSONProperty(CompProps, 'designator', Component.Name.Text);
+                AddJSONProperty(CompProps, 'layer', Layer2String(Component.Layer));
+                AddJSONNumber(CompProps, 'x', CoordToMils(Component.x - xorigin));
+                AddJSONNumber(CompProps, 'y', CoordToMils(Component.y - yorigin));
+                AddJSONNumber(CompProps, 'rotation', Component.Rotation);
+                AddJSONNumber(CompProps, 'width', CoordToMils(Rect.Right - Rect.Left));
+                AddJSONNumber(CompProps, 'height', CoordToMils(Rect.Top - Rect.Bottom));
+                AddJSONNumber(CompProps, 'box_left', CoordToMils(Rect.Left - xorigin));
+                AddJSONNumber(CompProps, 'box_bottom', CoordToMils(Rect.Bottom - yorigin));
+
+                GrpIter := Component.GroupIterator_Create;
+                GrpIter.SetState_FilterAll;
+                Prim := GrpIter.FirstPCBObject;
+                while (Prim <> nil) do
+                begin
+                    // Armor: an unreadable primitive is skipped, not fatal
+                    try
+                        PrimJSON := PrimitiveGeometryJSON(Prim, xorigin, yorigin);
+                    except
+                        PrimJSON := '';
+                    end;
+                    if (PrimJSON <> '') then
+                        PrimsArray.Add(PrimJSON);
+                    Prim := GrpIter.NextPCBObject;
+                end;
+                Component.GroupIterator_Destroy(GrpIter);
+
+                CompProps.Add(BuildJSONArray(PrimsArray, 'primitives', 1));
+                ComponentsArray.Add(BuildJSONObject(CompProps, 1));
+            finally
+                CompProps.Free;
+                PrimsArray.Free;
+            end;
+        end;
+
+        OutputLines := TStringList.Create;
+        try
+            OutputLines.Text := BuildJSONArray(ComponentsArray);
+            Result := WriteJSONToFile(OutputLines, ROOT_DIR + '\temp_component_geometry.json');
+        finally
+            OutputLines.Free;
+        end;
+    finally
+        Targets.Free;
+        ComponentsArray.Free;
+    end;
+end;
+
 // Minimum primitive-to-primitive distance between two components in mils,
 // ignoring text primitives (designator/comment strings float over neighbors
 // and would poison the measurement). 0 = touching or overlapping.
@@ -2173,13 +2489,75 @@ begin
     Result := CoordToMils(MinD);
 end;
 
+// Measure one same-side component pair: bounding-box prefilter, then the
+// precise distance with ComponentMinDistance. Adds a violation object to
+// ViolationsArray when the boxes overlap or the parts are closer than
+// ClearanceMils. Returns True when the pair was close enough to measure.
+function CheckPlacementPair(Board: IPCB_Board; Target, Other: IPCB_Component; ClearanceMils: Double; ViolationsArray: TStringList): Boolean;
+var
+    RectA, RectB       : TCoordRect;
+    VProps             : TStringList;
+    OverlapX, OverlapY : Double;
+    Separation         : Double;
+    DistMils           : Double;
+    IsOverlap          : Boolean;
+begin
+    Result := False;
+    RectA := Target.BoundingRectangleNoNameComment;
+    RectB := Other.BoundingRectangleNoNameComment;
+
+    // Bounding-box overlap/separation in mils (negative = gap)
+    OverlapX := CoordToMils(Min(RectA.Right, RectB.Right) - Max(RectA.Left, RectB.Left));
+    OverlapY := CoordToMils(Min(RectA.Top, RectB.Top) - Max(RectA.Bottom, RectB.Bottom));
+
+    if (OverlapX > 0) and (OverlapY > 0) then
+        Separation := 0
+    else
+        Separation := Max(-OverlapX, -OverlapY);
+
+    // Only measure precisely when the prefilter says "close"
+    if (Separation >= ClearanceMils + 25) then
+        Exit;
+
+    Result := True;
+    DistMils := ComponentMinDistance(Board, Target, Other);
+    IsOverlap := (OverlapX > 0) and (OverlapY > 0);
+
+    if (IsOverlap) or (DistMils < ClearanceMils) then
+    begin
+        VProps := TStringList.Create;
+        try
+            AddJSONProperty(VProps, 'a', Target.Name.Text);
+            AddJSONProperty(VProps, 'b', Other.Name.Text);
+            AddJSONProperty(VProps, 'layer', Layer2String(Target.Layer));
+            if IsOverlap then
+                AddJSONProperty(VProps, 'type', 'bounding_box_overlap')
+            else
+                AddJSONProperty(VProps, 'type', 'clearance');
+            AddJSONNumber(VProps, 'distance_mils', Round(DistMils * 100) / 100);
+            if IsOverlap then
+            begin
+                AddJSONNumber(VProps, 'overlap_x_mils', Round(OverlapX * 100) / 100);
+                AddJSONNumber(VProps, 'overlap_y_mils', Round(OverlapY * 100) / 100);
+            end;
+            AddJSONNumber(VProps, 'b_x', CoordToMils(Other.x - Board.XOrigin));
+            AddJSONNumber(VProps, 'b_y', CoordToMils(Other.y - Board.YOrigin));
+            ViolationsArray.Add(BuildJSONObject(VProps, 2));
+        finally
+            VProps.Free;
+        end;
+    end;
+end;
+
 // Check component placement for overlaps and clearance violations.
-// Targets are the given designators (or the current selection when the list
-// is empty); each target is checked against every other component on the same
-// side of the board. Bounding boxes act as a fast prefilter; close pairs are
-// measured precisely with Board.PrimPrimDistance (minimum distance between
-// any two primitives of the components, 0 = touching/overlapping).
-function CheckPlacement(DesignatorsList: TStringList; ClearanceMils: Double): String;
+// With PairsList ("A|B" entries, prefiltered by the server's spatial index)
+// only those pairs are measured. Otherwise targets are the given designators
+// (or the current selection when the list is empty) and each target is
+// checked against every other component on the same side of the board.
+// Bounding boxes act as a fast prefilter; close pairs are measured precisely
+// with Board.PrimPrimDistance (minimum distance between any two primitives
+// of the components, 0 = touching/overlapping).
+function CheckPlacement(DesignatorsList: TStringList; PairsList: TStringList; ClearanceMils: Double): String;
 var
     Board           : IPCB_Board;
     Iterator        : IPCB_BoardIterator;
@@ -2188,16 +2566,11 @@ var
     Processed       : TStringList;
     MissingArray    : TStringList;
     ViolationsArray : TStringList;
-    VProps          : TStringList;
     ResultProps     : TStringList;
-    RectA, RectB    : TCoordRect;
     Designator      : String;
-    i               : Integer;
-    OverlapX, OverlapY : Double;
-    Separation      : Double;
-    DistMils        : Double;
+    OtherDesignator : String;
+    i, SepPos       : Integer;
     PairsChecked    : Integer;
-    IsOverlap       : Boolean;
 begin
     Board := GetBoardSafe(0);
     if (Board = nil) then
@@ -2217,99 +2590,88 @@ begin
     PairsChecked := 0;
 
     try
-        // Build the target list: explicit designators, or current selection
-        if (DesignatorsList.Count > 0) then
+        if (PairsList.Count > 0) then
         begin
-            for i := 0 to DesignatorsList.Count - 1 do
+            // Measure the given pairs only; a designator that is gone from
+            // the board (stale server data) is reported as missing
+            for i := 0 to PairsList.Count - 1 do
             begin
-                Designator := Trim(DesignatorsList[i]);
-                if (Board.GetPcbComponentByRefDes(Designator) <> nil) then
-                    Targets.Add(Designator)
-                else
+                SepPos := Pos('|', PairsList[i]);
+                if (SepPos = 0) then
+                    Continue;
+                Designator := Trim(Copy(PairsList[i], 1, SepPos - 1));
+                OtherDesignator := Trim(Copy(PairsList[i], SepPos + 1, Length(PairsList[i]) - SepPos));
+                Target := Board.GetPcbComponentByRefDes(Designator);
+                Other := Board.GetPcbComponentByRefDes(OtherDesignator);
+
+                if (Target = nil) and (MissingArray.IndexOf('"' + JSONEscapeString(Designator) + '"') < 0) then
                     MissingArray.Add('"' + JSONEscapeString(Designator) + '"');
+                if (Other = nil) and (MissingArray.IndexOf('"' + JSONEscapeString(OtherDesignator) + '"') < 0) then
+                    MissingArray.Add('"' + JSONEscapeString(OtherDesignator) + '"');
+
+                if (Target <> nil) and (Other <> nil) and (Target.Layer = Other.Layer) then
+                begin
+                    if (Targets.IndexOf(Designator) < 0) then
+                        Targets.Add(Designator);
+                    if CheckPlacementPair(Board, Target, Other, ClearanceMils, ViolationsArray) then
+                        PairsChecked := PairsChecked + 1;
+                end;
             end;
         end
         else
         begin
-            for i := 0 to Board.SelectecObjectCount - 1 do
-                if (Board.SelectecObject[i].ObjectId = eComponentObject) then
-                    Targets.Add(Board.SelectecObject[i].Name.Text);
-        end;
-
-        if (Targets.Count = 0) then
-        begin
-            Result := 'ERROR: No components to check (no designators given and no components selected)';
-            Exit;
-        end;
-
-        // Check each target against every other component on the same side
-        for i := 0 to Targets.Count - 1 do
-        begin
-            Target := Board.GetPcbComponentByRefDes(Targets[i]);
-            RectA := Target.BoundingRectangleNoNameComment;
-
-            Iterator := Board.BoardIterator_Create;
-            Iterator.AddFilter_ObjectSet(MkSet(eComponentObject));
-            Iterator.AddFilter_IPCB_LayerSet(LayerSet.AllLayers);
-            Iterator.AddFilter_Method(eProcessAll);
-
-            Other := Iterator.FirstPCBObject;
-            while (Other <> nil) do
+            // Build the target list: explicit designators, or current selection
+            if (DesignatorsList.Count > 0) then
             begin
-                if (Other.Name.Text <> Target.Name.Text) and
-                   (Other.Layer = Target.Layer) and
-                   (Processed.IndexOf(Other.Name.Text) < 0) then
+                for i := 0 to DesignatorsList.Count - 1 do
                 begin
-                    RectB := Other.BoundingRectangleNoNameComment;
+                    Designator := Trim(DesignatorsList[i]);
+                    if (Board.GetPcbComponentByRefDes(Designator) <> nil) then
+                        Targets.Add(Designator)
+                    else
+                        MissingArray.Add('"' + JSONEscapeString(Designator) + '"');
+                end;
+            end
+            else
+            begin
+                for i := 0 to Board.SelectecObjectCount - 1 do
+                    if (Board.SelectecObject[i].ObjectId = eComponentObject) then
+                        Targets.Add(Board.SelectecObject[i].Name.Text);
+            end;
 
-                    // Bounding-box overlap/separation in mils (negative = gap)
-                    OverlapX := CoordToMils(Min(RectA.Right, RectB.Right) - Max(RectA.Left, RectB.Left));
-                    OverlapY := CoordToMils(Min(RectA.Top, RectB.Top) - Max(RectA.Bottom, RectB.Bottom));
+            if (Targets.Count = 0) then
+            begin
+                Result := 'ERROR: No components to check (no designators given and no components selected)';
+                Exit;
+            end;
 
-                    if (OverlapX > 0) and (OverlapY > 0) then
-                        Separation := 0
-                    else
-                        Separation := Max(-OverlapX, -OverlapY);
+            // Check each target against every other component on the same side
+            for i := 0 to Targets.Count - 1 do
+            begin
+                Target := Board.GetPcbComponentByRefDes(Targets[i]);
 
-                    // Only measure precisely when the prefilter says "close"
-                    if (Separation < ClearanceMils + 25) then
-                    begin
-                        PairsChecked := PairsChecked + 1;
-                        DistMils := ComponentMinDistance(Board, Target, Other);
-                        IsOverlap := (OverlapX > 0) and (OverlapY > 0);
+                Iterator := Board.BoardIterator_Create;
+                Iterator.AddFilter_ObjectSet(MkSet(eComponentObject));
+                Iterator.AddFilter_IPCB_LayerSet(LayerSet.AllLayers);
+                Iterator.AddFilter_Method(eProcessAll);
 
-                        if (IsOverlap) or (DistMils < ClearanceMils) then
-                        begin
-                            VProps := TStringList.Create;
-                            try
-                                AddJSONProperty(VProps, 'a', Target.Name.Text);
-                                AddJSONProperty(VProps, 'b', Other.Name.Text);
-                                AddJSONProperty(VProps, 'layer', Layer2String(Target.Layer));
-                                if IsOverlap then
-                                    AddJSONProperty(VProps, 'type', 'bounding_box_overlap')
-                                else
-                                    AddJSONProperty(VProps, 'type', 'clearance');
-                                AddJSONNumber(VProps, 'distance_mils', Round(DistMils * 100) / 100);
-                                if IsOverlap then
-                                begin
-                                    AddJSONNumber(VProps, 'overlap_x_mils', Round(OverlapX * 100) / 100);
-                                    AddJSONNumber(VProps, 'overlap_y_mils', Round(OverlapY * 100) / 100);
-                                end;
-                                AddJSONNumber(VProps, 'b_x', CoordToMils(Other.x - Board.XOrigin));
-                                AddJSONNumber(VProps, 'b_y', CoordToMils(Other.y - Board.YOrigin));
-                                ViolationsArray.Add(BuildJSONObject(VProps, 2));
-                            finally
-                                VProps.Free;
-                            end;
-                        end;
+                Other := Iterator.FirstPCBObject;
+                while (Other <> nil) do
+                begin
+                    if (Other.Name.Text <> Target.Name.Text) and
+                       (Other.Layer = Target.Layer) and
+                       (Processed.IndexOf(Other.Name.Text) < 0) then
+                    begin
+                        if CheckPlacementPair(Board, Target, Other, ClearanceMils, ViolationsArray) then
+                            PairsChecked := PairsChecked + 1;
                     end;
+
+                    Other := Iterator.NextPCBObject;
                 end;
 
-                Other := Iterator.NextPCBObject;
+                Board.BoardIterator_Destroy(Iterator);
+                Processed.Add(Target.Name.Text);
             end;
-
-            Board.BoardIterator_Destroy(Iterator);
-            Processed.Add(Target.Name.Text);
         end;
 
         AddJSONInteger(ResultProps, 'checked_count', Targets.Count);
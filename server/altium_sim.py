@@ -0,0 +1,379 @@
+"""
+Python stand-in for Altium and the bridge script.
+
+SimulatedAltium replaces ScriptLauncher: launching "Altium_API>Run" answers
+one request.json on a worker thread, launching "Altium_API>Serve" starts a
+resident loop that follows the same mailbox/heartbeat protocol as the
+DelphiScript Serve procedure. Commands are answered by plain Python
+handlers, so the bridge protocol, failover and latency can be exercised on
+any OS without Altium.
+
+make_bridge wires one to an AltiumBridge and FakeClock drives TTLs, for
+the tests that share them.
+"""
+
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bridge import (RESIDENT_ACTIVE, RESIDENT_HEARTBEAT, RESIDENT_REQUEST,
+                    RESIDENT_RESPONSE, RESIDENT_STOP, AltiumBridge)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+class SimulatedAltium:
+    """Fake X2.EXE + bridge script driven by a dict of command handlers.
+
+    Args:
+        exchange_dir: directory shared with the bridge
+        handlers: command name -> callable(request dict) returning the
+            command result; raising an exception produces an error response
+        launch_delay: seconds a launch spends "starting and compiling"
+        command_delay: seconds every command takes to execute
+    """
+
+    def __init__(self, exchange_dir: Path, handlers: Optional[Dict[str, Callable]] = None,
+                 launch_delay: float = 0.0, command_delay: float = 0.0):
+        self.exchange_dir = Path(exchange_dir)
+        self.handlers = dict(handlers or {})
+        self.launch_delay = launch_delay
+        self.command_delay = command_delay
+        self.launch_count = 0
+        self.commands_run = []
+        self.paused = threading.Event()  # resident loop keeps beating but stops serving
+        self._crash = threading.Event()
+        self._resident: Optional[threading.Thread] = None
+
+    # -- launcher interface -------------------------------------------------
+
+    def launch(self, proc_name: str = "Altium_API>Run") -> bool:
+        self.launch_count += 1
+        if proc_name.endswith(">Serve"):
+            self._crash.clear()
+            self._resident = threading.Thread(target=self._serve, daemon=True)
+            self._resident.start()
+        else:
+            threading.Thread(target=self._run_once, daemon=True).start()
+        return True
+
+    # -- test controls ------------------------------------------------------
+
+    def crash_resident(self) -> None:
+        """Kill the resident loop without cleanup, like a wedged script"""
+        self._crash.set()
+        if self._resident is not None:
+            self._resident.join(timeout=5)
+
+    def stop_resident(self) -> None:
+        (self.exchange_dir / RESIDENT_STOP).touch()
+        if self._resident is not None:
+            self._resident.join(timeout=5)
+
+    # -- script behaviour ---------------------------------------------------
+
+    def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one request and build the response object WriteResponse would"""
+        command = request.get("command", "")
+        if command == "batch":
+            return {"success": True, "result": [
+                self._run_batch_file(name) for name in request.get("batch_files", [])]}
+        self.commands_run.append(command)
+        if self.command_delay:
+            time.sleep(self.command_delay)
+        handler = self.handlers.get(command)
+        if handler is None:
+            return {"success": False, "error": f"Unknown command: {command}"}
+        try:
+            return {"success": True, "result": handler(request)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def _run_batch_file(self, name: str) -> Dict[str, Any]:
+        path = self.exchange_dir / name
+        if not path.exists():
+            return {"success": False, "error": f"No command in {name}"}
+        request = json.loads(path.read_text())
+        return {"command": request.get("command", ""), **self.execute(request)}
+
+    def _run_once(self) -> None:
+        time.sleep(self.launch_delay)
+        request_file = self.exchange_dir / "request.json"
+        if not request_file.exists():
+            return
+        request = json.loads(request_file.read_text())
+        response = self.execute(request)
+        _write_atomic(self.exchange_dir / "response.json", json.dumps(response))
+
+    def _beat(self) -> None:
+        _write_atomic(self.exchange_dir / RESIDENT_HEARTBEAT, f"served={len(self.commands_run)}")
+
+    def _serve(self) -> None:
+        time.sleep(self.launch_delay)
+        request_file = self.exchange_dir / RESIDENT_REQUEST
+        active_file = self.exchange_dir / RESIDENT_ACTIVE
+        stop_file = self.exchange_dir / RESIDENT_STOP
+        if stop_file.exists():
+            stop_file.unlink()
+        ticks = 0
+        self._beat()
+        while not stop_file.exists() and not self._crash.is_set():
+            if not self.paused.is_set() and request_file.exists():
+                try:
+                    os.replace(request_file, active_file)
+                except OSError:
+                    active_file = None
+                if active_file is not None:
+                    request = json.loads(active_file.read_text())
+                    active_file.unlink()
+                    response = self.execute(request)
+                    self._beat()
+                    _write_atomic(self.exchange_dir / RESIDENT_RESPONSE, json.dumps(response))
+                active_file = self.exchange_dir / RESIDENT_ACTIVE
+            ticks += 1
+            if ticks % 25 == 0:
+                self._beat()
+            time.sleep(0.002)
+        if stop_file.exists():
+            stop_file.unlink()
+
+
+def make_bridge(exchange_dir: Path, handlers: Optional[Dict[str, Callable]] = None, mode: str = "launch",
+                **sim_kwargs) -> Tuple[AltiumBridge, SimulatedAltium]:
+    """An AltiumBridge wired to a SimulatedAltium answering with handlers.
+
+    The resident transport's heartbeat, pickup and startup timeouts are
+    shortened so failover is seen in tenths of a second. sim_kwargs go to
+    SimulatedAltium (launch_delay, command_delay).
+    """
+    sim = SimulatedAltium(exchange_dir, handlers, **sim_kwargs)
+    config = SimpleNamespace(altium_exe_path="", script_path="", bridge_mode=mode)
+    bridge = AltiumBridge(config, Path(exchange_dir), launcher=sim)
+    bridge.resident_transport.heartbeat_timeout = 0.3
+    bridge.resident_transport.pickup_timeout = 0.3
+    bridge.resident_transport.startup_timeout = 5
+    return bridge, sim
+
+
+class FakeClock:
+    """Clock for TTL tests: returns now, which the test sets"""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SyntheticBoard:
+    """A generated board that answers get_all_component_data like the
+    script does, including the delta protocol (see component_sync),
+    get_component_pins with pads derived from each component's placement,
+    and get_component_geometry with pads, silkscreen and courtyard lines.
+
+    The snapshot the script keeps on disk is kept in memory here: a stamp
+    and each component's serialized JSON by designator.
+    """
+
+    FOOTPRINTS = ("0402", "0603", "0805", "SOT23", "SOIC8", "QFN32")
+    PAD_COUNTS = {"R": 2, "C": 2, "L": 2, "D": 2, "Q": 3, "U": 16}
+
+    def __init__(self, count: int = 10_000, seed: int = 0):
+        self.rng = random.Random(seed)
+        self._numbers = itertools.count(1)
+        self._channels = itertools.count(2)
+        self.components: Dict[str, Dict[str, Any]] = {}
+        # designator -> [(pad name, dx, dy, net)] in the rotation-0 frame
+        self.pads: Dict[str, list] = {}
+        self.nets = ["GND", "+3V3"] + [f"N{i}" for i in range(max(count // 2, 1))]
+        for _ in range(count):
+            self.add_component()
+        self._stamp = ""
+        self._snapshot: Dict[str, str] = {}
+        self._stamps = itertools.count(1)
+
+    def add_component(self) -> str:
+        prefix = self.rng.choice("RCLUDQ")
+        designator = f"{prefix}{next(self._numbers)}"
+        self.components[designator] = {
+            "designator": designator,
+            "name": f"{prefix}_PART",
+            "description": f"Synthetic {prefix} part",
+            "footprint": self.rng.choice(self.FOOTPRINTS),
+            "layer": self.rng.choice(["TopLayer", "BottomLayer"]),
+            "x": round(self.rng.uniform(0, 8000), 3),
+            "y": round(self.rng.uniform(0, 6000), 3),
+            "width": 40.0,
+            "height": 20.0,
+            "rotation": self.rng.choice([0, 90, 180, 270]),
+        }
+        pad_count = self.PAD_COUNTS[prefix]
+        pitch = 25.0 if pad_count > 3 else 40.0
+        self.pads[designator] = [
+            (str(i + 1), (i - (pad_count - 1) / 2) * pitch, 0.0,
+             self.rng.choice(self.nets[:2]) if self.rng.random() < 0.3 else self.rng.choice(self.nets))
+            for i in range(pad_count)]
+        return designator
+
+    def add_circuit(self, size: int = 12, link: Optional[str] = None) -> List[str]:
+        """A regulator-like block: one 16-pad IC and size - 1 two-pad
+        passives around a random point, wired on the block's own nets plus
+        GND and +3V3. link ties the IC's last pad to a net shared with
+        other blocks. Returns the block's designators, IC first."""
+        block = next(self._channels)
+        nets = [f"B{block}_{i}" for i in range(max(size // 2, 2))]
+        cx, cy = self.rng.uniform(0, 8000), self.rng.uniform(0, 6000)
+        designators = []
+        for i in range(size):
+            prefix = "U" if i == 0 else self.rng.choice("RCL")
+            designator = f"{prefix}{next(self._numbers)}"
+            self.components[designator] = {
+                "designator": designator, "name": f"{prefix}_PART",
+                "description": f"Synthetic {prefix} part",
+                "footprint": "QFN32" if i == 0 else self.rng.choice(self.FOOTPRINTS[:3]),
+                "layer": "TopLayer",
+                "x": round(cx + self.rng.uniform(-300, 300), 3), "y": round(cy + self.rng.uniform(-300, 300), 3),
+                "width": 200.0 if i == 0 else 40.0, "height": 200.0 if i == 0 else 20.0, "rotation": 0,
+            }
+            if i == 0:
+                wiring = [nets[k % len(nets)] if k < 12 else ("GND", "+3V3", "GND", link or "GND")[k - 12]
+                          for k in range(16)]
+            else:
+                wiring = [self.rng.choice(nets), self.rng.choice(nets + ["GND"])]
+            pitch = 25.0 if len(wiring) > 3 else 40.0
+            self.pads[designator] = [(str(k + 1), (k - (len(wiring) - 1) / 2) * pitch, 0.0, net)
+                                     for k, net in enumerate(wiring)]
+            designators.append(designator)
+        return designators
+
+    def mutate(self, moves: int = 10, adds: int = 0, removes: int = 0) -> None:
+        """Move/rotate, add and delete random components"""
+        for designator in self.rng.sample(sorted(self.components), moves):
+            component = self.components[designator]
+            component["x"] = round(component["x"] + self.rng.uniform(-50, 50), 3)
+            component["rotation"] = (component["rotation"] + 90) % 360
+        for designator in self.rng.sample(sorted(self.components), removes):
+            del self.components[designator]
+            del self.pads[designator]
+        for _ in range(adds):
+            self.add_component()
+
+    def duplicate(self, designators: List[str], dx: float = 0.0, dy: float = 0.0,
+                  shared=("GND", "+3V3")) -> List[str]:
+        """Copy components as another channel: new designators, moved by
+        (dx, dy), nets other than the shared ones renamed per channel"""
+        suffix = f"_CH{next(self._channels)}"
+        copies = []
+        for designator in designators:
+            copy = f"{designator.rstrip('0123456789')}{next(self._numbers)}"
+            component = self.components[designator]
+            self.components[copy] = dict(component, designator=copy,
+                                         x=round(component["x"] + dx, 3), y=round(component["y"] + dy, 3))
+            self.pads[copy] = [(name, px, py, net if net in shared else net + suffix)
+                               for name, px, py, net in self.pads[designator]]
+            copies.append(copy)
+        return copies
+
+    def get_layout_duplicator(self, request: Dict[str, Any]):
+        """layout_duplicator's result for the given source and destination
+        designators (the script takes both from the selection)"""
+        def entries(designators):
+            return [{
+                "designator": d,
+                "description": self.components[d]["description"],
+                "footprint": self.components[d]["footprint"],
+                "rotation": self.components[d]["rotation"],
+                "layer": self.components[d]["layer"],
+                "pins": [{key: p[key] for key in ("name", "net", "x", "y", "layer")} for p in self.pins_of(d)],
+            } for d in designators if d in self.components]
+        return {"success": True,
+                "source_components": entries(request.get("source", [])),
+                "destination_components": entries(request.get("destination", []))}
+
+    def get_all_component_data(self, request: Dict[str, Any]):
+        components = list(self.components.values())
+        if not request.get("delta"):
+            return components
+        since = request.get("since", "")
+        full = not since or since != self._stamp
+        current = {c["designator"]: json.dumps(c, sort_keys=True) for c in components}
+        changed = [c for c in components
+                   if full or self._snapshot.get(c["designator"]) != current[c["designator"]]]
+        removed = [] if full else [d for d in self._snapshot if d not in current]
+        self._stamp = f"s{next(self._stamps)}"
+        self._snapshot = current
+        return {"stamp": self._stamp, "full": full, "components": changed, "removed": removed}
+
+    def pins_of(self, designator: str) -> List[Dict[str, Any]]:
+        component = self.components[designator]
+        angle = math.radians(component["rotation"])
+        cos, sin = math.cos(angle), math.sin(angle)
+        mirror = -1.0 if component["layer"] == "BottomLayer" else 1.0
+        pins = []
+        for name, dx, dy, net in self.pads[designator]:
+            mx = dx * mirror
+            pins.append({
+                "name": name, "net": net,
+                "x": round(component["x"] + mx * cos - dy * sin, 4),
+                "y": round(component["y"] + mx * sin + dy * cos, 4),
+                "dx": dx, "dy": dy, "rotation": component["rotation"],
+                "layer": component["layer"], "width": 20.0, "height": 24.0,
+                "shape": "Rectangular",
+            })
+        return pins
+
+    def geometry_of(self, designator: str) -> Dict[str, Any]:
+        """get_component_geometry entry: rectangular pads, a silkscreen
+        outline around them and a Mechanical 15 courtyard outside that"""
+        component = self.components[designator]
+        pins = self.pins_of(designator)
+        primitives = [{"type": "pad", "name": p["name"], "x": p["x"], "y": p["y"],
+                       "rotation": component["rotation"], "width": 20.0, "height": 24.0,
+                       "shape": "Rectangular", "layer": component["layer"]} for p in pins]
+        reach = max(abs(dx) for _, dx, _, _ in self.pads[designator]) + 10.0
+        side = "Top" if component["layer"] == "TopLayer" else "Bottom"
+        corners = []
+        for layer, grow, width in ((f"{side} Overlay", 10.0, 6.0), ("Mechanical 15", 20.0, 2.0)):
+            w, h = reach + grow, 12.0 + grow
+            outline = [(-w, -h), (w, -h), (w, h), (-w, h)]
+            angle = math.radians(component["rotation"])
+            cos, sin = math.cos(angle), math.sin(angle)
+            points = [(round(component["x"] + x * cos - y * sin, 4), round(component["y"] + x * sin + y * cos, 4))
+                      for x, y in outline]
+            for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+                primitives.append({"type": "track", "x1": x1, "y1": y1, "x2": x2, "y2": y2,
+                                   "width": width, "layer": layer})
+            corners = points
+        # the bounding box of the courtyard lines
+        xs, ys = [x for x, _ in corners], [y for _, y in corners]
+        return {
+            "designator": designator, "layer": component["layer"],
+            "x": component["x"], "y": component["y"], "rotation": component["rotation"],
+            "width": max(xs) - min(xs) + 2.0, "height": max(ys) - min(ys) + 2.0,
+            "box_left": min(xs) - 1.0, "box_bottom": min(ys) - 1.0,
+            "primitives": primitives,
+        }
+
+    def get_component_geometry(self, request: Dict[str, Any]):
+        designators = request.get("designators") or list(self.components)
+        return [self.geometry_of(d) for d in designators if d in self.components]
+
+    def get_component_pins(self, request: Dict[str, Any]):
+        designators = request.get("designators") or list(self.components)
+        return [{
+            "designator": d,
+            "x": self.components[d]["x"], "y": self.components[d]["y"],
+            "rotation": self.components[d]["rotation"], "layer": self.components[d]["layer"],
+            "pins": self.pins_of(d),
+        } for d in designators if d in self.components]
@@ -0,0 +1,71 @@
+"""
+Benchmark: score_placement's evaluate_placement on a cached BoardModel vs
+the Python half of the old loop (re-reading every pin after a move and
+rebuilding net airlines from the pin dicts), on a synthetic board.
+
+The old loop also paid an Altium round trip per iteration (place, then
+get_component_pins), which this benchmark cannot reproduce; the numbers
+below are a lower bound for it.
+
+Run from the repo root:
+    python server/benchmarks/bench_board_model.py [components] [moved]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from board_model import BoardModel, evaluate_placement, parse_placements
+from mst import mst_length
+
+
+def legacy_round(board, moves, scope):
+    """Apply the moves to the board, re-read all pins, airline per touched net"""
+    for move in moves:
+        board.components[move["designator"]].update(x=move["x"], y=move["y"])
+    net_pads = {}
+    for comp in board.get_component_pins({}):
+        for pin in comp["pins"]:
+            net_pads.setdefault(pin["net"], []).append((pin["x"], pin["y"]))
+    nets = {pin["net"] for d in scope for pin in board.pins_of(d)}
+    return sum(mst_length(net_pads[n]) for n in nets if len(net_pads[n]) <= 40)
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(count: int = 3000, moved: int = 20):
+    board = SyntheticBoard(count=count, seed=0)
+    rng = random.Random(1)
+    scope = rng.sample(sorted(board.components), moved)
+    moves = [{"designator": d, "x": board.components[d]["x"] + rng.uniform(-200, 200),
+              "y": board.components[d]["y"] + rng.uniform(-200, 200)} for d in scope]
+    placements, errors = parse_placements(moves)
+    assert not errors
+
+    components = list(board.components.values())
+    pins = board.get_component_pins({})
+    build_s, model = timed(lambda: BoardModel(components, pins))
+    score_s, result = timed(lambda: evaluate_placement(model, placements), repeat=20)
+    legacy_s, _ = timed(lambda: legacy_round(board, moves, scope))
+
+    print(f"{count} components, {len(model.pad_comp)} pads, {moved} moved, "
+          f"{len(result['nets'])} nets scored")
+    print(f"  BoardModel build (once)     {build_s * 1000:9.1f} ms")
+    print(f"  evaluate_placement          {score_s * 1000:9.2f} ms")
+    print(f"  re-read pins + airlines     {legacy_s * 1000:9.1f} ms   ({legacy_s / score_s:.1f}x), "
+          f"plus the script round trips")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,60 @@
+"""
+Benchmark: render_board on synthetic boards - scene build (first call on
+a new snapshot), then render plus PNG encode for the whole board, a
+zoomed view and a highlighted net, the time render_board answers in once
+the scene is memoized.
+
+The synthetic nets join random parts across the whole board, so the
+airlines are far longer than on a placed board and the full-board times
+are pessimistic.
+
+Run from the repo root:
+    python server/benchmarks/bench_board_render.py [components] [size]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from board_render import BoardScene, render_board, to_png
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(components: int = 3000, size: int = 1600):
+    board = SyntheticBoard(components, seed=0)
+    comps = list(board.components.values())
+    pins = board.get_component_pins({})
+    geometry = board.get_component_geometry({})
+    print(f"{len(comps)} components, {sum(len(e['pins']) for e in pins)} pads")
+
+    scene_s, scene = timed(lambda: BoardScene(comps, pins, geometry))
+    airline_s, _ = timed(lambda: BoardScene(comps, pins).airlines(), repeat=1)
+    print(f"scene build: {scene_s * 1000:.1f} ms, airlines (first render): {airline_s * 1000:.1f} ms")
+    scene.airlines()
+
+    some = [c["designator"] for c in comps[:12]]
+    net = scene.net_names[0]
+    for label, kwargs in [("full board", {}), ("full board, courtyards", {"courtyards": True}),
+                          ("zoom_to 12 parts", {"zoom_to": some}), ("top only", {"layers": ["top"]}),
+                          ("highlight one net", {"highlight_nets": [net]})]:
+        kwargs.setdefault("courtyards", False)
+        render_s, result = timed(lambda: render_board(scene, size=size, **kwargs))
+        encode_s, png = timed(lambda: to_png(result["image"]))
+        print(f"{label}: render {render_s * 1000:.1f} ms + PNG {encode_s * 1000:.1f} ms "
+              f"({len(png) // 1024} KB, {result['image'].width}x{result['image'].height}, "
+              f"{result['pad_count']} pads, {result['airline_count']} airlines)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,54 @@
+"""
+Benchmark: suggest_clusters on a synthetic board of regulator-like blocks
+(an IC with 4-24 passives each, every four blocks sharing a bus net).
+Times the affinity matrix, Louvain and the full call, and checks how many
+blocks end up split across clusters.
+
+Run from the repo root:
+    python server/benchmarks/bench_clustering.py [blocks] [max_cluster_size]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from clustering import affinity, louvain, suggest_clusters
+from netgraph import NetGraph
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(blocks: int = 700, max_cluster_size: int = 40):
+    board = SyntheticBoard(count=0, seed=0)
+    planted = [board.add_circuit(board.rng.randint(5, 25), link=f"BUS{i // 4}") for i in range(blocks)]
+    components = list(board.components.values())
+    graph = NetGraph(board.get_component_pins({}))
+    comps = np.arange(len(graph))
+    print(f"{len(graph)} components in {blocks} blocks")
+
+    affinity_s, matrix = timed(lambda: affinity(graph, comps, graph.followed(40)))
+    print(f"affinity matrix: {len(matrix[1])} entries in {affinity_s * 1000:.1f} ms")
+    louvain_s, labels = timed(lambda: louvain(*matrix))
+    print(f"louvain: {labels.max() + 1} communities in {louvain_s * 1000:.1f} ms")
+
+    total_s, result = timed(lambda: suggest_clusters(graph, components, max_cluster_size=max_cluster_size))
+    where = {d: i for i, c in enumerate(result["clusters"]) for d in c["designators"]}
+    split = sum(len({where.get(d) for d in block}) > 1 for block in planted)
+    print(f"suggest_clusters: {result['cluster_count']} clusters (max {max_cluster_size}) in "
+          f"{total_s * 1000:.1f} ms, {split} blocks split")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,59 @@
+"""
+Benchmark: payload size and parse time of the columnar encoding vs the
+indented JSON get_component_data / get_component_pins return by default.
+
+Run from the repo root:
+    python server/benchmarks/bench_columnar.py [components]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import columnar
+from altium_sim import SyntheticBoard
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def compare(label, rows_json, compact, table):
+    json_parse_s, _ = timed(lambda: json.loads(rows_json))
+    col_parse_s, payload = timed(lambda: json.loads(compact))
+    rows_s, _ = timed(lambda: columnar.decode_rows(payload, table))
+    cols_s, _ = timed(lambda: columnar.decode_columns(payload, table))
+    print(f"{label}")
+    print(f"  json      {len(rows_json) / 1024:9.1f} KiB  parse {json_parse_s * 1000:7.1f} ms")
+    print(f"  columnar  {len(compact) / 1024:9.1f} KiB  parse {col_parse_s * 1000:7.1f} ms"
+          f"  (+rows {rows_s * 1000:.1f} ms, +columns {cols_s * 1000:.1f} ms)")
+    print(f"  {len(rows_json) / len(compact):.1f}x smaller")
+
+
+def main(count: int = 10_000):
+    board = SyntheticBoard(count=count, seed=0)
+    components = list(board.components.values())
+    print(f"{count} components")
+    compare("get_component_data",
+            json.dumps(components, indent=2),
+            columnar.dumps(columnar.encode_components(components), "columnar"),
+            "components")
+
+    pins = board.get_component_pins({})
+    print(f"{sum(len(c['pins']) for c in pins)} pads")
+    compare("get_component_pins",
+            json.dumps(pins, indent=2),
+            columnar.dumps(columnar.encode_component_pins(pins), "columnar"),
+            "pins")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
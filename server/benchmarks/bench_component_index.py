@@ -0,0 +1,94 @@
+"""
+Benchmark: ComponentIndex vs the old per-designator linear scan, and
+PropertyIndex queries vs re-scanning the component list.
+
+Run from the repo root:
+    python server/benchmarks/bench_component_index.py [components] [requested]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from component_index import ComponentIndex, PropertyIndex
+
+
+def synthetic_board(n: int):
+    footprints = ["0402", "0603", "0805", "SOT23", "QFN32", "SOIC8"]
+    return [{
+        "designator": f"{random.choice('RCLUDQ')}{i}",
+        "footprint": random.choice(footprints),
+        "layer": random.choice(["TopLayer", "BottomLayer"]),
+        "x": random.uniform(0, 4000),
+        "y": random.uniform(0, 3000),
+        "rotation": random.choice([0, 90, 180, 270]),
+    } for i in range(n)]
+
+
+def linear_filter(component_list, designators):
+    components, missing = [], []
+    for designator in designators:
+        for component in component_list:
+            if component.get("designator") == designator:
+                components.append(component)
+                break
+        else:
+            missing.append(designator)
+    return components, missing
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(n: int = 10_000, requested: int = 500):
+    random.seed(0)
+    board = synthetic_board(n)
+    designators = [c["designator"] for c in random.sample(board, requested)] + ["MISSING1"]
+
+    linear_s, expected = timed(lambda: linear_filter(board, designators))
+    build_s, index = timed(lambda: ComponentIndex(board))
+    lookup_s, got = timed(lambda: index.lookup(designators))
+    assert got == expected
+
+    print(f"{n} components, {len(designators)} requested designators")
+    print(f"  linear scan      {linear_s * 1000:9.2f} ms")
+    print(f"  index build      {build_s * 1000:9.2f} ms (once per snapshot)")
+    print(f"  index lookup     {lookup_s * 1000:9.2f} ms")
+    print(f"  speedup          {linear_s / (build_s + lookup_s):9.1f}x cold, "
+          f"{linear_s / lookup_s:.0f}x warm")
+
+    def scan_names():
+        names = set()
+        for component in board:
+            names.update(component.keys())
+        return sorted(names)
+
+    def scan_where():
+        return [c["designator"] for c in board if c.get("footprint") == "0402"]
+
+    properties = PropertyIndex(board)
+    properties.where("footprint", "0402")  # build the column once
+    print("property queries")
+    for label, scan, query in (
+            ("all names", scan_names, properties.names),
+            ("footprint = 0402", scan_where, lambda: properties.where("footprint", "0402")),
+            ("footprint ~ SO*", None, lambda: properties.where("footprint", pattern="SO*"))):
+        query_s, _ = timed(query)
+        line = f"  {label:16} {query_s * 1000:9.3f} ms"
+        if scan is not None:
+            scan_s, _ = timed(scan)
+            line += f"   (scan {scan_s * 1000:.2f} ms)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,58 @@
+"""
+Benchmark: bytes moved and round-trip time for get_all_component_data with
+and without delta sync, on a synthetic board that changes between calls.
+
+Bytes are the size of response.json. The ms/call column includes the
+simulator's own diffing and is only indicative.
+
+Run from the repo root:
+    python server/benchmarks/bench_component_sync.py [components] [calls] [moves]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bridge import AltiumBridge
+from altium_sim import SimulatedAltium, SyntheticBoard
+
+
+async def run(delta: bool, count: int, calls: int, moves: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        board = SyntheticBoard(count=count, seed=0)
+        sim = SimulatedAltium(Path(tmp), handlers={
+            "get_all_component_data": board.get_all_component_data})
+        config = SimpleNamespace(altium_exe_path="", script_path="", bridge_mode="launch",
+                                 component_delta_sync=delta)
+        bridge = AltiumBridge(config, Path(tmp), launcher=sim)
+        response_file = Path(tmp) / "response.json"
+
+        moved = []
+        start = time.perf_counter()
+        for _ in range(calls):
+            board.mutate(moves=moves, adds=1, removes=1)
+            await bridge.execute_command("get_all_component_data", {}, use_cache=False)
+            moved.append(response_file.stat().st_size)
+        elapsed = (time.perf_counter() - start) / calls
+    # The first call is always a full snapshot
+    steady = moved[1:] or moved
+    return sum(steady) / len(steady), elapsed
+
+
+def main(count: int = 10_000, calls: int = 10, moves: int = 25):
+    print(f"{count} components, {calls} calls, {moves} moves + 1 add + 1 remove between calls")
+    full_bytes, full_s = asyncio.run(run(False, count, calls, moves))
+    delta_bytes, delta_s = asyncio.run(run(True, count, calls, moves))
+    print(f"  full   {full_bytes / 1024:10.1f} KiB/call  {full_s * 1000:8.1f} ms/call")
+    print(f"  delta  {delta_bytes / 1024:10.1f} KiB/call  {delta_s * 1000:8.1f} ms/call")
+    print(f"  {full_bytes / delta_bytes:.0f}x fewer bytes")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:4]))
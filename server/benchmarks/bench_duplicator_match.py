@@ -0,0 +1,75 @@
+"""
+Benchmark: layout_duplicator matching (duplicator_match.match_groups) on a
+synthetic channel and its copy - an exact copy with shuffled designators,
+a mirrored copy with one part swapped out (wiring differs), and the
+symmetric worst case of interchangeable decoupling caps, which needs one
+refinement per cap.
+
+Run from the repo root:
+    python server/benchmarks/bench_duplicator_match.py [parts]
+"""
+
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from duplicator_match import match_groups
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(label, seconds, result, truth):
+    correct = sum(truth.get(s) == d for s, d in zip(result["source_designators"], result["destination_designators"]))
+    print(f"{label:<28} {seconds * 1000:8.1f} ms  {correct}/{len(truth)} correct, "
+          f"{result['ambiguous_count']} ambiguous, {len(result['unmatched_source'])} unmatched, "
+          f"{result['refinement_rounds']} rounds")
+
+
+def main(parts: int = 500):
+    board = SyntheticBoard(count=parts * 4, seed=0)
+    source = random.Random(0).sample(sorted(board.components), parts)
+    destination = board.duplicate(source, dx=12000)
+    truth = dict(zip(source, destination))
+    shuffled = list(destination)
+    random.Random(1).shuffle(shuffled)
+    data = board.get_layout_duplicator({"source": source, "destination": shuffled})
+    src, dst = data["source_components"], data["destination_components"]
+
+    seconds, result = timed(lambda: match_groups(src, dst))
+    report("exact copy", seconds, result, truth)
+
+    changed = copy.deepcopy(dst)
+    for component in changed:
+        for pin in component["pins"]:
+            pin["x"] = -pin["x"]
+    extra = copy.deepcopy(changed[0])
+    extra["designator"] = "X1"
+    changed[1:2] = [extra]
+    seconds, result = timed(lambda: match_groups(src, changed))
+    report("mirrored, one part swapped", seconds, result, truth)
+
+    def caps(first, x):
+        return [{"designator": f"C{first + i}", "footprint": "0402", "description": "100n",
+                 "pins": [{"name": "1", "net": "GND", "x": x + 60 * (i % 25), "y": 50 * (i // 25)},
+                          {"name": "2", "net": "+3V3", "x": x + 60 * (i % 25), "y": 50 * (i // 25) + 30}]}
+                for i in range(parts)]
+    cap_src, cap_dst = caps(1, 0), caps(parts + 1, 20000)
+    random.Random(2).shuffle(cap_dst)
+    seconds, result = timed(lambda: match_groups(cap_src, cap_dst))
+    report("interchangeable caps", seconds, result, {f"C{i + 1}": f"C{parts + i + 1}" for i in range(parts)})
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
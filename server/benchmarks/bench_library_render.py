@@ -0,0 +1,88 @@
+"""
+Benchmark: render_library_preview on a synthetic library spec - parsing,
+building the drawings and the contact sheet (PNG and SVG), with the text
+mask cache cold and then warm.
+
+The symbols are quad-sided ICs with 8 to 64 pins and a drawn body; the
+footprints are QFPs with a thermal pad and silkscreen.
+
+Run from the repo root:
+    python server/benchmarks/bench_library_render.py [symbols] [footprints]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import library_render
+from board_render import to_png
+from library_render import contact_sheet, contact_sheet_svg, drawings_of, load_source
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def symbol_spec(count):
+    lines = ["LIBRARY|bench.SchLib"]
+    for i in range(count):
+        side = 2 + i % 15
+        lines.append(f"SYMBOL|IC{i}|Synthetic {4 * side} pin part|1")
+        span = (side + 1) * 100
+        lines.append(f"GRAPHIC|rectangle|1|1|1|0|0|{span}|{-span}")
+        for k in range(side):
+            step = (k + 1) * 100
+            for n, (orient, x, y, name) in enumerate([("eRotate180", 0, -step, f"PA{k}"),
+                                                      ("eRotate270", step, -span, f"\\R\\ST{k}"),
+                                                      ("eRotate0", span, -step, f"PB{k}"),
+                                                      ("eRotate90", step, 0, "VCC" if k % 4 else "GND")]):
+                lines.append(f"PIN|{n * side + k + 1}|{name}|eElectricIO|{orient}|{x}|{y}")
+    return "\n".join(lines)
+
+
+def footprint_spec(count):
+    lines = ["FPLIB|bench.PcbLib"]
+    for i in range(count):
+        side = 4 + i % 13
+        lines.append(f"FOOTPRINT|QFP{4 * side}_{i}|Synthetic QFP")
+        half = side * 10 + 40
+        for k in range(side):
+            offset = (k - (side - 1) / 2) * 20
+            for n, (x, y, rot) in enumerate([(-half, -offset, 0), (offset, -half, 90),
+                                             (half, offset, 0), (-offset, half, 90)]):
+                lines.append(f"PAD|{n * side + k + 1}|{x}|{y}|{rot}|TopLayer|0|0|0|0|0|60|12|9|50")
+        lines.append(f"PAD|EP|0|0|0|TopLayer|0|0|0|0|0|{side * 12}|{side * 12}|2")
+        s = half - 50
+        for x1, y1, x2, y2 in [(-s, s, s, s), (s, s, s, -s), (s, -s, -s, -s), (-s, -s, -s, s)]:
+            lines.append(f"TRACK|{x1}|{y1}|{x2}|{y2}|8|TopOverlay")
+        lines.append(f"REGION|Mechanical15|0|{-half - 60}|{-half - 60}|{half + 60}|{-half - 60}|"
+                     f"{half + 60}|{half + 60}|{-half - 60}|{half + 60}")
+    return "\n".join(lines)
+
+
+def main(symbols: int = 300, footprints: int = 300):
+    for label, spec in [("symbols", symbol_spec(symbols)), ("footprints", footprint_spec(footprints))]:
+        parse_s, (kind, entries, problems) = timed(lambda: load_source(spec))
+        build_s, drawings = timed(lambda: drawings_of(kind, entries))
+        primitives = sum(len(e["primitives"]) for e in entries)
+        print(f"{len(entries)} {label}, {primitives} primitives, {len(problems)} spec errors: "
+              f"parse {parse_s * 1000:.1f} ms, drawings {build_s * 1000:.1f} ms")
+        library_render._text_masks.clear()
+        cold_s, sheet = timed(lambda: contact_sheet(drawings), repeat=1)
+        warm_s, sheet = timed(lambda: contact_sheet(drawings))
+        encode_s, png = timed(lambda: to_png(sheet))
+        svg_s, svg = timed(lambda: contact_sheet_svg(drawings))
+        print(f"  contact sheet {sheet.width}x{sheet.height}: {cold_s * 1000:.0f} ms cold, "
+              f"{warm_s * 1000:.0f} ms warm + PNG {encode_s * 1000:.0f} ms ({len(png) // 1024} KB); "
+              f"SVG {svg_s * 1000:.0f} ms ({len(svg) // 1024} KB)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
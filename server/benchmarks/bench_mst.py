@@ -0,0 +1,78 @@
+"""
+Benchmark: net airline (MST) length with server/mst.py vs the pure-Python
+Prim that get_net_connections used before, over random nets of growing
+size and the GND net of a synthetic board.
+
+Run from the repo root:
+    python server/benchmarks/bench_mst.py [board components]
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import mst
+from altium_sim import SyntheticBoard
+
+SIZES = (5, 16, 40, 100, 400, 1000, 2000)
+
+
+def legacy_mst_length(points: list) -> float:
+    """The previous main._mst_length, verbatim"""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    in_tree = [False] * n
+    best = [float("inf")] * n
+    best[0] = 0.0
+    total = 0.0
+    for _ in range(n):
+        u = min((i for i in range(n) if not in_tree[i]), key=lambda i: best[i])
+        in_tree[u] = True
+        total += best[u]
+        ux, uy = points[u]
+        for v in range(n):
+            if not in_tree[v]:
+                d = math.dist((ux, uy), points[v])
+                if d < best[v]:
+                    best[v] = d
+    return total
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def compare(label, points):
+    repeat = 1 if len(points) > 500 else 3
+    legacy_s, expected = timed(lambda: legacy_mst_length(points), repeat)
+    new_s, got = timed(lambda: mst.mst_length(points))
+    assert math.isclose(got, expected, rel_tol=1e-9), (got, expected)
+    print(f"  {label:>14} {legacy_s * 1000:11.2f} ms {new_s * 1000:9.3f} ms {legacy_s / new_s:8.1f}x")
+
+
+def main(components: int = 3000):
+    random.seed(0)
+    backend = "scipy Delaunay" if mst.Delaunay is not None else "row-wise Prim (no scipy)"
+    print(f"large nets: {backend}")
+    print(f"  {'pads':>14} {'legacy':>14} {'mst.py':>12} {'speedup':>9}")
+    for n in SIZES:
+        compare(f"{n}", [(random.uniform(0, 8000), random.uniform(0, 6000)) for _ in range(n)])
+
+    board = SyntheticBoard(count=components, seed=0)
+    gnd = [(pin["x"], pin["y"]) for designator in board.components
+           for pin in board.pins_of(designator) if pin["net"] == "GND"]
+    compare(f"GND ({len(gnd)})", gnd)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
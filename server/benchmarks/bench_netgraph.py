@@ -0,0 +1,73 @@
+"""
+Benchmark: connectivity queries on a synthetic board. The cached NetGraph
+is compared with rebuilding the net topology from the flat pad list on
+every call, the way get_net_connections groups pads, followed by a plain
+Python search. The queries are a 2-hop neighbourhood, the connected
+groups and the shared nets of a pair.
+
+Run from the repo root:
+    python server/benchmarks/bench_netgraph.py [components]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from netgraph import NetGraph
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def rebuilt_hops(pins, seed, hops, max_pads):
+    """Group pads by net, then search hop by hop"""
+    by_net, by_comp = {}, {}
+    for entry in pins:
+        for pin in entry["pins"]:
+            if pin["net"]:
+                by_net.setdefault(pin["net"], set()).add(entry["designator"])
+                by_comp.setdefault(entry["designator"], set()).add(pin["net"])
+    pad_count = {}
+    for entry in pins:
+        for pin in entry["pins"]:
+            pad_count[pin["net"]] = pad_count.get(pin["net"], 0) + 1
+    seen, frontier = {seed}, [seed]
+    for _ in range(hops):
+        nets = {n for d in frontier for n in by_comp.get(d, ()) if pad_count[n] <= max_pads}
+        frontier = [d for n in nets for d in by_net[n] if d not in seen]
+        seen.update(frontier)
+    return seen
+
+
+def main(count: int = 10_000):
+    board = SyntheticBoard(count=count, seed=0)
+    pins = board.get_component_pins({})
+    build_s, graph = timed(lambda: NetGraph(pins))
+    print(f"{count} components, {len(graph.net_names)} nets: graph built in {build_s * 1000:.1f} ms")
+
+    seed = graph.designators[0]
+    rebuilt_s, expected = timed(lambda: rebuilt_hops(pins, seed, 2, 40))
+    cached_s, result = timed(lambda: graph.neighbourhood([seed], hops=2))
+    assert {c["designator"] for c in result["components"]} | {seed} == expected
+    print(f"2-hop neighbourhood ({result['component_count']} parts): "
+          f"rebuilt {rebuilt_s * 1000:.1f} ms, cached {cached_s * 1000:.2f} ms")
+
+    for threshold in (40, 3):
+        groups_s, groups = timed(lambda: graph.groups(max_pads_per_net=threshold))
+        print(f"groups, nets up to {threshold} pads: {len(groups)} groups in {groups_s * 1000:.1f} ms")
+
+    shared_s, shared = timed(lambda: graph.shared_nets(graph.designators[:2]))
+    print(f"shared nets of a pair: {shared['net_count']} in {shared_s * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
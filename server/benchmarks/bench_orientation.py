@@ -0,0 +1,134 @@
+"""
+Benchmark: check_orientation scoring with orientation.check_rotations vs
+the previous per-pad x per-rotation loop that rebuilt each net's MST from
+scratch, on a synthetic board; then joint mode (optimize_rotations), with
+the board score it reaches vs applying every per-part suggestion at once.
+
+Run from the repo root:
+    python server/benchmarks/bench_orientation.py [components]
+"""
+
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from orientation import RotationSearch, check_rotations, optimize_rotations, rotate_offset
+
+
+def legacy_mst_length(points: list) -> float:
+    n = len(points)
+    if n < 2:
+        return 0.0
+    in_tree = [False] * n
+    best = [float("inf")] * n
+    best[0] = 0.0
+    total = 0.0
+    for _ in range(n):
+        u = min((i for i in range(n) if not in_tree[i]), key=lambda i: best[i])
+        in_tree[u] = True
+        total += best[u]
+        ux, uy = points[u]
+        for v in range(n):
+            if not in_tree[v]:
+                d = math.dist((ux, uy), points[v])
+                if d < best[v]:
+                    best[v] = d
+    return total
+
+
+def legacy_check(comps, net_pads, min_improvement_mils):
+    """The previous check_orientation loop, verbatim apart from returning"""
+    PLANE_NET_PAD_COUNT = 40
+    suggestions = []
+    checked = 0
+    for comp in comps:
+        pins = comp.get("pins", [])
+        if len(pins) != 2 or "x" not in comp:
+            continue
+        mirror = comp.get("layer") == "Bottom Layer"
+
+        def score(rotation):
+            total, detail = 0.0, []
+            for pin in pins:
+                net = pin.get("net", "")
+                cands = [(x, y) for (d, x, y) in net_pads.get(net, [])
+                         if d != comp["designator"]] if net else []
+                if not cands:
+                    continue
+                dx = -pin["dx"] if mirror else pin["dx"]
+                ox, oy = rotate_offset(dx, pin["dy"], rotation)
+                px, py = comp["x"] + ox, comp["y"] + oy
+                if len(cands) > PLANE_NET_PAD_COUNT:
+                    value = min(math.dist((px, py), c) for c in cands)
+                    metric = "nearest_return_mils"
+                else:
+                    value = legacy_mst_length(cands + [(px, py)])
+                    metric = "net_airline_mils"
+                total += value
+                detail.append({"pin": pin["name"], "net": net, metric: round(value, 1)})
+            return (total, detail) if detail else None
+
+        current = comp.get("rotation", 0) % 360
+        cur = score(current)
+        if cur is None:
+            continue
+        checked += 1
+        best_rot, best = current, cur
+        for r in (0, 90, 180, 270):
+            s = score(r)
+            if s is not None and s[0] < best[0]:
+                best_rot, best = r, s
+        improvement = cur[0] - best[0]
+        if best_rot != current and improvement >= min_improvement_mils:
+            suggestions.append({"designator": comp["designator"], "suggested_rotation": best_rot})
+    return suggestions, checked
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(count: int = 3000):
+    board = SyntheticBoard(count=count, seed=0)
+    comps = board.get_component_pins({})
+    for comp in comps:  # Altium's Layer2String spelling, as check_orientation sees it
+        comp["layer"] = "Bottom Layer" if comp["layer"] == "BottomLayer" else "Top Layer"
+    net_pads = {}
+    for comp in comps:
+        for pin in comp["pins"]:
+            net_pads.setdefault(pin["net"], []).append((comp["designator"], pin["x"], pin["y"]))
+    passives = sum(1 for c in comps if len(c["pins"]) == 2)
+
+    legacy_s, (expected, legacy_checked) = timed(lambda: legacy_check(comps, net_pads, 25), repeat=1)
+    new_s, (got, checked) = timed(lambda: check_rotations(comps, net_pads, 25))
+    assert checked == legacy_checked
+    assert sorted((s["designator"], s["suggested_rotation"]) for s in got) == \
+        sorted((s["designator"], s["suggested_rotation"]) for s in expected)
+
+    plane = max(len(pads) for pads in net_pads.values())
+    print(f"{count} components, {passives} 2-pad passives, {len(net_pads)} nets "
+          f"(largest {plane} pads), {len(got)} suggestions")
+    print(f"  legacy loop      {legacy_s * 1000:9.1f} ms")
+    print(f"  check_rotations  {new_s * 1000:9.1f} ms   ({legacy_s / new_s:.1f}x)")
+
+    joint_s, joint = timed(lambda: optimize_rotations(comps, net_pads, 25))
+    greedy = {s["designator"]: s["suggested_rotation"] for s in got}
+    applied = [dict(c, rotation=greedy.get(c["designator"], c["rotation"])) for c in comps]
+    greedy_score = RotationSearch(applied, net_pads).score()
+    print(f"  joint search     {joint_s * 1000:9.1f} ms   {joint['rounds']} rounds, "
+          f"{len(joint['rotations'])} rotations")
+    print(f"  board score: as placed {joint['initial_score_mils']:.0f}, all suggestions applied "
+          f"{greedy_score:.0f}, joint {joint['final_score_mils']:.0f}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,60 @@
+"""
+Benchmark: optimize_placement's annealer on clusters of a synthetic board.
+Prices moves incrementally (Annealer.delta) vs re-scoring the whole
+cluster per move (Annealer.reset), then reports what a time-budgeted run
+achieves.
+
+Run from the repo root:
+    python server/benchmarks/bench_placer.py [components] [budget_ms]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from board_model import BoardModel
+from placer import Annealer
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(count: int = 3000, budget_ms: int = 2000):
+    board = SyntheticBoard(count=count, seed=0)
+    model = BoardModel(list(board.components.values()), board.get_component_pins({}))
+    cx, cy = float(np.median(model.current.x)), float(np.median(model.current.y))
+    order = np.argsort(np.hypot(model.current.x - cx, model.current.y - cy))
+    print(f"{count} components, {len(model.pad_comp)} pads")
+
+    for size in (50, 100, 200):
+        cluster = [int(i) for i in order[:size]]
+        weights = model.weights_for(cluster, {}, 40)
+        box = model.boxes(model.current, np.array(cluster))
+        keep_in = (box[:, 0].min(), box[:, 1].min(), box[:, 2].max(), box[:, 3].max())
+        annealer = Annealer(model, cluster, weights, keep_in)
+        moves = [annealer.propose(200) for _ in range(500)]
+
+        incremental_s, _ = timed(lambda: [annealer.delta(m) for m in moves])
+        full_s, _ = timed(lambda: [annealer.reset() for _ in moves[:50]], repeat=1)
+        full_s *= len(moves) / 50
+        stats = annealer.run(time_budget=budget_ms / 1000)
+        per_move_us = incremental_s / len(moves) * 1e6
+        print(f"  {size:4d} parts, {len(weights)} nets: {per_move_us:6.0f} us/move incremental, "
+              f"{full_s / len(moves) * 1e6:7.0f} us/move full ({full_s / incremental_s:.0f}x); "
+              f"{stats['iterations']} moves in {budget_ms} ms, "
+              f"cost {stats['initial_cost']:.0f} -> {stats['final_cost']:.0f}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,76 @@
+"""
+Benchmark: tool result size and end-to-end latency with and without a
+fields= projection, through the bridge and the simulated backend.
+
+Each run mirrors what get_component_data / get_component_pins do: fetch
+from the bridge (read cache disabled so every call goes to the simulated
+script), filter, project, serialize.
+
+Run from the repo root:
+    python server/benchmarks/bench_projection.py [components] [requested]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SimulatedAltium, SyntheticBoard
+from bridge import AltiumBridge
+from component_index import ComponentIndex
+from projection import project
+
+FIELDS = "designator,x,y,rotation,layer"
+PIN_FIELDS = "x,y,net"
+
+
+async def component_data(bridge, designators, fields):
+    response = await bridge.execute_command("get_all_component_data", {}, use_cache=False)
+    components, _ = ComponentIndex.of(response["result"]).select(designators)
+    return json.dumps({"components": project(components, fields)}, indent=2)
+
+
+async def component_pins(bridge, designators, fields):
+    response = await bridge.execute_command("get_component_pins", {"designators": designators},
+                                            use_cache=False)
+    return json.dumps(project(response["result"], fields), indent=2)
+
+
+async def measure(tool, bridge, designators, fields, calls=5):
+    start = time.perf_counter()
+    for _ in range(calls):
+        text = await tool(bridge, designators, fields)
+    return len(text), (time.perf_counter() - start) / calls
+
+
+async def main(count: int = 10_000, requested: int = 1000):
+    board = SyntheticBoard(count=count, seed=0)
+    designators = sorted(board.components)[:requested]
+    with tempfile.TemporaryDirectory() as tmp:
+        sim = SimulatedAltium(Path(tmp), handlers={
+            "get_all_component_data": board.get_all_component_data,
+            "get_component_pins": board.get_component_pins,
+        })
+        config = SimpleNamespace(altium_exe_path="", script_path="", bridge_mode="launch",
+                                 component_delta_sync=False)
+        bridge = AltiumBridge(config, Path(tmp), launcher=sim)
+
+        print(f"{count} components, {requested} requested")
+        for label, tool, fields in (("get_component_data", component_data, FIELDS),
+                                    ("get_component_pins", component_pins, PIN_FIELDS)):
+            full_size, full_s = await measure(tool, bridge, designators, "")
+            size, elapsed = await measure(tool, bridge, designators, fields)
+            print(label)
+            print(f"  all fields  {full_size / 1024:9.1f} KiB  {full_s * 1000:7.1f} ms")
+            print(f"  projected   {size / 1024:9.1f} KiB  {elapsed * 1000:7.1f} ms"
+                  f"  ({full_size / size:.1f}x smaller, fields={fields})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(a) for a in sys.argv[1:3])))
@@ -0,0 +1,90 @@
+"""
+Benchmark: screenshot encoding on synthetic 4K frames. The old path
+(decode, PNG debug save, PNG encode, base64 encode and decode again) is
+compared with the single-encode pipeline in each mode: PNG, JPEG and WebP
+at full size, downscaled to 1920 px, and cropped to a zoom_to region.
+Diff mode is then timed on a small move: comparison cost and payload
+against a full frame.
+
+Run from the repo root:
+    python server/benchmarks/bench_screenshot.py [width] [height]
+"""
+
+import asyncio
+import base64
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from screenshot import ScreenshotService, SyntheticBackend, changed_tiles, clip, encode, zoom_region
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def old_pipeline(frame, debug_file):
+    image = frame.image()
+    image.save(debug_file)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    buffer.seek(0)
+    encoded = base64.b64encode(buffer.read()).decode("utf-8")
+    return base64.b64decode(encoded)
+
+
+def main(width: int = 3840, height: int = 2160):
+    frame = SyntheticBackend(width, height, seed=0).capture("pcb")
+    print(f"{width}x{height} frame, {len(frame.pixels) / 1e6:.1f} MB BGRX")
+    with tempfile.TemporaryDirectory() as tmp:
+        old_s, data = timed(lambda: old_pipeline(frame, os.path.join(tmp, "screenshot_pcb.png")))
+    print(f"{'old: png + debug save + base64':34s} {old_s * 1000:7.1f} ms {len(data) / 1024:8.0f} KB")
+
+    box = clip(zoom_region(frame.view_rect, 1200, 800), frame.width, frame.height)
+    modes = [("png", 80, 0, None), ("jpeg", 80, 0, None), ("webp", 80, 0, None),
+             ("png", 80, 1920, None), ("jpeg", 80, 1920, None), ("webp", 80, 1920, None),
+             ("jpeg", 60, 1280, None), ("png", 80, 0, box), ("jpeg", 80, 0, box)]
+    for image_format, quality, max_dimension, crop in modes:
+        seconds, (data, size) = timed(lambda: encode(frame.image(crop), image_format, quality, max_dimension))
+        label = f"{image_format} q{quality}" if image_format != "png" else "png"
+        if max_dimension:
+            label += f", max {max_dimension}"
+        if crop:
+            label += ", zoom crop"
+        print(f"{label:34s} {seconds * 1000:7.1f} ms {len(data) / 1024:8.0f} KB  {size[0]}x{size[1]}")
+
+    current = np.asarray(frame.image())
+    compare_s, grid = timed(lambda: changed_tiles(current, current, 64))
+    print(f"tile comparison ({grid.size} tiles): {compare_s * 1000:.1f} ms")
+    asyncio.run(diff_payloads(width, height))
+
+
+async def diff_payloads(width, height):
+    for image_format in ("png", "jpeg"):
+        backend = SyntheticBackend(width, height, seed=0)
+        service = ScreenshotService(backend)
+        full = await service.capture("pcb", image_format, diff=True)
+        backend.move(0, 12, 0)
+        start = time.perf_counter()
+        moved = await service.capture("pcb", image_format, diff=True)
+        seconds = time.perf_counter() - start
+        print(f"diff, one part moved, {image_format}: {len(moved['regions'])} regions, "
+              f"{moved['changed_tile_count']}/{moved['tile_count']} tiles, "
+              f"{moved['image_bytes'] / 1024:.0f} KB vs {full['image_bytes'] / 1024:.0f} KB full, "
+              f"{seconds * 1000:.0f} ms with capture")
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,69 @@
+"""
+Benchmark: check_placement's close-pair prefilter on a synthetic board.
+The grid index (BoardIndex.close_pairs) vs comparing every target with
+every component the way the script's loop did, for a handful of targets
+and for the whole board, plus region and nearest-component queries.
+
+Run from the repo root:
+    python server/benchmarks/bench_spatial.py [components]
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from spatial import BoardIndex
+
+
+def all_pairs(index, targets, distance):
+    """Every target against every same-side component, vectorized per target"""
+    boxes, pairs, done = index.grid.boxes, [], np.zeros(len(index), dtype=bool)
+    for t in targets:
+        a = boxes[t]
+        ox = np.minimum(a[2], boxes[:, 2]) - np.maximum(a[0], boxes[:, 0])
+        oy = np.minimum(a[3], boxes[:, 3]) - np.maximum(a[1], boxes[:, 1])
+        close = (ox > -distance) & (oy > -distance) & (index.bottom == index.bottom[t]) & ~done
+        close[t] = False
+        pairs.extend((t, int(b)) for b in np.nonzero(close)[0])
+        done[t] = True
+    return pairs
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(count: int = 10_000):
+    board = SyntheticBoard(count=count, seed=0)
+    components = list(board.components.values())
+    build_s, index = timed(lambda: BoardIndex(components))
+    print(f"{count} components, grid {index.grid.shape[0]}x{index.grid.shape[1]} "
+          f"cells of {index.grid.cell:.0f} mils, built in {build_s * 1000:.1f} ms")
+
+    rng = random.Random(1)
+    for label, targets in (("20 targets", rng.sample(range(count), 20)), ("full board", list(range(count)))):
+        grid_s, pairs = timed(lambda: index.close_pairs(targets, 31))
+        brute_s, expected = timed(lambda: all_pairs(index, targets, 31), repeat=1)
+        assert len(pairs) == len(expected)
+        print(f"  {label:10s}: {len(pairs):6d} close pairs of {len(targets) * (count - 1):>11,d} "
+              f"compared; grid {grid_s * 1000:8.2f} ms, all pairs {brute_s * 1000:8.1f} ms "
+              f"({brute_s / grid_s:.0f}x)")
+
+    region_s, _ = timed(lambda: [index.region(x, x, x + 500, x + 500) for x in range(0, 5000, 50)])
+    nearest_s, _ = timed(lambda: [index.nearest(x, 6000 - x, 5) for x in range(0, 5000, 50)])
+    print(f"  region query {region_s * 10:.3f} ms, nearest 5 {nearest_s * 10:.3f} ms (mean of 100)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,337 @@
+"""
+Local board model for scoring hypothetical placements.
+
+Judging a placement used to mean moving parts in Altium with
+place_components and reading them back with get_net_connections - a
+script round trip per iteration. BoardModel holds the board as arrays
+(built once per component/pin snapshot, like ComponentIndex) and scores
+placements in Python:
+
+- pad positions follow the convention get_component_pins documents: take
+  the rotation-0 offset (dx, dy), mirror dx for bottom-side parts, rotate
+  counterclockwise by the component rotation, add the component x/y
+- weighted airline: the MST length of each net touching the scoped
+  components, times its weight
+- overlap: intersecting bounding boxes of same-side parts, at least one of
+  them in scope
+- cluster area: the box around the scoped parts
+
+Bounding boxes come from get_all_component_data's width/height (the box
+at the current rotation, without designator/comment text) and are taken
+as centered on the component origin; a rotation change by an odd
+multiple of 90 degrees swaps them, other angles use the rotated box's
+extent.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mst import mst_length
+
+Placement = Dict[str, Any]
+
+
+def is_bottom(layer: Any) -> bool:
+    """True for "bottom", "Bottom Layer" and "BottomLayer" alike"""
+    return str(layer or "").replace(" ", "").lower() in ("bottom", "bottomlayer")
+
+
+def parse_placements(placements: Any) -> Tuple[List[Placement], List[str]]:
+    """Validate place_components-style placements -> (normalized, errors).
+
+    A normalized placement has designator, x, y, rotation (-1 = keep) and
+    layer ("", "top" or "bottom").
+    """
+    if not isinstance(placements, list):
+        return [], ["placements must be a list"]
+    normalized, errors = [], []
+    for idx, placement in enumerate(placements):
+        if not isinstance(placement, dict):
+            errors.append(f"placements[{idx}] must be an object")
+            continue
+
+        designator = str(placement.get("designator", "")).strip()
+        x = placement.get("x")
+        y = placement.get("y")
+
+        if not designator or x is None or y is None:
+            errors.append(f"placements[{idx}] must include designator, x, and y")
+            continue
+        if "|" in designator:
+            errors.append(f"placements[{idx}] designator must not contain '|'")
+            continue
+
+        rotation = placement.get("rotation", -1)
+        layer = str(placement.get("layer", "") or "").strip().lower()
+        if layer not in ("", "top", "bottom"):
+            errors.append(f"placements[{idx}] layer must be 'top' or 'bottom'")
+            continue
+
+        try:
+            normalized.append({"designator": designator, "x": float(x), "y": float(y),
+                               "rotation": float(rotation), "layer": layer})
+        except (TypeError, ValueError):
+            errors.append(f"placements[{idx}] x, y, and rotation must be numbers")
+    return normalized, errors
+
+
+class BoardState:
+    """Positions, rotations and sides of every component - the model's
+    current placement or a hypothetical one"""
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, rotation: np.ndarray, bottom: np.ndarray):
+        self.x, self.y, self.rotation, self.bottom = x, y, rotation, bottom
+
+    def copy(self) -> "BoardState":
+        return BoardState(self.x.copy(), self.y.copy(), self.rotation.copy(), self.bottom.copy())
+
+
+class BoardModel:
+    """Components, their boxes and their pads as arrays"""
+
+    _last: Optional[Tuple[list, list, "BoardModel"]] = None
+
+    def __init__(self, components: Iterable[Dict[str, Any]], pins: Iterable[Dict[str, Any]]):
+        # first entry per designator, like ComponentIndex
+        first: Dict[str, Dict[str, Any]] = {}
+        for component in components:
+            if component.get("designator") is not None:
+                first.setdefault(component["designator"], component)
+        self.designators: List[str] = list(first)
+        self.index: Dict[str, int] = {d: i for i, d in enumerate(self.designators)}
+        rows = list(first.values())
+        self.width = np.array([float(c.get("width") or 0) for c in rows])
+        self.height = np.array([float(c.get("height") or 0) for c in rows])
+        self.current = BoardState(
+            np.array([float(c.get("x", 0)) for c in rows]),
+            np.array([float(c.get("y", 0)) for c in rows]),
+            np.array([float(c.get("rotation", 0)) % 360 for c in rows]),
+            np.array([is_bottom(c.get("layer")) for c in rows], dtype=bool))
+
+        self.net_names: List[str] = []
+        net_ids: Dict[str, int] = {}
+        pad_comp, pad_dx, pad_dy, pad_net = [], [], [], []
+        for entry in pins:
+            i = self.index.get(entry.get("designator"))
+            if i is None:
+                continue
+            for pin in entry.get("pins", []):
+                net = pin.get("net") or ""
+                if not net or "dx" not in pin:
+                    continue
+                if net not in net_ids:
+                    net_ids[net] = len(self.net_names)
+                    self.net_names.append(net)
+                pad_comp.append(i)
+                pad_dx.append(float(pin["dx"]))
+                pad_dy.append(float(pin.get("dy", 0)))
+                pad_net.append(net_ids[net])
+        self.pad_comp = np.array(pad_comp, dtype=np.intp)
+        self.pad_dx = np.array(pad_dx, dtype=float)
+        self.pad_dy = np.array(pad_dy, dtype=float)
+        self.pad_net = np.array(pad_net, dtype=np.intp)
+        self.net_ids = net_ids
+        # net id -> pad indices, component -> net ids
+        order = np.argsort(self.pad_net, kind="stable")
+        bounds = np.searchsorted(self.pad_net[order], np.arange(len(self.net_names) + 1))
+        self.net_pads = [order[bounds[k]:bounds[k + 1]] for k in range(len(self.net_names))]
+        self.comp_nets: List[set] = [set() for _ in rows]
+        for comp, net in zip(pad_comp, pad_net):
+            self.comp_nets[comp].add(net)
+
+    @classmethod
+    def of(cls, components: list, pins: list) -> "BoardModel":
+        """Model for this snapshot, reusing the last one if both lists are
+        the same objects"""
+        last = cls._last
+        if last is not None and last[0] is components and last[1] is pins:
+            return last[2]
+        model = cls(components, pins)
+        cls._last = (components, pins, model)
+        return model
+
+    def __len__(self) -> int:
+        return len(self.designators)
+
+    def apply(self, placements: Sequence[Placement], state: Optional[BoardState] = None
+              ) -> Tuple[BoardState, List[str]]:
+        """Copy of state (default: current) with normalized placements
+        applied -> (state, missing designators)"""
+        state = (state or self.current).copy()
+        missing = []
+        for placement in placements:
+            i = self.index.get(placement["designator"])
+            if i is None:
+                missing.append(placement["designator"])
+                continue
+            state.x[i], state.y[i] = placement["x"], placement["y"]
+            if placement.get("rotation", -1) >= 0:
+                state.rotation[i] = placement["rotation"] % 360
+            if placement.get("layer"):
+                state.bottom[i] = placement["layer"] == "bottom"
+        return state, missing
+
+    def pad_positions(self, state: BoardState, pads: Optional[np.ndarray] = None
+                      ) -> Tuple[np.ndarray, np.ndarray]:
+        """Absolute x/y of the given pads (default: all) in state"""
+        if pads is None:
+            pads = np.arange(len(self.pad_comp))
+        comp = self.pad_comp[pads]
+        dx = np.where(state.bottom[comp], -self.pad_dx[pads], self.pad_dx[pads])
+        dy = self.pad_dy[pads]
+        angle = np.radians(state.rotation[comp])
+        cos, sin = np.cos(angle), np.sin(angle)
+        return state.x[comp] + dx * cos - dy * sin, state.y[comp] + dx * sin + dy * cos
+
+    def boxes(self, state: BoardState, comps: Optional[np.ndarray] = None) -> np.ndarray:
+        """(k, 4) array of xmin, ymin, xmax, ymax for the given components"""
+        if comps is None:
+            comps = np.arange(len(self))
+        delta = np.radians(state.rotation[comps] - self.current.rotation[comps])
+        # round away trig noise so quarter turns swap width and height exactly
+        cos, sin = np.abs(np.round(np.cos(delta), 9)), np.abs(np.round(np.sin(delta), 9))
+        w, h = self.width[comps], self.height[comps]
+        half_w, half_h = (w * cos + h * sin) / 2, (w * sin + h * cos) / 2
+        x, y = state.x[comps], state.y[comps]
+        return np.column_stack((x - half_w, y - half_h, x + half_w, y + half_h))
+
+    def nets_of(self, comps: Iterable[int]) -> List[int]:
+        """Net ids touching any of the components, sorted"""
+        nets = set()
+        for i in comps:
+            nets |= self.comp_nets[i]
+        return sorted(nets)
+
+    def weights_for(self, comps: Iterable[int], net_weights: Dict[str, float],
+                    max_pads_per_net: int) -> Dict[int, float]:
+        """Net id -> weight for the nets touching comps: net_weights[name],
+        default 1; nets with more than max_pads_per_net pads are left out
+        unless named, and weight 0 drops a net"""
+        weights = {}
+        for net in self.nets_of(comps):
+            name = self.net_names[net]
+            if name in net_weights:
+                weight = float(net_weights[name])
+            elif len(self.net_pads[net]) > max_pads_per_net:
+                continue
+            else:
+                weight = 1.0
+            if weight:
+                weights[net] = weight
+        return weights
+
+    def airlines(self, state: BoardState, nets: Iterable[int]) -> Dict[int, float]:
+        """MST airline length per net id"""
+        lengths = {}
+        for net in nets:
+            px, py = self.pad_positions(state, self.net_pads[net])
+            lengths[net] = mst_length(np.column_stack((px, py)))
+        return lengths
+
+    def overlaps(self, state: BoardState, comps: np.ndarray) -> List[Tuple[int, int, float, float]]:
+        """(a, b, overlap_x, overlap_y) for each same-side pair with
+        intersecting boxes and at least one part in comps"""
+        if not len(comps) or not len(self):
+            return []
+        mine = self.boxes(state, comps)
+        every = self.boxes(state)
+        ox = np.minimum(mine[:, None, 2], every[None, :, 2]) - np.maximum(mine[:, None, 0], every[None, :, 0])
+        oy = np.minimum(mine[:, None, 3], every[None, :, 3]) - np.maximum(mine[:, None, 1], every[None, :, 1])
+        hit = (ox > 0) & (oy > 0) & (state.bottom[comps][:, None] == state.bottom[None, :])
+        in_scope = np.zeros(len(self), dtype=bool)
+        in_scope[comps] = True
+        pairs = []
+        for r, b in zip(*np.nonzero(hit)):
+            a = int(comps[r])
+            # each pair once: skip self, and scoped pairs seen from the other side
+            if a == b or (in_scope[b] and b < a):
+                continue
+            pairs.append((a, int(b), float(ox[r, b]), float(oy[r, b])))
+        return pairs
+
+    def score(self, state: BoardState, comps: np.ndarray, nets: Sequence[int],
+              weights: Dict[int, float]) -> Dict[str, Any]:
+        """Weighted airline, overlap and cluster area of comps in state"""
+        airlines = self.airlines(state, nets)
+        overlaps = self.overlaps(state, comps)
+        if len(comps):
+            box = self.boxes(state, comps)
+            xmin, ymin = box[:, 0].min(), box[:, 1].min()
+            xmax, ymax = box[:, 2].max(), box[:, 3].max()
+        else:
+            xmin = ymin = xmax = ymax = 0.0
+        return {
+            "airlines": airlines,
+            "weighted_airline_mils": sum(weights.get(n, 1.0) * airlines[n] for n in nets),
+            "overlaps": overlaps,
+            "overlap_area_sq_mils": sum(ox * oy for _, _, ox, oy in overlaps),
+            "cluster_box": (float(xmin), float(ymin), float(xmax), float(ymax)),
+            "cluster_area_sq_mils": float((xmax - xmin) * (ymax - ymin)),
+        }
+
+
+def evaluate_placement(model: BoardModel, placements: Sequence[Placement],
+                    net_weights: Optional[Dict[str, float]] = None,
+                    cmp_designators: Optional[Sequence[str]] = None,
+                    max_pads_per_net: int = 40) -> Dict[str, Any]:
+    """Score normalized placements against the model's current placement.
+
+    The scope is cmp_designators, or the placed components. Nets touching
+    the scope are scored with weight net_weights[net] (default 1, 0 drops
+    the net); nets with more than max_pads_per_net pads (planes) are left
+    out unless net_weights names them.
+    """
+    net_weights = net_weights or {}
+    proposed, missing = model.apply(placements)
+    scope_names = list(cmp_designators) if cmp_designators else [p["designator"] for p in placements]
+    scope, seen = [], set()
+    for designator in scope_names:
+        i = model.index.get(designator)
+        if i is None:
+            if designator not in missing:
+                missing.append(designator)
+        elif i not in seen:
+            seen.add(i)
+            scope.append(i)
+    comps = np.array(scope, dtype=np.intp)
+
+    weights = model.weights_for(scope, net_weights, max_pads_per_net)
+    nets = list(weights)
+
+    before = model.score(model.current, comps, nets, weights)
+    after = model.score(proposed, comps, nets, weights)
+
+    def summary(result):
+        xmin, ymin, xmax, ymax = result["cluster_box"]
+        return {
+            "weighted_airline_mils": round(result["weighted_airline_mils"], 1),
+            "overlap_count": len(result["overlaps"]),
+            "overlap_area_sq_mils": round(result["overlap_area_sq_mils"], 1),
+            "cluster_width_mils": round(xmax - xmin, 1),
+            "cluster_height_mils": round(ymax - ymin, 1),
+            "cluster_area_sq_mils": round(result["cluster_area_sq_mils"], 1),
+        }
+
+    net_rows = [{
+        "net": model.net_names[net],
+        "weight": weights[net],
+        "pad_count": len(model.net_pads[net]),
+        "airline_mils": round(after["airlines"][net], 1),
+        "current_airline_mils": round(before["airlines"][net], 1),
+    } for net in nets]
+    net_rows.sort(key=lambda r: r["weight"] * (r["current_airline_mils"] - r["airline_mils"]))
+
+    proposed_summary, current_summary = summary(after), summary(before)
+    return {
+        "scope": [model.designators[i] for i in scope],
+        "missing_designators": missing,
+        "proposed": proposed_summary,
+        "current": current_summary,
+        "delta": {key: round(proposed_summary[key] - current_summary[key], 1)
+                  for key in proposed_summary},
+        "overlaps": [{"a": model.designators[a], "b": model.designators[b],
+                      "overlap_x_mils": round(ox, 1), "overlap_y_mils": round(oy, 1)}
+                     for a, b, ox, oy in after["overlaps"]],
+        "nets": net_rows,
+    }
@@ -0,0 +1,439 @@
+"""
+Local board renderer (render_board).
+
+get_screenshot needs Altium focused and visible, a take_view_screenshot
+script run and a full-window BitBlt. BoardScene draws the board from the
+dumps the read cache already holds, so a view is back in tens of
+milliseconds and rendering works headless:
+
+- component boxes from get_all_component_data (the box without text, as
+  BoardIndex takes it)
+- pads from get_component_pins: center, size, rotation, shape and layer,
+  drawn as circles and ovals (round pads) or rotated rectangles (any
+  other shape)
+- courtyards from get_component_geometry, when given (the primitives
+  clearance.primitive_kind calls courtyard, as polylines)
+- airlines: the minimum spanning tree of each net (mst.spanning_tree),
+  computed once per snapshot; nets with more than max_pads_per_net pads
+  are planes and get none, as in get_net_connections
+
+Board y points up and image y down. Colours follow Altium's defaults
+(red top, blue bottom, gold through-hole pads, yellow top overlay). With
+highlight_nets, everything off those nets is dimmed and their pads and
+airlines are drawn bright. Only what falls inside the view box is drawn:
+components through the BoardIndex grid, pads and airlines by a vectorized
+box test.
+
+Per-primitive drawing calls would dominate on a full board, so the
+renderer batches: box outlines and courtyards are clipped to the image and
+sampled at every pixel step with NumPy, small axis-aligned pads are
+filled as rectangles with NumPy, and each net's airlines are one PIL
+polyline (an Euler tour of its spanning tree, which retraces edges
+instead of jumping). Larger or rotated pads and labels are drawn with PIL.
+The image is a one-byte palette image (PALETTE, indices INK and DIM_INK),
+a third of the RGB work to fill and to PNG-encode.
+"""
+
+import io
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from board_model import is_bottom
+from clearance import primitive_kind, primitive_shapes
+from mst import spanning_tree
+from spatial import BoardIndex, expand_runs
+
+SIDES = ("top", "bottom")
+MIN_MARGIN_MILS = 100.0  # zoom margin: 10% of the larger span, at least this
+LABEL_MIN_PX = 24        # components narrower than this on screen get no designator
+SMALL_PAD_PX = 8         # axis-aligned pads up to this size on screen are filled with NumPy
+
+# palette image: index 0 is the black background, then each colour and its dimmed copy
+COLOURS = {
+    "top_pad": (255, 0, 0), "bottom_pad": (0, 0, 255), "multi_pad": (200, 160, 40),
+    "top_body": (255, 255, 0), "bottom_body": (128, 128, 255),
+    "courtyard": (200, 0, 200), "airline": (220, 220, 220),
+    "highlight": (0, 255, 120), "label": (255, 255, 255),
+}
+DIM = 0.35  # brightness of everything off the highlighted nets
+PNG_COMPRESS_LEVEL = 1  # the flat palette image compresses well even at the fastest level
+
+
+def _side(layer: Any) -> str:
+    """top, bottom or multi (through-hole pads)"""
+    key = str(layer or "").replace(" ", "").lower()
+    if key.startswith("multi"):
+        return "multi"
+    return "bottom" if is_bottom(layer) else "top"
+
+
+INK = {name: 1 + i for i, name in enumerate(COLOURS)}
+DIM_INK = {name: 1 + len(COLOURS) + i for i, name in enumerate(COLOURS)}
+PALETTE = [0, 0, 0] + [c for colour in COLOURS.values() for c in colour] + \
+    [int(c * DIM) for colour in COLOURS.values() for c in colour]
+
+
+def to_png(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+    return buffer.getvalue()
+
+
+class BoardScene:
+    """Drawable geometry of a board snapshot as arrays"""
+
+    _last: Optional[Tuple[list, list, Optional[list], "BoardScene"]] = None
+
+    def __init__(self, components: Iterable[Dict[str, Any]], pins: Iterable[Dict[str, Any]],
+                 geometry: Optional[Iterable[Dict[str, Any]]] = None):
+        self.board = BoardIndex(components)
+        self.net_names: List[str] = []
+        self.net_ids: Dict[str, int] = {}
+        columns = ([], [], [], [], [], [], [], [])  # x, y, width, height, rotation, round, side, net
+        for entry in pins:
+            if entry.get("designator") not in self.board.index:
+                continue
+            for pin in entry.get("pins", []):
+                if "x" not in pin or "y" not in pin:
+                    continue
+                net = pin.get("net") or ""
+                if net and net not in self.net_ids:
+                    self.net_ids[net] = len(self.net_names)
+                    self.net_names.append(net)
+                shape = str(pin.get("shape", "")).lower()
+                rounded = ("round" in shape or "circ" in shape) and "rect" not in shape
+                values = (float(pin["x"]), float(pin["y"]), float(pin.get("width") or 0),
+                          float(pin.get("height") or 0), float(pin.get("rotation") or 0), int(rounded),
+                          ("top", "bottom", "multi").index(_side(pin.get("layer", entry.get("layer")))),
+                          self.net_ids.get(net, -1))
+                for column, value in zip(columns, values):
+                    column.append(value)
+        self.pad_x, self.pad_y, self.pad_w, self.pad_h, self.pad_rot = (np.array(c, dtype=float)
+                                                                         for c in columns[:5])
+        self.pad_round, self.pad_side, self.pad_net = (np.array(c, dtype=np.intp) for c in columns[5:])
+
+        # courtyard outlines as segments (x1, y1, x2, y2) and their components
+        segments, owners, seen = [], [], set()
+        for component in geometry or []:
+            i = self.board.index.get(component.get("designator"))
+            if i is None or i in seen:
+                continue
+            seen.add(i)
+            for primitive in component.get("primitives", []):
+                if primitive_kind(primitive) != "courtyard":
+                    continue
+                for vertices, _, closed in primitive_shapes(primitive):
+                    ends = vertices[1:] + vertices[:1] if closed else vertices[1:]
+                    segments.extend((ax, ay, bx, by) for (ax, ay), (bx, by) in zip(vertices, ends))
+                    owners.extend([i] * len(ends))
+        self.courtyard_seg = np.array(segments, dtype=float).reshape(-1, 4)
+        self.courtyard_comp = np.array(owners, dtype=np.intp)
+        self._airlines: Dict[int, "Airlines"] = {}
+
+    @classmethod
+    def of(cls, components: list, pins: list, geometry: Optional[list] = None) -> "BoardScene":
+        """Scene for this snapshot, reusing the last one if the lists are
+        the same objects"""
+        last = cls._last
+        if last is not None and last[0] is components and last[1] is pins and last[2] is geometry:
+            return last[3]
+        scene = cls(components, pins, geometry)
+        cls._last = (components, pins, geometry, scene)
+        return scene
+
+    def __len__(self) -> int:
+        return len(self.board)
+
+    def airlines(self, max_pads_per_net: Optional[int] = 40) -> "Airlines":
+        """Airlines of the nets up to max_pads_per_net pads (0/None: all),
+        cached per limit"""
+        key = max_pads_per_net or 0
+        if key not in self._airlines:
+            order = np.argsort(self.pad_net, kind="stable")
+            bounds = np.searchsorted(self.pad_net[order], np.arange(len(self.net_names) + 1))
+            nets, tours = [], []
+            for k in range(len(self.net_names)):
+                pads = order[bounds[k]:bounds[k + 1]]
+                if len(pads) < 2 or (key and len(pads) > key):
+                    continue
+                points = np.column_stack((self.pad_x[pads], self.pad_y[pads]))
+                nets.append(k)
+                tours.append(points[_euler_tour(spanning_tree(points).edges, len(pads))])
+            self._airlines[key] = Airlines(nets, tours)
+        return self._airlines[key]
+
+    def extent(self) -> Tuple[float, float, float, float]:
+        """Box around every component and pad"""
+        boxes = self.board.grid.boxes
+        xs = np.concatenate((boxes[:, 0], boxes[:, 2], self.pad_x))
+        ys = np.concatenate((boxes[:, 1], boxes[:, 3], self.pad_y))
+        if not len(xs):
+            return -500.0, -500.0, 500.0, 500.0
+        return float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max())
+
+    def zoom_box(self, designators: Sequence[str]) -> Tuple[Tuple[float, float, float, float], List[str]]:
+        """Box around the given components with the take_view_screenshot
+        margin -> (box, missing designators)"""
+        found = [self.board.index[d] for d in designators if d in self.board.index]
+        missing = [d for d in designators if d not in self.board.index]
+        if not found:
+            return self.extent(), missing
+        boxes = self.board.grid.boxes[found]
+        return _with_margin((float(boxes[:, 0].min()), float(boxes[:, 1].min()),
+                             float(boxes[:, 2].max()), float(boxes[:, 3].max()))), missing
+
+
+def _euler_tour(edges: np.ndarray, n: int) -> List[int]:
+    """Walk of a tree that goes down every edge and back up it, as point
+    indices: drawn as one polyline it draws each edge (twice) and nothing else"""
+    children: List[List[int]] = [[] for _ in range(n)]
+    for a, b in edges.tolist():
+        children[a].append(b)
+        children[b].append(a)
+    walk, stack, seen = [0], [(0, iter(children[0]))], {0}
+    while stack:
+        node, rest = stack[-1]
+        child = next(rest, None)
+        if child is None:
+            stack.pop()
+            if stack:
+                walk.append(stack[-1][0])
+        elif child not in seen:
+            seen.add(child)
+            walk.append(child)
+            stack.append((child, iter(children[child])))
+    return walk
+
+
+class Airlines:
+    """Per net: its id, the Euler tour of its spanning tree (points in mils)
+    and the tour's box"""
+
+    def __init__(self, nets: List[int], tours: List[np.ndarray]):
+        self.nets = np.array(nets, dtype=np.intp)
+        self.tours = tours
+        self.boxes = np.array([(t[:, 0].min(), t[:, 1].min(), t[:, 0].max(), t[:, 1].max()) for t in tours],
+                              dtype=float).reshape(-1, 4)
+        self.segment_count = np.array([(len(t) + 1) // 2 - 1 for t in tours], dtype=np.intp)
+
+
+def _with_margin(box: Tuple[float, float, float, float]) -> Tuple[float, float, float, float]:
+    x1, y1, x2, y2 = box
+    margin = max(max(x2 - x1, y2 - y1) / 10, MIN_MARGIN_MILS)
+    return x1 - margin, y1 - margin, x2 + margin, y2 + margin
+
+
+class _View:
+    """Board mils -> image pixels"""
+
+    def __init__(self, box: Tuple[float, float, float, float], size: int):
+        self.x1, self.y1, self.x2, self.y2 = box
+        span = max(self.x2 - self.x1, self.y2 - self.y1, 1e-6)
+        self.scale = size / span
+        self.width = max(1, round((self.x2 - self.x1) * self.scale))
+        self.height = max(1, round((self.y2 - self.y1) * self.scale))
+
+    def px(self, x):
+        return (x - self.x1) * self.scale
+
+    def py(self, y):
+        return (self.y2 - y) * self.scale
+
+
+def _clip(segments: np.ndarray, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Pixel segments (n, 4) clipped to the image (Liang-Barsky) ->
+    (clipped segments, indices of the ones left)"""
+    ax, ay, bx, by = segments.T
+    dx, dy = bx - ax, by - ay
+    low, high = np.zeros(len(segments)), np.ones(len(segments))
+    keep = np.ones(len(segments), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, q in ((-dx, ax), (dx, width - 1 - ax), (-dy, ay), (dy, height - 1 - ay)):
+            keep &= (p != 0) | (q >= 0)
+            ratio = q / p
+            low = np.where(p < 0, np.maximum(low, ratio), low)
+            high = np.where(p > 0, np.minimum(high, ratio), high)
+    keep &= low <= high
+    low, high = low[keep], high[keep]
+    ax, ay, dx, dy = ax[keep], ay[keep], dx[keep], dy[keep]
+    return np.column_stack((ax + low * dx, ay + low * dy, ax + high * dx, ay + high * dy)), np.flatnonzero(keep)
+
+
+def _draw_segments(canvas: np.ndarray, segments: np.ndarray, colours: np.ndarray) -> None:
+    """1-pixel lines in pixel coordinates, sampled at every pixel step;
+    later segments paint over earlier ones"""
+    height, width = canvas.shape[:2]
+    segments, kept = _clip(segments, width, height)
+    if not len(segments):
+        return
+    ax, ay, bx, by = segments.T
+    steps = np.ceil(np.maximum(np.abs(bx - ax), np.abs(by - ay))).astype(np.intp) + 1
+    owner, step = expand_runs(np.zeros(len(steps), dtype=np.intp), steps)
+    t = step / np.maximum(steps[owner] - 1, 1)
+    x = np.rint(ax[owner] + t * (bx - ax)[owner]).astype(np.intp)
+    y = np.rint(ay[owner] + t * (by - ay)[owner]).astype(np.intp)
+    canvas[y, x] = colours[kept][owner]
+
+
+def _box_segments(left, top, right, bottom) -> np.ndarray:
+    """Outline segments of pixel boxes, four per box"""
+    return np.stack([np.column_stack(e) for e in ((left, top, right, top), (right, top, right, bottom),
+                                                   (right, bottom, left, bottom), (left, bottom, left, top))],
+                    axis=1).reshape(-1, 4)
+
+
+def render_board(scene: BoardScene, box: Optional[Sequence[float]] = None,
+                 zoom_to: Optional[Sequence[str]] = None, layers: Optional[Sequence[str]] = None,
+                 highlight_nets: Iterable[str] = (), airlines: bool = True, max_pads_per_net: Optional[int] = 40,
+                 courtyards: bool = True, labels: bool = True, size: int = 1600) -> Dict[str, Any]:
+    """Draw the board, or the zoomed part of it, as an image.
+
+    Args:
+        scene: BoardScene of the board
+        box: [x1, y1, x2, y2] view box in mils (default: the whole board)
+        zoom_to: designators to zoom to, with take_view_screenshot's margin
+            (instead of box)
+        layers: sides to draw, "top" and/or "bottom" (default: both);
+            through-hole pads are on both
+        highlight_nets: nets to draw bright, everything else dimmed
+        airlines: draw each net's minimum spanning tree
+        max_pads_per_net: nets with more pads get no airlines (0: all)
+        courtyards: draw courtyards (when the scene has geometry)
+        labels: write designators on components large enough on screen
+        size: pixels along the longer side of the view
+
+    Returns:
+        dict: image (PIL, palette mode; to_png encodes it), view_box, scale_px_per_mil, missing_designators,
+        unknown_nets and the drawn component, pad and airline counts
+    """
+    if size < 16 or size > 8192:
+        raise ValueError("size must be between 16 and 8192 pixels")
+    sides = [s.strip().lower() for s in (layers or SIDES)]
+    if not sides or any(s not in SIDES for s in sides):
+        raise ValueError("layers must be 'top' and/or 'bottom'")
+    missing: List[str] = []
+    if zoom_to:
+        view_box, missing = scene.zoom_box(list(zoom_to))
+    elif box is not None:
+        if len(box) != 4:
+            raise ValueError("box must be [x1, y1, x2, y2] in mils")
+        x1, y1, x2, y2 = (float(v) for v in box)
+        view_box = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        if view_box[2] - view_box[0] <= 0 or view_box[3] - view_box[1] <= 0:
+            raise ValueError("box must have a positive width and height")
+    else:
+        view_box = _with_margin(scene.extent())
+    view = _View(view_box, size)
+    x1, y1, x2, y2 = view_box
+    highlight = np.array(sorted({scene.net_ids[n] for n in highlight_nets if n in scene.net_ids}), dtype=np.intp)
+    unknown_nets = [n for n in highlight_nets if n not in scene.net_ids]
+    ink = DIM_INK if len(highlight) else INK
+    bright = INK["highlight"]
+    canvas = np.zeros((view.height, view.width), dtype=np.uint8)
+
+    # component boxes and courtyards, bottom side first so the top side is drawn over it
+    comps = scene.board.grid.query(*view_box)
+    comps = comps[np.isin(scene.board.bottom[comps], [s == "bottom" for s in sides])]
+    comps = comps[np.argsort(~scene.board.bottom[comps], kind="stable")]
+    boxes = scene.board.grid.boxes[comps]
+    left, right = view.px(boxes[:, 0]), view.px(boxes[:, 2])
+    top, low = view.py(boxes[:, 3]), view.py(boxes[:, 1])
+    body = np.where(scene.board.bottom[comps], ink["bottom_body"], ink["top_body"]).astype(np.uint8)
+    _draw_segments(canvas, _box_segments(left, top, right, low), np.repeat(body, 4))
+    if courtyards and len(scene.courtyard_seg):
+        lines = scene.courtyard_seg[np.isin(scene.courtyard_comp, comps)]
+        pixels = np.column_stack((view.px(lines[:, 0]), view.py(lines[:, 1]), view.px(lines[:, 2]), view.py(lines[:, 3])))
+        _draw_segments(canvas, pixels, np.full(len(pixels), ink["courtyard"], dtype=np.uint8))
+
+    # pads inside the view on a drawn side (through-hole pads always), top pads last
+    side_codes = [SIDES.index(s) for s in sides] + [2]
+    reach = np.maximum(scene.pad_w, scene.pad_h) / 2
+    pads = np.flatnonzero((scene.pad_x + reach >= x1) & (scene.pad_x - reach <= x2) &
+                          (scene.pad_y + reach >= y1) & (scene.pad_y - reach <= y2) &
+                          np.isin(scene.pad_side, side_codes))
+    pads = pads[np.argsort(scene.pad_side[pads] == 0, kind="stable")]
+    cx, cy = view.px(scene.pad_x[pads]), view.py(scene.pad_y[pads])
+    half_w, half_h = scene.pad_w[pads] * view.scale / 2, scene.pad_h[pads] * view.scale / 2
+    pad_ink = np.array([ink["top_pad"], ink["bottom_pad"], ink["multi_pad"]], dtype=np.uint8)[scene.pad_side[pads]]
+    pad_ink[np.isin(scene.pad_net[pads], highlight)] = bright
+    # pads up to SMALL_PAD_PX across at a multiple of 90 degrees (any rotation
+    # below 3 pixels, round ones below 4) are filled rectangles, set directly
+    turns = scene.pad_rot[pads] / 90
+    quarter = np.rint(turns) % 2 == 1
+    square = np.abs(turns - np.rint(turns)) < 1e-3
+    across = 2 * np.maximum(half_w, half_h)
+    small = (across < 3) | (square & (across <= SMALL_PAD_PX) & ((across < 4) | (scene.pad_round[pads] == 0)))
+    fill_w = np.clip(np.rint(2 * np.where(quarter, half_h, half_w)[small]), 1, SMALL_PAD_PX).astype(np.intp)
+    fill_h = np.clip(np.rint(2 * np.where(quarter, half_w, half_h)[small]), 1, SMALL_PAD_PX).astype(np.intp)
+    owner, cell = expand_runs(np.zeros(len(fill_w), dtype=np.intp), fill_w * fill_h)
+    x = np.rint(cx[small] - fill_w / 2).astype(np.intp)[owner] + cell % fill_w[owner]
+    y = np.rint(cy[small] - fill_h / 2).astype(np.intp)[owner] + cell // fill_w[owner]
+    inside = (x >= 0) & (x < view.width) & (y >= 0) & (y < view.height)
+    canvas[y[inside], x[inside]] = pad_ink[small][owner[inside]]
+
+    image = Image.fromarray(canvas, mode="L")
+    image.putpalette(PALETTE)
+    draw = ImageDraw.Draw(image)
+    large = np.flatnonzero(~small)
+    angle = np.radians(scene.pad_rot[pads[large]])
+    cos, sin = np.cos(angle), np.sin(angle)
+    hw, hh = half_w[large], half_h[large]
+    # rectangle corners, rotated CCW on the board (clockwise in image y)
+    corner_x = np.array([-1, 1, 1, -1])[None, :] * hw[:, None]
+    corner_y = np.array([-1, -1, 1, 1])[None, :] * hh[:, None]
+    px = cx[large, None] + corner_x * cos[:, None] - corner_y * sin[:, None]
+    py = cy[large, None] - (corner_x * sin[:, None] + corner_y * cos[:, None])
+    radius = np.minimum(hw, hh)
+    stretch = np.maximum(hw, hh) - radius
+    # round pads: the centers of the end circles, along the longer side
+    ex = np.where(hw >= hh, stretch, 0.0)
+    ey = np.where(hw >= hh, 0.0, stretch)
+    end_x, end_y = ex * cos - ey * sin, -(ex * sin + ey * cos)
+    for k, p in enumerate(large.tolist()):
+        fill = int(pad_ink[p])
+        if scene.pad_round[pads[p]]:
+            r = radius[k]
+            ends = ((cx[p] + end_x[k], cy[p] + end_y[k]), (cx[p] - end_x[k], cy[p] - end_y[k]))
+            for ax, ay in ends[:2 if stretch[k] > 0 else 1]:
+                draw.ellipse((ax - r, ay - r, ax + r, ay + r), fill=fill)
+            if stretch[k] > 0:
+                draw.line(ends, fill=fill, width=max(1, round(2 * r)))
+        else:
+            draw.polygon(list(zip(px[k].tolist(), py[k].tolist())), fill=fill)
+
+    # airlines of the nets whose tree box touches the view, one polyline per
+    # net; highlighted ones 2 pixels wide, on top
+    airline_count = 0
+    if airlines:
+        tree = scene.airlines(max_pads_per_net)
+        keep = np.flatnonzero((tree.boxes[:, 2] >= x1) & (tree.boxes[:, 0] <= x2) &
+                              (tree.boxes[:, 3] >= y1) & (tree.boxes[:, 1] <= y2))
+        lit = np.isin(tree.nets[keep], highlight)
+        keep = keep[np.argsort(lit, kind="stable")]
+        for k, bold in zip(keep.tolist(), np.sort(lit).tolist()):
+            tour = tree.tours[k]
+            points = np.column_stack((view.px(tour[:, 0]), view.py(tour[:, 1]))).ravel().tolist()
+            draw.line(points, fill=bright if bold else ink["airline"], width=2 if bold else 1)
+        airline_count = int(tree.segment_count[keep].sum())
+
+    if labels:
+        font = ImageFont.load_default()
+        for k in np.flatnonzero(right - left >= LABEL_MIN_PX).tolist():
+            text = scene.board.designators[comps[k]]
+            tx1, ty1, tx2, ty2 = draw.textbbox((0, 0), text, font=font)
+            if tx2 - tx1 <= right[k] - left[k]:
+                draw.text(((left[k] + right[k] - (tx2 - tx1)) / 2, (top[k] + low[k] - (ty2 - ty1)) / 2), text,
+                          fill=ink["label"], font=font)
+
+    return {
+        "image": image,
+        "view_box": [round(v, 3) for v in view_box],
+        "scale_px_per_mil": round(view.scale, 6),
+        "missing_designators": missing,
+        "unknown_nets": unknown_nets,
+        "component_count": len(comps),
+        "pad_count": len(pads),
+        "airline_count": airline_count,
+    }
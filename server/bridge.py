@@ -0,0 +1,501 @@
+"""
+Transport layer between the MCP server and the Altium DelphiScript bridge.
+
+Two ways of getting a request into Altium:
+- launch: write request.json and launch X2.EXE with Altium_API>Run; the
+  script compiles, runs one command, writes response.json and exits.
+- resident: launch Altium_API>Serve once; the script stays running, polls a
+  mailbox file for requests and writes a heartbeat file while idle. Every
+  later command skips the X2.EXE launch and the script recompile.
+
+The resident transport falls back to launching per command whenever the
+resident script is not alive (no fresh heartbeat, or a request is not
+picked up in time), so a crashed or stopped loop never blocks the tools.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from component_sync import ComponentSync
+from pagination import ResultPager
+from read_cache import ReadCache, invalidates, is_cacheable
+from waiters import CompletionWaiter, make_waiter
+
+logger = logging.getLogger("AltiumMCPServer")
+
+BRIDGE_MODES = ("launch", "resident")
+
+# Resident mailbox file names, relative to the exchange directory. They are
+# deliberately distinct from request.json/response.json so a launched
+# one-shot script and the resident loop never read each other's requests.
+RESIDENT_REQUEST = "resident_request.json"
+RESIDENT_ACTIVE = "resident_active.json"
+RESIDENT_RESPONSE = "resident_response.json"
+RESIDENT_HEARTBEAT = "resident_heartbeat.txt"
+RESIDENT_STOP = "resident_stop"
+
+
+def parse_response(response_text: str) -> Dict[str, Any]:
+    """Parse a response file written by the bridge script.
+
+    The DelphiScript JSON writer occasionally double-quotes nested arrays or
+    leaves escaped quotes behind, so a couple of known fixes are attempted
+    before giving up with a structured error.
+    """
+    try:
+        response = json.loads(response_text)
+        logger.info(f"Successfully parsed JSON response")
+        return response
+    except json.JSONDecodeError as e:
+        logger.error(f"Error parsing JSON response: {e}")
+        logger.error(f"Error at position {e.pos}, line {e.lineno}, column {e.colno}")
+        logger.error(f"Character at error position: '{response_text[e.pos:e.pos+10]}...'")
+
+        # Try to manually fix common JSON issues
+        logger.info("Attempting to fix JSON response...")
+        fixed_text = response_text
+
+        # Fix 1: If there's a quoted JSON array, try to fix it
+        if '"[' in fixed_text and ']"' in fixed_text:
+            fixed_text = fixed_text.replace('"[', '[').replace(']"', ']')
+            logger.info("Fixed double-quoted JSON array")
+
+        # Fix 2: Handle escaped quotes in JSON strings
+        fixed_text = fixed_text.replace('\\"', '"')
+
+        # Try to parse the fixed JSON
+        try:
+            fixed_response = json.loads(fixed_text)
+            logger.info("Successfully parsed fixed JSON response")
+            return fixed_response
+        except json.JSONDecodeError as e2:
+            logger.error(f"Still failed to parse JSON after fixes: {e2}")
+
+        # If all else fails, return a structured error
+        return {
+            "success": False,
+            "error": f"Invalid JSON response: {e}",
+            "raw_response": response_text[:500]  # Include part of the raw response for diagnosis
+        }
+
+
+def write_request(path: Path, request: Dict[str, Any]) -> None:
+    """Write a request file atomically.
+
+    The DelphiScript side parses requests line by line, so the file is
+    written with indent=2 (one key per line). Writing to a temp file and
+    renaming means a polling reader never sees a half-written request.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(request, f, indent=2)
+    os.replace(tmp, path)
+
+
+class ScriptLauncher:
+    """Launches a procedure of the bridge script project through X2.EXE."""
+
+    def __init__(self, config):
+        self.config = config
+        self.launch_count = 0
+
+    @staticmethod
+    def _resolve_msix_path(virtual_path: str) -> str:
+        """Resolve an MSIX-virtualized path to the real filesystem path.
+
+        When Claude Desktop is installed via MSIX (the standard .exe installer
+        on modern Windows), file paths are virtualized under AppData\\Roaming\\
+        but the real files live at AppData\\Local\\Packages\\Claude_*\\
+        LocalCache\\Roaming\\. Child processes of the MSIX app (like Python)
+        can see the virtualized paths, but external apps (like Altium) cannot.
+        This resolves the path so external processes can find the files.
+        """
+        appdata = os.environ.get('APPDATA', '')
+        if not appdata or not virtual_path.startswith(appdata):
+            return virtual_path
+
+        localappdata = os.environ.get('LOCALAPPDATA', '')
+        packages_dir = os.path.join(localappdata, 'Packages')
+        if not os.path.isdir(packages_dir):
+            return virtual_path
+
+        try:
+            for item in os.listdir(packages_dir):
+                if item.startswith('Claude_'):
+                    relative = os.path.relpath(virtual_path, appdata)
+                    real_path = os.path.join(packages_dir, item, 'LocalCache', 'Roaming', relative)
+                    if os.path.exists(real_path):
+                        logger.info(f"Resolved MSIX path: {virtual_path} -> {real_path}")
+                        return real_path
+        except Exception as e:
+            logger.warning(f"Error resolving MSIX path: {e}")
+
+        return virtual_path
+
+    def launch(self, proc_name: str = "Altium_API>Run") -> bool:
+        """Run a script procedure (e.g. "Altium_API>Run") without waiting for it"""
+        if not os.path.exists(self.config.altium_exe_path):
+            logger.error(f"Altium executable not found at: {self.config.altium_exe_path}")
+            print(f"Error: Altium executable not found. Please check the configuration.")
+            return False
+
+        if not os.path.exists(self.config.script_path):
+            logger.error(f"Script file not found at: {self.config.script_path}")
+            print(f"Error: Script file not found. Please check the configuration.")
+            return False
+
+        try:
+            # Resolve MSIX-virtualized path so Altium (an external process
+            # outside the MSIX sandbox) can find the script files
+            script_path = self._resolve_msix_path(self.config.script_path)
+
+            # Command format: "X2.EXE" -RScriptingSystem:RunScript(ProjectName="path\file.PrjScr"|ProcName="ModuleName>Run")
+            command = f'"{self.config.altium_exe_path}" -RScriptingSystem:RunScript(ProjectName="{script_path}"^|ProcName="{proc_name}")'
+
+            logger.info(f"Running command: {command}")
+
+            # Start the process
+            process = subprocess.Popen(command, shell=True)
+            self.launch_count += 1
+
+            # Don't wait for completion - Altium will run the script and generate the response
+            logger.info(f"Launched Altium with script, process ID: {process.pid}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error launching Altium: {e}")
+            return False
+
+
+class LaunchTransport:
+    """One X2.EXE launch (and script compile) per request."""
+
+    name = "launch"
+
+    def __init__(self, exchange_dir: Path, launcher, waiter: CompletionWaiter, timeout: float = 120):
+        self.request_file = exchange_dir / "request.json"
+        self.response_file = exchange_dir / "response.json"
+        self.launcher = launcher
+        self.waiter = waiter
+        self.timeout = timeout
+
+    async def send(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # Clean up any existing response file
+        if self.response_file.exists():
+            self.response_file.unlink()
+
+        # Write the request file with command and parameters
+        write_request(self.request_file, request)
+        logger.info(f"Wrote request file for command: {request.get('command')}")
+
+        # Run the Altium script
+        if not self.launcher.launch("Altium_API>Run"):
+            return {"success": False, "error": "Failed to run Altium script"}
+
+        # Wait for the response file
+        logger.info(f"Waiting for response file to appear...")
+        if not await self.waiter.wait(self.response_file, self.timeout):
+            logger.error("Timeout waiting for response from Altium")
+            return {"success": False, "error": "No response received from Altium (timeout)"}
+
+        return _read_response(self.response_file)
+
+
+class ResidentTransport:
+    """Feeds requests to a long-running Altium_API>Serve loop.
+
+    Protocol (all files in the exchange directory):
+    - Python writes resident_request.json (atomically) and waits.
+    - The loop claims it by renaming it to resident_active.json, runs the
+      command and writes resident_response.json (temp file + rename).
+    - While idle the loop rewrites resident_heartbeat.txt every ~0.5 s;
+      its mtime tells Python the loop is alive.
+    - Creating resident_stop ends the loop.
+
+    A request that is not claimed within pickup_timeout is withdrawn and
+    sent through the fallback transport instead.
+    """
+
+    name = "resident"
+
+    def __init__(self, exchange_dir: Path, launcher, waiter: CompletionWaiter,
+                 fallback: LaunchTransport, timeout: float = 120, heartbeat_timeout: float = 3.0,
+                 pickup_timeout: float = 2.0, startup_timeout: float = 30.0):
+        self.request_file = exchange_dir / RESIDENT_REQUEST
+        self.active_file = exchange_dir / RESIDENT_ACTIVE
+        self.response_file = exchange_dir / RESIDENT_RESPONSE
+        self.heartbeat_file = exchange_dir / RESIDENT_HEARTBEAT
+        self.stop_file = exchange_dir / RESIDENT_STOP
+        self.launcher = launcher
+        self.waiter = waiter
+        self.fallback = fallback
+        self.timeout = timeout
+        self.heartbeat_timeout = heartbeat_timeout
+        self.pickup_timeout = pickup_timeout
+        self.startup_timeout = startup_timeout
+        self.fallback_count = 0
+        self._last_response = 0.0
+
+    def heartbeat_age(self) -> Optional[float]:
+        """Seconds since the resident loop last signalled, None if never"""
+        try:
+            last = max(self.heartbeat_file.stat().st_mtime, self._last_response)
+        except OSError:
+            return None
+        return max(0.0, time.time() - last)
+
+    def is_alive(self) -> bool:
+        age = self.heartbeat_age()
+        return age is not None and age <= self.heartbeat_timeout
+
+    async def start(self) -> bool:
+        """Launch the resident loop and wait for its first heartbeat"""
+        if self.is_alive():
+            return True
+        for f in (self.stop_file, self.request_file, self.active_file, self.response_file):
+            if f.exists():
+                f.unlink()
+        if not self.launcher.launch("Altium_API>Serve"):
+            return False
+        logger.info("Waiting for resident Altium script heartbeat...")
+        start_time = time.time()
+        if await self.waiter.wait_for(self.heartbeat_file.parent, self.is_alive, self.startup_timeout):
+            logger.info(f"Resident script up after {time.time() - start_time:.2f}s")
+            return True
+        logger.error("Resident Altium script did not start")
+        return False
+
+    def stop(self) -> None:
+        """Ask the resident loop to exit after its current request"""
+        self.stop_file.touch()
+
+    async def _fall_back(self, request: Dict[str, Any], reason: str) -> Dict[str, Any]:
+        self.fallback_count += 1
+        logger.warning(f"Resident bridge unavailable ({reason}), launching script for this command")
+        return await self.fallback.send(request)
+
+    async def send(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.is_alive() and not await self.start():
+            return await self._fall_back(request, "resident script not running")
+
+        if self.response_file.exists():
+            self.response_file.unlink()
+        write_request(self.request_file, request)
+        logger.info(f"Queued resident request for command: {request.get('command')}")
+
+        # Wait for the loop to claim the request
+        if not await self.waiter.wait(self.request_file, self.pickup_timeout, exists=False):
+            try:
+                self.request_file.unlink()
+                withdrawn = True
+            except FileNotFoundError:
+                withdrawn = False  # claimed just now
+            if withdrawn:
+                return await self._fall_back(request, "request not picked up")
+
+        if not await self.waiter.wait(self.response_file, self.timeout):
+            logger.error("Timeout waiting for response from resident Altium script")
+            return {"success": False, "error": "No response received from Altium (timeout)"}
+
+        # A response proves the loop is alive even if its heartbeat went
+        # stale during a long command
+        self._last_response = time.time()
+        return _read_response(self.response_file)
+
+
+class Response(dict):
+    """A parsed response that remembers the size of the file it came from"""
+
+    def __init__(self, response: Dict[str, Any], raw_bytes: Optional[int] = None):
+        super().__init__(response)
+        self.raw_bytes = raw_bytes
+
+
+def _read_response(response_file: Path) -> Dict[str, Any]:
+    # Read the response file and print it for debugging
+    logger.info("Response file found, reading response")
+    with open(response_file, "r") as f:
+        response_text = f.read()
+
+    # Log the raw response for debugging
+    logger.info(f"Raw response (first 200 chars): {response_text[:200]}")
+    return Response(parse_response(response_text), len(response_text))
+
+
+class AltiumBridge:
+    """Serializes commands to Altium over the configured transport."""
+
+    def __init__(self, config, exchange_dir: Path, launcher=None, waiter: Optional[CompletionWaiter] = None):
+        self.config = config
+        self.exchange_dir = exchange_dir
+        self.launcher = launcher or ScriptLauncher(config)
+        self.waiter = waiter or make_waiter(getattr(config, "response_waiter", "auto"))
+        self.launch_transport = LaunchTransport(exchange_dir, self.launcher, self.waiter)
+        self.resident_transport = ResidentTransport(
+            exchange_dir, self.launcher, self.waiter, fallback=self.launch_transport)
+        self.cache = ReadCache(ttl=getattr(config, "cache_ttl_seconds", 30.0),
+                               max_entries=getattr(config, "cache_max_entries", 64))
+        self.component_sync = ComponentSync(enabled=getattr(config, "component_delta_sync", True))
+        self.pager = ResultPager(version=lambda: self.cache.version)
+
+        # Commands share a single request/response file pair, so
+        # concurrent tool calls must be serialized or they clobber each other
+        self._command_lock = asyncio.Lock()
+
+    @property
+    def transport(self):
+        if getattr(self.config, "bridge_mode", "launch") == "resident":
+            return self.resident_transport
+        return self.launch_transport
+
+    async def execute_command(self, command: str, params: Dict[str, Any],
+                              use_cache: bool = True) -> Dict[str, Any]:
+        """Execute a command in Altium via the bridge script.
+
+        Read-only commands are answered from the read cache when possible;
+        pass use_cache=False to force a fresh read (the fresh result still
+        refreshes the cache). Cached responses are shared - do not mutate.
+        """
+        async with self._command_lock:
+            return await self._execute_command_locked(command, params, use_cache)
+
+    async def _execute_command_locked(self, command: str, params: Dict[str, Any],
+                                      use_cache: bool = True) -> Dict[str, Any]:
+        cacheable = is_cacheable(command, params)
+        if cacheable and use_cache:
+            cached = self.cache.get(ReadCache.key(command, params))
+            if cached is not None:
+                logger.info(f"Read cache hit for command: {command}")
+                return cached
+
+        response = await self._send(command, params)
+        if invalidates(command):
+            self.cache.invalidate()
+        elif cacheable and response.get("success", False):
+            self.cache.put(ReadCache.key(command, params), response)
+        return response
+
+    async def _send(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if self.component_sync.handles(command, params):
+            response = await self._send_raw(command, self.component_sync.request_params())
+            return self.component_sync.merge(response, getattr(response, "raw_bytes", None))
+        return await self._send_raw(command, params)
+
+    async def _send_raw(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await self.transport.send({
+                "command": command,
+                **params  # Include parameters directly in the main JSON object
+            })
+        except Exception as e:
+            logger.error(f"Error executing command: {e}")
+            return {"success": False, "error": str(e)}
+
+    async def execute_batch(self, commands: List[Tuple[str, Dict[str, Any]]],
+                            use_cache: bool = True) -> List[Dict[str, Any]]:
+        """Execute several commands, in order, in a single script run.
+
+        Returns one response per command, each shaped like the return value
+        of execute_command ({"success", "result" | "error"}). Cached reads
+        are answered locally and only the rest is sent to Altium.
+        """
+        async with self._command_lock:
+            return await self._execute_batch_locked(commands, use_cache)
+
+    async def _execute_batch_locked(self, commands: List[Tuple[str, Dict[str, Any]]],
+                                    use_cache: bool = True) -> List[Dict[str, Any]]:
+        out: List[Optional[Dict[str, Any]]] = [None] * len(commands)
+        pending = []
+        last_mutation = -1
+        for i, (command, params) in enumerate(commands):
+            # Reads after a mutation in the same batch must see its effect
+            if use_cache and last_mutation < 0 and is_cacheable(command, params):
+                cached = self.cache.get(ReadCache.key(command, params))
+                if cached is not None:
+                    out[i] = cached
+                    continue
+            if invalidates(command):
+                last_mutation = i
+            pending.append(i)
+
+        if len(pending) == 1:
+            i = pending[0]
+            out[i] = await self._send(*commands[i])
+        elif pending:
+            for i, response in zip(pending, await self._send_batch([commands[i] for i in pending])):
+                out[i] = response
+
+        if last_mutation >= 0:
+            self.cache.invalidate()
+        for i in pending:
+            command, params = commands[i]
+            if i > last_mutation and is_cacheable(command, params) and out[i].get("success", False):
+                self.cache.put(ReadCache.key(command, params), out[i])
+        return out
+
+    async def _send_batch(self, commands: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        # The script parses requests line by line and cannot read nested
+        # objects, so each command goes into its own sub-request file and
+        # the envelope lists the file names
+        batch_files = []
+        try:
+            for i, (command, params) in enumerate(commands):
+                if self.component_sync.handles(command, params):
+                    params = self.component_sync.request_params()
+                name = f"batch_{i}.json"
+                write_request(self.exchange_dir / name, {"command": command, **params})
+                batch_files.append(name)
+
+            logger.info(f"Running batch of {len(commands)} commands: {[c for c, _ in commands]}")
+            response = await self._send_raw("batch", {"batch_files": batch_files})
+        finally:
+            for name in batch_files:
+                try:
+                    (self.exchange_dir / name).unlink()
+                except OSError:
+                    pass
+
+        if not response.get("success", False):
+            error_msg = response.get("error", "Unknown error")
+            return [{"success": False, "error": f"Batch failed: {error_msg}"} for _ in commands]
+
+        results = response.get("result", [])
+        if isinstance(results, str):
+            results = parse_response(results)
+        if not isinstance(results, list):
+            results = []
+
+        out = []
+        for i, (command, params) in enumerate(commands):
+            if i < len(results) and isinstance(results[i], dict):
+                entry = dict(results[i])
+                entry.pop("command", None)
+                if self.component_sync.handles(command, params):
+                    entry = self.component_sync.merge(entry)
+                out.append(entry)
+            else:
+                out.append({"success": False, "error": f"No batch result for {command}"})
+        return out
+
+    def status(self) -> Dict[str, Any]:
+        """Transport details for get_server_status"""
+        resident = self.resident_transport
+        age = resident.heartbeat_age()
+        return {
+            "bridge_mode": self.transport.name,
+            "script_launches": self.launcher.launch_count,
+            "resident_alive": resident.is_alive(),
+            "resident_heartbeat_age_s": round(age, 2) if age is not None else None,
+            "resident_fallbacks": resident.fallback_count,
+            "response_waiter": self.waiter.name,
+            "response_waits": self.waiter.stats.summary(),
+            "read_cache": self.cache.stats(),
+            "component_sync": self.component_sync.stats(),
+            "pagination": self.pager.stats(),
+        }
@@ -0,0 +1,428 @@
+"""
+Board-wide clearance check on exported component geometry.
+
+check_placement measures each close pair inside the script, one
+PrimPrimDistance call per primitive pair, so it is limited to a target
+set. ClearanceModel takes the geometry get_component_geometry exports once
+(every pad, track, arc, fill and region of every component, in board
+coordinates) and measures the pairs in Python with vectorized kernels, so
+a whole-board check runs in seconds and needs no further script runs
+until the design changes.
+
+Every primitive becomes a polyline with a radius, open or closed:
+
+- round pad: its center (oval: the segment between the end centers),
+  radius half the smaller size
+- rectangular pad, fill, region: closed polygon, radius 0
+- rounded-rectangle pad: the rectangle shrunk by the corner radius, with
+  that radius; octagonal pad: closed octagon
+- track: its segment, arc: chords every ARC_STEP_DEG degrees, radius half
+  the width; via: its center, radius half its size
+
+Two primitives are apart by their smallest segment-to-segment distance
+minus both radii, and touch (0) when that is negative, when segments cross
+or when one closed polygon contains the other. Arcs measured on chords
+read slightly far (R * (1 - cos(ARC_STEP_DEG / 2)), 0.4% of the radius).
+
+Primitives are sorted into kinds - pad, copper, silk (overlay layers),
+courtyard and mechanical - so a check can be limited to some of them.
+Courtyards are drawn as lines (see create_pcb_footprint); the convex hull
+of a component's courtyard lines is added as a closed outline so a part
+sitting entirely inside another's courtyard counts as touching it. Text
+is skipped, as in check_placement.
+
+Pairs come from BoardIndex.close_pairs with check_placement's prefilter
+rule, and violations have check_placement's shape.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from spatial import BoardIndex, expand_runs
+
+KINDS = ("pad", "copper", "silk", "courtyard", "mechanical")
+# Layers holding courtyard lines besides any layer named "...courtyard..."
+COURTYARD_LAYERS = ("Mechanical 15",)
+# Arc discretization step
+ARC_STEP_DEG = 10.0
+# Element pairs per vectorized batch (bounds temporary memory)
+CHUNK = 1 << 20
+
+Shape = Tuple[List[Tuple[float, float]], float, bool]
+
+
+def _layer_key(layer: Any) -> str:
+    return str(layer or "").replace(" ", "").lower()
+
+
+def primitive_kind(primitive: Dict[str, Any], courtyard_layers: Sequence[str] = COURTYARD_LAYERS) -> str:
+    """pad, copper, silk, courtyard or mechanical"""
+    if primitive.get("type") == "pad":
+        return "pad"
+    layer = _layer_key(primitive.get("layer"))
+    if "courtyard" in layer or layer in {_layer_key(c) for c in courtyard_layers}:
+        return "courtyard"
+    if "overlay" in layer or "silk" in layer:
+        return "silk"
+    if "mechanical" in layer:
+        return "mechanical"
+    return "copper"
+
+
+def _place(points: Iterable[Tuple[float, float]], x: float, y: float, rotation: float
+           ) -> List[Tuple[float, float]]:
+    """Rotate CCW by rotation degrees about the origin, then move to x/y"""
+    angle = math.radians(rotation)
+    cos, sin = math.cos(angle), math.sin(angle)
+    return [(x + px * cos - py * sin, y + px * sin + py * cos) for px, py in points]
+
+
+def _rectangle(w: float, h: float) -> List[Tuple[float, float]]:
+    return [(-w / 2, -h / 2), (w / 2, -h / 2), (w / 2, h / 2), (-w / 2, h / 2)]
+
+
+def primitive_shapes(primitive: Dict[str, Any]) -> List[Shape]:
+    """(vertices, radius, closed) polylines of an exported primitive; [] for
+    unknown or degenerate ones"""
+    kind = primitive.get("type")
+    if kind == "pad":
+        x, y = float(primitive["x"]), float(primitive["y"])
+        w, h = float(primitive.get("width", 0)), float(primitive.get("height", 0))
+        rotation = float(primitive.get("rotation", 0))
+        shape = _layer_key(primitive.get("shape")).replace("-", "")
+        small = min(w, h)
+        if "round" in shape and "rect" in shape:
+            corner = min(max(float(primitive.get("corner_pct", 50)), 0.0), 100.0) / 100 * small / 2
+            return [(_place(_rectangle(w - 2 * corner, h - 2 * corner), x, y, rotation), corner, True)]
+        if "round" in shape or "circ" in shape:
+            reach = (max(w, h) - small) / 2
+            ends = [(-reach, 0.0), (reach, 0.0)] if w >= h else [(0.0, -reach), (0.0, reach)]
+            return [(_place(ends, x, y, rotation), small / 2, False)]
+        if "oct" in shape:
+            c = small / 4
+            octagon = [(-w / 2 + c, -h / 2), (w / 2 - c, -h / 2), (w / 2, -h / 2 + c), (w / 2, h / 2 - c),
+                       (w / 2 - c, h / 2), (-w / 2 + c, h / 2), (-w / 2, h / 2 - c), (-w / 2, -h / 2 + c)]
+            return [(_place(octagon, x, y, rotation), 0.0, True)]
+        # rectangular, and anything unknown as its full rectangle
+        return [(_place(_rectangle(w, h), x, y, rotation), 0.0, True)]
+    if kind == "track":
+        ends = [(float(primitive["x1"]), float(primitive["y1"])), (float(primitive["x2"]), float(primitive["y2"]))]
+        return [(ends, float(primitive.get("width", 0)) / 2, False)]
+    if kind == "arc":
+        start, end = float(primitive.get("start_angle", 0)), float(primitive.get("end_angle", 360))
+        if end <= start:
+            end += 360
+        steps = max(1, math.ceil((end - start) / ARC_STEP_DEG))
+        cx, cy, r = float(primitive["cx"]), float(primitive["cy"]), float(primitive["radius"])
+        points = [(cx + r * math.cos(math.radians(start + (end - start) * i / steps)),
+                   cy + r * math.sin(math.radians(start + (end - start) * i / steps))) for i in range(steps + 1)]
+        return [(points, float(primitive.get("width", 0)) / 2, False)]
+    if kind == "fill":
+        x1, y1, x2, y2 = (float(primitive[k]) for k in ("x1", "y1", "x2", "y2"))
+        rect = _rectangle(abs(x2 - x1), abs(y2 - y1))
+        return [(_place(rect, (x1 + x2) / 2, (y1 + y2) / 2, float(primitive.get("rotation", 0))), 0.0, True)]
+    if kind == "region":
+        points = [(float(v[0]), float(v[1])) for v in primitive.get("vertices", [])]
+        return [(points, 0.0, True)] if len(points) >= 3 else []
+    if kind == "via":
+        point = (float(primitive["x"]), float(primitive["y"]))
+        return [([point], float(primitive.get("size", 0)) / 2, False)]
+    return []
+
+
+def convex_hull(points: Sequence[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """Counterclockwise hull (monotone chain), collinear points dropped"""
+    points = sorted(set(points))
+    if len(points) < 3:
+        return points
+
+    def half(seq):
+        chain = []
+        for p in seq:
+            while len(chain) >= 2 and ((chain[-1][0] - chain[-2][0]) * (p[1] - chain[-2][1])
+                                       - (chain[-1][1] - chain[-2][1]) * (p[0] - chain[-2][0])) <= 0:
+                chain.pop()
+            chain.append(p)
+        return chain
+    lower, upper = half(points), half(reversed(points))
+    return lower[:-1] + upper[:-1]
+
+
+def segment_distances(px, py, qx, qy, rx, ry, sx, sy) -> np.ndarray:
+    """Distance between segments pq and rs, elementwise; 0 where they cross"""
+    def to_segment(x, y, ax, ay, bx, by):
+        dx, dy = bx - ax, by - ay
+        length2 = dx * dx + dy * dy
+        t = ((x - ax) * dx + (y - ay) * dy) / np.where(length2 > 0, length2, 1.0)
+        np.clip(t, 0.0, 1.0, out=t)
+        return np.hypot(ax + t * dx - x, ay + t * dy - y)
+
+    d = np.minimum(np.minimum(to_segment(px, py, rx, ry, sx, sy), to_segment(qx, qy, rx, ry, sx, sy)),
+                   np.minimum(to_segment(rx, ry, px, py, qx, qy), to_segment(sx, sy, px, py, qx, qy)))
+    # proper crossings (touching ends are already at distance 0)
+    d1 = (qx - px) * (ry - py) - (qy - py) * (rx - px)
+    d2 = (qx - px) * (sy - py) - (qy - py) * (sx - px)
+    d3 = (sx - rx) * (py - ry) - (sy - ry) * (px - rx)
+    d4 = (sx - rx) * (qy - ry) - (sy - ry) * (qx - rx)
+    d[(d1 * d2 < 0) & (d3 * d4 < 0)] = 0.0
+    return d
+
+
+def _chunks(counts: np.ndarray) -> Iterable[slice]:
+    """Consecutive slices of runs whose counts add up to about CHUNK"""
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(counts):
+        before = ends[start - 1] if start else 0
+        stop = max(int(np.searchsorted(ends, before + CHUNK, side="right")), start + 1)
+        yield slice(start, stop)
+        start = stop
+
+
+class ClearanceModel:
+    """Component primitives of a geometry snapshot as flat segment arrays"""
+
+    _last: Optional[Tuple[list, tuple, "ClearanceModel"]] = None
+
+    def __init__(self, geometry: Iterable[Dict[str, Any]], kinds: Optional[Sequence[str]] = None,
+                 courtyard_layers: Sequence[str] = COURTYARD_LAYERS):
+        geometry = list(geometry)
+        kinds = tuple(kinds) if kinds else KINDS
+        unknown = [k for k in kinds if k not in KINDS]
+        if unknown:
+            raise ValueError(f"unknown primitive kinds {unknown}, expected some of {list(KINDS)}")
+        self.kinds = kinds
+        self.board = BoardIndex(geometry)
+        first: Dict[str, Dict[str, Any]] = {}
+        for component in geometry:
+            if component.get("designator") is not None:
+                first.setdefault(component["designator"], component)
+
+        seg = ([], [], [], [], [], [])  # ax, ay, bx, by, radius, shape
+        shape_kind, shape_x, shape_y = [], [], []
+        self.seg_start = np.zeros(len(self.board), dtype=np.intp)
+        self.seg_count = np.zeros(len(self.board), dtype=np.intp)
+        self.closed_count = np.zeros(len(self.board), dtype=np.intp)
+        self.shape_start = np.zeros(len(self.board), dtype=np.intp)
+        self.shape_count = np.zeros(len(self.board), dtype=np.intp)
+        for i, designator in enumerate(self.board.designators):
+            shapes, courtyard = [], []
+            for primitive in first[designator].get("primitives", []):
+                kind = primitive_kind(primitive, courtyard_layers)
+                if kind not in kinds:
+                    continue
+                for vertices, radius, closed in primitive_shapes(primitive):
+                    shapes.append((vertices, radius, closed, kind))
+                    if kind == "courtyard" and not closed:
+                        courtyard.extend(vertices)
+            hull = convex_hull(courtyard)
+            if len(hull) >= 3:
+                shapes.append((hull, 0.0, True, "courtyard"))
+            # closed shapes first: their segments are the ones containment tests
+            shapes.sort(key=lambda s: not s[2])
+
+            self.seg_start[i], self.shape_start[i] = len(seg[0]), len(shape_kind)
+            for vertices, radius, closed, kind in shapes:
+                shape = len(shape_kind)
+                shape_kind.append(KINDS.index(kind))
+                shape_x.append(vertices[0][0])
+                shape_y.append(vertices[0][1])
+                ends = vertices[1:] + vertices[:1] if closed else vertices[1:] or vertices
+                for (ax, ay), (bx, by) in zip(vertices, ends):
+                    for column, value in zip(seg, (ax, ay, bx, by, radius, shape)):
+                        column.append(value)
+                if closed:
+                    self.closed_count[i] += len(vertices)
+            self.seg_count[i] = len(seg[0]) - self.seg_start[i]
+            self.shape_count[i] = len(shape_kind) - self.shape_start[i]
+
+        self.ax, self.ay, self.bx, self.by, self.radius = (np.array(c, dtype=float) for c in seg[:5])
+        self.seg_shape = np.array(seg[5], dtype=np.intp)
+        self.shape_kind = np.array(shape_kind, dtype=np.intp)
+        self.shape_x = np.array(shape_x, dtype=float)
+        self.shape_y = np.array(shape_y, dtype=float)
+        # xmin, ymin, xmax, ymax of each segment with its radius, and of each component
+        self.seg_box = np.column_stack((np.minimum(self.ax, self.bx) - self.radius,
+                                        np.minimum(self.ay, self.by) - self.radius,
+                                        np.maximum(self.ax, self.bx) + self.radius,
+                                        np.maximum(self.ay, self.by) + self.radius)).reshape(-1, 4)
+        self.extent = np.full((len(self.board), 4), np.nan)
+        has = np.nonzero(self.seg_count)[0]
+        if len(has):
+            starts = self.seg_start[has]
+            self.extent[has, 0] = np.minimum.reduceat(self.seg_box[:, 0], starts)
+            self.extent[has, 1] = np.minimum.reduceat(self.seg_box[:, 1], starts)
+            self.extent[has, 2] = np.maximum.reduceat(self.seg_box[:, 2], starts)
+            self.extent[has, 3] = np.maximum.reduceat(self.seg_box[:, 3], starts)
+
+    @classmethod
+    def of(cls, geometry: list, kinds: Optional[Sequence[str]] = None) -> "ClearanceModel":
+        """Model for this snapshot and kinds, reusing the last one if the
+        geometry list is the same object"""
+        key = tuple(kinds) if kinds else KINDS
+        last = cls._last
+        if last is not None and last[0] is geometry and last[1] == key:
+            return last[2]
+        model = cls(geometry, key)
+        cls._last = (geometry, key, model)
+        return model
+
+    def __len__(self) -> int:
+        return len(self.board)
+
+    def _segments_near(self, comps: np.ndarray, others: np.ndarray, limit: Optional[float]
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Segments of comps[i], as per-pair lists (starts, counts, segment
+        ids), keeping only those whose extent comes within limit of the
+        extent of others[i] - the rest cannot be closer than limit"""
+        owner, segs = expand_runs(self.seg_start[comps], self.seg_count[comps])
+        if limit is not None:
+            box = self.extent[others[owner]]
+            gap_x = np.maximum(np.maximum(box[:, 0] - self.seg_box[segs, 2], self.seg_box[segs, 0] - box[:, 2]), 0)
+            gap_y = np.maximum(np.maximum(box[:, 1] - self.seg_box[segs, 3], self.seg_box[segs, 1] - box[:, 3]), 0)
+            near = np.hypot(gap_x, gap_y) < limit
+            owner, segs = owner[near], segs[near]
+        counts = np.bincount(owner, minlength=len(comps))
+        return np.cumsum(counts) - counts, counts, segs
+
+    def distances(self, a: np.ndarray, b: np.ndarray, limit: Optional[float] = None
+                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Minimum primitive distance of each component pair (a[i], b[i]),
+        inf when either has no primitives or, with limit, when the pair is
+        at least limit apart -> (distances, shape of a, shape of b) with the
+        closest (or containing/contained) shapes, -1 if none"""
+        a, b = np.asarray(a, dtype=np.intp), np.asarray(b, dtype=np.intp)
+        dist = np.full(len(a), np.inf)
+        near_a = np.full(len(a), -1, dtype=np.intp)
+        near_b = np.full(len(a), -1, dtype=np.intp)
+        start_a, count_a, segs_a = self._segments_near(a, b, limit)
+        start_b, count_b, segs_b = self._segments_near(b, a, limit)
+        counts = count_a * count_b
+        pairs = np.nonzero(counts)[0]
+        for part in _chunks(counts[pairs]):
+            runs = pairs[part]
+            run, k = expand_runs(np.zeros(len(runs), dtype=np.intp), counts[runs])
+            width = count_b[runs][run]
+            sa = segs_a[start_a[runs][run] + k // width]
+            sb = segs_b[start_b[runs][run] + k % width]
+            d = segment_distances(self.ax[sa], self.ay[sa], self.bx[sa], self.by[sa],
+                                  self.ax[sb], self.ay[sb], self.bx[sb], self.by[sb])
+            d -= self.radius[sa] + self.radius[sb]
+            offsets = np.cumsum(counts[runs]) - counts[runs]
+            best = np.minimum.reduceat(d, offsets)
+            # first element per run reaching its minimum
+            hit = np.nonzero(d <= best[run])[0]
+            _, first = np.unique(run[hit], return_index=True)
+            dist[runs] = np.maximum(best, 0.0)
+            near_a[runs] = self.seg_shape[sa[hit[first]]]
+            near_b[runs] = self.seg_shape[sb[hit[first]]]
+        if limit is not None:
+            dist[dist >= limit] = np.inf
+
+        # a part wholly inside a closed outline of the other crosses nothing
+        apart = np.nonzero(dist > 0)[0]
+        for points, outlines, flip in ((a, b, False), (b, a, True)):
+            inside, point, outline = self._inside(points[apart], outlines[apart])
+            where = apart[inside]
+            dist[where] = 0.0
+            near_a[where], near_b[where] = (outline, point) if flip else (point, outline)
+            apart = apart[~inside]
+        return dist, near_a, near_b
+
+    def _inside(self, a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Whether a vertex of any shape of a[i] lies inside a closed shape
+        of b[i] (even-odd rule) -> (mask, a's shape, b's shape) with the
+        shapes of the first hit, over the pairs where mask is set"""
+        inside = np.zeros(len(a), dtype=bool)
+        shape_a = np.full(len(a), -1, dtype=np.intp)
+        shape_b = np.full(len(a), -1, dtype=np.intp)
+        counts = self.shape_count[a] * self.closed_count[b]
+        pairs = np.nonzero(counts)[0]
+        n_shapes = max(len(self.shape_kind), 1)
+        for part in _chunks(counts[pairs]):
+            runs = pairs[part]
+            run, k = expand_runs(np.zeros(len(runs), dtype=np.intp), counts[runs])
+            width = self.closed_count[b[runs]][run]
+            local = k // width
+            point = self.shape_start[a[runs]][run] + local
+            sg = self.seg_start[b[runs]][run] + k % width
+            x, y = self.shape_x[point], self.shape_y[point]
+            ax, ay, bx, by = self.ax[sg], self.ay[sg], self.bx[sg], self.by[sg]
+            straddles = (ay > y) != (by > y)
+            cross = straddles & (x < ax + (y - ay) * (bx - ax) / np.where(straddles, by - ay, 1.0))
+            # crossings per (run, point, closed shape): odd = inside
+            starts = np.cumsum(self.shape_count[a[runs]]) - self.shape_count[a[runs]]
+            group = starts[run] + local
+            keys, hits = np.unique(group[cross] * n_shapes + self.seg_shape[sg[cross]], return_counts=True)
+            odd = keys[hits % 2 == 1]
+            if not len(odd):
+                continue
+            # keys are sorted by group, so each run's first hit comes first
+            groups = odd // n_shapes
+            owner, first = np.unique(np.searchsorted(starts, groups, side="right") - 1, return_index=True)
+            hit_runs = runs[owner]
+            inside[hit_runs] = True
+            shape_a[hit_runs] = self.shape_start[a[hit_runs]] + groups[first] - starts[owner]
+            shape_b[hit_runs] = odd[first] % n_shapes
+        return inside, shape_a[inside], shape_b[inside]
+
+    def kind_of(self, shape: int) -> Optional[str]:
+        return KINDS[self.shape_kind[shape]] if shape >= 0 else None
+
+
+def check_clearance(model: ClearanceModel, designators: Optional[Sequence[str]] = None,
+                    clearance_mils: float = 6.0) -> Dict[str, Any]:
+    """check_placement's result for the given components (default: all),
+    measured on the model: every same-side pair the bounding-box prefilter
+    keeps, reported when the boxes overlap or the primitives are closer
+    than clearance_mils"""
+    if clearance_mils <= 0:
+        clearance_mils = 6.0
+    board = model.board
+    if designators:
+        designators = list(dict.fromkeys(designators))
+        targets = [board.index[d] for d in designators if d in board.index]
+        missing = [d for d in designators if d not in board.index]
+    else:
+        targets, missing = list(range(len(board))), []
+
+    pairs = board.close_pairs(targets, clearance_mils + 25)
+    a = np.array([p[0] for p in pairs], dtype=np.intp)
+    b = np.array([p[1] for p in pairs], dtype=np.intp)
+    boxes = board.grid.boxes
+    ox = np.minimum(boxes[a, 2], boxes[b, 2]) - np.maximum(boxes[a, 0], boxes[b, 0])
+    oy = np.minimum(boxes[a, 3], boxes[b, 3]) - np.maximum(boxes[a, 1], boxes[b, 1])
+    overlap = (ox > 0) & (oy > 0)
+    # only distances below the clearance matter, except for overlapping
+    # boxes, which are reported with their exact distance
+    dist, near_a, near_b = model.distances(a, b, limit=clearance_mils)
+    exact = np.nonzero(overlap & np.isinf(dist))[0]
+    dist[exact], near_a[exact], near_b[exact] = model.distances(a[exact], b[exact])
+    measured = (model.seg_count[a] > 0) & (model.seg_count[b] > 0)
+
+    violations = []
+    for r in np.nonzero(overlap | (dist < clearance_mils))[0].tolist():
+        i, j = int(a[r]), int(b[r])
+        violation = {"a": board.designators[i], "b": board.designators[j], "layer": board.layers[i],
+                     "type": "bounding_box_overlap" if overlap[r] else "clearance",
+                     "distance_mils": round(float(dist[r]), 2) if np.isfinite(dist[r]) else None}
+        if overlap[r]:
+            violation["overlap_x_mils"] = round(float(ox[r]), 2)
+            violation["overlap_y_mils"] = round(float(oy[r]), 2)
+        violation["b_x"] = float(board.x[j])
+        violation["b_y"] = float(board.y[j])
+        if near_a[r] >= 0:
+            violation["closest"] = [model.kind_of(near_a[r]), model.kind_of(near_b[r])]
+        violations.append(violation)
+
+    return {
+        "checked_count": len(targets),
+        "clearance_mils": clearance_mils,
+        "candidate_pairs": len(pairs),
+        "close_pairs_measured": int(measured.sum()),
+        "violation_count": len(violations),
+        "missing_designators": missing,
+        "violations": violations,
+    }
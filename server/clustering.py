@@ -0,0 +1,236 @@
+"""
+Connectivity-based placement clusters (suggest_clusters).
+
+Placing a new board starts from groups of parts that belong together,
+such as a regulator with its passives. The groups come from the
+component/net graph (netgraph.NetGraph):
+
+- affinity: every followed net with k parts adds 1/(k-1) between each
+  pair of them (clique expansion), so a 2-pin net binds its two parts by
+  1 and a 20-pin bus adds a little to every pair. Plane nets (more than
+  max_pads_per_net pads, or named in exclude_nets) are left out, as in
+  get_net_connections. The affinity matrix is built in CSR form by
+  sorting and summing (row, column) keys
+- communities: Louvain modularity optimization. It moves single parts
+  to the neighbouring community with the best modularity gain until no
+  move helps, merges each community into one node (summing the sparse
+  matrix by community) and repeats on the smaller graph. Communities
+  larger than max_cluster_size are clustered again on their own
+  subgraph, whose smaller total weight already favours smaller
+  communities, doubling the resolution while they do not split
+- each cluster gets an anchor (the part with the most pads, usually the
+  IC) and a suggested area: the summed footprint boxes divided by
+  PACKING_DENSITY, as a square
+"""
+
+import math
+import random
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from netgraph import NetGraph
+from spatial import expand_runs
+
+PACKING_DENSITY = 0.5  # fraction of a cluster's area covered by footprint boxes
+MAX_PASSES = 20        # local-moving sweeps per Louvain level
+MIN_GAIN = 1e-9        # smaller modularity gains are not worth a move
+MAX_RESOLUTION_STEP = 64  # oversized communities stop splitting beyond this times the resolution
+
+
+def affinity(graph: NetGraph, comps: np.ndarray, follow: np.ndarray
+             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Clique-expanded affinity between the given components as CSR
+    (indptr, indices, weights), rows and columns in comps order"""
+    n = len(comps)
+    local = np.full(len(graph), -1, dtype=np.intp)
+    local[comps] = np.arange(n)
+    nets = np.nonzero(follow)[0]
+    net, comp = graph.comps_on(nets)
+    keep = local[comp] >= 0
+    net, comp = net[keep], local[comp[keep]]
+    # runs of given parts per net (comps_on keeps each net's parts together);
+    # the weight counts every part on the net
+    starts = np.flatnonzero(np.r_[True, net[1:] != net[:-1]]) if len(net) else np.zeros(0, dtype=np.intp)
+    sizes = np.diff(np.r_[starts, len(net)])
+    run = np.repeat(np.arange(len(starts)), sizes)
+    owner, partner = expand_runs(starts[run], sizes[run])
+    a, b = comp[owner], comp[partner]
+    weight = 1.0 / np.maximum(np.diff(graph.net_ptr)[net[owner]] - 1, 1)
+    pair = a != b
+    return coalesce(a[pair], b[pair], weight[pair], n)
+
+
+def coalesce(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, n: int
+             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """CSR (indptr, indices, weights) of an n x n matrix with repeated
+    entries summed"""
+    keys, inverse = np.unique(rows.astype(np.int64) * n + cols, return_inverse=True)
+    summed = np.bincount(inverse.reshape(-1), weights=weights, minlength=len(keys))
+    indptr = np.searchsorted(keys // max(n, 1), np.arange(n + 1))
+    return indptr, (keys % max(n, 1)).astype(np.intp), summed
+
+
+def _local_moving(indptr, indices, weights, resolution: float, rng: random.Random) -> Optional[List[int]]:
+    """One Louvain level: community of every node, or None if no node moved"""
+    n = len(indptr) - 1
+    strength = np.bincount(np.repeat(np.arange(n), np.diff(indptr)), weights=weights, minlength=n).tolist()
+    total = float(sum(strength))
+    if total <= 0:
+        return None
+    scale = resolution / total
+    rows = [(indices[indptr[i]:indptr[i + 1]].tolist(), weights[indptr[i]:indptr[i + 1]].tolist())
+            for i in range(n)]
+    community = list(range(n))
+    tot = list(strength)
+    order = list(range(n))
+    rng.shuffle(order)
+    moved = False
+    for _ in range(MAX_PASSES):
+        changed = False
+        for i in order:
+            own, k = community[i], strength[i]
+            links: Dict[int, float] = {}
+            neighbours, link_weights = rows[i]
+            for j, w in zip(neighbours, link_weights):
+                if j != i:
+                    c = community[j]
+                    links[c] = links.get(c, 0.0) + w
+            tot[own] -= k
+            best, best_gain = own, links.get(own, 0.0) - tot[own] * k * scale
+            for c, w in links.items():
+                gain = w - tot[c] * k * scale
+                if gain > best_gain + MIN_GAIN:
+                    best, best_gain = c, gain
+            tot[best] += k
+            if best != own:
+                community[i] = best
+                changed = moved = True
+        if not changed:
+            break
+    return community if moved else None
+
+
+def louvain(indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray,
+            resolution: float = 1.0, seed: int = 0) -> np.ndarray:
+    """Community label (0..k-1) of every node of a symmetric CSR graph"""
+    n = len(indptr) - 1
+    labels = np.arange(n)
+    rng = random.Random(seed)
+    while True:
+        community = _local_moving(indptr, indices, weights, resolution, rng)
+        if community is None:
+            return np.unique(labels, return_inverse=True)[1].reshape(-1)
+        community = np.unique(community, return_inverse=True)[1].reshape(-1)
+        labels = community[labels]
+        # one node per community, edges summed (internal ones become self loops)
+        size = int(community.max()) + 1
+        rows = np.repeat(community, np.diff(indptr))
+        indptr, indices, weights = coalesce(rows, community[indices], weights, size)
+
+
+def cluster_labels(graph: NetGraph, comps: np.ndarray, max_pads_per_net: Optional[int] = 40,
+                   exclude_nets: Iterable[str] = (), max_cluster_size: int = 40,
+                   resolution: float = 1.0) -> np.ndarray:
+    """Cluster label of each of the given components (in comps order)"""
+    follow = graph.followed(max_pads_per_net, exclude_nets)
+    indptr, indices, weights = affinity(graph, comps, follow)
+    labels = louvain(indptr, indices, weights, resolution)
+    # oversized communities: cluster their own subgraph, raising the resolution until they split
+    pending = [(members, resolution) for members in _split(labels) if len(members) > max_cluster_size]
+    while pending:
+        members, res = pending.pop()
+        sub = louvain(*_subgraph(indptr, indices, weights, members), resolution=res)
+        if sub.max() == 0:
+            if res < resolution * MAX_RESOLUTION_STEP:
+                pending.append((members, res * 2))
+            continue
+        labels[members] = labels.max() + 1 + sub
+        pending.extend((members[part], res) for part in _split(sub) if len(part) > max_cluster_size)
+    return np.unique(labels, return_inverse=True)[1].reshape(-1)
+
+
+def _split(labels: np.ndarray) -> List[np.ndarray]:
+    order = np.argsort(labels, kind="stable")
+    return np.split(order, np.flatnonzero(np.diff(labels[order])) + 1) if len(labels) else []
+
+
+def _subgraph(indptr, indices, weights, members: np.ndarray):
+    """CSR of the subgraph induced by members, renumbered 0..len-1"""
+    local = np.full(len(indptr) - 1, -1, dtype=np.intp)
+    local[members] = np.arange(len(members))
+    owner, k = expand_runs(indptr[members], np.diff(indptr)[members])
+    inside = local[indices[k]] >= 0
+    return coalesce(owner[inside], local[indices[k][inside]], weights[k][inside], len(members))
+
+
+def suggest_clusters(graph: NetGraph, components: Sequence[Dict[str, Any]],
+                     designators: Optional[Sequence[str]] = None, max_pads_per_net: Optional[int] = 40,
+                     exclude_nets: Iterable[str] = (), max_cluster_size: int = 40,
+                     min_cluster_size: int = 2, resolution: float = 1.0) -> Dict[str, Any]:
+    """Placement clusters of the board, or of some of its components.
+
+    Args:
+        graph: NetGraph of the board
+        components: get_all_component_data entries, for the footprint boxes
+        designators: cluster only these (default: every component)
+        max_pads_per_net: nets with more pads are not followed (0: none skipped)
+        exclude_nets: net names not to follow
+        max_cluster_size: larger communities are split again
+        min_cluster_size: smaller clusters are left out of the list
+        resolution: Louvain resolution; higher gives smaller clusters
+
+    Returns:
+        dict: component_count, cluster_count, unclustered_count,
+        missing_designators and clusters [{size, anchor, anchor_pad_count,
+        designators, suggested_area {width_mils, height_mils,
+        area_sq_mils}, internal_net_count, external_nets}], largest first
+    """
+    if max_cluster_size < 1:
+        raise ValueError("max_cluster_size must be at least 1")
+    if resolution <= 0:
+        raise ValueError("resolution must be positive")
+    if designators:
+        comps, missing = graph.lookup(designators)
+    else:
+        comps, missing = np.arange(len(graph)), []
+    labels = cluster_labels(graph, comps, max_pads_per_net, exclude_nets, max_cluster_size, resolution)
+
+    boxes = {c.get("designator"): float(c.get("width") or 0) * float(c.get("height") or 0) for c in components}
+    pad_count = np.diff(graph.pad_ptr)
+    follow = graph.followed(max_pads_per_net, exclude_nets)
+    # a followed net is internal when every part on it is in the cluster
+    cluster_of = np.full(len(graph), -1, dtype=np.intp)
+    cluster_of[comps] = labels
+    clusters, unclustered = [], 0
+    for members in _split(labels):
+        members = comps[members]
+        if len(members) < max(min_cluster_size, 1):
+            unclustered += len(members)
+            continue
+        names = [graph.designators[i] for i in members]
+        anchor = members[np.lexsort((members, -pad_count[members]))[0]]
+        area = sum(boxes.get(d, 0.0) for d in names) / PACKING_DENSITY
+        side = math.sqrt(area)
+        nets = np.unique(graph.nets_of(members))
+        nets = nets[follow[nets]]
+        through, on = graph.comps_on(nets)
+        external = np.unique(through[cluster_of[on] != cluster_of[members[0]]])
+        clusters.append({
+            "size": len(members),
+            "anchor": graph.designators[anchor],
+            "anchor_pad_count": int(pad_count[anchor]),
+            "designators": names,
+            "suggested_area": {"width_mils": round(side, 1), "height_mils": round(side, 1),
+                               "area_sq_mils": round(area, 1)},
+            "internal_net_count": len(nets) - len(external),
+            "external_nets": sorted(graph.net_names[k] for k in external),
+        })
+    clusters.sort(key=lambda c: -c["size"])
+    return {
+        "component_count": len(comps),
+        "cluster_count": len(clusters),
+        "unclustered_count": unclustered,
+        "missing_designators": missing,
+        "clusters": clusters,
+    }
@@ -0,0 +1,160 @@
+"""
+Columnar encoding for bulk component and pad payloads.
+
+A list of component dicts as indented JSON repeats every key per component
+and spends most of its bytes on whitespace and on a handful of footprint,
+layer and net names. The columnar form stores each table as one array per
+field, and every string-valued field as indices into a single string table
+shared by all tables:
+
+    {"format": "columnar",
+     "strings": ["0402", "TopLayer", "GND", ...],
+     "tables": {
+       "components": {"count": 2,
+                      "columns": {"designator": [5, 6], "x": [100.0, 250.5], ...},
+                      "string_fields": ["designator", "layer", ...]},
+       "pins": {...}}}
+
+A missing value is null in a plain column and -1 in a string column.
+decode_rows() turns a table back into the original dicts; decode_columns()
+returns one array per field (NumPy arrays when NumPy is installed).
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional: decode_columns falls back to lists
+    np = None
+
+FORMATS = ("json", "columnar")
+
+
+class ColumnarEncoder:
+    """Builds a columnar payload; tables added to one encoder share a
+    string table"""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self.tables: Dict[str, Dict[str, Any]] = {}
+
+    def _intern(self, value: str) -> int:
+        index = self._string_ids.get(value)
+        if index is None:
+            index = len(self.strings)
+            self._string_ids[value] = index
+            self.strings.append(value)
+        return index
+
+    def add_table(self, name: str, rows: Iterable[Dict[str, Any]],
+                  fields: Optional[List[str]] = None) -> None:
+        rows = list(rows)
+        if fields is None:
+            # Field order of first appearance
+            fields = list(dict.fromkeys(key for row in rows for key in row))
+        columns: Dict[str, list] = {}
+        string_fields = []
+        for field in fields:
+            values = [row.get(field) for row in rows]
+            present = [v for v in values if v is not None]
+            if present and all(isinstance(v, str) for v in present):
+                columns[field] = [-1 if v is None else self._intern(v) for v in values]
+                string_fields.append(field)
+            else:
+                columns[field] = values
+        self.tables[name] = {"count": len(rows), "columns": columns,
+                             "string_fields": string_fields}
+
+    def payload(self) -> Dict[str, Any]:
+        return {"format": "columnar", "strings": self.strings, "tables": self.tables}
+
+
+def encode_components(components: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Columnar payload with a single "components" table"""
+    encoder = ColumnarEncoder()
+    encoder.add_table("components", components)
+    return encoder.payload()
+
+
+def encode_component_pins(components: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Columnar payload for get_component_pins output: a "components" table
+    (placement fields) and a flat "pins" table whose designator column ties
+    each pad to its component"""
+    component_rows, pin_rows = [], []
+    for component in components:
+        component_rows.append({k: v for k, v in component.items() if k != "pins"})
+        designator = component.get("designator")
+        for pin in component.get("pins", []):
+            pin_rows.append({"designator": designator, **pin})
+    encoder = ColumnarEncoder()
+    encoder.add_table("components", component_rows)
+    encoder.add_table("pins", pin_rows)
+    return encoder.payload()
+
+
+def dumps(payload: Any, fmt: str = "json") -> str:
+    """Tool output: indented JSON as before, or compact for columnar"""
+    if fmt == "columnar":
+        return json.dumps(payload, separators=(",", ":"))
+    return json.dumps(payload, indent=2)
+
+
+def _table(payload: Dict[str, Any], table: str) -> Dict[str, Any]:
+    if payload.get("format") != "columnar":
+        raise ValueError("not a columnar payload")
+    try:
+        return payload["tables"][table]
+    except KeyError:
+        raise ValueError(f"no table '{table}' in payload") from None
+
+
+def _string_column(strings: List[str], codes: List[int]) -> List[Optional[str]]:
+    return [None if code < 0 else strings[code] for code in codes]
+
+
+def decode_rows(payload: Dict[str, Any], table: str = "components") -> List[Dict[str, Any]]:
+    """Rebuild the row dicts; fields missing from a row are left out"""
+    data = _table(payload, table)
+    strings = payload.get("strings", [])
+    string_fields = set(data.get("string_fields", []))
+    columns = {field: _string_column(strings, values) if field in string_fields else values
+               for field, values in data["columns"].items()}
+    rows = []
+    for i in range(data["count"]):
+        rows.append({field: values[i] for field, values in columns.items()
+                     if values[i] is not None})
+    return rows
+
+
+def decode_columns(payload: Dict[str, Any], table: str = "components",
+                   as_numpy: bool = True) -> Dict[str, Any]:
+    """One array per field. With NumPy, numeric columns become float64
+    arrays (missing = nan) and string / mixed columns object arrays"""
+    data = _table(payload, table)
+    strings = payload.get("strings", [])
+    string_fields = set(data.get("string_fields", []))
+    if not (as_numpy and np is not None):
+        return {field: _string_column(strings, values) if field in string_fields else values
+                for field, values in data["columns"].items()}
+
+    # Code -1 (missing) picks the trailing None
+    lookup = np.empty(len(strings) + 1, dtype=object)
+    lookup[:-1] = strings
+    out = {}
+    for field, values in data["columns"].items():
+        if field in string_fields:
+            out[field] = lookup[np.asarray(values, dtype=np.int64)]
+            continue
+        first = next((v for v in values if v is not None), None)
+        if isinstance(first, (int, float)) and not isinstance(first, bool):
+            try:
+                out[field] = np.array(values, dtype=np.float64)  # None -> nan
+                continue
+            except (TypeError, ValueError):
+                pass
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        out[field] = array
+    return out
@@ -0,0 +1,235 @@
+"""
+Designator index over a component dump.
+
+get_all_component_data and get_schematic_data return one flat list of
+component dicts. Filtering that list per requested designator is
+O(requested * components); on a 4,000-part board a few hundred designators
+cost millions of comparisons. ComponentIndex is built once per snapshot
+and answers designator lookups in O(1), with secondary lookups by
+footprint, layer and sheet.
+
+PropertyIndex is the inverted view used by the property tools: property
+name -> value -> designators. Each property's column is built the first
+time it is queried, so "all names", "values of X" and "designators where
+X = value / matches pattern" stay sub-millisecond on repeat questions.
+
+ComponentIndex.of() memoizes the index of the last snapshot it saw. The read
+cache hands back the same list object until the design changes, so repeated
+tool calls reuse one index.
+"""
+
+import fnmatch
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+Component = Dict[str, Any]
+
+
+class ComponentIndex:
+    """O(1) designator lookup plus footprint / layer / sheet groupings.
+
+    When a designator appears more than once (multi-part schematic symbols
+    placed on several sheets), lookup returns the first entry, matching the
+    old linear scan; all entries are still grouped by sheet.
+    """
+
+    _last: Optional[Tuple[list, "ComponentIndex"]] = None
+
+    def __init__(self, components: Iterable[Component]):
+        self.components: List[Component] = list(components)
+        self.by_designator: Dict[str, Component] = {}
+        self.by_footprint: Dict[str, List[Component]] = {}
+        self.by_layer: Dict[str, List[Component]] = {}
+        self.by_sheet: Dict[str, List[Component]] = {}
+        self._properties: Optional["PropertyIndex"] = None
+        for component in self.components:
+            designator = component.get("designator")
+            if designator is not None:
+                self.by_designator.setdefault(designator, component)
+            for field, groups in (("footprint", self.by_footprint),
+                                  ("layer", self.by_layer),
+                                  ("sheet", self.by_sheet)):
+                value = component.get(field)
+                if value is not None:
+                    groups.setdefault(value, []).append(component)
+
+    @classmethod
+    def of(cls, components: list) -> "ComponentIndex":
+        """Index for this snapshot, reusing the last one if it is the same list"""
+        last = cls._last
+        if last is not None and last[0] is components:
+            return last[1]
+        index = cls(components)
+        cls._last = (components, index)
+        return index
+
+    @property
+    def properties(self) -> "PropertyIndex":
+        if self._properties is None:
+            self._properties = PropertyIndex(self.components)
+        return self._properties
+
+    def __len__(self) -> int:
+        return len(self.by_designator)
+
+    def __contains__(self, designator: str) -> bool:
+        return designator in self.by_designator
+
+    def get(self, designator: str) -> Optional[Component]:
+        return self.by_designator.get(designator)
+
+    def lookup(self, designators: Iterable[str]) -> Tuple[List[Component], List[str]]:
+        """Components for the given designators, in request order, plus the
+        designators that were not found"""
+        found, missing = [], []
+        for designator in designators:
+            component = self.by_designator.get(designator)
+            if component is None:
+                missing.append(designator)
+            else:
+                found.append(component)
+        return found, missing
+
+    def with_footprint(self, footprint: str) -> List[Component]:
+        return self.by_footprint.get(footprint, [])
+
+    def on_layer(self, layer: str) -> List[Component]:
+        return self.by_layer.get(layer, [])
+
+    def on_sheet(self, sheet: str) -> List[Component]:
+        """Components on a sheet, matched by full path or file name"""
+        if sheet in self.by_sheet:
+            return self.by_sheet[sheet]
+        wanted = sheet.lower()
+        matches = []
+        for path, components in self.by_sheet.items():
+            if path.replace("/", "\\").rsplit("\\", 1)[-1].lower() == wanted:
+                matches.extend(components)
+        return matches
+
+    def select(self, designators: Optional[Iterable[str]] = None, footprint: str = "",
+               layer: str = "", sheet: str = "") -> Tuple[List[Component], List[str]]:
+        """Components matching every given criterion.
+
+        With designators, results keep request order and unknown designators
+        are reported as missing; footprint / layer / sheet narrow the result.
+        Without designators, the filters select from the whole board.
+        """
+        missing: List[str] = []
+        if designators is not None:
+            candidates, missing = self.lookup(designators)
+        else:
+            candidates = None
+        for value, group in ((footprint, self.with_footprint),
+                             (layer, self.on_layer),
+                             (sheet, self.on_sheet)):
+            if not value:
+                continue
+            members = group(value)
+            if candidates is None:
+                candidates = members
+            else:
+                ids = {id(c) for c in members}
+                candidates = [c for c in candidates if id(c) in ids]
+        return list(candidates if candidates is not None else self.components), missing
+
+
+def value_key(value: Any) -> str:
+    """Comparable text form of a property value: strings as-is, 90 and 90.0
+    both "90", nested values as sorted JSON"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool) or value is None:
+        return json.dumps(value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class _Column:
+    """One property: (designator, value) pairs in board order, and the
+    designators grouped by value key"""
+
+    __slots__ = ("pairs", "groups")
+
+    def __init__(self):
+        self.pairs: List[Tuple[str, Any]] = []
+        self.groups: Dict[str, List[str]] = {}
+
+    def add(self, designator: str, value: Any) -> None:
+        self.pairs.append((designator, value))
+        self.groups.setdefault(value_key(value), []).append(designator)
+
+
+class PropertyIndex:
+    """Inverted index: property name -> value -> designators.
+
+    Property names are collected up front; a property's column is built on
+    its first query and kept up to date by add().
+    """
+
+    def __init__(self, components: Iterable[Component] = ()):
+        self._components: List[Component] = []
+        self._names: Dict[str, None] = {}
+        self._columns: Dict[str, _Column] = {}
+        for component in components:
+            self.add(component)
+
+    def add(self, component: Component) -> None:
+        self._components.append(component)
+        for name in component:
+            self._names.setdefault(name)
+        designator = component.get("designator")
+        if designator:
+            for name, column in self._columns.items():
+                if name in component:
+                    column.add(designator, component[name])
+
+    def _column(self, name: str) -> _Column:
+        column = self._columns.get(name)
+        if column is None:
+            column = _Column()
+            if name in self._names:
+                for component in self._components:
+                    designator = component.get("designator")
+                    if designator and name in component:
+                        column.add(designator, component[name])
+            self._columns[name] = column
+        return column
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def names(self) -> List[str]:
+        return sorted(self._names)
+
+    def values(self, name: str) -> List[Dict[str, Any]]:
+        """[{designator, value}] for every component that has the property"""
+        return [{"designator": d, "value": v} for d, v in self._column(name).pairs]
+
+    def distinct(self, name: str) -> Dict[str, List[str]]:
+        """value -> designators"""
+        return self._column(name).groups
+
+    def where(self, name: str, value: Any = None, pattern: str = "") -> List[str]:
+        """Designators whose property equals value, or matches a glob
+        pattern (case-insensitive, e.g. "10k*", "*0402*")"""
+        groups = self._column(name).groups
+        if pattern:
+            pattern = pattern.lower()
+            return [d for key, designators in groups.items()
+                    if fnmatch.fnmatchcase(key.lower(), pattern)
+                    for d in designators]
+        keys = [value_key(value)]
+        if isinstance(value, str):
+            # "90" from a tool call should match a numeric 90 in the dump
+            try:
+                keys.append(value_key(float(value)))
+            except ValueError:
+                pass
+        designators = []
+        for key in dict.fromkeys(keys):
+            designators.extend(groups.get(key, []))
+        return designators
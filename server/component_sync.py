@@ -0,0 +1,114 @@
+"""
+Delta sync of the board component list.
+
+get_all_component_data used to re-serialize every component on every call.
+With delta sync the bridge sends the stamp of the snapshot it holds
+({"delta": true, "since": stamp}); the script compares the board against the
+snapshot it saved under that stamp and answers
+
+    {"stamp": new_stamp, "full": false,
+     "components": [changed or added components],
+     "removed": [designators]}
+
+ComponentSync merges that into its copy and hands callers the full list, so
+tools see the same result as before. The script falls back to a full answer
+("full": true) when the stamps disagree - first call, server restart, a
+lost response - and to an empty stamp when designators are not unique. A
+plain list (a script without delta support) is taken as a full snapshot.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("AltiumMCPServer")
+
+SYNC_COMMAND = "get_all_component_data"
+
+
+class ComponentSync:
+    """Holds the last component snapshot and its stamp"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stamp = ""
+        self.snapshot: Optional[List[Dict[str, Any]]] = None
+        self._by_designator: Dict[str, Dict[str, Any]] = {}
+        self.full_syncs = 0
+        self.delta_syncs = 0
+        self.bytes_received = 0
+        self.last_bytes = 0
+        self.last_changed = 0
+        self.last_removed = 0
+
+    def handles(self, command: str, params: Dict[str, Any]) -> bool:
+        return self.enabled and command == SYNC_COMMAND and not params
+
+    def request_params(self) -> Dict[str, Any]:
+        return {"delta": True, "since": self.stamp}
+
+    def reset(self) -> None:
+        """Forget the snapshot; the next request is answered in full"""
+        self.stamp = ""
+        self.snapshot = None
+        self._by_designator = {}
+
+    def merge(self, response: Dict[str, Any], raw_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """Apply a delta (or full) response and return a response holding
+        the complete component list. raw_bytes is the size of the response
+        file as the transport read it (None inside a batch, where the file
+        holds every command's result)."""
+        if not response.get("success", False):
+            return response
+        self.last_bytes = raw_bytes or 0
+        self.bytes_received += self.last_bytes
+        result = response.get("result")
+        if isinstance(result, str):
+            try:
+                result = json.loads(result)
+            except json.JSONDecodeError as e:
+                self.reset()
+                return {"success": False, "error": f"Bad component data: {e}"}
+
+        if isinstance(result, list):
+            self._load_full(result, "")
+        elif not isinstance(result, dict):
+            self.reset()
+            return {"success": False, "error": "Unexpected component data format"}
+        elif result.get("full", True) or self.snapshot is None:
+            self._load_full(result.get("components", []), result.get("stamp", ""))
+        else:
+            changed = result.get("components", [])
+            removed = result.get("removed", [])
+            for designator in removed:
+                self._by_designator.pop(designator, None)
+            for component in changed:
+                # Existing components keep their place, new ones go last
+                self._by_designator[component.get("designator", "")] = component
+            self.snapshot = list(self._by_designator.values())
+            self.stamp = result.get("stamp", "")
+            self.delta_syncs += 1
+            self.last_changed = len(changed)
+            self.last_removed = len(removed)
+            logger.info(f"Component delta: {len(changed)} changed, {len(removed)} removed, "
+                        f"{self.last_bytes} bytes")
+        return {"success": True, "result": self.snapshot}
+
+    def _load_full(self, components: List[Dict[str, Any]], stamp: str) -> None:
+        self.snapshot = list(components)
+        self._by_designator = {c.get("designator", ""): c for c in self.snapshot}
+        # Without unique designators a delta could not be applied
+        self.stamp = stamp if len(self._by_designator) == len(self.snapshot) else ""
+        self.full_syncs += 1
+        self.last_changed = len(self.snapshot)
+        self.last_removed = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "components": len(self.snapshot) if self.snapshot is not None else None,
+            "full_syncs": self.full_syncs,
+            "delta_syncs": self.delta_syncs,
+            "bytes_received": self.bytes_received,
+            "last_bytes": self.last_bytes,
+        }
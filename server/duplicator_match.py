@@ -0,0 +1,301 @@
+"""
+Source/destination matching for layout_duplicator.
+
+layout_duplicator returns both groups' components with their pins and
+nets, and the pairing used to be left to the caller. match_groups pairs
+them locally from connectivity alone. Designators are ignored:
+
+- both groups become one component/net graph in which every pin is an
+  edge labelled with its pad name. Nets named in both groups (GND, rails,
+  a shared bus) are already identified, so they keep their name as a
+  fixed label. Every other net starts out anonymous
+- Weisfeiler-Lehman colour refinement: a component starts from its
+  footprint and pad names and then takes its own colour plus the multiset
+  of (pad, net colour) around it, and nets likewise from (pad, component
+  colour), until the partition stops splitting. Multisets are hashed by
+  summing mixed 64-bit keys, so a round is a few NumPy passes over the
+  pins
+- a colour held by exactly one source and one destination part is a
+  match. Where the description splits a colour class the same way on
+  both sides, the class is split
+- a class with several parts on each side is symmetric (decoupling caps
+  on the same rails, identical sub-blocks). One pair is individualized
+  and refinement runs again. The pair is picked by description and then
+  by position, after mapping the source through the rigid transform
+  fitted to the matches so far. These picks are reported as ambiguous
+- a class whose counts differ means the wiring differs somewhere near
+  those parts. They are paired at the deepest refinement round where
+  their classes still agree, by the same rule. Picks among several
+  candidates, and pairs that only agree on footprint, are reported too
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+MAX_CANDIDATES = 8  # destination candidates listed per ambiguous match
+DESCRIPTION_PENALTY = 1e9  # a differing description loses to any distance
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, elementwise"""
+    z = np.asarray(values).astype(np.uint64) + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * _M1
+    z = (z ^ (z >> np.uint64(27))) * _M2
+    return z ^ (z >> np.uint64(31))
+
+
+def _relabel(keys: np.ndarray) -> np.ndarray:
+    """Dense colours 0..k-1 for hashed keys"""
+    return np.unique(keys, return_inverse=True)[1].reshape(-1).astype(np.int64)
+
+
+def _count(colours: np.ndarray) -> int:
+    return int(colours.max()) + 1 if len(colours) else 0
+
+
+def fit_transform(src: np.ndarray, dst: np.ndarray):
+    """Least-squares orthogonal map (rotation, possibly mirrored) plus
+    offset taking src points onto dst. Returns a function of points.
+    Fewer than three pairs only fix the offset, and collinear ones cannot
+    tell a mirror image apart, so they get a plain rotation."""
+    src_mean, dst_mean = src.mean(axis=0), dst.mean(axis=0)
+    if len(src) < 3:
+        return lambda points: points - src_mean + dst_mean
+    u, singular, vt = np.linalg.svd((src - src_mean).T @ (dst - dst_mean))
+    if singular[1] <= 1e-9 * max(singular[0], 1.0):
+        u = u * [1.0, np.sign(np.linalg.det(u @ vt)) or 1.0]
+    rotation = u @ vt
+    return lambda points: (points - src_mean) @ rotation + dst_mean
+
+
+class GroupGraph:
+    """Both groups' components and nets as one graph.
+
+    Args:
+        source: layout_duplicator's source_components entries
+        destination: its destination_components entries
+    """
+
+    def __init__(self, source: Sequence[Dict[str, Any]], destination: Sequence[Dict[str, Any]]):
+        components = list(source) + list(destination)
+        self.designators = [str(c.get("designator", "")) for c in components]
+        self.side = np.array([0] * len(source) + [1] * len(destination), dtype=np.int64)
+        named = [{p.get("net") for c in group for p in c.get("pins") or [] if p.get("net")}
+                 for group in (source, destination)]
+        shared = sorted(named[0] & named[1])
+        shared_ids = {name: i for i, name in enumerate(shared)}
+
+        labels: Dict[Any, int] = {}
+        pads: Dict[str, int] = {}
+        descriptions: Dict[str, int] = {}
+        nets: Dict[Tuple[int, str], int] = {}
+        net_label: List[int] = []
+        edge_comp, edge_net, edge_pad = [], [], []
+        comp_label, description, positions = [], [], []
+        for i, component in enumerate(components):
+            side = int(self.side[i])
+            pins = component.get("pins") or []
+            names = tuple(sorted(str(p.get("name", "")) for p in pins))
+            comp_label.append(labels.setdefault((component.get("footprint", ""), names), len(labels)))
+            description.append(descriptions.setdefault(component.get("description", ""), len(descriptions)))
+            points = [(float(p["x"]), float(p["y"])) for p in pins if "x" in p and "y" in p]
+            positions.append(np.mean(points, axis=0) if points else (np.nan, np.nan))
+            for pin in pins:
+                name = pin.get("net")
+                if not name:
+                    continue
+                node = nets.get((side, name))
+                if node is None:
+                    node = nets[(side, name)] = len(net_label)
+                    net_label.append(shared_ids.get(name, len(shared)))
+                edge_comp.append(i)
+                edge_net.append(node)
+                edge_pad.append(pads.setdefault(str(pin.get("name", "")), len(pads)))
+
+        self.shared_count = len(shared)
+        self.comp_label = _relabel(np.array(comp_label, dtype=np.int64))
+        self.net_label = np.array(net_label, dtype=np.int64)
+        self.fixed = self.net_label < len(shared)
+        self.description = np.array(description, dtype=np.int64)
+        self.edge_comp = np.array(edge_comp, dtype=np.int64)
+        self.edge_net = np.array(edge_net, dtype=np.int64)
+        self.edge_pad = _mix(np.array(edge_pad, dtype=np.int64))
+        # parts without pad positions sit at their group's centroid
+        self.positions = np.array(positions, dtype=float).reshape(-1, 2)
+        for s in (0, 1):
+            rows = self.side == s
+            known = rows & ~np.isnan(self.positions[:, 0])
+            centre = self.positions[known].mean(axis=0) if known.any() else np.zeros(2)
+            self.positions[rows & ~known] = centre
+
+    def __len__(self) -> int:
+        return len(self.designators)
+
+    def refine(self, comp: np.ndarray, net: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[np.ndarray]]:
+        """Refine to a stable partition. Returns component and net colours
+        and the component colours after every round, the input first."""
+        history = [comp]
+        count = _count(comp) + _count(net)
+        while True:
+            around = np.zeros(len(comp), dtype=np.uint64)
+            np.add.at(around, self.edge_comp, _mix(self.edge_pad ^ net[self.edge_net].astype(np.uint64)))
+            comp = _relabel(_mix(_mix(comp) ^ around))
+            around = np.zeros(len(net), dtype=np.uint64)
+            np.add.at(around, self.edge_net, _mix(self.edge_pad ^ _mix(history[-1][self.edge_comp])))
+            # named nets keep their label; the rest are numbered after them
+            net = net.copy()
+            net[~self.fixed] = self.shared_count + _relabel(_mix(_mix(net[~self.fixed]) ^ around[~self.fixed]))
+            history.append(comp)
+            new_count = _count(comp) + _count(net)
+            if new_count == count:
+                return comp, net, history
+            count = new_count
+
+    def class_counts(self, comp: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        k = _count(comp)
+        return (np.bincount(comp[self.side == 0], minlength=k),
+                np.bincount(comp[self.side == 1], minlength=k))
+
+    def split_by_description(self, comp: np.ndarray) -> np.ndarray:
+        """Split every class whose descriptions are distributed the same
+        way in both groups"""
+        keys = _mix(_mix(comp) ^ self.description.astype(np.uint64))
+        key = _relabel(keys)
+        per_key = np.zeros((2, _count(key)), dtype=np.int64)
+        np.add.at(per_key, (self.side, key), 1)
+        balanced = np.ones(_count(comp), dtype=bool)
+        np.logical_and.at(balanced, comp, per_key[0, key] == per_key[1, key])
+        return _relabel(np.where(balanced[comp], keys, _mix(comp)))
+
+    def matches(self, comp: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(source, destination) index arrays of one-to-one classes"""
+        sources, destinations = self.class_counts(comp)
+        unique = (sources == 1) & (destinations == 1)
+        partner = np.full(len(unique), -1, dtype=np.int64)
+        rows = np.nonzero((self.side == 1) & unique[comp])[0]
+        partner[comp[rows]] = rows
+        src = np.nonzero((self.side == 0) & unique[comp])[0]
+        return src, partner[comp[src]]
+
+    def predictor(self, src: np.ndarray, dst: np.ndarray):
+        """Map source positions into the destination group's frame"""
+        if len(src):
+            return fit_transform(self.positions[src], self.positions[dst])
+        centres = [self.positions[self.side == s].mean(axis=0) if (self.side == s).any() else np.zeros(2)
+                   for s in (0, 1)]
+        return lambda points: points - centres[0] + centres[1]
+
+    def costs(self, sources: np.ndarray, candidates: np.ndarray, predict) -> np.ndarray:
+        """Pick cost of every (source, candidate): distance from the
+        source's predicted position, plus a penalty if descriptions differ"""
+        predicted = predict(self.positions[sources])
+        cost = np.hypot(*(predicted[:, None, :] - self.positions[candidates][None, :, :]).transpose(2, 0, 1))
+        return cost + DESCRIPTION_PENALTY * (self.description[sources][:, None] != self.description[candidates][None, :])
+
+
+def _greedy_pairs(cost: np.ndarray) -> List[Tuple[int, int]]:
+    """Cheapest-first pairing of rows and columns"""
+    cost = cost.astype(float).copy()
+    pairs = []
+    for _ in range(min(cost.shape)):
+        r, c = np.unravel_index(np.argmin(cost), cost.shape)
+        pairs.append((int(r), int(c)))
+        cost[r, :] = np.inf
+        cost[:, c] = np.inf
+    return pairs
+
+
+def match_groups(source: Sequence[Dict[str, Any]], destination: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Pair layout_duplicator's source and destination components by
+    connectivity.
+
+    Args:
+        source: source_components entries (designator, footprint,
+            description, pins with name/net/x/y)
+        destination: destination_components entries
+
+    Returns:
+        dict: source_designators and destination_designators in matching
+        order (ready for layout_duplicator_apply), how many pairs were
+        made despite differing connectivity, the ambiguous matches with
+        their candidates, and the parts left unmatched
+    """
+    graph = GroupGraph(source, destination)
+    names = graph.designators
+    comp, net, history = graph.refine(graph.comp_label, graph.net_label)
+    rounds = len(history) - 1
+    comp, net, _ = graph.refine(graph.split_by_description(comp), net)
+
+    ambiguous: List[Tuple[int, Dict[str, Any]]] = []
+
+    def report(s: int, d: int, candidates: np.ndarray, reason: str, **extra) -> None:
+        ambiguous.append((int(s), dict({
+            "source": names[s], "destination": names[d], "reason": reason,
+            "candidate_count": len(candidates),
+            "candidates": [names[c] for c in candidates[:MAX_CANDIDATES]],
+        }, **extra)))
+
+    # symmetric classes: individualize one pair at a time
+    while True:
+        sources, destinations = graph.class_counts(comp)
+        symmetric = (sources == destinations) & (sources > 1)
+        open_sources = np.nonzero((graph.side == 0) & symmetric[comp])[0]
+        if not len(open_sources):
+            break
+        s = open_sources[0]
+        candidates = np.nonzero((graph.side == 1) & (comp == comp[s]))[0]
+        cost = graph.costs(np.array([s]), candidates, graph.predictor(*graph.matches(comp)))[0]
+        candidates = candidates[np.argsort(cost, kind="stable")]
+        d = candidates[0]
+        report(s, d, candidates, "symmetric")
+        comp = comp.copy()
+        comp[[s, d]] = _count(comp)
+        comp, net, _ = graph.refine(comp, net)
+
+    src, dst = graph.matches(comp)
+    pairs = dict(zip(src.tolist(), dst.tolist()))
+
+    # classes that differ: pair at the deepest round that still agrees
+    left = np.ones(len(graph), dtype=bool)
+    left[src] = left[dst] = False
+    predict = graph.predictor(src, dst)
+    differing = 0
+    for level in range(len(history) - 1, -1, -1):
+        if not left.any():
+            break
+        colours = history[level]
+        for colour in np.unique(colours[left]):
+            members = left & (colours == colour)
+            class_sources = np.nonzero(members & (graph.side == 0))[0]
+            class_destinations = np.nonzero(members & (graph.side == 1))[0]
+            if not len(class_sources) or not len(class_destinations):
+                continue
+            cost = graph.costs(class_sources, class_destinations, predict)
+            for r, c in _greedy_pairs(cost):
+                s, d = class_sources[r], class_destinations[c]
+                pairs[int(s)] = int(d)
+                left[s] = left[d] = False
+                differing += 1
+                # a lone pair whose neighbourhoods agree for a round or more is kept quietly
+                if len(class_destinations) > 1 or level == 0:
+                    report(s, d, class_destinations[np.argsort(cost[r], kind="stable")],
+                           "connectivity differs", agreeing_rounds=level)
+
+    ordered = sorted(pairs)
+    ambiguous.sort(key=lambda entry: entry[0])
+    return {
+        "matched_count": len(ordered),
+        "source_designators": [names[s] for s in ordered],
+        "destination_designators": [names[pairs[s]] for s in ordered],
+        "connectivity_differs_count": differing,
+        "ambiguous_count": len(ambiguous),
+        "ambiguous": [entry for _, entry in ambiguous],
+        "unmatched_source": [names[i] for i in np.nonzero(left & (graph.side == 0))[0]],
+        "unmatched_destination": [names[i] for i in np.nonzero(left & (graph.side == 1))[0]],
+        "refinement_rounds": rounds,
+    }
@@ -0,0 +1,855 @@
+"""
+Offline previews of library symbols and footprints (render_library_preview).
+
+Checking a symbol made with create_schematic_symbol or create_symbols_batch
+otherwise means opening the library in Altium and taking a screenshot.
+Here the same primitives are drawn locally, from either source:
+
+- a get_symbol_primitives / get_footprint_primitives dump (one symbol or
+  footprint, or the "*" dump of a whole library)
+- a create_symbols_batch / create_footprints_batch spec file that has not
+  been run yet. parse_symbol_spec and parse_footprint_spec turn it into
+  the dump shape, reading the fields the way the scripts do (including
+  the auto-sized body rectangle of a symbol without GRAPHIC lines), and
+  list the lines the scripts would reject or ignore
+
+Each symbol or footprint becomes a Drawing: filled and stroked polylines
+and text in mils, y up, in paint order. Symbol arcs, ellipses, pies,
+round rectangles and beziers are flattened; footprint pads, tracks, arcs,
+fills, regions and vias go through clearance.primitive_shapes, so pad
+shapes match the clearance check. Pins point away from the body at their
+location (eRotate0 right, eRotate90 up, counterclockwise as in Altium),
+with the number along the pin and the name inside the body.
+
+A Drawing is written as SVG (viewBox in mils, y flipped) or painted with
+PIL; contact_sheet puts many into one grid. Text is the slow part of PIL
+drawing, so each (text, pixel size, anchor, quarter turn) is rasterized
+once and pasted as a mask after that: pin numbers and names repeat
+across a library.
+"""
+
+import fnmatch
+import json
+import math
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from clearance import primitive_shapes
+
+Colour = Tuple[int, int, int]
+Box = Tuple[float, float, float, float]
+
+# Colours of create_schematic_symbol's body and Altium's PCB defaults
+SYMBOL_BACKGROUND = (255, 255, 255)
+BODY_FILL = (255, 255, 176)
+BODY_LINE = (0, 0, 255)
+PIN_COLOUR = (0, 0, 0)
+LABEL_COLOUR = (0, 0, 128)
+FOOTPRINT_BACKGROUND = (0, 0, 0)
+HOLE_COLOUR = (60, 60, 60)
+PAD_TEXT_COLOUR = (255, 255, 255)
+CAPTION_COLOUR = (90, 90, 90)
+# (layer name fragment, colour, paint rank) - first match wins; lower ranks are painted first
+LAYER_STYLES = (
+    ("overlay", (255, 255, 0), 4), ("silk", (255, 255, 0), 4),
+    ("multi", (200, 160, 40), 3), ("paste", (128, 128, 128), 1), ("solder", (160, 0, 160), 1),
+    ("keepout", (255, 0, 255), 0), ("mechanical", (200, 0, 200), 0), ("courtyard", (200, 0, 200), 0),
+    ("assembly", (200, 0, 200), 0), ("bottom", (0, 0, 255), 2),
+)
+COPPER_STYLE = ((255, 0, 0), 3)
+HOLE_RANK = 5
+
+# Schematic line widths by their enum (smallest, small, medium, large), in mils
+LINE_WIDTHS = (1.0, 10.0, 30.0, 50.0)
+PIN_WIDTH_MILS = 10.0
+DEFAULT_PIN_LENGTH = 300.0
+PIN_TEXT_MILS = 50.0     # pin name and number height
+PIN_NAME_GAP = 40.0      # pin name to body edge
+PIN_NUMBER_GAP = 8.0     # pin number above its line
+LABEL_TEXT_MILS = 60.0
+PAD_TEXT_MILS = 40.0     # pad names, at most this and half the pad
+TEXT_ASPECT = 0.6        # average character width / height, for bounds
+ARC_STEP_DEG = 5.0
+BEZIER_STEPS = 16
+
+# TPinElectrical and TRotationBy90 in enum order, as create_schematic_symbol spells them
+ELECTRICAL_TYPES = ("eElectricInput", "eElectricIO", "eElectricOutput", "eElectricOpenCollector",
+                    "eElectricPassive", "eElectricHiZ", "eElectricOpenEmitter", "eElectricPower")
+ORIENTATIONS = ("eRotate0", "eRotate90", "eRotate180", "eRotate270")
+PIN_DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+# TShape enum -> the shape names clearance.primitive_shapes reads
+PAD_SHAPES = {1: "Round", 2: "Rectangular", 3: "Octagonal", 4: "Round", 9: "RoundedRectangular"}
+
+MIN_TEXT_PX = 5          # smaller text is left out of PNGs
+MARGIN_PX = 8
+CAPTION_PX = 14          # contact sheet name strip under each cell
+MAX_IMAGE_PX = 16384
+MAX_CACHED_TEXTS = 20000
+IMAGE_FORMATS = ("png", "svg")
+
+
+class Drawing:
+    """One symbol or footprint as shapes and text in mils (y up), in paint order"""
+
+    def __init__(self, name: str, background: Colour):
+        self.name = name
+        self.background = background
+        # (points (n, 2), closed, fill, stroke, stroke width in mils)
+        self.shapes: List[Tuple[np.ndarray, bool, Optional[Colour], Optional[Colour], float]] = []
+        # (x, y, text, height in mils, colour, PIL anchor, rotation in degrees CCW)
+        self.texts: List[Tuple[float, float, str, float, Colour, str, float]] = []
+        self.skipped: Dict[str, int] = {}
+
+    def shape(self, points: Any, closed: bool = False, fill: Optional[Colour] = None,
+              stroke: Optional[Colour] = None, width: float = 0.0) -> None:
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if len(points):
+            self.shapes.append((points, closed, fill, stroke, width))
+
+    def text(self, x: float, y: float, text: str, height: float, colour: Colour, anchor: str = "ls",
+             rotation: float = 0.0) -> None:
+        if text.strip():
+            self.texts.append((x, y, text, height, colour, anchor, rotation))
+
+    def skip(self, kind: Any) -> None:
+        kind = str(kind or "untyped")
+        self.skipped[kind] = self.skipped.get(kind, 0) + 1
+
+    def bounds(self) -> Box:
+        """Box around every shape (with its stroke) and an estimate of every text"""
+        boxes = [(p[:, 0].min() - w / 2, p[:, 1].min() - w / 2, p[:, 0].max() + w / 2, p[:, 1].max() + w / 2)
+                 for p, _, _, _, w in self.shapes]
+        boxes.extend(_text_box(*t[:4], t[5], t[6]) for t in self.texts)
+        if not boxes:
+            return -50.0, -50.0, 50.0, 50.0
+        boxes = np.array(boxes, dtype=float)
+        x1, y1 = boxes[:, 0].min(), boxes[:, 1].min()
+        x2, y2 = boxes[:, 2].max(), boxes[:, 3].max()
+        # keep a single line or dot visible
+        pad_x, pad_y = max(0.0, 10 - (x2 - x1)) / 2, max(0.0, 10 - (y2 - y1)) / 2
+        return float(x1 - pad_x), float(y1 - pad_y), float(x2 + pad_x), float(y2 + pad_y)
+
+
+def _text_box(x: float, y: float, text: str, height: float, anchor: str, rotation: float) -> Box:
+    length = TEXT_ASPECT * height * len(text)
+    u = {"l": (0.0, length), "m": (-length / 2, length / 2), "r": (-length, 0.0)}[anchor[0]]
+    v = (-height / 2, height / 2) if anchor[1] == "m" else (-0.2 * height, height)
+    angle = math.radians(rotation)
+    cos, sin = math.cos(angle), math.sin(angle)
+    xs = [x + a * cos - b * sin for a in u for b in v]
+    ys = [y + a * sin + b * cos for a in u for b in v]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+# ---------------------------------------------------------------- spec files
+
+def _fields(line: str) -> List[str]:
+    return line.split("|")
+
+
+def _field(fields: Sequence[str], i: int) -> str:
+    """GetFieldFromPipeString: the i-th field, '' past the end"""
+    return fields[i] if i < len(fields) else ""
+
+
+def _number(text: str, what: str) -> float:
+    try:
+        return float(text.strip())
+    except ValueError:
+        raise ValueError(f"{what} is not a number: {text.strip()!r}") from None
+
+
+def _integer(text: str, what: str) -> int:
+    try:
+        return int(text.strip())
+    except ValueError:
+        raise ValueError(f"{what} must be a whole number: {text.strip()!r}") from None
+
+
+def _pairs(fields: Sequence[str], first: int) -> List[Dict[str, float]]:
+    """x|y pairs from field first on, up to the first empty field (as the scripts count them)"""
+    count = 0
+    while _field(fields, first + count).strip():
+        count += 1
+    return [{"x": _number(fields[first + 2 * i], "vertex x"), "y": _number(fields[first + 2 * i + 1], "vertex y")}
+            for i in range(count // 2)]
+
+
+def _spec_pin(entry: str) -> Dict[str, Any]:
+    """create_schematic_symbol pin: number|name|electrical|orientation|x|y[|part[|length[|show_name[|show_designator]]]]"""
+    f = _fields(entry)
+    part = _field(f, 6).strip()
+    length = _field(f, 7).strip()
+    show_name, show_number = _field(f, 8).strip(), _field(f, 9).strip()
+    electrical, orientation = _field(f, 2).strip(), _field(f, 3).strip()
+    return {
+        "type": "pin", "pin_number": _field(f, 0).strip(), "pin_name": _field(f, 1),
+        # unknown names fall back like StrToPinElectricalType / StrToPinOrientation
+        "electrical": ELECTRICAL_TYPES.index(electrical) if electrical in ELECTRICAL_TYPES else 4,
+        "orientation": ORIENTATIONS.index(orientation) if orientation in ORIENTATIONS else 0,
+        # StrToInt: pin positions must be whole mils
+        "x": _integer(_field(f, 4), "pin x"), "y": _integer(_field(f, 5), "pin y"),
+        "length": _number(length, "pin length") if length else DEFAULT_PIN_LENGTH,
+        "show_name": show_name != "0", "show_designator": show_number != "0",
+        "owner_part_id": _integer(part, "pin part") if part else 1,
+    }
+
+
+def _spec_graphic(entry: str) -> Dict[str, Any]:
+    """create_schematic_symbol graphic entry -> get_symbol_primitives primitive"""
+    f = _fields(entry.strip())
+    kind = _field(f, 0).strip().lower()
+    part = _integer(_field(f, 1), "graphic part") if _field(f, 1).strip() else 1
+    width = _integer(_field(f, 2), "line width") if _field(f, 2).strip() else 1
+    base = {"owner_part_id": part}
+    if kind in ("line", "rectangle"):
+        first = 3 if kind == "line" else 4
+        x1, y1, x2, y2 = (_number(_field(f, first + i), "coordinate") for i in range(4))
+        base.update(x1=x1, y1=y1, x2=x2, y2=y2)
+    elif kind == "polyline":
+        base["vertices"] = _pairs(f, 3)
+    elif kind == "polygon":
+        base["vertices"] = _pairs(f, 4)
+    elif kind in ("arc", "elliptical_arc"):
+        names = ["cx", "cy", "radius"] + (["secondary_radius"] if kind == "elliptical_arc" else [])
+        names += ["start_angle", "end_angle"]
+        base.update({name: _number(_field(f, 3 + i), name) for i, name in enumerate(names)})
+    elif kind == "ellipse":
+        names = ("cx", "cy", "radius", "secondary_radius")
+        base.update({name: _number(_field(f, 4 + i), name) for i, name in enumerate(names)})
+    elif kind == "label":
+        return {"type": "label", "text": _field(f, 4), "x": _number(_field(f, 2), "label x"),
+                "y": _number(_field(f, 3), "label y"), "owner_part_id": part}
+    else:
+        raise ValueError(f"unknown graphic type {kind!r}")
+    base.update(type=kind, line_width=width)
+    if kind in ("rectangle", "polygon", "ellipse"):
+        base["is_solid"] = _field(f, 3).strip() == "1"
+    return base
+
+
+def _auto_bodies(pins: List[Dict[str, Any]], part_count: int) -> List[Dict[str, Any]]:
+    """create_schematic_symbol's body rectangles when no graphics are given:
+    per part, around its pins (and shared ones) with 100 mils above and below"""
+    bodies = []
+    for part in range(1, part_count + 1):
+        own = [p for p in pins if p["owner_part_id"] in (part, 0)]
+        if not own:
+            continue
+        xs, ys = [p["x"] for p in own], [p["y"] for p in own]
+        bodies.append({"type": "rectangle", "x1": min(xs), "y1": min(ys) - 100, "x2": max(xs),
+                       "y2": max(ys) + 100, "line_width": 1, "is_solid": True, "owner_part_id": part})
+    return bodies
+
+
+def parse_symbol_spec(text: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """create_symbols_batch spec -> (symbols in get_symbol_primitives dump
+    shape, problems [{line, error}])"""
+    symbols: List[Dict[str, Any]] = []
+    problems: List[Dict[str, Any]] = []
+    pins: List[Dict[str, Any]] = []
+    graphics: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+
+    def flush():
+        if current is not None:
+            # the script raises the part count to the highest owner part id
+            owners = [p["owner_part_id"] for p in pins + graphics]
+            current["part_count"] = max([current["part_count"]] + owners)
+            current["primitives"] = (graphics or _auto_bodies(pins, current["part_count"])) + pins
+            symbols.append(current)
+
+    for number, line in enumerate(text.splitlines(), 1):
+        f = _fields(line)
+        kind = _field(f, 0).strip().upper()
+        try:
+            if kind == "SYMBOL":
+                flush()
+                pins, graphics = [], []
+                part_count = _field(f, 3).strip()
+                current = {"symbol_name": _field(f, 1).strip(), "description": _field(f, 2),
+                           "part_count": _integer(part_count, "part count") if part_count else 1}
+                if not current["symbol_name"]:
+                    problems.append({"line": number, "error": "SYMBOL without a name is not created"})
+            elif kind in ("PIN", "GRAPHIC"):
+                if current is None:
+                    raise ValueError(f"{kind} before any SYMBOL line is ignored")
+                if kind == "PIN":
+                    # the script skips pins without a y field
+                    if _field(_fields(line[4:]), 5).strip():
+                        pins.append(_spec_pin(line[4:]))
+                elif line[8:].strip():
+                    graphics.append(_spec_graphic(line[8:]))
+            elif kind not in ("LIBRARY", ""):
+                raise ValueError(f"unknown record {kind!r} is ignored")
+        except ValueError as e:
+            problems.append({"line": number, "error": str(e)})
+    flush()
+    return symbols, problems
+
+
+def _spec_pad(f: Sequence[str]) -> Dict[str, Any]:
+    """PAD|name|x|y|rot|layer|plated|hole_size|hole_type|hole_width|hole_rot|top_x|top_y|top_shape[|corner_pct[|mode|...]]"""
+    pad = {"type": "pad", "name": _field(f, 1), "x": _number(_field(f, 2), "pad x"),
+           "y": _number(_field(f, 3), "pad y"), "rotation": _number(_field(f, 4) or "0", "pad rotation"),
+           "layer": _field(f, 5).strip(), "plated": _field(f, 6).strip() == "1",
+           "hole_size": _number(_field(f, 7) or "0", "hole size"),
+           "hole_type": _integer(_field(f, 8), "hole type"),
+           "hole_width": _number(_field(f, 9) or "0", "hole width"),
+           "hole_rotation": _number(_field(f, 10) or "0", "hole rotation"),
+           "top_x_size": _number(_field(f, 11), "pad x size"), "top_y_size": _number(_field(f, 12), "pad y size"),
+           "top_shape": _integer(_field(f, 13), "pad shape")}
+    if _field(f, 14).strip():
+        pad["corner_pct"] = _integer(_field(f, 14), "corner percentage")
+    pad["mode"] = _integer(_field(f, 15), "pad mode") if _field(f, 15).strip() else 0
+    return pad
+
+
+def _spec_footprint_primitive(kind: str, f: Sequence[str]) -> Dict[str, Any]:
+    if kind == "PAD":
+        return _spec_pad(f)
+    names = {
+        "TRACK": ("x1", "y1", "x2", "y2", "width"),
+        "ARC": ("cx", "cy", "radius", "start_angle", "end_angle", "width"),
+        "FILL": ("x1", "y1", "x2", "y2", "rotation"),
+        "TEXT": ("x", "y", "size", "width", "rotation"),
+        "VIA": ("x", "y", "size", "hole_size"),
+    }
+    if kind == "REGION":
+        return {"type": "region", "layer": _field(f, 1).strip(), "kind": _integer(_field(f, 2) or "0", "region kind"),
+                "vertices": _pairs(f, 3)}
+    if kind not in names:
+        raise ValueError(f"unknown record {kind!r} is ignored")
+    primitive: Dict[str, Any] = {"type": kind.lower()}
+    primitive.update({name: _number(_field(f, 1 + i), name) for i, name in enumerate(names[kind])})
+    if kind == "VIA":
+        primitive.update(low_layer=_field(f, 5).strip(), high_layer=_field(f, 6).strip())
+    else:
+        primitive["layer"] = _field(f, 1 + len(names[kind])).strip()
+    if kind == "TEXT":
+        primitive.update(mirror=_field(f, 7).strip() == "1", ttf=_field(f, 8).strip() == "1",
+                         text=_field(f, 9).replace("<NL>", "\r\n"))
+    return primitive
+
+
+def parse_footprint_spec(text: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """create_footprints_batch spec -> (footprints in get_footprint_primitives
+    dump shape, problems [{line, error}])"""
+    footprints: List[Dict[str, Any]] = []
+    problems: List[Dict[str, Any]] = []
+    for number, line in enumerate(text.splitlines(), 1):
+        f = _fields(line)
+        kind = _field(f, 0).strip().upper()
+        try:
+            if kind == "FOOTPRINT":
+                footprints.append({"footprint_name": _field(f, 1).strip(), "description": _field(f, 2),
+                                   "primitives": []})
+            elif kind not in ("FPLIB", ""):
+                if not footprints:
+                    raise ValueError(f"{kind} before any FOOTPRINT line is ignored")
+                footprints[-1]["primitives"].append(_spec_footprint_primitive(kind, f))
+        except ValueError as e:
+            problems.append({"line": number, "error": str(e)})
+    return footprints, problems
+
+
+def library_items(dump: Any) -> Tuple[str, List[Dict[str, Any]]]:
+    """Kind ("symbol" or "footprint") and entries of a get_symbol_primitives
+    or get_footprint_primitives dump (one entry, or the "*" list)"""
+    if isinstance(dump, str):
+        dump = json.loads(dump)
+    if isinstance(dump, list):
+        entries = dump
+    elif isinstance(dump, dict) and ("symbols" in dump or "footprints" in dump):
+        entries = dump.get("symbols") or dump.get("footprints") or []
+    elif isinstance(dump, dict):
+        entries = [dump]
+    else:
+        raise ValueError("not a symbol or footprint primitives dump")
+    entries = [e for e in entries if isinstance(e, dict)]
+    if not entries:
+        raise ValueError("the dump holds no symbols or footprints")
+    if any("primitives" not in e for e in entries):
+        raise ValueError("inventory dumps have no primitives: dump with a name or '*'")
+    footprint = any("footprint_name" in e for e in entries)
+    return ("footprint" if footprint else "symbol"), entries
+
+
+def load_source(text: str) -> Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """A spec file or a saved primitives dump -> (kind, entries, problems)"""
+    stripped = text.lstrip()
+    if stripped.startswith(("{", "[")):
+        kind, entries = library_items(json.loads(stripped))
+        return kind, entries, []
+    for line in text.splitlines():
+        record = _field(_fields(line), 0).strip().upper()
+        if record in ("FPLIB", "FOOTPRINT"):
+            return ("footprint",) + parse_footprint_spec(text)
+        if record in ("LIBRARY", "SYMBOL"):
+            return ("symbol",) + parse_symbol_spec(text)
+    raise ValueError("not a symbol/footprint batch spec or primitives dump")
+
+
+def entry_name(entry: Dict[str, Any]) -> str:
+    return str(entry.get("symbol_name") or entry.get("footprint_name") or entry.get("name") or "")
+
+
+def select(entries: List[Dict[str, Any]], names: Optional[Sequence[str]]
+           ) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Entries whose name matches any of names (exact or glob, any case)
+    -> (entries in library order, names that matched nothing)"""
+    if not names:
+        return entries, []
+    patterns = [str(n).upper() for n in names]
+    upper = [entry_name(e).upper() for e in entries]
+    chosen = [e for e, name in zip(entries, upper) if any(fnmatch.fnmatchcase(name, p) for p in patterns)]
+    missing = [n for n, p in zip(names, patterns) if not any(fnmatch.fnmatchcase(name, p) for name in upper)]
+    return chosen, missing
+
+
+# ---------------------------------------------------------------- drawings
+
+def _arc(cx: float, cy: float, rx: float, ry: float, start: float, end: float) -> np.ndarray:
+    if end <= start:
+        end += 360
+    steps = max(2, math.ceil((end - start) / ARC_STEP_DEG))
+    angles = np.radians(np.linspace(start, end, steps + 1))
+    return np.column_stack((cx + rx * np.cos(angles), cy + ry * np.sin(angles)))
+
+
+def _bezier(points: np.ndarray) -> np.ndarray:
+    """Cubic segments p0 p1 p2 p3, p3 p4 p5 p6, ..."""
+    if len(points) < 4:
+        return points
+    t = np.linspace(0, 1, BEZIER_STEPS + 1)[:, None]
+    curves = [(1 - t) ** 3 * points[i] + 3 * (1 - t) ** 2 * t * points[i + 1] +
+              3 * (1 - t) * t ** 2 * points[i + 2] + t ** 3 * points[i + 3] for i in range(0, len(points) - 3, 3)]
+    return np.vstack(curves)
+
+
+def _round_rectangle(x1: float, y1: float, x2: float, y2: float, rx: float, ry: float) -> np.ndarray:
+    x1, x2, y1, y2 = min(x1, x2), max(x1, x2), min(y1, y2), max(y1, y2)
+    rx, ry = min(abs(rx), (x2 - x1) / 2), min(abs(ry), (y2 - y1) / 2)
+    corners = ((x2 - rx, y2 - ry, 0), (x1 + rx, y2 - ry, 90), (x1 + rx, y1 + ry, 180), (x2 - rx, y1 + ry, 270))
+    return np.vstack([_arc(cx, cy, rx, ry, a, a + 90) for cx, cy, a in corners])
+
+
+def _vertices(primitive: Dict[str, Any]) -> np.ndarray:
+    return np.array([(float(v["x"]), float(v["y"])) if isinstance(v, dict) else (float(v[0]), float(v[1]))
+                     for v in primitive.get("vertices", [])], dtype=float).reshape(-1, 2)
+
+
+def _line_width(primitive: Dict[str, Any]) -> float:
+    return LINE_WIDTHS[min(max(int(primitive.get("line_width") or 0), 0), len(LINE_WIDTHS) - 1)]
+
+
+def _symbol_primitive(drawing: Drawing, p: Dict[str, Any]) -> None:
+    kind = p.get("type")
+    width = _line_width(p)
+    fill = BODY_FILL if p.get("is_solid") else None
+    if kind in ("rectangle", "round_rectangle"):
+        x1, y1, x2, y2 = (float(p[k]) for k in ("x1", "y1", "x2", "y2"))
+        if kind == "rectangle":
+            points = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+        else:
+            points = _round_rectangle(x1, y1, x2, y2, float(p.get("corner_x_radius") or 0),
+                                      float(p.get("corner_y_radius") or 0))
+        drawing.shape(points, True, fill, BODY_LINE, width)
+    elif kind == "line":
+        drawing.shape([(float(p["x1"]), float(p["y1"])), (float(p["x2"]), float(p["y2"]))],
+                      stroke=BODY_LINE, width=width)
+    elif kind in ("polyline", "bezier"):
+        points = _vertices(p)
+        drawing.shape(_bezier(points) if kind == "bezier" else points, stroke=BODY_LINE, width=width)
+    elif kind == "polygon":
+        drawing.shape(_vertices(p), True, fill, BODY_LINE, width)
+    elif kind in ("arc", "elliptical_arc", "ellipse", "pie"):
+        cx, cy, rx = float(p["cx"]), float(p["cy"]), float(p["radius"])
+        ry = float(p.get("secondary_radius") or rx) if kind in ("elliptical_arc", "ellipse") else rx
+        if kind == "ellipse":
+            drawing.shape(_arc(cx, cy, rx, ry, 0, 360)[:-1], True, fill, BODY_LINE, width)
+        else:
+            points = _arc(cx, cy, rx, ry, float(p.get("start_angle", 0)), float(p.get("end_angle", 360)))
+            if kind == "pie":
+                drawing.shape(np.vstack(([(cx, cy)], points)), True, fill, BODY_LINE, width)
+            else:
+                drawing.shape(points, stroke=BODY_LINE, width=width)
+    elif kind == "label":
+        drawing.text(float(p["x"]), float(p["y"]), str(p.get("text", "")), LABEL_TEXT_MILS, LABEL_COLOUR)
+    else:
+        drawing.skip(kind)
+
+
+def _orientation(value: Any) -> int:
+    if isinstance(value, str) and value.strip() in ORIENTATIONS:
+        return ORIENTATIONS.index(value.strip())
+    return int(value or 0) % 4
+
+
+def _pin(drawing: Drawing, pin: Dict[str, Any]) -> None:
+    x, y = float(pin["x"]), float(pin["y"])
+    length = float(pin.get("length", DEFAULT_PIN_LENGTH))
+    dx, dy = PIN_DIRECTIONS[_orientation(pin.get("orientation"))]
+    tip_x, tip_y = x + dx * length, y + dy * length
+    drawing.shape([(x, y), (tip_x, tip_y)], stroke=PIN_COLOUR, width=PIN_WIDTH_MILS)
+    rotation = 90.0 if dx == 0 else 0.0
+    if pin.get("show_designator", True):
+        # along the pin, above it (left of it when vertical)
+        mid_x, mid_y = (x + tip_x) / 2 - dy * dy * PIN_NUMBER_GAP, (y + tip_y) / 2 + dx * dx * PIN_NUMBER_GAP
+        drawing.text(mid_x, mid_y, str(pin.get("pin_number", "")), PIN_TEXT_MILS, PIN_COLOUR, "ms", rotation)
+    if pin.get("show_name", True):
+        # inside the body, ending PIN_NAME_GAP from the pin
+        anchor = "rm" if dx + dy > 0 else "lm"
+        name = str(pin.get("pin_name", "")).replace("\\", "")  # overbar markers
+        drawing.text(x - dx * PIN_NAME_GAP, y - dy * PIN_NAME_GAP, name, PIN_TEXT_MILS, PIN_COLOUR, anchor, rotation)
+
+
+def symbol_drawing(symbol: Dict[str, Any], part: int = 1) -> Drawing:
+    """Drawing of one part of a get_symbol_primitives symbol (primitives owned
+    by that part or shared by all); pins are drawn over the body"""
+    drawing = Drawing(entry_name(symbol), SYMBOL_BACKGROUND)
+    pins = []
+    for primitive in symbol.get("primitives", []):
+        owner = primitive.get("owner_part_id")
+        if owner is not None and int(owner) not in (0, part):
+            continue
+        try:
+            if primitive.get("type") == "pin":
+                pins.append(primitive)
+            else:
+                _symbol_primitive(drawing, primitive)
+        except (KeyError, TypeError, ValueError):
+            drawing.skip(primitive.get("type"))
+    for pin in pins:
+        try:
+            _pin(drawing, pin)
+        except (KeyError, TypeError, ValueError):
+            drawing.skip("pin")
+    return drawing
+
+
+def layer_style(layer: Any) -> Tuple[Colour, int]:
+    """(colour, paint rank) of a PCB layer name"""
+    key = str(layer or "").replace(" ", "").replace("-", "").lower()
+    for fragment, colour, rank in LAYER_STYLES:
+        if fragment in key:
+            return colour, rank
+    return COPPER_STYLE
+
+
+def _as_geometry(primitive: Dict[str, Any]) -> Dict[str, Any]:
+    """get_footprint_primitives entry in the get_component_geometry form
+    clearance.primitive_shapes reads"""
+    kind = primitive.get("type")
+    if kind == "pad":
+        pad = {"type": "pad", "x": primitive["x"], "y": primitive["y"],
+               "width": primitive.get("top_x_size", primitive.get("width", 0)),
+               "height": primitive.get("top_y_size", primitive.get("height", 0)),
+               "rotation": primitive.get("rotation", 0),
+               "shape": PAD_SHAPES.get(int(primitive.get("top_shape") or 2), "Rectangular")}
+        if "corner_pct" in primitive:
+            pad["corner_pct"] = primitive["corner_pct"]
+        return pad
+    if kind == "region":
+        return dict(primitive, vertices=_vertices(primitive).tolist())
+    return primitive
+
+
+def _hole(primitive: Dict[str, Any]) -> List[Tuple[Any, float, bool]]:
+    """Drill of a pad: round, square (hole_type 1) or slot (2, hole_width long)"""
+    size = float(primitive.get("hole_size") or 0)
+    if size <= 0:
+        return []
+    x, y = float(primitive["x"]), float(primitive["y"])
+    hole_type = int(primitive.get("hole_type") or 0)
+    rotation = float(primitive.get("rotation") or 0) + float(primitive.get("hole_rotation") or 0)
+    if hole_type == 1:
+        return primitive_shapes({"type": "pad", "x": x, "y": y, "width": size, "height": size,
+                                 "rotation": rotation, "shape": "Rectangular"})
+    length = max(float(primitive.get("hole_width") or 0), size) if hole_type == 2 else size
+    return primitive_shapes({"type": "pad", "x": x, "y": y, "width": length, "height": size,
+                             "rotation": rotation, "shape": "Round"})
+
+
+def _add_shapes(layers: List[Tuple[int, int, Any, Colour]], rank: int, shapes, colour: Colour) -> None:
+    for vertices, radius, closed in shapes:
+        layers.append((rank, len(layers), (vertices, radius, closed), colour))
+
+
+def footprint_drawing(footprint: Dict[str, Any]) -> Drawing:
+    """Drawing of a get_footprint_primitives footprint: mechanical layers,
+    then bottom, top and multi-layer copper, overlay, drills, pad names and text"""
+    drawing = Drawing(entry_name(footprint), FOOTPRINT_BACKGROUND)
+    layers: List[Tuple[int, int, Any, Colour]] = []
+    labels: List[Tuple[float, float, str, float, Colour, str, float]] = []
+    for primitive in footprint.get("primitives", []):
+        kind = primitive.get("type")
+        try:
+            if kind == "text":
+                colour, _ = layer_style(primitive.get("layer"))
+                text = " ".join(str(primitive.get("text", "")).split())
+                labels.append((float(primitive["x"]), float(primitive["y"]), text,
+                               float(primitive.get("size") or 60), colour, "ls", float(primitive.get("rotation") or 0)))
+            elif kind in ("pad", "track", "arc", "fill", "region", "via"):
+                colour, rank = layer_style("multi" if kind == "via" else primitive.get("layer"))
+                _add_shapes(layers, rank, primitive_shapes(_as_geometry(primitive)), colour)
+                if kind == "pad":
+                    _add_shapes(layers, HOLE_RANK, _hole(primitive), HOLE_COLOUR)
+                    small = min(float(primitive.get("top_x_size") or 0), float(primitive.get("top_y_size") or 0))
+                    labels.insert(0, (float(primitive["x"]), float(primitive["y"]), str(primitive.get("name", "")),
+                                      min(PAD_TEXT_MILS, small / 2), PAD_TEXT_COLOUR, "mm", 0.0))
+                elif kind == "via":
+                    _add_shapes(layers, HOLE_RANK, _hole(primitive), HOLE_COLOUR)
+            else:
+                drawing.skip(kind)
+        except (KeyError, TypeError, ValueError):
+            drawing.skip(kind)
+    for _, _, (vertices, radius, closed), colour in sorted(layers, key=lambda entry: entry[:2]):
+        if closed and len(vertices) >= 3:
+            drawing.shape(vertices, True, colour, colour if radius > 0 else None, 2 * radius)
+        else:
+            drawing.shape(vertices, stroke=colour, width=2 * radius)
+    for label in labels:
+        drawing.text(*label)
+    return drawing
+
+
+def drawings_of(kind: str, entries: Iterable[Dict[str, Any]], part: int = 1) -> List[Drawing]:
+    if kind == "footprint":
+        return [footprint_drawing(e) for e in entries]
+    return [symbol_drawing(e, part) for e in entries]
+
+
+# ---------------------------------------------------------------- SVG
+
+def _hex(colour: Colour) -> str:
+    return "#%02x%02x%02x" % colour
+
+
+def _svg_shapes(drawing: Drawing) -> List[str]:
+    parts = []
+    for points, closed, fill, stroke, width in drawing.shapes:
+        if stroke is not None and width > 0:
+            line = f' stroke="{_hex(stroke)}" stroke-width="{width:.6g}" stroke-linecap="round" stroke-linejoin="round"'
+        elif stroke is not None:
+            line = f' stroke="{_hex(stroke)}" stroke-width="1" vector-effect="non-scaling-stroke"'
+        else:
+            line = ""
+        if len(points) == 1:
+            if stroke is not None:
+                x, y = points[0]
+                parts.append(f'<circle cx="{x:.6g}" cy="{-y:.6g}" r="{max(width, 1) / 2:.6g}" fill="{_hex(stroke)}"/>')
+            continue
+        coords = " ".join(f"{x:.6g},{-y:.6g}" for x, y in points.tolist())
+        if closed:
+            paint = _hex(fill) if fill is not None else "none"
+            parts.append(f'<polygon points="{coords}" fill="{paint}"{line}/>')
+        else:
+            parts.append(f'<polyline points="{coords}" fill="none"{line}/>')
+    for x, y, text, height, colour, anchor, rotation in drawing.texts:
+        align = {"l": "start", "m": "middle", "r": "end"}[anchor[0]]
+        baseline = ' dominant-baseline="central"' if anchor[1] == "m" else ""
+        turn = f' transform="rotate({-rotation:.6g} {x:.6g} {-y:.6g})"' if rotation else ""
+        parts.append(f'<text x="{x:.6g}" y="{-y:.6g}" font-size="{height:.6g}" fill="{_hex(colour)}" '
+                     f'text-anchor="{align}"{baseline}{turn}>{escape(text)}</text>')
+    return parts
+
+
+def _view_box(bounds: Box, width: int, height: int, scale: float) -> str:
+    """viewBox (in mils, SVG y down) of bounds with MARGIN_PX around it, centred in width x height"""
+    x1, y1, x2, y2 = bounds
+    w, h = width / scale, height / scale
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+    return f"{cx - w / 2:.6g} {-cy - h / 2:.6g} {w:.6g} {h:.6g}"
+
+
+def _fit(bounds: Box, width: int, height: int) -> float:
+    """Pixels per mil fitting bounds into width x height with MARGIN_PX around"""
+    x1, y1, x2, y2 = bounds
+    return min(max(width - 2 * MARGIN_PX, 1) / max(x2 - x1, 1e-6), max(height - 2 * MARGIN_PX, 1) / max(y2 - y1, 1e-6))
+
+
+def _image_size(bounds: Box, size: int) -> Tuple[int, int, float]:
+    x1, y1, x2, y2 = bounds
+    scale = (size - 2 * MARGIN_PX) / max(x2 - x1, y2 - y1, 1e-6)
+    return (max(1, round((x2 - x1) * scale)) + 2 * MARGIN_PX, max(1, round((y2 - y1) * scale)) + 2 * MARGIN_PX,
+            scale)
+
+
+def render_svg(drawing: Drawing, size: int = 800) -> str:
+    """SVG document of one drawing, size pixels along its longer side"""
+    bounds = drawing.bounds()
+    width, height, scale = _image_size(bounds, size)
+    return "\n".join([
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="{_view_box(bounds, width, height, scale)}" font-family="sans-serif">',
+        f'<rect x="-1e6" y="-1e6" width="2e6" height="2e6" fill="{_hex(drawing.background)}"/>',
+        *_svg_shapes(drawing), "</svg>", ""])
+
+
+def contact_sheet_svg(drawings: Sequence[Drawing], cell_size: int = 160, columns: int = 0) -> str:
+    """SVG grid of drawings, each in a cell_size square with its name under it"""
+    columns, rows = _grid(len(drawings), cell_size, columns)
+    pitch = cell_size + CAPTION_PX
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{columns * cell_size}" height="{rows * pitch}" '
+             f'font-family="sans-serif">',
+             '<rect width="100%" height="100%" fill="#ffffff"/>']
+    for i, drawing in enumerate(drawings):
+        left, top = (i % columns) * cell_size, (i // columns) * pitch
+        bounds = drawing.bounds()
+        parts.append(f'<svg x="{left}" y="{top}" width="{cell_size}" height="{cell_size}" '
+                     f'viewBox="{_view_box(bounds, cell_size, cell_size, _fit(bounds, cell_size, cell_size))}">')
+        parts.append(f'<rect x="-1e6" y="-1e6" width="2e6" height="2e6" fill="{_hex(drawing.background)}"/>')
+        parts.extend(_svg_shapes(drawing))
+        parts.append("</svg>")
+        parts.append(f'<text x="{left + cell_size / 2}" y="{top + cell_size + CAPTION_PX - 3}" font-size="11" '
+                     f'fill="{_hex(CAPTION_COLOUR)}" text-anchor="middle">{escape(drawing.name)}</text>')
+    parts.extend(["</svg>", ""])
+    return "\n".join(parts)
+
+
+# ---------------------------------------------------------------- PNG
+
+@lru_cache(maxsize=64)
+def _font(size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.load_default(size)
+
+
+_text_masks: Dict[Tuple[str, int, str, int], Tuple[Image.Image, int, int]] = {}
+
+
+def _text_mask(text: str, size: int, anchor: str, quarter: int) -> Tuple[Image.Image, int, int]:
+    """Rasterized text and the offset of its top-left corner from the anchor,
+    turned by quarter * 90 degrees counterclockwise, cached"""
+    key = (text, size, anchor, quarter)
+    cached = _text_masks.get(key)
+    if cached is None:
+        font = _font(size)
+        left, top, right, bottom = font.getbbox(text, anchor=anchor)
+        mask = Image.new("L", (max(right - left, 1), max(bottom - top, 1)))
+        ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=font, anchor=anchor)
+        # image coordinates (y down): a CCW quarter turn maps (u, v) to (v, -u)
+        offsets = ((left, top), (top, -right), (-right, -bottom), (-bottom, left))
+        if quarter:
+            mask = mask.transpose((None, Image.Transpose.ROTATE_90, Image.Transpose.ROTATE_180,
+                                   Image.Transpose.ROTATE_270)[quarter])
+        cached = (mask, *offsets[quarter])
+        if len(_text_masks) >= MAX_CACHED_TEXTS:
+            _text_masks.clear()
+        _text_masks[key] = cached
+    return cached
+
+
+def _paint(image: Image.Image, draw: ImageDraw.ImageDraw, drawing: Drawing, bounds: Box,
+           box: Tuple[int, int, int, int], scale: float) -> None:
+    """Paint a drawing with bounds centred in the pixel box (left, top, right, bottom)"""
+    x1, y1, x2, y2 = bounds
+    left, top, right, bottom = box
+    ox = (left + right) / 2 - (x1 + x2) / 2 * scale
+    oy = (top + bottom) / 2 + (y1 + y2) / 2 * scale
+    for points, closed, fill, stroke, width in drawing.shapes:
+        pixels = points * (scale, -scale) + (ox, oy)
+        flat = pixels.ravel().tolist()
+        line = max(1, round(width * scale))
+        if closed and fill is not None and len(pixels) >= 3:
+            draw.polygon(flat, fill=fill)
+        if stroke is None:
+            continue
+        if len(pixels) == 1:
+            r = line / 2
+            draw.ellipse((flat[0] - r, flat[1] - r, flat[0] + r, flat[1] + r), fill=stroke)
+            continue
+        if closed:
+            # once round and one vertex on, so the first corner is joined too
+            flat += flat[:4]
+        draw.line(flat, fill=stroke, width=line, joint="curve" if line > 2 else None)
+        if line > 2 and not closed:
+            r = line / 2
+            for x, y in (pixels[0], pixels[-1]):
+                draw.ellipse((x - r, y - r, x + r, y + r), fill=stroke)
+    for x, y, text, height, colour, anchor, rotation in drawing.texts:
+        size = round(height * scale)
+        if size < MIN_TEXT_PX:
+            continue
+        mask, dx, dy = _text_mask(text, size, anchor, round(rotation / 90) % 4)
+        image.paste(colour, (round(ox + x * scale) + dx, round(oy - y * scale) + dy), mask)
+
+
+def render_png(drawing: Drawing, size: int = 800) -> Image.Image:
+    """RGB image of one drawing, size pixels along its longer side"""
+    bounds = drawing.bounds()
+    width, height, scale = _image_size(bounds, size)
+    image = Image.new("RGB", (width, height), drawing.background)
+    _paint(image, ImageDraw.Draw(image), drawing, bounds, (0, 0, width, height), scale)
+    return image
+
+
+def _grid(count: int, cell_size: int, columns: int) -> Tuple[int, int]:
+    columns = min(columns or math.ceil(math.sqrt(count)), count) or 1
+    rows = max(1, math.ceil(count / columns))
+    if columns * cell_size > MAX_IMAGE_PX or rows * (cell_size + CAPTION_PX) > MAX_IMAGE_PX:
+        raise ValueError(f"a {columns} x {rows} sheet of {cell_size} pixel cells is too large: "
+                         f"select fewer names or use a smaller cell_size")
+    return columns, rows
+
+
+def contact_sheet(drawings: Sequence[Drawing], cell_size: int = 160, columns: int = 0) -> Image.Image:
+    """Grid image of drawings, each scaled into a cell_size square with its name under it"""
+    columns, rows = _grid(len(drawings), cell_size, columns)
+    pitch = cell_size + CAPTION_PX
+    sheet = Image.new("RGB", (columns * cell_size, rows * pitch), (255, 255, 255))
+    draw = ImageDraw.Draw(sheet)
+    for i, drawing in enumerate(drawings):
+        left, top = (i % columns) * cell_size, (i // columns) * pitch
+        box = (left + 1, top + 1, left + cell_size - 1, top + cell_size - 1)
+        draw.rectangle(box, fill=drawing.background)
+        bounds = drawing.bounds()
+        _paint(sheet, draw, drawing, bounds, box, _fit(bounds, cell_size - 2, cell_size - 2))
+        name = drawing.name
+        while len(name) > 3 and _font(11).getlength(name) > cell_size - 4:
+            name = name[:-2] + "…"
+        mask, dx, dy = _text_mask(name, 11, "ms", 0)
+        sheet.paste(CAPTION_COLOUR, (left + cell_size // 2 + dx, top + pitch - 3 + dy), mask)
+    return sheet
+
+
+def check_preview_options(image_format: str, size: int, cell_size: int, columns: int, part: int) -> str:
+    """Normalized image format, or ValueError"""
+    image_format = str(image_format or "png").lower()
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"image_format must be one of {', '.join(IMAGE_FORMATS)}")
+    if not 32 <= size <= 8192:
+        raise ValueError("size must be between 32 and 8192 pixels")
+    if not 48 <= cell_size <= 2048:
+        raise ValueError("cell_size must be between 48 and 2048 pixels")
+    if columns < 0:
+        raise ValueError("columns must not be negative")
+    if part < 1:
+        raise ValueError("part must be at least 1")
+    return image_format
+
+
+def render_preview(kind: str, entries: List[Dict[str, Any]], names: Optional[Sequence[str]] = None,
+                   part: int = 1, image_format: str = "png", size: int = 800, cell_size: int = 160,
+                   columns: int = 0) -> Tuple[Dict[str, Any], Any]:
+    """One entry as a size-pixel image, several as a contact sheet.
+    Returns (metadata, PIL image or SVG text)."""
+    image_format = check_preview_options(image_format, size, cell_size, columns, part)
+    chosen, missing = select(entries, names)
+    if not chosen:
+        raise ValueError(f"no {kind} matches {list(names or [])}")
+    drawings = drawings_of(kind, chosen, part)
+    single = len(drawings) == 1
+    if image_format == "svg":
+        output = render_svg(drawings[0], size) if single else contact_sheet_svg(drawings, cell_size, columns)
+    else:
+        output = render_png(drawings[0], size) if single else contact_sheet(drawings, cell_size, columns)
+    result: Dict[str, Any] = {"kind": kind, "count": len(drawings), "missing_names": missing,
+                              "skipped_primitives": {d.name: d.skipped for d in drawings if d.skipped}}
+    if single:
+        result["bounds_mils"] = [round(v, 1) for v in drawings[0].bounds()]
+    return result, output
@@ -11,16 +11,27 @@ from tkinter import filedialog
 from pathlib import Path
 from typing import Dict, Any, Optional
 import sys
-import win32gui
-import win32ui
-import win32con
-import win32api
-from PIL import Image
-import io
-import base64
 import glob
 import re
 
+from bridge import AltiumBridge, BRIDGE_MODES
+from component_index import ComponentIndex
+from projection import project
+from pagination import list_key_for
+import columnar
+from mst import mst_length
+from orientation import check_rotations, optimize_rotations
+from board_model import BoardModel, parse_placements, evaluate_placement
+from placer import optimize_placement as anneal_placement
+from spatial import BoardIndex
+from clearance import ClearanceModel, check_clearance as check_clearance_local
+from duplicator_match import match_groups
+from netgraph import NetGraph
+from clustering import suggest_clusters as suggest_clusters_local
+from screenshot import CAPTURE_BACKENDS, ScreenshotService, check_options, make_backend
+from board_render import BoardScene, render_board as render_board_local, to_png
+from library_render import library_items, load_source as load_library_source, render_preview as render_library_local
+
 # Configure logging
 logging.basicConfig(
     level=logging.DEBUG,  # Change to DEBUG for more detailed logs
@@ -54,6 +65,12 @@ class AltiumConfig:
     def __init__(self):
         self.altium_exe_path = ""
         self.script_path = str(DEFAULT_SCRIPT_PATH)
+        self.bridge_mode = "launch"
+        self.response_waiter = "auto"
+        self.cache_ttl_seconds = 30.0
+        self.component_delta_sync = True
+        self.screenshot_backend = "auto"
+        self.screenshot_debug_save = False
         self.load_config()
     
     def load_config(self):
@@ -64,6 +81,18 @@ class AltiumConfig:
                     config = json.load(f)
                     self.altium_exe_path = config.get("altium_exe_path", "")
                     self.script_path = config.get("script_path", str(DEFAULT_SCRIPT_PATH))
+                    self.bridge_mode = config.get("bridge_mode", "launch")
+                    if self.bridge_mode not in BRIDGE_MODES:
+                        logger.warning(f"Unknown bridge_mode '{self.bridge_mode}', using 'launch'")
+                        self.bridge_mode = "launch"
+                    self.response_waiter = config.get("response_waiter", "auto")
+                    self.cache_ttl_seconds = float(config.get("cache_ttl_seconds", 30.0))
+                    self.component_delta_sync = bool(config.get("component_delta_sync", True))
+                    self.screenshot_backend = config.get("screenshot_backend", "auto")
+                    if self.screenshot_backend not in CAPTURE_BACKENDS:
+                        logger.warning(f"Unknown screenshot_backend '{self.screenshot_backend}', using 'auto'")
+                        self.screenshot_backend = "auto"
+                    self.screenshot_debug_save = bool(config.get("screenshot_debug_save", False))
                 logger.info(f"Loaded configuration from {CONFIG_FILE}")
             except Exception as e:
                 logger.error(f"Error loading configuration: {e}")
@@ -111,7 +140,13 @@ class AltiumConfig:
         """Save configuration to file"""
         config = {
             "altium_exe_path": self.altium_exe_path,
-            "script_path": self.script_path
+            "script_path": self.script_path,
+            "bridge_mode": self.bridge_mode,
+            "response_waiter": self.response_waiter,
+            "cache_ttl_seconds": self.cache_ttl_seconds,
+            "component_delta_sync": self.component_delta_sync,
+            "screenshot_backend": self.screenshot_backend,
+            "screenshot_debug_save": self.screenshot_debug_save
         }
         
         try:
@@ -220,179 +255,22 @@ class AltiumConfig:
         
         return paths_verified
 
-class AltiumBridge:
-    def __init__(self):
-        # Ensure the MCP directory exists
-        MCP_DIR.mkdir(exist_ok=True)
-
-        # Load configuration
-        self.config = AltiumConfig()
-        self.config.verify_paths()
-
-        # Commands share a single request.json/response.json pair, so
-        # concurrent tool calls must be serialized or they clobber each other
-        self._command_lock = asyncio.Lock()
-
-    async def execute_command(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a command in Altium via the bridge script"""
-        async with self._command_lock:
-            return await self._execute_command_locked(command, params)
-
-    async def _execute_command_locked(self, command: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            # Clean up any existing response file
-            if RESPONSE_FILE.exists():
-                RESPONSE_FILE.unlink()
-            
-            # Write the request file with command and parameters
-            with open(REQUEST_FILE, "w") as f:
-                json.dump({
-                    "command": command,
-                    **params  # Include parameters directly in the main JSON object
-                }, f, indent=2)
-            
-            logger.info(f"Wrote request file for command: {command}")
-            
-            # Run the Altium script
-            success = await self.run_altium_script()
-            if not success:
-                return {"success": False, "error": "Failed to run Altium script"}
-            
-            # Wait for the response file
-            logger.info(f"Waiting for response file to appear...")
-            timeout = 120  # seconds
-            start_time = time.time()
-            while not RESPONSE_FILE.exists() and time.time() - start_time < timeout:
-                await asyncio.sleep(0.5)
-            
-            if not RESPONSE_FILE.exists():
-                logger.error("Timeout waiting for response from Altium")
-                return {"success": False, "error": "No response received from Altium (timeout)"}
-            
-            # Read the response file and print it for debugging
-            logger.info("Response file found, reading response")
-            response_text = ""
-            with open(RESPONSE_FILE, "r") as f:
-                response_text = f.read()
-            
-            # Log the raw response for debugging
-            logger.info(f"Raw response (first 200 chars): {response_text[:200]}")
-            
-            # Parse the JSON response with detailed error handling
-            try:
-                response = json.loads(response_text)
-                logger.info(f"Successfully parsed JSON response")
-                return response
-            except json.JSONDecodeError as e:
-                logger.error(f"Error parsing JSON response: {e}")
-                logger.error(f"Error at position {e.pos}, line {e.lineno}, column {e.colno}")
-                logger.error(f"Character at error position: '{response_text[e.pos:e.pos+10]}...'")
-                
-                # Try to manually fix common JSON issues
-                logger.info("Attempting to fix JSON response...")
-                fixed_text = response_text
-                
-                # Fix 1: If there's a quoted JSON array, try to fix it
-                if '"[' in fixed_text and ']"' in fixed_text:
-                    fixed_text = fixed_text.replace('"[', '[').replace(']"', ']')
-                    logger.info("Fixed double-quoted JSON array")
-                
-                # Fix 2: Handle escaped quotes in JSON strings
-                fixed_text = fixed_text.replace('\\"', '"')
-                
-                # Try to parse the fixed JSON
-                try:
-                    fixed_response = json.loads(fixed_text)
-                    logger.info("Successfully parsed fixed JSON response")
-                    return fixed_response
-                except json.JSONDecodeError as e2:
-                    logger.error(f"Still failed to parse JSON after fixes: {e2}")
-                
-                # If all else fails, return a structured error
-                return {
-                    "success": False, 
-                    "error": f"Invalid JSON response: {e}",
-                    "raw_response": response_text[:500]  # Include part of the raw response for diagnosis
-                }
-        
-        except Exception as e:
-            logger.error(f"Error executing command: {e}")
-            return {"success": False, "error": str(e)}
-    
-    @staticmethod
-    def _resolve_msix_path(virtual_path: str) -> str:
-        """Resolve an MSIX-virtualized path to the real filesystem path.
-
-        When Claude Desktop is installed via MSIX (the standard .exe installer
-        on modern Windows), file paths are virtualized under AppData\\Roaming\\
-        but the real files live at AppData\\Local\\Packages\\Claude_*\\
-        LocalCache\\Roaming\\. Child processes of the MSIX app (like Python)
-        can see the virtualized paths, but external apps (like Altium) cannot.
-        This resolves the path so external processes can find the files.
-        """
-        appdata = os.environ.get('APPDATA', '')
-        if not appdata or not virtual_path.startswith(appdata):
-            return virtual_path
-
-        localappdata = os.environ.get('LOCALAPPDATA', '')
-        packages_dir = os.path.join(localappdata, 'Packages')
-        if not os.path.isdir(packages_dir):
-            return virtual_path
-
-        try:
-            for item in os.listdir(packages_dir):
-                if item.startswith('Claude_'):
-                    relative = os.path.relpath(virtual_path, appdata)
-                    real_path = os.path.join(packages_dir, item, 'LocalCache', 'Roaming', relative)
-                    if os.path.exists(real_path):
-                        logger.info(f"Resolved MSIX path: {virtual_path} -> {real_path}")
-                        return real_path
-        except Exception as e:
-            logger.warning(f"Error resolving MSIX path: {e}")
-
-        return virtual_path
-
-    async def run_altium_script(self) -> bool:
-        """Run the Altium bridge script"""
-        if not os.path.exists(self.config.altium_exe_path):
-            logger.error(f"Altium executable not found at: {self.config.altium_exe_path}")
-            print(f"Error: Altium executable not found. Please check the configuration.")
-            return False
-
-        if not os.path.exists(self.config.script_path):
-            logger.error(f"Script file not found at: {self.config.script_path}")
-            print(f"Error: Script file not found. Please check the configuration.")
-            return False
-
-        try:
-            # Resolve MSIX-virtualized path so Altium (an external process
-            # outside the MSIX sandbox) can find the script files
-            script_path = self._resolve_msix_path(self.config.script_path)
-
-            # Command format: "X2.EXE" -RScriptingSystem:RunScript(ProjectName="path\file.PrjScr"|ProcName="ModuleName>Run")
-            command = f'"{self.config.altium_exe_path}" -RScriptingSystem:RunScript(ProjectName="{script_path}"^|ProcName="Altium_API>Run")'
-            
-            logger.info(f"Running command: {command}")
-            
-            # Start the process
-            process = subprocess.Popen(command, shell=True)
-            
-            # Don't wait for completion - Altium will run the script and generate the response
-            logger.info(f"Launched Altium with script, process ID: {process.pid}")
-            return True
-        
-        except Exception as e:
-            logger.error(f"Error launching Altium: {e}")
-            return False
-
 # Create a global bridge instance
-altium_bridge = AltiumBridge()
+MCP_DIR.mkdir(exist_ok=True)
+_config = AltiumConfig()
+_config.verify_paths()
+altium_bridge = AltiumBridge(_config, EXCHANGE_DIR)
+screenshots = ScreenshotService(make_backend(_config.screenshot_backend),
+                                debug_dir=MCP_DIR if _config.screenshot_debug_save else None)
 
 @mcp.tool()
-async def get_all_component_property_names(ctx: Context) -> str:
+async def get_all_component_property_names(ctx: Context, refresh: bool = False) -> str:
     """
     Get all available component property names (JSON keys) from all components
     
+    Args:
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
+    
     Returns:
         str: JSON array with all unique property names
     """
@@ -401,7 +279,8 @@ async def get_all_component_property_names(ctx: Context) -> str:
     # Execute the command in Altium to get component data
     response = await altium_bridge.execute_command(
         "get_all_component_data", 
-        {}
+        {},
+        use_cache=not refresh
     )
     
     # Check for success
@@ -424,13 +303,8 @@ async def get_all_component_property_names(ctx: Context) -> str:
         else:
             components_list = components_data
             
-        # Extract all unique property names from all components
-        property_names = set()
-        for component in components_list:
-            property_names.update(component.keys())
-        
-        # Convert set to sorted list for consistent output
-        property_list = sorted(list(property_names))
+        # All unique property names, sorted for consistent output
+        property_list = ComponentIndex.of(components_list).properties.names()
         
         logger.info(f"Found {len(property_list)} unique property names")
         return json.dumps(property_list, indent=2)
@@ -439,12 +313,13 @@ async def get_all_component_property_names(ctx: Context) -> str:
         return json.dumps({"error": f"Failed to process component data: {str(e)}"})
 
 @mcp.tool()
-async def get_component_property_values(ctx: Context, property_name: str) -> str:
+async def get_component_property_values(ctx: Context, property_name: str, refresh: bool = False) -> str:
     """
     Get values of a specific property for all components
     
     Args:
         property_name (str): The name of the property to get values for
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
     
     Returns:
         str: JSON array with objects containing designator and property value
@@ -454,7 +329,8 @@ async def get_component_property_values(ctx: Context, property_name: str) -> str
     # Execute the command in Altium to get component data
     response = await altium_bridge.execute_command(
         "get_all_component_data", 
-        {}
+        {},
+        use_cache=not refresh
     )
     
     # Check for success
@@ -478,20 +354,69 @@ async def get_component_property_values(ctx: Context, property_name: str) -> str
             components_list = components_data
             
         # Extract the property values along with designators
-        property_values = []
-        for component in components_list:
-            designator = component.get("designator")
-            if designator and property_name in component:
-                property_values.append({
-                    "designator": designator,
-                    "value": component.get(property_name)
-                })
+        property_values = ComponentIndex.of(components_list).properties.values(property_name)
         
         logger.info(f"Found {len(property_values)} components with property '{property_name}'")
         return json.dumps(property_values, indent=2)
     except Exception as e:
         logger.error(f"Error processing component data: {e}")
         return json.dumps({"error": f"Failed to process component data: {str(e)}"})
+
+@mcp.tool()
+async def find_components_by_property(ctx: Context, property_name: str, value: str = "",
+                                      pattern: str = "", refresh: bool = False) -> str:
+    """
+    Find the designators of components whose property equals a value or matches a pattern
+    
+    Args:
+        property_name (str): The property to test (e.g. "footprint", "layer", "rotation")
+        value (str, optional): Exact value to match. Numbers match regardless of format ("90" matches 90.0)
+        pattern (str, optional): Case-insensitive wildcard pattern instead of an exact value
+            (e.g. "*0402*", "SOT23*"). With neither value nor pattern, returns designators grouped by value.
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
+    
+    Returns:
+        str: JSON object with the matching designators and their count, or a
+             value -> designators map when no value/pattern is given
+    """
+    logger.info(f"Finding components where {property_name} = {value!r} / pattern {pattern!r}")
+    
+    response = await altium_bridge.execute_command(
+        "get_all_component_data",
+        {},
+        use_cache=not refresh
+    )
+    
+    if not response.get("success", False):
+        error_msg = response.get("error", "Unknown error")
+        logger.error(f"Error getting component data: {error_msg}")
+        return json.dumps({"error": f"Failed to get component data: {error_msg}"})
+    
+    components_data = response.get("result", [])
+    if not components_data:
+        logger.info("No component data found")
+        return json.dumps({"error": "No component data found"})
+    
+    try:
+        if isinstance(components_data, str):
+            components_data = json.loads(components_data)
+        properties = ComponentIndex.of(components_data).properties
+        if property_name not in properties:
+            return json.dumps({"error": f"Unknown property '{property_name}'",
+                               "property_names": properties.names()})
+        
+        if not value and not pattern:
+            groups = properties.distinct(property_name)
+            return json.dumps({"property": property_name, "value_count": len(groups),
+                               "values": groups}, indent=2)
+        
+        designators = properties.where(property_name, value=value, pattern=pattern)
+        logger.info(f"Found {len(designators)} matching components")
+        return json.dumps({"property": property_name, "count": len(designators),
+                           "designators": designators}, indent=2)
+    except Exception as e:
+        logger.error(f"Error processing component data: {e}")
+        return json.dumps({"error": f"Failed to process component data: {str(e)}"})
     
 @mcp.tool()
 async def get_symbol_placement_rules(ctx: Context) -> str:
@@ -728,22 +653,31 @@ async def create_schematic_symbol(ctx: Context, symbol_name: str, description: s
     return json.dumps(result, indent=2)
 
 @mcp.tool()
-async def get_schematic_data(ctx: Context, cmp_designators: list) -> str:
+async def get_schematic_data(ctx: Context, cmp_designators: list = None, sheet: str = "",
+                             fields: str = "", refresh: bool = False) -> str:
     """
     Get schematic data for components in Altium
     
     Args:
-        cmp_designators (list): List of designators of the components (e.g., ["R1", "C5", "U3"])
+        cmp_designators (list, optional): List of designators of the components (e.g., ["R1", "C5", "U3"])
+        sheet (str, optional): Only components on this sheet (full path or file name, e.g. "Power.SchDoc").
+            Can be combined with cmp_designators or used alone.
+        fields (str, optional): Comma-separated fields to return, e.g. "designator,sheet,parameters".
+            Omit for every field. "parameters.Value" selects single parameters.
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
     
     Returns:
         str: JSON object with schematic component data for requested designators
     """
-    logger.info(f"Getting schematic data for components: {cmp_designators}")
+    logger.info(f"Getting schematic data for components: {cmp_designators} (sheet={sheet!r})")
+    if not cmp_designators and not sheet:
+        return json.dumps({"error": "Provide cmp_designators and/or sheet"})
     
     # Execute the command in Altium to get schematic data
     response = await altium_bridge.execute_command(
         "get_schematic_data",
-        {}  # No parameters needed for this command in the Altium script
+        {},  # No parameters needed for this command in the Altium script
+        use_cache=not refresh
     )
     
     # Check for success
@@ -766,23 +700,12 @@ async def get_schematic_data(ctx: Context, cmp_designators: list) -> str:
         else:
             schematic_list = schematic_data
         
-        # Filter components by designator
-        components = []
-        missing_designators = []
-        
-        for designator in cmp_designators:
-            found = False
-            for component in schematic_list:
-                if component.get("designator") == designator:
-                    components.append(component)
-                    found = True
-                    break
-            
-            if not found:
-                missing_designators.append(designator)
+        # Filter components by designator / sheet
+        components, missing_designators = ComponentIndex.of(schematic_list).select(
+            cmp_designators or None, sheet=sheet)
         
         result = {
-            "components": components,
+            "components": project(components, fields),
         }
         
         if missing_designators:
@@ -864,22 +787,40 @@ async def set_pcb_layer_visibility(ctx: Context, layer_names: list, visible: boo
     return json.dumps(result, indent=2)
 
 @mcp.tool()
-async def get_component_data(ctx: Context, cmp_designators: list) -> str:
+async def get_component_data(ctx: Context, cmp_designators: list = None, footprint: str = "",
+                             layer: str = "", fields: str = "", output_format: str = "json",
+                             refresh: bool = False) -> str:
     """
     Get all data for components in Altium
     
     Args:
-        cmp_designators (list): List of designators of the components (e.g., ["R1", "C5", "U3"])
+        cmp_designators (list, optional): List of designators of the components (e.g., ["R1", "C5", "U3"])
+        footprint (str, optional): Only components with this footprint (e.g. "0402_R")
+        layer (str, optional): Only components on this layer ("TopLayer" or "BottomLayer")
+            Filters can be combined with cmp_designators or used alone.
+        fields (str, optional): Comma-separated fields to return, e.g. "designator,x,y,rotation,layer".
+            Omit for every field.
+        output_format (str): "json" (default) or "columnar" - one array per field with
+            repeated strings (footprints, layers) stored once in a string table. Much smaller
+            for hundreds of components.
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
     
     Returns:
-        str: JSON object with all component data for requested designators
+        str: JSON object with all component data for requested designators. In columnar
+             format, "components" is {"format", "strings", "tables": {"components": {"count",
+             "columns", "string_fields"}}}; values of string_fields columns index "strings".
     """
-    logger.info(f"Getting data for components: {cmp_designators}")
+    logger.info(f"Getting data for components: {cmp_designators} (footprint={footprint!r}, layer={layer!r})")
+    if not cmp_designators and not footprint and not layer:
+        return json.dumps({"error": "Provide cmp_designators and/or a footprint or layer filter"})
+    if output_format not in columnar.FORMATS:
+        return json.dumps({"error": f"output_format must be one of {list(columnar.FORMATS)}"})
     
     # Execute the command in Altium to get all component data
     response = await altium_bridge.execute_command(
         "get_all_component_data",
-        {}  # No parameters needed for this command in the Altium script
+        {},  # No parameters needed for this command in the Altium script
+        use_cache=not refresh
     )
     
     # Check for success
@@ -902,23 +843,14 @@ async def get_component_data(ctx: Context, cmp_designators: list) -> str:
         else:
             component_list = component_data
         
-        # Filter components by designator
-        components = []
-        missing_designators = []
-        
-        for designator in cmp_designators:
-            found = False
-            for component in component_list:
-                if component.get("designator") == designator:
-                    components.append(component)
-                    found = True
-                    break
-            
-            if not found:
-                missing_designators.append(designator)
+        # Filter components by designator / footprint / layer
+        components, missing_designators = ComponentIndex.of(component_list).select(
+            cmp_designators or None, footprint=footprint, layer=layer)
+        components = project(components, fields)
         
         result = {
-            "components": components,
+            "components": columnar.encode_components(components)
+                          if output_format == "columnar" else components,
         }
         
         if missing_designators:
@@ -926,7 +858,7 @@ async def get_component_data(ctx: Context, cmp_designators: list) -> str:
             logger.info(f"Some designators not found: {missing_designators}")
         
         logger.info(f"Found data for {len(components)} components")
-        return json.dumps(result, indent=2)
+        return columnar.dumps(result, output_format)
     except Exception as e:
         logger.error(f"Error processing component data: {e}")
         return json.dumps({"error": f"Failed to process component data: {str(e)}"})
@@ -964,10 +896,13 @@ async def get_selected_components_coordinates(ctx: Context) -> str:
     return json.dumps(components_coords, indent=2)
 
 @mcp.tool()
-async def get_all_designators(ctx: Context) -> str:
+async def get_all_designators(ctx: Context, refresh: bool = False) -> str:
     """
     Get all component designators from the current Altium board
     
+    Args:
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
+    
     Returns:
         str: JSON array of all component designators on the current board
     """
@@ -976,7 +911,8 @@ async def get_all_designators(ctx: Context) -> str:
     # Execute the command in Altium to get all component data
     response = await altium_bridge.execute_command(
         "get_all_component_data",
-        {}  # No parameters needed
+        {},  # No parameters needed
+        use_cache=not refresh
     )
     
     # Check for success
@@ -1009,12 +945,21 @@ async def get_all_designators(ctx: Context) -> str:
         return json.dumps({"error": f"Failed to process component data: {str(e)}"})
 
 @mcp.tool()
-async def get_component_pins(ctx: Context, cmp_designators: list) -> str:
+async def get_component_pins(ctx: Context, cmp_designators: list, fields: str = "",
+                             output_format: str = "json", refresh: bool = False) -> str:
     """
     Get pin data for components in Altium
 
     Args:
         cmp_designators (list): List of designators of the components (e.g., ["R1", "C5", "U3"])
+        fields (str, optional): Comma-separated fields to return, e.g. "designator,x,y,rotation,layer".
+            Omit for every field. Nested lists (pins) get the same selection unless named
+            ("pins" keeps them whole, "pins.x" selects inside).
+            E.g. "x,y,net" trims components to designator/x/y and pins to x/y/net.
+        output_format (str): "json" (default) or "columnar" - a "components" table and a flat
+            "pins" table (with a designator column), one array per field, repeated strings
+            (nets, layers, shapes) stored once in a string table.
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
 
     Returns:
         str: JSON array, one entry per component with its placement info
@@ -1030,11 +975,14 @@ async def get_component_pins(ctx: Context, cmp_designators: list) -> str:
              - net, layer, width, height, shape
     """
     logger.info(f"Getting pin data for components: {cmp_designators}")
+    if output_format not in columnar.FORMATS:
+        return json.dumps({"error": f"output_format must be one of {list(columnar.FORMATS)}"})
     
     # Execute the command in Altium to get pin data
     response = await altium_bridge.execute_command(
         "get_component_pins",
-        {"designators": cmp_designators}  # Pass the list of designators
+        {"designators": cmp_designators},  # Pass the list of designators
+        use_cache=not refresh
     )
     
     # Check for success
@@ -1051,8 +999,96 @@ async def get_component_pins(ctx: Context, cmp_designators: list) -> str:
         return json.dumps({"message": "No pin data found for the specified components"})
     
     logger.info(f"Retrieved pin data for components")
+    pins_data = project(pins_data, fields)
+    if output_format == "columnar" and isinstance(pins_data, list):
+        return columnar.dumps(columnar.encode_component_pins(pins_data), "columnar")
     return json.dumps(pins_data, indent=2)
 
+# Read-only bridge commands that are safe to combine in run_command_batch
+BATCH_COMMANDS = (
+    "get_component_pins",
+    "get_net_connections",
+    "get_selected_components_coordinates",
+    "get_all_component_data",
+    "get_schematic_data",
+    "get_all_nets",
+    "get_pcb_rules",
+    "get_pcb_layers",
+    "get_pcb_layer_stackup",
+)
+
+@mcp.tool()
+async def run_command_batch(ctx: Context, commands: list) -> str:
+    """
+    Run several read-only Altium queries in ONE script run.
+
+    Every separate tool call is a full round trip into Altium; when you need
+    several independent pieces of data (e.g. pins and net connectivity for
+    the same parts, plus the rule list), fetch them here in one go.
+
+    Args:
+        commands (list): Ordered list of {"command": str, "params": dict}.
+            Supported commands and their params (names as the Altium
+            script expects them):
+            - get_component_pins: {"designators": [...]} (omit = selection)
+            - get_net_connections: {"designators": [...]} (omit = selection)
+            - get_selected_components_coordinates: {}
+            - get_all_component_data: {}
+            - get_schematic_data: {}
+            - get_all_nets: {}
+            - get_pcb_rules: {}
+            - get_pcb_layers: {}
+            - get_pcb_layer_stackup: {}
+
+    Example:
+        commands=[{"command": "get_component_pins", "params": {"designators": ["C12"]}},
+                  {"command": "get_net_connections", "params": {"designators": ["C12"]}}]
+
+    Returns:
+        str: JSON array with one {command, success, result | error} entry per
+             command, in order. Results are the raw script data (for
+             get_net_connections: the flat pad list, not the per-net summary
+             the get_net_connections tool builds).
+    """
+    batch = []
+    errors = []
+    for idx, entry in enumerate(commands):
+        if not isinstance(entry, dict) or not entry.get("command"):
+            errors.append(f"commands[{idx}] must be an object with a command")
+            continue
+        command = str(entry["command"])
+        if command not in BATCH_COMMANDS:
+            errors.append(f"commands[{idx}]: '{command}' is not a supported batch command")
+            continue
+        params = entry.get("params") or {}
+        if not isinstance(params, dict):
+            errors.append(f"commands[{idx}] params must be an object")
+            continue
+        batch.append((command, params))
+
+    if errors:
+        return json.dumps({"success": False, "error": "; ".join(errors)})
+    if not batch:
+        return json.dumps({"success": False, "error": "No commands provided"})
+
+    logger.info(f"Running command batch: {[c for c, _ in batch]}")
+    results = await altium_bridge.execute_batch(batch)
+    out = []
+    for (command, _), response in zip(batch, results):
+        result = response.get("result")
+        if isinstance(result, str):
+            try:
+                result = json.loads(result)
+            except json.JSONDecodeError:
+                pass
+        entry = {"command": command, "success": response.get("success", False)}
+        if entry["success"]:
+            entry["result"] = result
+        else:
+            entry["error"] = response.get("error", "Unknown error")
+        out.append(entry)
+    return json.dumps(out, indent=2)
+
 SANDBOX_DIR = MCP_DIR / "SandboxScript"
 SANDBOX_PAS = SANDBOX_DIR / "Sandbox.pas"
 SANDBOX_PRJ = SANDBOX_DIR / "Sandbox.PrjScr"
@@ -1168,14 +1204,20 @@ async def run_altium_script(ctx: Context, script: str, timeout_seconds: int = 12
             except OSError:
                 pass
 
+    # A sandbox script can change anything, so cached reads are no longer trusted
+    altium_bridge.cache.invalidate()
+
     cmd = (f'"{altium_bridge.config.altium_exe_path}" -RScriptingSystem:RunScript('
            f'ProjectName="{SANDBOX_PRJ}"^|ProcName="Sandbox>Run")')
     subprocess.Popen(cmd, shell=True)
 
     start = time.time()
     dialogs = 0
-    while not SANDBOX_RESULT.exists() and time.time() - start < timeout_seconds:
-        await asyncio.sleep(0.5)
+    # Wake as soon as the result appears, but look for blocking dialogs
+    # every 0.5 s once the script has had time to start
+    while time.time() - start < timeout_seconds:
+        if await altium_bridge.waiter.wait(SANDBOX_RESULT, 0.5):
+            break
         if time.time() - start > 6:
             dialogs += _dismiss_altium_dialogs()
 
@@ -1269,7 +1311,8 @@ async def ensure_altium_script_skill(ctx: Context, install: bool = False) -> str
 
 
 @mcp.tool()
-async def get_footprint_primitives(ctx: Context, library_path: str = "", footprint_name: str = "") -> str:
+async def get_footprint_primitives(ctx: Context, library_path: str = "", footprint_name: str = "",
+                                   fields: str = "", limit: int = 0, cursor: str = "") -> str:
     """
     Read the primitives of footprints in a PCB library (.PcbLib).
 
@@ -1293,13 +1336,22 @@ async def get_footprint_primitives(ctx: Context, library_path: str = "", footpri
             the currently focused PCB library (an already-open library is
             only focused, never reloaded).
         footprint_name (str, optional): Exact footprint name, or "*".
+        fields (str, optional): Comma-separated primitive fields to return,
+            e.g. "x,y,layer,top_x_size,top_y_size". Omit for every field.
+            Footprint names and primitive types are always kept; the
+            footprints and primitives lists get the same selection.
+        limit (int, optional): Page size in footprints (inventory and "*") or primitives (single footprint). 0 (default) returns everything at once.
+        cursor (str, optional): next_cursor from a previous page. Pages come from a server-side
+            copy of the first call's result (no new Altium query) until the design changes.
 
     Returns:
         str: JSON - inventory: {library_name, footprint_count, footprints:
              [{name, description, <type counts>}]}; dump: primitives list
-             per footprint
+             per footprint. Paged results add total, offset and next_cursor.
     """
     logger.info(f"Getting footprint primitives (library={library_path}, footprint={footprint_name})")
+    if cursor:
+        return json.dumps(altium_bridge.pager.page("get_footprint_primitives", cursor, limit), indent=2)
 
     response = await altium_bridge.execute_command(
         "get_footprint_primitives",
@@ -1311,6 +1363,17 @@ async def get_footprint_primitives(ctx: Context, library_path: str = "", footpri
         return json.dumps({"success": False, "error": f"Failed to get footprint primitives: {error_msg}"})
 
     result = response.get("result", {})
+    if fields or limit:
+        if isinstance(result, str):
+            try:
+                result = json.loads(result)
+            except json.JSONDecodeError as e:
+                return json.dumps({"success": False, "error": f"Failed to get footprint primitives: invalid JSON from script: {e}"})
+        result = project(result, fields)
+        list_key = list_key_for(result, ("footprints", "primitives"))
+        if limit and list_key:
+            return json.dumps(altium_bridge.pager.start("get_footprint_primitives", result, list_key, limit),
+                              indent=2)
     return json.dumps(result, indent=2) if not isinstance(result, str) else result
 
 @mcp.tool()
@@ -1398,7 +1461,8 @@ async def create_symbols_batch(ctx: Context, spec_file: str) -> str:
     return json.dumps(result, indent=2) if not isinstance(result, str) else result
 
 @mcp.tool()
-async def get_symbol_primitives(ctx: Context, library_path: str = "", symbol_name: str = "") -> str:
+async def get_symbol_primitives(ctx: Context, library_path: str = "", symbol_name: str = "",
+                                fields: str = "", limit: int = 0, cursor: str = "") -> str:
     """
     Read the graphic primitives of symbols in a schematic library (.SchLib).
 
@@ -1417,14 +1481,23 @@ async def get_symbol_primitives(ctx: Context, library_path: str = "", symbol_nam
         library_path (str, optional): Full path to the .SchLib file to open.
             Omit to use the schematic library currently focused in Altium.
         symbol_name (str, optional): Exact symbol (LibReference) name to dump.
+        fields (str, optional): Comma-separated primitive fields to return,
+            e.g. "x,y,number,name". Omit for every field. Symbol names and
+            primitive types are always kept; the symbols and primitives
+            lists get the same selection.
+        limit (int, optional): Page size in symbols (inventory) or primitives (dump). 0 (default) returns everything at once.
+        cursor (str, optional): next_cursor from a previous page. Pages come from a server-side
+            copy of the first call's result (no new Altium query) until the design changes.
 
     Returns:
         str: JSON object - inventory mode: {library_name, symbol_count,
              symbols: [{name, description, part_count, <type counts>}]};
              dump mode: {library_name, symbol_name, description, part_count,
-             primitives: [...]}
+             primitives: [...]}. Paged results add total, offset and next_cursor.
     """
     logger.info(f"Getting symbol primitives (library={library_path}, symbol={symbol_name})")
+    if cursor:
+        return json.dumps(altium_bridge.pager.page("get_symbol_primitives", cursor, limit), indent=2)
 
     response = await altium_bridge.execute_command(
         "get_symbol_primitives",
@@ -1437,21 +1510,47 @@ async def get_symbol_primitives(ctx: Context, library_path: str = "", symbol_nam
         return json.dumps({"success": False, "error": f"Failed to get symbol primitives: {error_msg}"})
 
     result = response.get("result", {})
+    if fields or limit:
+        if isinstance(result, str):
+            try:
+                result = json.loads(result)
+            except json.JSONDecodeError as e:
+                return json.dumps({"success": False, "error": f"Failed to get symbol primitives: invalid JSON from script: {e}"})
+        result = project(result, fields)
+        list_key = list_key_for(result, ("symbols", "primitives"))
+        if limit and list_key:
+            return json.dumps(altium_bridge.pager.start("get_symbol_primitives", result, list_key, limit),
+                              indent=2)
     return json.dumps(result, indent=2) if not isinstance(result, str) else result
 
 @mcp.tool()
-async def get_all_nets(ctx: Context) -> str:
+async def get_all_nets(ctx: Context, limit: int = 0, cursor: str = "", refresh: bool = False) -> str:
     """
     Return every unique net name in the active PCB document.
 
+    Parameters
+    ----------
+    limit : int
+        Page size in nets. 0 (default) returns everything at once.
+    cursor : str
+        next_cursor from a previous page. Pages come from a server-side copy
+        of the first call's result (no new Altium query) until the design
+        changes.
+    refresh : bool
+        Bypass the read cache and re-read from Altium. Default False.
+
     Returns
     -------
     str :
-        A JSON array of net names, e.g. ["GND", "VCC33", "USB_D+", ...]
+        A JSON array of net names, e.g. ["GND", "VCC33", "USB_D+", ...].
+        With limit or cursor: {"nets": [...], "total", "offset", "next_cursor"}
+        (next_cursor is null on the last page).
     """
     logger.info("Getting all nets")
+    if cursor:
+        return json.dumps(altium_bridge.pager.page("get_all_nets", cursor, limit), indent=2)
 
-    response = await altium_bridge.execute_command("get_all_nets", {})
+    response = await altium_bridge.execute_command("get_all_nets", {}, use_cache=not refresh)
 
     if not response.get("success", False):
         error_msg = response.get("error", "Unknown error")
@@ -1459,6 +1558,9 @@ async def get_all_nets(ctx: Context) -> str:
         return json.dumps({"error": f"Failed to get nets: {error_msg}"})
 
     # Result is already a JSON‑serialisable Python list
+    if limit:
+        return json.dumps(altium_bridge.pager.start("get_all_nets", response.get("result", []),
+                                                    "nets", limit), indent=2)
     return json.dumps(response.get("result", []), indent=2)
 
 @mcp.tool()
@@ -1606,45 +1708,17 @@ async def place_components(ctx: Context, placements: list) -> str:
     """
     logger.info(f"Placing {len(placements)} components")
 
-    # Flatten each placement into a pipe-delimited string
-    # ('Designator|X|Y|Rotation|Layer') - the DelphiScript side parses the
-    # request line by line, so nested JSON objects are not safe to send
-    entries = []
-    errors = []
-    for idx, placement in enumerate(placements):
-        if not isinstance(placement, dict):
-            errors.append(f"placements[{idx}] must be an object")
-            continue
-
-        designator = str(placement.get("designator", "")).strip()
-        x = placement.get("x")
-        y = placement.get("y")
-
-        if not designator or x is None or y is None:
-            errors.append(f"placements[{idx}] must include designator, x, and y")
-            continue
-        if "|" in designator:
-            errors.append(f"placements[{idx}] designator must not contain '|'")
-            continue
-
-        rotation = placement.get("rotation", -1)
-        layer = str(placement.get("layer", "") or "").strip().lower()
-        if layer not in ("", "top", "bottom"):
-            errors.append(f"placements[{idx}] layer must be 'top' or 'bottom'")
-            continue
-
-        try:
-            entry = f"{designator}|{float(x)}|{float(y)}|{float(rotation)}|{layer}"
-        except (TypeError, ValueError):
-            errors.append(f"placements[{idx}] x, y, and rotation must be numbers")
-            continue
-        entries.append(entry)
-
+    placements, errors = parse_placements(placements)
     if errors:
         return json.dumps({"success": False, "error": "; ".join(errors)})
-    if not entries:
+    if not placements:
         return json.dumps({"success": False, "error": "No placements provided"})
 
+    # Flatten each placement into a pipe-delimited string
+    # ('Designator|X|Y|Rotation|Layer') - the DelphiScript side parses the
+    # request line by line, so nested JSON objects are not safe to send
+    entries = [f"{p['designator']}|{p['x']}|{p['y']}|{p['rotation']}|{p['layer']}" for p in placements]
+
     response = await altium_bridge.execute_command(
         "place_components",
         {"placements": entries}
@@ -1659,30 +1733,179 @@ async def place_components(ctx: Context, placements: list) -> str:
     logger.info(f"Placed components successfully")
     return json.dumps({"success": True, "result": result}, indent=2)
 
-def _mst_length(points: list) -> float:
-    """Minimum-spanning-tree length over (x, y) points (Prim's algorithm)."""
-    n = len(points)
-    if n < 2:
-        return 0.0
-    import math
-    in_tree = [False] * n
-    best = [float("inf")] * n
-    best[0] = 0.0
-    total = 0.0
-    for _ in range(n):
-        u = min((i for i in range(n) if not in_tree[i]), key=lambda i: best[i])
-        in_tree[u] = True
-        total += best[u]
-        ux, uy = points[u]
-        for v in range(n):
-            if not in_tree[v]:
-                d = math.dist((ux, uy), points[v])
-                if d < best[v]:
-                    best[v] = d
-    return total
+async def _load_components_and_pins(refresh: bool = False, with_pins: bool = True):
+    """Cached component and (optionally) pin dumps of the open PCB ->
+    (components, pins, error message)"""
+    response = await altium_bridge.execute_command("get_all_component_data", {}, use_cache=not refresh)
+    if not response.get("success", False):
+        return None, None, f"Failed to get component data: {response.get('error', 'Unknown error')}"
+    components = response.get("result", [])
+    if isinstance(components, str):
+        components = json.loads(components)
+    if not with_pins:
+        return components, None, None
+
+    designators = [c["designator"] for c in components if c.get("designator")]
+    response = await altium_bridge.execute_command(
+        "get_component_pins", {"designators": designators}, use_cache=not refresh)
+    if not response.get("success", False):
+        return None, None, f"Failed to get pin data: {response.get('error', 'Unknown error')}"
+    pins = response.get("result", [])
+    if isinstance(pins, str):
+        pins = json.loads(pins)
+    return components, pins, None
+
+async def _load_board_model(refresh: bool = False):
+    """BoardModel of the open PCB -> (model, error message)"""
+    components, pins, error = await _load_components_and_pins(refresh)
+    if error:
+        return None, error
+    return BoardModel.of(components, pins), None
+
+async def _load_board_index(refresh: bool = False, with_pads: bool = False):
+    """BoardIndex of the open PCB -> (index, error message)"""
+    components, pins, error = await _load_components_and_pins(refresh, with_pins=with_pads)
+    if error:
+        return None, error
+    return BoardIndex.of(components, pins), None
+
+async def _load_net_graph(refresh: bool = False):
+    """NetGraph of the open PCB -> (graph, error message)"""
+    components, pins, error = await _load_components_and_pins(refresh)
+    if error:
+        return None, error
+    return NetGraph.of(pins), None
+
+@mcp.tool()
+async def score_placement(ctx: Context, placements: list, net_weights: dict = None,
+                          cmp_designators: list = None, max_pads_per_net: int = 40,
+                          refresh: bool = False) -> str:
+    """
+    Score a hypothetical placement without moving anything in Altium.
+
+    Applies the placements to a local model of the board (component
+    positions, bounding boxes and rotation-0 pad offsets, read once and
+    reused until the design changes) and returns the same metrics for the
+    proposed and the current placement. Use it to compare candidate
+    layouts in milliseconds, then commit the winner with place_components.
+
+    Metrics, over the scoped components:
+    - weighted_airline_mils: sum over the nets touching them of the net's
+      minimum-spanning-tree airline length times its weight
+    - overlap_count / overlap_area_sq_mils: same-side bounding-box
+      intersections involving a scoped component (any overlap is a
+      conflict; confirm near-misses with check_placement)
+    - cluster_width/height/area: the box around the scoped components
+
+    Pads are predicted the way get_component_pins documents: mirror dx on
+    the bottom side, rotate (dx, dy) counterclockwise by the rotation, add
+    x/y. Bounding boxes are taken as centered on the component origin.
+
+    Args:
+        placements (list): Same format as place_components: [{"designator",
+            "x", "y", optional "rotation" (-1 keeps), optional "layer"
+            ("top"/"bottom")}, ...]. Positions in mils.
+        net_weights (dict, optional): Net name -> weight, e.g.
+            {"SW": 5, "VIN": 3, "EN": 0.2}. Default weight 1; 0 ignores a net.
+        cmp_designators (list, optional): Components to score (the cluster).
+            Default: the components in placements.
+        max_pads_per_net (int): Nets with more pads (planes like GND) are
+            left out of the airline unless named in net_weights. Default 40.
+        refresh (bool): Re-read the board from Altium instead of the cached
+            model. Default False.
+
+    Returns:
+        str: JSON object with scope, missing_designators, proposed / current
+             / delta metrics, the proposed overlaps [{a, b, overlap_x_mils,
+             overlap_y_mils}], and per-net rows {net, weight, pad_count,
+             airline_mils, current_airline_mils} sorted biggest
+             regression first.
+    """
+    logger.info(f"Scoring placement of {len(placements) if isinstance(placements, list) else '?'} components")
+    placements, errors = parse_placements(placements)
+    if errors:
+        return json.dumps({"success": False, "error": "; ".join(errors)})
+    if not placements and not cmp_designators:
+        return json.dumps({"success": False, "error": "No placements provided"})
+
+    model, error = await _load_board_model(refresh)
+    if model is None:
+        logger.error(f"Error loading board model: {error}")
+        return json.dumps({"success": False, "error": error})
+
+    result = evaluate_placement(model, placements, net_weights=net_weights,
+                                cmp_designators=cmp_designators, max_pads_per_net=max_pads_per_net)
+    logger.info(f"Placement score: {result['proposed']}")
+    return json.dumps(result, indent=2)
+
+@mcp.tool()
+async def optimize_placement(ctx: Context, cmp_designators: list, net_weights: dict = None,
+                             keep_in: list = None, clearance_mils: float = 10.0,
+                             allow_rotation: bool = True, grid_mils: float = 1.0,
+                             time_budget_s: float = 2.0, seed: int = 0,
+                             max_pads_per_net: int = 40, refresh: bool = False) -> str:
+    """
+    Place a cluster of components by simulated annealing, locally.
+
+    Runs on the same cached board model as score_placement - nothing moves
+    in Altium. The components in cmp_designators move inside keep_in;
+    everything else is fixed. The cost combines:
+    - per-net airline (MST) length times the net's weight; plane nets
+      named in net_weights count each cluster pad's distance to the
+      nearest fixed pad of the net instead
+    - overlap of courtyards (bounding boxes grown by clearance_mils / 2),
+      so parts end up at least clearance_mils apart where possible
+    Rotations are limited to 0/90/180/270. Sides never change.
+
+    Review the result, then apply it with place_components(placements).
+
+    Args:
+        cmp_designators (list): The cluster to place, e.g. ["U3", "C12", "L2"].
+            50-200 parts is fine within the default budget.
+        net_weights (dict, optional): Net name -> criticality weight, e.g.
+            {"SW": 10, "FB": 5}. Default 1; 0 ignores a net.
+        keep_in (list, optional): [xmin, ymin, xmax, ymax] in mils. Default:
+            the cluster's current bounding box grown by 20% on each side.
+        clearance_mils (float): Minimum part-to-part spacing. Default 10.
+        allow_rotation (bool): Try orthogonal rotations. Default True.
+        grid_mils (float): Snap positions to this grid (0 = off). Default 1.
+        time_budget_s (float): Search time, capped at 30 s. Default 2.
+        seed (int): Random seed, for repeatable runs. Default 0.
+        max_pads_per_net (int): Nets with more pads (planes like GND) are
+            scored only when named in net_weights. Default 40.
+        refresh (bool): Re-read the board from Altium. Default False.
+
+    Returns:
+        str: JSON object with placements (ready for place_components, only
+             the parts that moved), current / proposed / delta metrics as in
+             score_placement, remaining box overlaps, clearance_violations,
+             and optimizer stats (iterations, accepted, elapsed_ms, costs).
+    """
+    if not cmp_designators:
+        return json.dumps({"success": False, "error": "No cmp_designators provided"})
+    logger.info(f"Optimizing placement of {len(cmp_designators)} components")
+
+    model, error = await _load_board_model(refresh)
+    if model is None:
+        logger.error(f"Error loading board model: {error}")
+        return json.dumps({"success": False, "error": error})
+
+    try:
+        # CPU-bound for up to time_budget_s: keep the event loop responsive
+        result = await asyncio.to_thread(
+            anneal_placement, model, cmp_designators, net_weights=net_weights, keep_in=keep_in,
+            clearance_mils=clearance_mils, allow_rotation=allow_rotation, grid_mils=grid_mils,
+            time_budget_s=min(max(float(time_budget_s), 0.1), 30.0), seed=seed,
+            max_pads_per_net=max_pads_per_net)
+    except ValueError as e:
+        return json.dumps({"success": False, "error": str(e)})
+
+    logger.info(f"Placement optimized: {result['optimizer']}")
+    return json.dumps(result, indent=2)
 
 @mcp.tool()
-async def get_net_connections(ctx: Context, cmp_designators: list = None, max_pads_per_net: int = 40) -> str:
+async def get_net_connections(ctx: Context, cmp_designators: list = None, max_pads_per_net: int = 40,
+                              limit: int = 0, cursor: str = "", refresh: bool = False) -> str:
     """
     Get net connectivity and airline (unrouted connection) lengths for the
     nets touching the given components.
@@ -1693,29 +1916,42 @@ async def get_net_connections(ctx: Context, cmp_designators: list = None, max_pa
     airline length in mils. Shorter airlines on critical nets (switching
     loops, input/output capacitors) mean a better placement; non-critical
     nets (enables, set resistors, feedback dividers) may be lengthened to
-    buy routing space. Plane nets like GND have many pads and a meaningless
-    airline - judge them by proximity to plane connections instead.
+    buy routing space. Plane nets like GND have many pads and an airline
+    that mostly reflects board size - judge them by proximity to plane
+    connections instead.
 
     Args:
         cmp_designators (list, optional): Components whose nets to analyze
             (e.g. ["U12", "R42"]). Omit to use the current Altium selection.
         max_pads_per_net (int): Nets with more pads than this (e.g. GND)
             return only pads belonging to the given components, plus the
-            total pad_count. Their airline is also skipped. Default 40.
+            total pad_count. Their airline still covers every pad on the
+            net. Default 40.
+        limit (int, optional): Page size in nets (nets are sorted longest
+            airline first, large nets last). 0 (default) returns everything
+            at once.
+        cursor (str, optional): next_cursor from a previous page. Pages come
+            from a server-side copy of the first call's result (no new
+            Altium query) until the design changes.
+        refresh (bool): Bypass the read cache and re-read from Altium.
+            Default False.
 
     Returns:
         str: JSON object with one entry per net: pad_count,
-             airline_mst_mils (None for large nets), and pads
+             airline_mst_mils, and pads
              [{designator, pin, x, y}, ...] in mils relative to the board
-             origin. Large nets set pads_truncated=true.
+             origin. Large nets set pads_truncated=true. Paged results add
+             total, offset and next_cursor.
     """
     logger.info(f"Getting net connections (designators={cmp_designators})")
+    if cursor:
+        return json.dumps(altium_bridge.pager.page("get_net_connections", cursor, limit), indent=2)
 
     params = {}
     if cmp_designators:
         params["designators"] = cmp_designators
 
-    response = await altium_bridge.execute_command("get_net_connections", params)
+    response = await altium_bridge.execute_command("get_net_connections", params, use_cache=not refresh)
 
     if not response.get("success", False):
         error_msg = response.get("error", "Unknown error")
@@ -1736,37 +1972,28 @@ async def get_net_connections(ctx: Context, cmp_designators: list = None, max_pa
     out_nets = []
     for name in result.get("net_names", []):
         pads = nets.get(name, [])
-        entry = {"net": name, "pad_count": len(pads)}
-        if len(pads) <= max_pads_per_net:
-            entry["airline_mst_mils"] = round(_mst_length([(p["x"], p["y"]) for p in pads]), 1)
-            entry["pads"] = [
-                {"designator": p["designator"], "pin": p["pin"], "x": p["x"], "y": p["y"]}
-                for p in pads
-            ]
-        else:
-            entry["airline_mst_mils"] = None
+        entry = {"net": name, "pad_count": len(pads),
+                 "airline_mst_mils": round(mst_length([(p["x"], p["y"]) for p in pads]), 1)}
+        if len(pads) > max_pads_per_net:
             entry["pads_truncated"] = True
-            entry["pads"] = [
-                {"designator": p["designator"], "pin": p["pin"], "x": p["x"], "y": p["y"]}
-                for p in pads
-                if not target_set or p["designator"] in target_set
-            ]
+            pads = [p for p in pads if not target_set or p["designator"] in target_set]
+        entry["pads"] = [
+            {"designator": p["designator"], "pin": p["pin"], "x": p["x"], "y": p["y"]}
+            for p in pads
+        ]
         out_nets.append(entry)
 
-    out_nets.sort(key=lambda e: (e["airline_mst_mils"] is None, -(e["airline_mst_mils"] or 0)))
+    out_nets.sort(key=lambda e: (e.get("pads_truncated", False), -e["airline_mst_mils"]))
 
     logger.info(f"Net connections: {len(out_nets)} nets")
+    if limit:
+        return json.dumps(altium_bridge.pager.start(
+            "get_net_connections", {"net_count": len(out_nets), "nets": out_nets}, "nets", limit), indent=2)
     return json.dumps({"net_count": len(out_nets), "nets": out_nets}, indent=2)
 
-def _rotate_offset(dx: float, dy: float, degrees: float) -> tuple:
-    """Rotate a rotation-0 pad offset counterclockwise by the given angle."""
-    import math
-    rad = math.radians(degrees)
-    return (dx * math.cos(rad) - dy * math.sin(rad),
-            dx * math.sin(rad) + dy * math.cos(rad))
-
 @mcp.tool()
-async def check_orientation(ctx: Context, cmp_designators: list = None, min_improvement_mils: float = 25) -> str:
+async def check_orientation(ctx: Context, cmp_designators: list = None, min_improvement_mils: float = 25,
+                            joint: bool = False) -> str:
     """
     Advisory check: find 2-pad passives whose rotation could be improved.
 
@@ -1792,44 +2019,50 @@ async def check_orientation(ctx: Context, cmp_designators: list = None, min_impr
     bbox_changes=true is applied (a 90-degree change alters the body
     outline), re-run check_placement afterwards.
 
+    Per-part suggestions each assume every other part stays as it is, so
+    neighbours on a shared net can suggest turns that undo each other.
+    joint=True instead searches the rotations of all target parts together
+    and minimizes one board score: each routable net's airline length,
+    counted once, plus each plane-net pad's distance to the nearest pad of
+    a part outside the target set. It returns one consistent batch of
+    rotations. It handles a whole board (thousands of passives) in seconds.
+
     Args:
         cmp_designators (list, optional): Components to check. Omit to use
             the current Altium selection. Components with more or fewer than
             2 pads are skipped.
         min_improvement_mils (float): Only report components where the best
             rotation improves the connection score by at least this many
-            mils (default 25).
+            mils (default 25). In joint mode, a part is only turned if that
+            improves the board score by at least this much.
+        joint (bool): Search all rotations together (see above). Default False.
 
     Returns:
         str: JSON object with checked_count and suggestions, each having
              designator, current_rotation, suggested_rotation,
              improvement_mils, bbox_changes, and a per-pad breakdown of
              nearest same-net distances at the current vs suggested rotation.
+             In joint mode: checked_count, rounds, initial/final_score_mils,
+             improvement_mils, rotations (designator, current_rotation,
+             suggested_rotation, bbox_changes) and the same batch as
+             place_components placements.
     """
-    import math
-
     logger.info(f"Checking orientation (designators={cmp_designators})")
 
-    # Resolve the target designators from the selection when not given
-    if not cmp_designators:
-        sel_resp = await altium_bridge.execute_command("get_selected_components_coordinates", {})
-        if not sel_resp.get("success", False):
-            return json.dumps({"success": False, "error": sel_resp.get("error", "Unknown error")})
-        sel = sel_resp.get("result", [])
-        if isinstance(sel, str):
-            sel = json.loads(sel)
-        cmp_designators = [c["designator"] for c in sel if "designator" in c]
-        if not cmp_designators:
-            return json.dumps({"success": False, "error": "No components selected and no designators given"})
-
-    pins_resp = await altium_bridge.execute_command("get_component_pins", {"designators": cmp_designators})
+    # Pins and net connectivity come back from a single script run; with
+    # no designators given, both commands use the current Altium selection
+    params = {"designators": cmp_designators} if cmp_designators else {}
+    pins_resp, nets_resp = await altium_bridge.execute_batch([
+        ("get_component_pins", params),
+        ("get_net_connections", params),
+    ])
+
     if not pins_resp.get("success", False):
         return json.dumps({"success": False, "error": pins_resp.get("error", "Unknown error")})
     comps = pins_resp.get("result", [])
     if isinstance(comps, str):
         comps = json.loads(comps)
 
-    nets_resp = await altium_bridge.execute_command("get_net_connections", {"designators": cmp_designators})
     if not nets_resp.get("success", False):
         return json.dumps({"success": False, "error": nets_resp.get("error", "Unknown error")})
     net_data = nets_resp.get("result", {})
@@ -1841,63 +2074,14 @@ async def check_orientation(ctx: Context, cmp_designators: list = None, min_impr
     for p in net_data.get("pads", []):
         net_pads.setdefault(p["net"], []).append((p["designator"], p["x"], p["y"]))
 
-    PLANE_NET_PAD_COUNT = 40  # nets above this are treated as planes
+    if joint:
+        result = optimize_rotations(comps, net_pads, min_improvement_mils)
+        logger.info(f"Joint orientation: {len(result['rotations'])} rotations from "
+                    f"{result['checked_count']} components, {result['improvement_mils']} mils")
+        return json.dumps({"mode": "joint", "min_improvement_mils": min_improvement_mils,
+                           "rotation_count": len(result["rotations"]), **result}, indent=2)
 
-    suggestions = []
-    checked = 0
-    for comp in comps:
-        pins = comp.get("pins", [])
-        if len(pins) != 2 or "x" not in comp:
-            continue
-        mirror = comp.get("layer") == "Bottom Layer"
-
-        def score(rotation):
-            """Hybrid per-pad score (see docstring); None if no pad scores."""
-            total, detail = 0.0, []
-            for pin in pins:
-                net = pin.get("net", "")
-                cands = [(x, y) for (d, x, y) in net_pads.get(net, [])
-                         if d != comp["designator"]] if net else []
-                if not cands:
-                    continue
-                dx = -pin["dx"] if mirror else pin["dx"]
-                ox, oy = _rotate_offset(dx, pin["dy"], rotation)
-                px, py = comp["x"] + ox, comp["y"] + oy
-                if len(cands) > PLANE_NET_PAD_COUNT:
-                    value = min(math.dist((px, py), c) for c in cands)
-                    metric = "nearest_return_mils"
-                else:
-                    value = _mst_length(cands + [(px, py)])
-                    metric = "net_airline_mils"
-                total += value
-                detail.append({"pin": pin["name"], "net": net, metric: round(value, 1)})
-            return (total, detail) if detail else None
-
-        current = comp.get("rotation", 0) % 360
-        cur = score(current)
-        if cur is None:
-            continue
-        checked += 1
-
-        best_rot, best = current, cur
-        for r in (0, 90, 180, 270):
-            s = score(r)
-            if s is not None and s[0] < best[0]:
-                best_rot, best = r, s
-
-        improvement = cur[0] - best[0]
-        if best_rot != current and improvement >= min_improvement_mils:
-            suggestions.append({
-                "designator": comp["designator"],
-                "current_rotation": current,
-                "suggested_rotation": best_rot,
-                "improvement_mils": round(improvement, 1),
-                "bbox_changes": (best_rot - current) % 180 != 0,
-                "current_pads": cur[1],
-                "suggested_pads": best[1],
-            })
-
-    suggestions.sort(key=lambda s: -s["improvement_mils"])
+    suggestions, checked = check_rotations(comps, net_pads, min_improvement_mils)
     logger.info(f"Orientation check: {len(suggestions)} suggestions from {checked} components")
     return json.dumps({
         "checked_count": checked,
@@ -1907,15 +2091,18 @@ async def check_orientation(ctx: Context, cmp_designators: list = None, min_impr
     }, indent=2)
 
 @mcp.tool()
-async def check_placement(ctx: Context, cmp_designators: list = None, clearance_mils: float = 6) -> str:
+async def check_placement(ctx: Context, cmp_designators: list = None, clearance_mils: float = 6,
+                          full_board: bool = False, refresh: bool = False) -> str:
     """
     Verify component placement: find overlaps and clearance violations.
 
     Checks each target component against every other component on the same
-    side of the board. Bounding boxes (which include silkscreen) are used as
-    a fast prefilter; close pairs are then measured precisely with Altium's
+    side of the board. Close pairs are found locally with a spatial index
+    over the cached component bounding boxes (which include silkscreen);
+    only those pairs are sent to Altium and measured precisely with its
     primitive-to-primitive distance, so reported distances are true minimum
     distances between any primitives (pads, silk, etc.) of the two parts.
+    This makes a full-board check practical.
 
     Run this after placing components - a screenshot is not verification.
 
@@ -1924,22 +2111,64 @@ async def check_placement(ctx: Context, cmp_designators: list = None, clearance_
             Omit to check the components currently selected in Altium.
         clearance_mils (float): Minimum allowed primitive-to-primitive distance
             in mils (default 6). Pairs closer than this are reported.
+        full_board (bool): Check every component on the board instead of
+            cmp_designators / the selection. Default False.
+        refresh (bool): Re-read component boxes from Altium instead of the
+            read cache (use after moving parts by hand in Altium). Default False.
 
     Returns:
-        str: JSON object with checked_count, violation_count, and a violations
-             list. Each violation has a/b designators, type
-             ("bounding_box_overlap" = the parts' outlines intersect, or
-             "clearance" = distance below threshold), distance_mils (0 =
-             touching/overlapping copper or silk), overlap sizes when boxes
-             intersect, and the other part's x/y position. An empty violations
-             list means the placement is clean at the given clearance.
-    """
-    logger.info(f"Checking placement (designators={cmp_designators}, clearance={clearance_mils})")
-
-    params = {"clearance_mils": clearance_mils}
-    if cmp_designators:
-        params["designators"] = cmp_designators
+        str: JSON object with checked_count, candidate_pairs (pairs close
+             enough to measure), violation_count, and a violations list. Each
+             violation has a/b designators, type ("bounding_box_overlap" =
+             the parts' outlines intersect, or "clearance" = distance below
+             threshold), distance_mils (0 = touching/overlapping copper or
+             silk), overlap sizes when boxes intersect, and the other part's
+             x/y position. An empty violations list means the placement is
+             clean at the given clearance.
+    """
+    logger.info(f"Checking placement (designators={cmp_designators}, clearance={clearance_mils}, "
+                f"full_board={full_board})")
+    if clearance_mils <= 0:
+        clearance_mils = 6
+
+    index, error = await _load_board_index(refresh)
+    if index is None:
+        logger.error(f"Error loading component boxes: {error}")
+        return json.dumps({"success": False, "error": f"Failed to check placement: {error}"})
+
+    if full_board:
+        designators = list(index.designators)
+    elif cmp_designators:
+        designators = list(dict.fromkeys(str(d).strip() for d in cmp_designators))
+    else:
+        response = await altium_bridge.execute_command("get_selected_components_coordinates", {})
+        if not response.get("success", False):
+            error_msg = response.get("error", "Unknown error")
+            logger.error(f"Error getting selection: {error_msg}")
+            return json.dumps({"success": False, "error": f"Failed to check placement: {error_msg}"})
+        selected = response.get("result", [])
+        if isinstance(selected, str):
+            selected = json.loads(selected) if selected.strip() else []
+        designators = list(dict.fromkeys(c.get("designator") for c in selected if c.get("designator")))
+
+    targets = [index.index[d] for d in designators if d in index.index]
+    missing = [d for d in designators if d not in index.index]
+    if not targets:
+        return json.dumps({"success": False, "error": "Failed to check placement: no components to check "
+                           "(no designators given and no components selected)",
+                           "missing_designators": missing})
+
+    # Same prefilter distance the script used before measuring a pair
+    pairs = index.close_pairs(targets, clearance_mils + 25)
+    logger.info(f"Spatial prefilter: {len(pairs)} candidate pairs for {len(targets)} components")
+    result = {"checked_count": len(targets), "clearance_mils": clearance_mils,
+              "candidate_pairs": len(pairs), "close_pairs_measured": 0, "violation_count": 0,
+              "missing_designators": missing, "violations": []}
+    if not pairs:
+        return json.dumps(result, indent=2)
 
+    names = index.designators
+    params = {"clearance_mils": clearance_mils, "pairs": [f"{names[a]}|{names[b]}" for a, b in pairs]}
     response = await altium_bridge.execute_command("check_placement", params)
 
     if not response.get("success", False):
@@ -1947,12 +2176,318 @@ async def check_placement(ctx: Context, cmp_designators: list = None, clearance_
         logger.error(f"Error checking placement: {error_msg}")
         return json.dumps({"success": False, "error": f"Failed to check placement: {error_msg}"})
 
-    result = response.get("result", {})
-    logger.info(f"Placement check complete: {result.get('violation_count', '?')} violations")
+    measured = response.get("result", {})
+    if isinstance(measured, str):
+        measured = json.loads(measured)
+    result["close_pairs_measured"] = measured.get("close_pairs_measured", 0)
+    result["violations"] = measured.get("violations", [])
+    result["violation_count"] = len(result["violations"])
+    # designators the script no longer finds: the cached boxes are stale
+    for designator in measured.get("missing_designators", []):
+        if designator not in result["missing_designators"]:
+            result["missing_designators"].append(designator)
+    logger.info(f"Placement check complete: {result['violation_count']} violations")
     return json.dumps(result, indent=2)
 
 @mcp.tool()
-async def get_screenshot(ctx: Context, view_type: str = "pcb", zoom_to: list = None):
+async def check_clearance(ctx: Context, cmp_designators: list = None, clearance_mils: float = 6,
+                          kinds: list = None, refresh: bool = False) -> str:
+    """
+    Board-wide placement check computed locally from exported footprint geometry.
+
+    Exports the pads, tracks, arcs, fills and regions of every component once
+    (cached until the design changes), then measures every close same-side
+    pair in Python - a whole board in seconds, where check_placement measures
+    each pair inside Altium. Same result shape as check_placement. Arcs are
+    measured on 10-degree chords (at most 0.4% of the radius long); confirm
+    borderline results with check_placement.
+
+    Args:
+        cmp_designators (list, optional): Components to check (e.g. ["U12", "R42"]).
+            Omit to check the whole board.
+        clearance_mils (float): Minimum allowed primitive-to-primitive distance
+            in mils (default 6). Pairs closer than this are reported.
+        kinds (list, optional): Primitive kinds to measure, any of "pad",
+            "copper", "silk", "courtyard" (Mechanical 15 or a courtyard layer)
+            and "mechanical". Omit for all of them, like check_placement;
+            e.g. ["courtyard"] for a courtyard-overlap check.
+        refresh (bool): Re-export the geometry instead of using the read cache.
+            Default False.
+
+    Returns:
+        str: JSON object like check_placement's: checked_count, candidate_pairs,
+             close_pairs_measured, violation_count, missing_designators and
+             violations (a, b, layer, type, distance_mils, overlap sizes, b_x,
+             b_y), each violation with the kinds of the two closest primitives
+             in "closest".
+    """
+    logger.info(f"Checking clearance locally (designators={cmp_designators}, "
+                f"clearance={clearance_mils}, kinds={kinds})")
+    response = await altium_bridge.execute_command("get_component_geometry", {}, use_cache=not refresh)
+    if not response.get("success", False):
+        error_msg = response.get("error", "Unknown error")
+        logger.error(f"Error exporting component geometry: {error_msg}")
+        return json.dumps({"success": False, "error": f"Failed to export component geometry: {error_msg}"})
+    geometry = response.get("result", [])
+    if isinstance(geometry, str):
+        geometry = json.loads(geometry)
+
+    def run():
+        model = ClearanceModel.of(geometry, kinds)
+        return check_clearance_local(model, cmp_designators, clearance_mils)
+
+    try:
+        # CPU-bound on large boards: keep the event loop responsive
+        result = await asyncio.to_thread(run)
+    except ValueError as e:
+        return json.dumps({"success": False, "error": str(e)})
+    logger.info(f"Local clearance check complete: {result['violation_count']} violations "
+                f"in {result['candidate_pairs']} candidate pairs")
+    return json.dumps(result, indent=2)
+
+@mcp.tool()
+async def query_region(ctx: Context, x1: float, y1: float, x2: float, y2: float, layer: str = "",
+                       include_pads: bool = False, refresh: bool = False) -> str:
+    """
+    List the components (and optionally pads) in a rectangle of the board.
+
+    Answered locally from a spatial index over the cached component bounding
+    boxes and pad positions - no script run once the board data is cached.
+
+    Args:
+        x1, y1, x2, y2 (float): Opposite corners of the rectangle in mils,
+            relative to the board origin (any order).
+        layer (str): "top" or "bottom" to limit the query to one side; empty
+            (default) for both.
+        include_pads (bool): Also return the pads whose centers lie in the
+            rectangle (designator, name, net, x, y). Default False.
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
+
+    Returns:
+        str: JSON object with region, component_count and components (designator,
+             layer, x, y, box = [xmin, ymin, xmax, ymax]) of every component whose
+             bounding box intersects the rectangle; pad_count and pads with
+             include_pads.
+    """
+    logger.info(f"Querying region ({x1}, {y1}) - ({x2}, {y2}) layer={layer!r}")
+    index, error = await _load_board_index(refresh, with_pads=include_pads)
+    if index is None:
+        logger.error(f"Error loading board index: {error}")
+        return json.dumps({"success": False, "error": error})
+    try:
+        result = index.region(x1, y1, x2, y2, layer=layer, include_pads=include_pads)
+    except ValueError as e:
+        return json.dumps({"success": False, "error": str(e)})
+    logger.info(f"Region query found {result['component_count']} components")
+    return json.dumps(result, indent=2)
+
+@mcp.tool()
+async def nearest_components(ctx: Context, x: float, y: float, k: int = 5, layer: str = "",
+                             refresh: bool = False) -> str:
+    """
+    Find the k components closest to a point of the board.
+
+    Distances are from the point to each component's bounding box (0 = the
+    point lies inside it), answered locally from a spatial index over the
+    cached component data.
+
+    Args:
+        x, y (float): The point in mils, relative to the board origin.
+        k (int): How many components to return (default 5).
+        layer (str): "top" or "bottom" to search one side only; empty
+            (default) for both.
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
+
+    Returns:
+        str: JSON object with the point and components (designator, layer, x, y,
+             box, distance_mils), nearest first.
+    """
+    logger.info(f"Finding {k} components nearest to ({x}, {y}) layer={layer!r}")
+    index, error = await _load_board_index(refresh)
+    if index is None:
+        logger.error(f"Error loading board index: {error}")
+        return json.dumps({"success": False, "error": error})
+    try:
+        components = index.nearest(x, y, k=k, layer=layer)
+    except ValueError as e:
+        return json.dumps({"success": False, "error": str(e)})
+    return json.dumps({"point": [x, y], "components": components}, indent=2)
+
+@mcp.tool()
+async def get_component_neighbourhood(ctx: Context, cmp_designators: list, hops: int = 1,
+                                      max_pads_per_net: int = 40, exclude_nets: list = None,
+                                      refresh: bool = False) -> str:
+    """
+    Find the components within a number of net hops of the given components.
+
+    One hop is every component sharing a net with the given ones, two hops
+    adds the components sharing a net with those, and so on. Plane nets
+    would connect everything in one hop, so nets with more than
+    max_pads_per_net pads (GND, rails) and nets named in exclude_nets are
+    not followed. Answered locally from a connectivity graph cached with
+    the board's pin data.
+
+    Args:
+        cmp_designators (list): Components to start from (e.g. ["U12"]).
+        hops (int): How many net hops to follow (default 1).
+        max_pads_per_net (int): Nets with more pads than this are not
+            followed. 0 follows every net. Default 40.
+        exclude_nets (list, optional): Net names not to follow (e.g. ["VBUS"]).
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
+
+    Returns:
+        str: JSON object with components [{designator, hops, via_net}] nearest
+             first, component_count, missing_designators and skipped_nets (the
+             unfollowed nets the neighbourhood touches).
+    """
+    logger.info(f"Finding components within {hops} hops of {cmp_designators}")
+    if not cmp_designators:
+        return json.dumps({"success": False, "error": "cmp_designators must list at least one component"})
+    graph, error = await _load_net_graph(refresh)
+    if graph is None:
+        logger.error(f"Error loading net graph: {error}")
+        return json.dumps({"success": False, "error": error})
+    try:
+        result = graph.neighbourhood(cmp_designators, hops=hops, max_pads_per_net=max_pads_per_net,
+                                     exclude_nets=exclude_nets or ())
+    except ValueError as e:
+        return json.dumps({"success": False, "error": str(e)})
+    return json.dumps(result, indent=2)
+
+@mcp.tool()
+async def get_connectivity_groups(ctx: Context, max_pads_per_net: int = 40, exclude_nets: list = None,
+                                  min_size: int = 2, limit: int = 0, cursor: str = "",
+                                  refresh: bool = False) -> str:
+    """
+    Split the board into groups of components connected by signal nets.
+
+    Two components are in the same group when a chain of followed nets
+    links them. Plane nets (more than max_pads_per_net pads) and nets in
+    exclude_nets are not followed, so the groups show the separate
+    circuits of the board, e.g. each channel of a multi-channel design.
+    Answered locally from a connectivity graph cached with the board's
+    pin data.
+
+    Args:
+        max_pads_per_net (int): Nets with more pads than this are not
+            followed. 0 follows every net. Default 40.
+        exclude_nets (list, optional): Net names not to follow.
+        min_size (int): Leave out groups with fewer components (default 2,
+            which leaves out unconnected parts).
+        limit (int, optional): Page size in groups (largest first). 0 (default)
+            returns everything at once.
+        cursor (str, optional): next_cursor from a previous page.
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
+
+    Returns:
+        str: JSON object with component_count, group_count and groups [{size,
+             designators}], largest first. Paged results add total, offset
+             and next_cursor.
+    """
+    logger.info(f"Finding connectivity groups (max_pads_per_net={max_pads_per_net})")
+    if cursor:
+        return json.dumps(altium_bridge.pager.page("get_connectivity_groups", cursor, limit), indent=2)
+    graph, error = await _load_net_graph(refresh)
+    if graph is None:
+        logger.error(f"Error loading net graph: {error}")
+        return json.dumps({"success": False, "error": error})
+    groups = graph.groups(max_pads_per_net, exclude_nets or (), min_size)
+    result = {
+        "component_count": len(graph),
+        "group_count": len(groups),
+        "groups": [{"size": len(g), "designators": [graph.designators[i] for i in g]} for g in groups],
+    }
+    logger.info(f"Connectivity groups: {len(groups)}")
+    if limit:
+        return json.dumps(altium_bridge.pager.start("get_connectivity_groups", result, "groups", limit), indent=2)
+    return json.dumps(result, indent=2)
+
+@mcp.tool()
+async def get_shared_nets(ctx: Context, cmp_designators: list, refresh: bool = False) -> str:
+    """
+    List the nets that two or more of the given components have in common.
+
+    Answered locally from a connectivity graph cached with the board's pin
+    data.
+
+    Args:
+        cmp_designators (list): Components to compare (e.g. ["U1", "C5"]).
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
+
+    Returns:
+        str: JSON object with nets [{net, pad_count, pins {designator: [pad
+             names]}}], those shared by most of the components first, plus
+             net_count and missing_designators.
+    """
+    logger.info(f"Finding nets shared by {cmp_designators}")
+    if not cmp_designators or len(cmp_designators) < 2:
+        return json.dumps({"success": False, "error": "cmp_designators must list at least two components"})
+    graph, error = await _load_net_graph(refresh)
+    if graph is None:
+        logger.error(f"Error loading net graph: {error}")
+        return json.dumps({"success": False, "error": error})
+    return json.dumps(graph.shared_nets(cmp_designators), indent=2)
+
+@mcp.tool()
+async def suggest_clusters(ctx: Context, cmp_designators: list = None, max_pads_per_net: int = 40,
+                           exclude_nets: list = None, max_cluster_size: int = 40, min_cluster_size: int = 2,
+                           resolution: float = 1.0, limit: int = 0, cursor: str = "",
+                           refresh: bool = False) -> str:
+    """
+    Suggest groups of components to place together, found from the netlist.
+
+    Parts joined by many small nets (a regulator with its input/output caps,
+    feedback divider and inductor) end up in one cluster; plane nets are
+    ignored because they join everything. Use the clusters as the starting
+    point for placing a new board: place each cluster around its anchor,
+    within about its suggested area, and clusters that share external nets
+    near each other. Computed locally (community detection on the cached
+    connectivity graph); a 10,000-part board takes about a second.
+
+    Args:
+        cmp_designators (list, optional): Only cluster these components (e.g.
+            the parts still to be placed). Omit for the whole board.
+        max_pads_per_net (int): Nets with more pads than this (GND, rails)
+            are ignored. 0 uses every net. Default 40.
+        exclude_nets (list, optional): Further net names to ignore.
+        max_cluster_size (int): Larger clusters are split further (default 40).
+        min_cluster_size (int): Smaller clusters are only counted in
+            unclustered_count (default 2).
+        resolution (float): Higher values give smaller clusters (default 1.0).
+        limit (int, optional): Page size in clusters (largest first). 0 (default)
+            returns everything at once.
+        cursor (str, optional): next_cursor from a previous page.
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
+
+    Returns:
+        str: JSON object with component_count, cluster_count, unclustered_count,
+             missing_designators and clusters [{size, anchor, anchor_pad_count,
+             designators, suggested_area {width_mils, height_mils, area_sq_mils},
+             internal_net_count, external_nets}]. Paged results add total,
+             offset and next_cursor.
+    """
+    logger.info(f"Suggesting clusters (designators={cmp_designators}, max_cluster_size={max_cluster_size})")
+    if cursor:
+        return json.dumps(altium_bridge.pager.page("suggest_clusters", cursor, limit), indent=2)
+    components, pins, error = await _load_components_and_pins(refresh)
+    if error:
+        logger.error(f"Error loading board data: {error}")
+        return json.dumps({"success": False, "error": error})
+    try:
+        result = await asyncio.to_thread(
+            suggest_clusters_local, NetGraph.of(pins), components, cmp_designators,
+            max_pads_per_net, exclude_nets or (), max_cluster_size, min_cluster_size, resolution)
+    except ValueError as e:
+        return json.dumps({"success": False, "error": str(e)})
+    logger.info(f"Suggested {result['cluster_count']} clusters")
+    if limit:
+        return json.dumps(altium_bridge.pager.start("suggest_clusters", result, "clusters", limit), indent=2)
+    return json.dumps(result, indent=2)
+
+@mcp.tool()
+async def get_screenshot(ctx: Context, view_type: str = "pcb", zoom_to: list = None,
+                         image_format: str = "png", quality: int = 80, max_dimension: int = 0,
+                         crop: bool = True, diff: bool = False, tile_size: int = 64, tolerance: int = 0):
     """
     Take a screenshot of the Altium window, returned as viewable image content.
 
@@ -1962,13 +2497,33 @@ async def get_screenshot(ctx: Context, view_type: str = "pcb", zoom_to: list = N
             PCB view only: Altium zooms to the bounding box of these components
             (plus a margin) before the capture, so the components fill the frame.
             Omit to capture at the current zoom level.
+        image_format (str): "png" (lossless, default), "jpeg" or "webp" (much smaller)
+        quality (int): JPEG/WebP quality, 1-100
+        max_dimension (int): Downscale so neither side exceeds this many pixels (0: full size)
+        crop (bool): With zoom_to, return only the zoomed region instead of the whole window
+        diff (bool): Compare with the previous screenshot of this view type (same
+            zoom_to, crop and max_dimension) and return only the regions that changed.
+            Use while iterating on placement; the first call returns the full frame.
+        tile_size (int): Diff tile size in pixels; changed tiles are merged into rectangles
+        tolerance (int): Per-channel colour difference (0-255) a diff ignores
 
     Returns:
         Image content of the captured window plus a JSON metadata text block
-        (window title, size, zoomed component count)
+        (window title, size, crop box, encoded size, zoomed component count).
+        With diff, "diff" is "full" (one image), "tiles" (one image per entry of
+        "regions", at its x/y in the full frame) or "unchanged" (no image).
     """
     logger.info(f"Taking screenshot of Altium {view_type} window (zoom_to={zoom_to})")
 
+    try:
+        image_format = check_options(image_format, quality, max_dimension)
+        if tile_size < 8:
+            raise ValueError("tile_size must be at least 8")
+        if not 0 <= tolerance <= 255:
+            raise ValueError("tolerance must be between 0 and 255")
+    except ValueError as e:
+        return json.dumps({"success": False, "error": str(e)})
+
     try:
         # First, execute the Altium command to ensure the right document type
         # is focused, optionally zooming to the requested components
@@ -1986,169 +2541,19 @@ async def get_screenshot(ctx: Context, view_type: str = "pcb", zoom_to: list = N
             logger.error(f"Error focusing {view_type} document: {error_msg}")
             return json.dumps({"success": False, "error": f"Failed to focus the correct document type: {error_msg}"})
         
-        # Run the screenshot capture in a separate thread
-        import threading
-        import queue
-        import datetime
-        from PIL import Image
-        
-        result_queue = queue.Queue()
-        
-        def capture_screenshot_thread():
-            try:
-                # Find Altium windows
-                altium_windows = []
-                altium_fallback_windows = []
-                
-                def collect_altium_windows(hwnd, _):
-                    if win32gui.IsWindowVisible(hwnd):
-                        title = win32gui.GetWindowText(hwnd)
-                        
-                        # First, look for windows with Altium and .PrjPcb in the title
-                        if "Altium" in title and ".PrjPcb" in title:
-                            altium_windows.append({
-                                "handle": hwnd,
-                                "title": title,
-                                "class_name": win32gui.GetClassName(hwnd),
-                                "rect": win32gui.GetWindowRect(hwnd)
-                            })
-                        # Collect any window with Altium in the title as fallback
-                        elif "Altium" in title:
-                            altium_fallback_windows.append({
-                                "handle": hwnd,
-                                "title": title,
-                                "class_name": win32gui.GetClassName(hwnd),
-                                "rect": win32gui.GetWindowRect(hwnd)
-                            })
-                    return True
-                
-                win32gui.EnumWindows(collect_altium_windows, 0)
-                
-                # If no specific Altium .PrjPcb windows found, use the fallback
-                if not altium_windows and altium_fallback_windows:
-                    altium_windows = altium_fallback_windows
-                
-                if not altium_windows:
-                    result_queue.put({
-                        "success": False, 
-                        "error": f"No Altium windows found for {view_type} view"
-                    })
-                    return
-                
-                # Use the first matching window
-                window = altium_windows[0]
-                hwnd = window["handle"]
-                
-                # Get window dimensions
-                left, top, right, bottom = window["rect"]
-                width = right - left
-                height = bottom - top
-                
-                if width <= 0 or height <= 0:
-                    result_queue.put({"success": False, "error": f"Invalid window dimensions: {width}x{height}"})
-                    return
-                
-                # Try to activate the window
-                try:
-                    win32gui.SetForegroundWindow(hwnd)
-                    time.sleep(0.5)
-                except Exception as e:
-                    logger.warning(f"Could not bring window to foreground: {e}")
-                
-                # Take screenshot using GDI functions instead of ImageGrab
-                try:
-                    # Get device context
-                    hwndDC = win32gui.GetWindowDC(hwnd)
-                    mfcDC = win32ui.CreateDCFromHandle(hwndDC)
-                    saveDC = mfcDC.CreateCompatibleDC()
-                    
-                    # Create a bitmap object
-                    saveBitMap = win32ui.CreateBitmap()
-                    saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
-                    saveDC.SelectObject(saveBitMap)
-                    
-                    # Copy the screen into the bitmap
-                    saveDC.BitBlt((0, 0), (width, height), mfcDC, (0, 0), win32con.SRCCOPY)
-                    
-                    # Convert the bitmap to an Image
-                    bmpinfo = saveBitMap.GetInfo()
-                    bmpstr = saveBitMap.GetBitmapBits(True)
-                    img = Image.frombuffer(
-                        'RGB',
-                        (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                        bmpstr, 'raw', 'BGRX', 0, 1)
-                    
-                    # Save a local copy of the screenshot for debugging (non-fatal if it fails)
-                    try:
-                        debug_filename = str(MCP_DIR / f"screenshot_{view_type}.png")
-                        img.save(debug_filename)
-                        logger.info(f"Saved debug screenshot to {debug_filename}")
-                    except Exception as save_error:
-                        logger.warning(f"Could not save debug screenshot to {debug_filename}: {save_error}")
-                        debug_filename = None  # Clear it since save failed
-                    
-                    # Clean up GDI resources
-                    win32gui.DeleteObject(saveBitMap.GetHandle())
-                    saveDC.DeleteDC()
-                    mfcDC.DeleteDC()
-                    win32gui.ReleaseDC(hwnd, hwndDC)
-                    
-                    # Convert to base64
-                    buffer = io.BytesIO()
-                    img.save(buffer, format='PNG')
-                    buffer.seek(0)
-                    img_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-                    
-                    # Put result in queue
-                    result_queue.put({
-                        "success": True,
-                        "width": width,
-                        "height": height,
-                        "window_title": window["title"],
-                        "window_class": window["class_name"],
-                        "view_type": view_type,
-                        "image_format": "PNG",
-                        "encoding": "base64",
-                        "debug_file": debug_filename,
-                        "image_data": img_base64
-                    })
-                    
-                except Exception as e:
-                    import traceback
-                    trace = traceback.format_exc()
-                    logger.error(f"GDI screenshot error: {e}\n{trace}")
-                    result_queue.put({
-                        "success": False, 
-                        "error": f"GDI screenshot failed: {str(e)}",
-                        "traceback": trace
-                    })
-                
-            except Exception as e:
-                import traceback
-                result_queue.put({
-                    "success": False, 
-                    "error": f"Screenshot thread error: {str(e)}",
-                    "traceback": traceback.format_exc()
-                })
-        
-        # Start the thread
-        thread = threading.Thread(target=capture_screenshot_thread)
-        thread.daemon = True
-        thread.start()
-        
-        # Wait for the thread to complete
-        thread.join(timeout=10)  # 10 second timeout
-        
-        if thread.is_alive():
-            logger.error("Screenshot thread timed out")
-            return json.dumps({"success": False, "error": "Screenshot operation timed out"})
-        
-        # Get the result from the queue
-        if result_queue.empty():
-            logger.error("Screenshot thread did not return a result")
-            return json.dumps({"success": False, "error": "Screenshot thread did not return a result"})
-        
-        result = result_queue.get()
+        # The script reports the zoomed rectangle's size; the crop is where
+        # it landed in the view pane
+        zoom_info = response.get("result", {})
+        if not isinstance(zoom_info, dict):
+            zoom_info = {}
+        zoom = None
+        if crop and zoom_info.get("zoomed_component_count"):
+            zoom = (float(zoom_info.get("zoom_width_mils") or 0), float(zoom_info.get("zoom_height_mils") or 0))
+
+        # Capture and encode on the screenshot pool, so other tools keep
+        # running while the window settles and the frame is encoded
+        result = await screenshots.capture(view_type.lower(), image_format, quality, max_dimension, zoom,
+                                           diff, tile_size, tolerance)
 
         if not result.get("success", False):
             error_msg = result.get("error", "Unknown error")
@@ -2157,31 +2562,193 @@ async def get_screenshot(ctx: Context, view_type: str = "pcb", zoom_to: list = N
 
         logger.info(f"Screenshot taken successfully, size: {result['width']}x{result['height']}")
 
-        # Return the PNG as a proper MCP image content block instead of inline
+        # Return the image as a proper MCP image content block instead of inline
         # base64 text: raw base64 in the text result exceeds client token
         # limits (a full-window capture is ~300 KB), while image blocks are
         # rendered natively by clients
-        image_base64 = result.pop("image_data")
-        result.pop("encoding", None)
-        zoom_info = response.get("result", {})
-        if isinstance(zoom_info, dict) and "zoomed_component_count" in zoom_info:
+        if "image" in result:
+            images = [result.pop("image")]
+        else:
+            images = [region.pop("image") for region in result["regions"]]
+        if "zoomed_component_count" in zoom_info:
             result["zoomed_component_count"] = zoom_info["zoomed_component_count"]
-        return [
-            json.dumps(result),
-            MCPImage(data=base64.b64decode(image_base64), format="png"),
-        ]
+        return [json.dumps(result)] + [MCPImage(data=image, format=image_format) for image in images]
 
     except Exception as e:
         logger.error(f"Error in screenshot function: {str(e)}")
         return json.dumps({"success": False, "error": f"Failed to take screenshot: {str(e)}"})
-    
+
+@mcp.tool()
+async def render_board(ctx: Context, zoom_to: list = None, box: list = None, layers: list = None,
+                       highlight_nets: list = None, airlines: bool = True, max_pads_per_net: int = 40,
+                       courtyards: bool = False, labels: bool = True, size: int = 1600,
+                       refresh: bool = False):
+    """
+    Draw the PCB locally from the cached board data, returned as a PNG image.
+
+    Unlike get_screenshot, Altium is not touched once the board data is
+    cached: component boxes, pads and airlines are drawn in Python in tens of
+    milliseconds, so use it freely while iterating on placement. Red is top,
+    blue bottom, gold through-hole; yellow/purple outlines are component boxes
+    and magenta lines courtyards.
+
+    Args:
+        zoom_to (list, optional): Component designators to zoom to (e.g. ["U12", "R42"]),
+            with a margin around them.
+        box (list, optional): [x1, y1, x2, y2] area to draw in mils, instead of zoom_to.
+            Omit both for the whole board.
+        layers (list, optional): "top" and/or "bottom" (default both). Through-hole
+            pads are drawn on either.
+        highlight_nets (list, optional): Net names to draw bright (pads and
+            airlines); everything else is dimmed.
+        airlines (bool): Draw each net's shortest connecting tree. Default True.
+        max_pads_per_net (int): Nets with more pads (GND, rails) get no airlines.
+            0 draws every net. Default 40.
+        courtyards (bool): Also draw courtyards. Needs the footprint geometry export
+            (one script run, then cached like check_clearance's). Default False.
+        labels (bool): Write designators on components large enough to hold them.
+        size (int): Pixels along the longer side of the image (16-8192, default 1600).
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
+
+    Returns:
+        JSON metadata (view_box in mils, scale_px_per_mil, missing_designators,
+        unknown_nets, drawn component/pad/airline counts, render_ms) plus the PNG image.
+    """
+    logger.info(f"Rendering board locally (zoom_to={zoom_to}, box={box}, layers={layers})")
+    components, pins, error = await _load_components_and_pins(refresh)
+    if error:
+        logger.error(f"Error loading board data: {error}")
+        return json.dumps({"success": False, "error": error})
+    geometry = None
+    if courtyards:
+        response = await altium_bridge.execute_command("get_component_geometry", {}, use_cache=not refresh)
+        if not response.get("success", False):
+            error_msg = response.get("error", "Unknown error")
+            logger.error(f"Error exporting component geometry: {error_msg}")
+            return json.dumps({"success": False, "error": f"Failed to export component geometry: {error_msg}"})
+        geometry = response.get("result", [])
+        if isinstance(geometry, str):
+            geometry = json.loads(geometry)
+
+    def run():
+        start = time.perf_counter()
+        scene = BoardScene.of(components, pins, geometry)
+        result = render_board_local(scene, box, zoom_to, layers, highlight_nets or (), airlines,
+                                    max_pads_per_net, courtyards, labels, size)
+        image = result.pop("image")
+        png = to_png(image)
+        result.update(width=image.width, height=image.height, image_bytes=len(png),
+                      render_ms=round((time.perf_counter() - start) * 1000, 1))
+        return result, png
+
+    try:
+        result, png = await asyncio.to_thread(run)
+    except ValueError as e:
+        return json.dumps({"success": False, "error": str(e)})
+    logger.info(f"Board rendered: {result['width']}x{result['height']} in {result['render_ms']} ms")
+    return [json.dumps(result), MCPImage(data=png, format="png")]
+
 @mcp.tool()
-async def layout_duplicator(ctx: Context) -> str:
+async def render_library_preview(ctx: Context, spec_file: str = "", library_type: str = "",
+                                 library_path: str = "", names: list = None, part: int = 1,
+                                 image_format: str = "png", size: int = 800, cell_size: int = 160,
+                                 columns: int = 0, output_file: str = ""):
+    """
+    Draw library symbols or footprints locally, as a PNG or SVG preview.
+
+    Review a create_symbols_batch / create_footprints_batch spec before any
+    Altium run, or look over a library without screenshots: pins (number
+    along the pin, name inside the body), bodies, lines, arcs, polygons,
+    ellipses and labels for symbols; pads (with drills and names), tracks,
+    arcs, fills, regions, vias and text for footprints, coloured by layer.
+    One item is drawn size pixels wide; several become a contact sheet
+    with each name under its cell (a 300-symbol library takes about a
+    second).
+
+    Args:
+        spec_file (str, optional): A batch spec file (SYMBOL/PIN/GRAPHIC or
+            FOOTPRINT/PAD/... lines), or a saved get_symbol_primitives /
+            get_footprint_primitives JSON dump. Read locally; Altium is not used.
+        library_type (str, optional): Without spec_file: "sch" or "pcb" to dump
+            every symbol/footprint of a library (one script run) and draw it.
+        library_path (str, optional): With library_type, the .SchLib/.PcbLib to dump.
+            Omit for the focused library.
+        names (list, optional): Names or glob patterns to draw (e.g. ["LM*", "R0603"]).
+            Default all.
+        part (int): Symbol part to draw for multi-part symbols. Default 1.
+        image_format (str): "png" (default) or "svg".
+        size (int): Pixels along the longer side for a single item (32-8192, default 800).
+        cell_size (int): Contact sheet cell size in pixels (48-2048, default 160).
+        columns (int): Contact sheet columns. 0 (default) for a square sheet.
+        output_file (str, optional): Also write the PNG/SVG to this path.
+
+    Returns:
+        JSON metadata (kind, count, missing_names, spec_errors with line numbers
+        for records the batch script would reject or ignore, skipped_primitives,
+        render_ms) plus the PNG image or the SVG text.
+    """
+    logger.info(f"Rendering library preview (spec_file={spec_file}, library_type={library_type})")
+    if spec_file:
+        try:
+            with open(spec_file, "r", encoding="utf-8-sig") as f:
+                source = f.read()
+        except OSError as e:
+            return json.dumps({"success": False, "error": f"Cannot read spec file: {e}"})
+        dump = None
+    else:
+        commands = {"sch": ("get_symbol_primitives", "symbol_name"),
+                    "pcb": ("get_footprint_primitives", "footprint_name")}
+        if library_type not in commands:
+            return json.dumps({"success": False, "error": 'Give spec_file, or library_type "sch" or "pcb"'})
+        command, name_key = commands[library_type]
+        response = await altium_bridge.execute_command(command, {"library_path": library_path, name_key: "*"})
+        if not response.get("success", False):
+            error_msg = response.get("error", "Unknown error")
+            logger.error(f"Error dumping library primitives: {error_msg}")
+            return json.dumps({"success": False, "error": f"Failed to dump library primitives: {error_msg}"})
+        dump = response.get("result", {})
+
+    def run():
+        start = time.perf_counter()
+        if dump is None:
+            kind, entries, problems = load_library_source(source)
+        else:
+            (kind, entries), problems = library_items(dump), []
+        result, output = render_library_local(kind, entries, names, part, image_format, size,
+                                              cell_size, columns)
+        result["spec_errors"] = problems
+        data = output.encode("utf-8") if isinstance(output, str) else to_png(output)
+        if output_file:
+            with open(output_file, "wb") as f:
+                f.write(data)
+            result["output_file"] = output_file
+        result["render_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return result, output, data
+
+    try:
+        result, output, data = await asyncio.to_thread(run)
+    except (ValueError, OSError) as e:
+        return json.dumps({"success": False, "error": str(e)})
+    logger.info(f"Library preview: {result['count']} {result['kind']}(s) in {result['render_ms']} ms")
+    if isinstance(output, str):
+        return [json.dumps(result), output]
+    result.update(width=output.width, height=output.height)
+    return [json.dumps(result), MCPImage(data=data, format="png")]
+
+@mcp.tool()
+async def layout_duplicator(ctx: Context, auto_match: bool = True, apply: bool = False) -> str:
     """
     First step of layout duplication. Selects source components and returns data to match with destination components.
     
+    Args:
+        auto_match (bool, optional): Pair source and destination components locally by net connectivity
+            (footprint and description break ties) and add the result under "match". Defaults to True.
+        apply (bool, optional): Pass the automatic match straight to layout_duplicator_apply. Ambiguous
+            matches are still listed in "match". Defaults to False.
+    
     Returns:
-        str: JSON object with source and destination component data for matching
+        str: JSON object with source and destination component data, the automatic match and, with apply,
+            the layout_duplicator_apply result
     """
     logger.info("Starting layout duplication - selection phase")
     
@@ -2207,15 +2774,51 @@ async def layout_duplicator(ctx: Context) -> str:
     # Parse the result to check if no source components were selected
     try:
         if isinstance(components_data, str):
-            result_json = json.loads(components_data)
-            if not result_json.get("success", True):
-                logger.info(f"Source component selection issue: {result_json.get('message', 'Unknown issue')}")
-                return json.dumps(result_json)
+            components_data = json.loads(components_data)
+        if not components_data.get("success", True):
+            logger.info(f"Source component selection issue: {components_data.get('message', 'Unknown issue')}")
+            return json.dumps(components_data)
     except Exception as e:
         logger.error(f"Error parsing layout duplicator result: {e}")
+        return json.dumps(components_data, indent=2)
     
     logger.info(f"Retrieved layout duplicator component data")
-    return json.dumps(components_data, indent=2)
+    if not (auto_match or apply):
+        return json.dumps(components_data, indent=2)
+    
+    match = await asyncio.to_thread(
+        match_groups,
+        components_data.get("source_components", []),
+        components_data.get("destination_components", []))
+    components_data["match"] = match
+    logger.info(f"Matched {match['matched_count']} components, {match['ambiguous_count']} ambiguous")
+    
+    if not apply:
+        components_data["message"] = ("Successfully duplicated objects. \"match\" pairs the source and destination "
+                                      "components by net connectivity; check its ambiguous entries, then call "
+                                      "layout_duplicator_apply with its source_designators and destination_designators.")
+        return json.dumps(components_data, indent=2)
+    
+    if not match["matched_count"]:
+        components_data["success"] = False
+        components_data["message"] = "No source component could be matched to a destination component."
+        return json.dumps(components_data, indent=2)
+    
+    response = await altium_bridge.execute_command(
+        "layout_duplicator_apply",
+        {
+            "source_designators": match["source_designators"],
+            "destination_designators": match["destination_designators"]
+        }
+    )
+    if not response.get("success", False):
+        error_msg = response.get("error", "Unknown error")
+        logger.error(f"Error applying layout duplication: {error_msg}")
+        return json.dumps({"success": False, "error": f"Failed to apply layout duplication: {error_msg}",
+                           "match": match})
+    
+    logger.info(f"Layout duplication applied successfully")
+    return json.dumps({"success": True, "match": match, "apply_result": response.get("result", {})}, indent=2)
 
 @mcp.tool()
 async def layout_duplicator_apply(ctx: Context, source_designators: list, destination_designators: list) -> str:
@@ -2253,19 +2856,29 @@ async def layout_duplicator_apply(ctx: Context, source_designators: list, destin
     return json.dumps(result, indent=2)
     
 @mcp.tool()
-async def get_pcb_rules(ctx: Context) -> str:
+async def get_pcb_rules(ctx: Context, limit: int = 0, cursor: str = "", refresh: bool = False) -> str:
     """
     Get all design rules from the current Altium PCB
     
+    Args:
+        limit (int, optional): Page size in rules. 0 (default) returns everything at once.
+        cursor (str, optional): next_cursor from a previous page. Pages come from a server-side
+            copy of the first call's result (no new Altium query) until the design changes.
+        refresh (bool): Bypass the read cache and re-read from Altium. Default False.
+    
     Returns:
-        str: JSON array of PCB design rules with their properties
+        str: JSON array of PCB design rules with their properties. With limit or
+             cursor: {"rules": [...], "total", "offset", "next_cursor"}
     """
     logger.info("Getting PCB design rules")
+    if cursor:
+        return json.dumps(altium_bridge.pager.page("get_pcb_rules", cursor, limit), indent=2)
     
     # Execute the command in Altium to get rule data
     response = await altium_bridge.execute_command(
         "get_pcb_rules",
-        {}  # No parameters needed
+        {},  # No parameters needed
+        use_cache=not refresh
     )
     
     # Check for success
@@ -2282,6 +2895,8 @@ async def get_pcb_rules(ctx: Context) -> str:
         return json.dumps({"message": "No PCB rules found in the current document"})
     
     logger.info(f"Retrieved PCB rules data")
+    if limit and isinstance(rules_data, list):
+        return json.dumps(altium_bridge.pager.start("get_pcb_rules", rules_data, "rules", limit), indent=2)
     return json.dumps(rules_data, indent=2)
 
 @mcp.tool()
@@ -2445,10 +3060,53 @@ async def get_server_status(ctx: Context) -> str:
         "script_path": altium_bridge.config.script_path,
         "altium_found": os.path.exists(altium_bridge.config.altium_exe_path),
         "script_found": os.path.exists(altium_bridge.config.script_path),
+        **altium_bridge.status(),
+        **screenshots.status(),
     }
     
     return json.dumps(status, indent=2)
 
+@mcp.tool()
+async def set_bridge_mode(ctx: Context, mode: str) -> str:
+    """
+    Choose how commands reach Altium. The choice is saved to config.json.
+
+    - "launch": every command launches X2.EXE, which compiles and runs the
+      bridge script once. Always works, but each call pays the launch and
+      compile time.
+    - "resident": the bridge script is launched once and stays running,
+      serving commands from a mailbox file and writing a heartbeat while
+      idle. Much lower latency per call. If the resident script stops
+      (heartbeat goes stale, or a request is not picked up) commands fall
+      back to "launch" automatically. While it is running, Altium's script
+      executor is busy, so run_altium_script experiments should switch
+      back to "launch" first.
+
+    Args:
+        mode (str): "launch" or "resident"
+
+    Returns:
+        str: JSON object with the new mode and the bridge status
+    """
+    mode = mode.strip().lower()
+    if mode not in BRIDGE_MODES:
+        return json.dumps({"success": False, "error": f"mode must be one of {list(BRIDGE_MODES)}"})
+
+    async with altium_bridge._command_lock:
+        if mode == "launch" and altium_bridge.resident_transport.is_alive():
+            altium_bridge.resident_transport.stop()
+        altium_bridge.config.bridge_mode = mode
+        altium_bridge.config.save_config()
+        if mode == "resident":
+            started = await altium_bridge.resident_transport.start()
+            if not started:
+                return json.dumps({"success": False,
+                                   "error": "Resident script did not start; commands will fall back to launch mode",
+                                   **altium_bridge.status()}, indent=2)
+
+    logger.info(f"Bridge mode set to {mode}")
+    return json.dumps({"success": True, **altium_bridge.status()}, indent=2)
+
 if __name__ == "__main__":
     logger.info("Starting Altium MCP Server...")
     logger.info(f"Using MCP directory: {MCP_DIR}")
@@ -0,0 +1,239 @@
+"""
+Component/net connectivity graph of the whole board.
+
+get_net_connections groups the script's flat pad list by net on every
+call, and only for the nets around the components asked about. NetGraph
+is built once per get_component_pins snapshot, memoized like BoardModel.
+The read cache hands back a new list when the design changes, and that
+invalidates the graph with it. It holds the bipartite component/net
+graph as two CSR adjacency lists plus the pads:
+
+- comp_ptr/comp_nets: the distinct nets of each component
+- net_ptr/net_comps: the distinct components on each net
+- net_pad_count: pads per net; pads are stored in component order
+
+Plane nets (GND, rails) connect almost everything, so the queries take
+the same threshold as get_net_connections' max_pads_per_net. Nets with
+more pads than that, or named in exclude_nets, are not followed. The
+queries are:
+
+- neighbourhood: the components within k hops of some components, hop
+  by hop over the followed nets, each with the net it was reached through
+- groups: the connected components of the graph over the followed nets
+  (scipy.sparse.csgraph when installed, else label propagation)
+- shared_nets: the nets that two or more components have in common
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from spatial import expand_runs
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+except ImportError:  # optional: groups fall back to NumPy label propagation
+    csr_matrix = None
+
+
+class NetGraph:
+    """Bipartite component/net graph of one get_component_pins dump.
+
+    Args:
+        pins: get_component_pins entries (designator, pins with name/net)
+    """
+
+    _last: Optional[Tuple[list, "NetGraph"]] = None
+
+    def __init__(self, pins: Iterable[Dict[str, Any]]):
+        self.designators: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.net_names: List[str] = []
+        self.net_ids: Dict[str, int] = {}
+        pad_comp, pad_net, self.pad_names = [], [], []
+        for entry in pins:
+            designator = entry.get("designator")
+            if not designator or designator in self.index:
+                continue
+            comp = self.index[designator] = len(self.designators)
+            self.designators.append(designator)
+            for pin in entry.get("pins") or []:
+                net = pin.get("net")
+                if not net:
+                    continue
+                k = self.net_ids.get(net)
+                if k is None:
+                    k = self.net_ids[net] = len(self.net_names)
+                    self.net_names.append(net)
+                pad_comp.append(comp)
+                pad_net.append(k)
+                self.pad_names.append(str(pin.get("name", "")))
+
+        n, nets = len(self.designators), len(self.net_names)
+        self.pad_comp = np.array(pad_comp, dtype=np.intp)
+        self.pad_net = np.array(pad_net, dtype=np.intp)
+        self.pad_ptr = np.searchsorted(self.pad_comp, np.arange(n + 1))
+        self.net_pad_count = np.bincount(self.pad_net, minlength=nets)
+        # distinct (component, net) edges, sorted by component then net
+        edges = np.unique(self.pad_comp * max(nets, 1) + self.pad_net)
+        comp, net = edges // max(nets, 1), edges % max(nets, 1)
+        self.comp_nets = net
+        self.comp_ptr = np.searchsorted(comp, np.arange(n + 1))
+        order = np.argsort(net, kind="stable")
+        self.net_comps = comp[order]
+        self.net_ptr = np.searchsorted(net[order], np.arange(nets + 1))
+
+    @classmethod
+    def of(cls, pins: list) -> "NetGraph":
+        """Graph for this snapshot, reusing the last one if it is the same list"""
+        last = cls._last
+        if last is not None and last[0] is pins:
+            return last[1]
+        graph = cls(pins)
+        cls._last = (pins, graph)
+        return graph
+
+    def __len__(self) -> int:
+        return len(self.designators)
+
+    def lookup(self, designators: Iterable[str]) -> Tuple[np.ndarray, List[str]]:
+        """(component indices in the given order without repeats, missing designators)"""
+        found, missing, seen = [], [], set()
+        for designator in designators:
+            if designator in seen:
+                continue
+            seen.add(designator)
+            i = self.index.get(designator)
+            if i is None:
+                missing.append(designator)
+            else:
+                found.append(i)
+        return np.array(found, dtype=np.intp), missing
+
+    def followed(self, max_pads_per_net: Optional[int] = 40, exclude_nets: Iterable[str] = ()) -> np.ndarray:
+        """Mask of the nets queries follow: at most max_pads_per_net pads
+        (0 or None: any number) and not excluded by name"""
+        follow = np.ones(len(self.net_names), dtype=bool)
+        if max_pads_per_net:
+            follow &= self.net_pad_count <= max_pads_per_net
+        for name in exclude_nets or ():
+            k = self.net_ids.get(name)
+            if k is not None:
+                follow[k] = False
+        return follow
+
+    def nets_of(self, comps: np.ndarray) -> np.ndarray:
+        """Net ids of the given components, with repeats"""
+        comps = np.asarray(comps, dtype=np.intp)
+        _, k = expand_runs(self.comp_ptr[comps], np.diff(self.comp_ptr)[comps])
+        return self.comp_nets[k]
+
+    def comps_on(self, nets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(net, component) for every component on the given nets"""
+        nets = np.asarray(nets, dtype=np.intp)
+        owner, k = expand_runs(self.net_ptr[nets], np.diff(self.net_ptr)[nets])
+        return nets[owner], self.net_comps[k]
+
+    def neighbourhood(self, designators: Sequence[str], hops: int = 1, max_pads_per_net: Optional[int] = 40,
+                      exclude_nets: Iterable[str] = ()) -> Dict[str, Any]:
+        """Components within hops steps of the given ones over followed nets.
+
+        Returns:
+            dict: designators, hops, missing_designators, component_count,
+            components [{designator, hops, via_net}] nearest first (the
+            given components themselves excluded), and skipped_nets: the
+            unfollowed nets the result touches
+        """
+        if hops < 0:
+            raise ValueError("hops must be 0 or more")
+        seeds, missing = self.lookup(designators)
+        follow = self.followed(max_pads_per_net, exclude_nets)
+        distance = np.full(len(self), -1, dtype=np.intp)
+        via = np.full(len(self), -1, dtype=np.intp)
+        distance[seeds] = 0
+        done = ~follow
+        frontier = seeds
+        for hop in range(1, hops + 1):
+            if not len(frontier):
+                break
+            nets = self.nets_of(frontier)
+            nets = np.unique(nets[~done[nets]])
+            done[nets] = True
+            through, comps = self.comps_on(nets)
+            fresh = distance[comps] < 0
+            comps, first = np.unique(comps[fresh], return_index=True)
+            distance[comps] = hop
+            via[comps] = through[fresh][first]
+            frontier = comps
+
+        reached = np.nonzero(distance > 0)[0]
+        reached = reached[np.argsort(distance[reached], kind="stable")]
+        touched = np.unique(self.nets_of(np.nonzero(distance >= 0)[0]))
+        return {
+            "designators": [self.designators[i] for i in seeds],
+            "hops": hops,
+            "missing_designators": missing,
+            "component_count": len(reached),
+            "components": [{"designator": self.designators[i], "hops": int(distance[i]),
+                            "via_net": self.net_names[via[i]]} for i in reached],
+            "skipped_nets": sorted(self.net_names[k] for k in touched[~follow[touched]]),
+        }
+
+    def labels(self, max_pads_per_net: Optional[int] = 40, exclude_nets: Iterable[str] = ()) -> np.ndarray:
+        """Connected-component label of every component over the followed nets"""
+        follow = self.followed(max_pads_per_net, exclude_nets)
+        n, nets = len(self), len(self.net_names)
+        edge_net = np.repeat(np.arange(nets), np.diff(self.net_ptr))
+        keep = follow[edge_net]
+        edge_comp, edge_net = self.net_comps[keep], edge_net[keep]
+        if csr_matrix is not None:
+            # components are nodes 0..n-1, nets n..n+nets-1
+            graph = csr_matrix((np.ones(len(edge_comp), dtype=np.int8), (edge_comp, n + edge_net)),
+                               shape=(n + nets, n + nets))
+            return connected_components(graph, directed=False)[1][:n]
+        label = np.arange(n)
+        while True:
+            net_label = np.full(nets, n)
+            np.minimum.at(net_label, edge_net, label[edge_comp])
+            new = label.copy()
+            np.minimum.at(new, edge_comp, net_label[edge_net])
+            new = new[new]  # pointer jumping
+            if np.array_equal(new, label):
+                return label
+            label = new
+
+    def groups(self, max_pads_per_net: Optional[int] = 40, exclude_nets: Iterable[str] = (),
+               min_size: int = 2) -> List[np.ndarray]:
+        """Component indices of each connected group of at least min_size,
+        largest first"""
+        label = self.labels(max_pads_per_net, exclude_nets)
+        order = np.argsort(label, kind="stable")
+        bounds = np.nonzero(np.diff(label[order]))[0] + 1
+        groups = [g for g in np.split(order, bounds) if len(g) >= max(min_size, 1)]
+        groups.sort(key=lambda g: (-len(g), g[0]))
+        return groups
+
+    def shared_nets(self, designators: Sequence[str]) -> Dict[str, Any]:
+        """Nets that two or more of the given components are on.
+
+        Returns:
+            dict: designators, missing_designators, net_count and nets
+            [{net, pad_count, pins {designator: [pad names]}}], most of the
+            given components first
+        """
+        comps, missing = self.lookup(designators)
+        pins: Dict[int, Dict[str, List[str]]] = {}
+        for comp in comps:
+            for p in range(self.pad_ptr[comp], self.pad_ptr[comp + 1]):
+                pins.setdefault(int(self.pad_net[p]), {}).setdefault(
+                    self.designators[comp], []).append(self.pad_names[p])
+        shared = [(k, on) for k, on in pins.items() if len(on) > 1]
+        shared.sort(key=lambda item: (-len(item[1]), self.net_names[item[0]]))
+        return {
+            "designators": [self.designators[i] for i in comps],
+            "missing_designators": missing,
+            "net_count": len(shared),
+            "nets": [{"net": self.net_names[k], "pad_count": int(self.net_pad_count[k]), "pins": on}
+                     for k, on in shared],
+        }
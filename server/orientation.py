@@ -0,0 +1,358 @@
+"""
+Rotation scoring for 2-pad passives (check_orientation).
+
+Each orthogonal rotation of a component is scored by summing one term per
+pad:
+- routable nets (at most PLANE_NET_PAD_COUNT pads besides the component's
+  own): the net's airline (MST) length with the pad at its rotated position
+- plane nets: distance to the nearest same-net pad of another component
+
+The old loop rebuilt the MST of the other pads from scratch for every pad
+x rotation x component. NetScorer keeps one mst.IncrementalTree per net:
+a component's own pads are deleted from it (reconnecting the split
+subtrees) and all rotated positions are then priced in one O(n) pass.
+Plane nets answer nearest-pad queries from a KD-tree (scipy's cKDTree, or
+a vectorized scan without scipy).
+
+Scoring each part against the others' current rotations is greedy: two
+caps on the same net can each look better turned, and worse turned
+together. RotationSearch (joint mode) optimizes one global score instead
+- every routable net's airline length once, plus each pad on a plane net's
+distance to the nearest pad of a part outside the search - by coordinate
+descent in rounds:
+
+- score all four rotations of every part that still needs it at once:
+  the affected nets, padded to a few fixed sizes, go through one batched
+  Prim (mst.mst_lengths) per size
+- apply the best-improving parts that share no routable net, so each
+  accepted change improves the global score by exactly its own gain
+- rescore only the parts on nets that changed
+"""
+
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mst import IncrementalTree, mst_lengths
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # optional: plane nets fall back to a NumPy scan
+    cKDTree = None
+
+PLANE_NET_PAD_COUNT = 40  # nets above this are treated as planes
+ROTATIONS = (0, 90, 180, 270)
+BATCH_SIZES = (2, 3, 4, 6, 8, 12, 16, 24, 32, 48)  # routable nets are padded to one of these
+
+
+def rotate_offset(dx: float, dy: float, degrees: float) -> tuple:
+    """Rotate a rotation-0 pad offset counterclockwise by the given angle."""
+    rad = math.radians(degrees)
+    return (dx * math.cos(rad) - dy * math.sin(rad),
+            dx * math.sin(rad) + dy * math.cos(rad))
+
+
+class NetScorer:
+    """The pads of one net, scoring candidate positions for one pad of a
+    component against the pads of every other component"""
+
+    def __init__(self, pads: Iterable[Tuple[str, float, float]]):
+        pads = list(pads)
+        self.points = np.array([(x, y) for _, x, y in pads], dtype=float).reshape(-1, 2)
+        self._owned: Dict[str, List[int]] = {}
+        for i, (designator, _, _) in enumerate(pads):
+            self._owned.setdefault(designator, []).append(i)
+        self._tree: Optional[IncrementalTree] = None
+        self._kdtree = None
+
+    def score(self, designator: str, positions: Sequence[Tuple[float, float]]
+              ) -> Optional[Tuple[str, np.ndarray]]:
+        """(metric, one value per position), or None when the net has no
+        pads outside the component"""
+        own = self._owned.get(designator, [])
+        others = len(self.points) - len(own)
+        if not others:
+            return None
+        if others > PLANE_NET_PAD_COUNT:
+            return "nearest_return_mils", self._nearest(own, positions)
+        if self._tree is None:
+            self._tree = IncrementalTree(self.points)
+        return "net_airline_mils", self._tree.without(own).lengths_with(positions)
+
+    def _nearest(self, own: List[int], positions) -> np.ndarray:
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if cKDTree is None:
+            d = np.hypot(positions[:, None, 0] - self.points[None, :, 0],
+                         positions[:, None, 1] - self.points[None, :, 1])
+            d[:, own] = np.inf
+            return d.min(axis=1)
+        if self._kdtree is None:
+            self._kdtree = cKDTree(self.points)
+        # The component's own pads can be among the nearest; ask for enough
+        # neighbours to skip past them
+        d, idx = self._kdtree.query(positions, k=len(own) + 1)
+        d, idx = d.reshape(len(positions), -1), idx.reshape(len(positions), -1)
+        for i in own:
+            d[idx == i] = np.inf
+        return d.min(axis=1)
+
+
+def check_rotations(components: List[Dict[str, Any]],
+                    net_pads: Dict[str, List[Tuple[str, float, float]]],
+                    min_improvement_mils: float) -> Tuple[List[Dict[str, Any]], int]:
+    """Score every 2-pad component at its current and each orthogonal
+    rotation -> (suggestions sorted by improvement, components checked)"""
+    scorers: Dict[str, NetScorer] = {}
+    suggestions, checked = [], 0
+    for comp in components:
+        pins = comp.get("pins", [])
+        if len(pins) != 2 or "x" not in comp:
+            continue
+        mirror = comp.get("layer") == "Bottom Layer"
+        current = comp.get("rotation", 0) % 360
+        rotations = (current,) + ROTATIONS
+
+        terms = []  # (pin, net, metric, value per rotation)
+        for pin in pins:
+            net = pin.get("net", "")
+            if not net or net not in net_pads:
+                continue
+            if net not in scorers:
+                scorers[net] = NetScorer(net_pads[net])
+            dx = -pin["dx"] if mirror else pin["dx"]
+            positions = []
+            for rotation in rotations:
+                ox, oy = rotate_offset(dx, pin["dy"], rotation)
+                positions.append((comp["x"] + ox, comp["y"] + oy))
+            scored = scorers[net].score(comp["designator"], positions)
+            if scored is not None:
+                terms.append((pin["name"], net) + scored)
+        if not terms:
+            continue
+        checked += 1
+
+        totals = sum(values for _, _, _, values in terms)
+        best = 0
+        for i in range(1, len(rotations)):
+            if totals[i] < totals[best]:
+                best = i
+        improvement = float(totals[0] - totals[best])
+        if rotations[best] != current and improvement >= min_improvement_mils:
+            def detail(i):
+                return [{"pin": name, "net": net, metric: round(float(values[i]), 1)}
+                        for name, net, metric, values in terms]
+            suggestions.append({
+                "designator": comp["designator"],
+                "current_rotation": current,
+                "suggested_rotation": rotations[best],
+                "improvement_mils": round(improvement, 1),
+                "bbox_changes": (rotations[best] - current) % 180 != 0,
+                "current_pads": detail(0),
+                "suggested_pads": detail(best),
+            })
+
+    suggestions.sort(key=lambda s: -s["improvement_mils"])
+    return suggestions, checked
+
+
+class RotationSearch:
+    """Joint rotation search over the 2-pad components in components; the
+    pads of every other part in net_pads stay where they are"""
+
+    def __init__(self, components: List[Dict[str, Any]],
+                 net_pads: Dict[str, List[Tuple[str, float, float]]]):
+        self.comps = [c for c in components if len(c.get("pins", [])) == 2 and "x" in c]
+        searched = {c["designator"] for c in self.comps}
+        count = len(self.comps)
+
+        # Pad positions per component, pin and choice (0 = as placed, then ROTATIONS)
+        self.current_rotation = [c.get("rotation", 0) % 360 for c in self.comps]
+        self.positions = np.zeros((count, 2, len(ROTATIONS) + 1, 2))
+        for i, comp in enumerate(self.comps):
+            mirror = comp.get("layer") == "Bottom Layer"
+            for j, pin in enumerate(comp["pins"]):
+                dx = -pin["dx"] if mirror else pin["dx"]
+                for k, rotation in enumerate((self.current_rotation[i],) + ROTATIONS):
+                    ox, oy = rotate_offset(dx, pin["dy"], rotation)
+                    self.positions[i, j, k] = comp["x"] + ox, comp["y"] + oy
+        self.choice = np.zeros(count, dtype=np.intp)
+        self.scored = np.zeros(count, dtype=bool)
+
+        # Plane-net term per component and choice
+        self.plane = np.zeros((count, len(ROTATIONS) + 1))
+        routable: Dict[str, List[Tuple[int, int]]] = {}
+        planes: Dict[str, List[Tuple[int, int]]] = {}
+        owned: Dict[str, Counter] = {}
+        for i, comp in enumerate(self.comps):
+            for j, pin in enumerate(comp["pins"]):
+                net = pin.get("net", "")
+                if net and net in net_pads:
+                    if net not in owned:
+                        owned[net] = Counter(d for d, _, _ in net_pads[net])
+                    # pads outside the component, as NetScorer.score counts them
+                    others = len(net_pads[net]) - owned[net][comp["designator"]]
+                    kind = planes if others > PLANE_NET_PAD_COUNT else routable
+                    kind.setdefault(net, []).append((i, j))
+        for net, pins in planes.items():
+            fixed = np.array([(x, y) for d, x, y in net_pads[net] if d not in searched],
+                             dtype=float).reshape(-1, 2)
+            if not len(fixed):
+                continue
+            owners = np.array([i for i, _ in pins], dtype=np.intp)
+            query = self.positions[owners, [j for _, j in pins]].reshape(-1, 2)
+            if cKDTree is not None:
+                d = cKDTree(fixed).query(query)[0]
+            else:
+                d = np.hypot(query[:, None, 0] - fixed[None, :, 0],
+                             query[:, None, 1] - fixed[None, :, 1]).min(axis=1)
+            np.add.at(self.plane, owners, d.reshape(len(pins), -1))
+            self.scored[owners] = True
+
+        # Routable nets share one flat point array: each net's pads of
+        # parts outside the search, then a slot per searched pin
+        self.pin_net = np.full((count, 2), -1, dtype=np.intp)
+        self.pin_slot = np.full((count, 2), -1, dtype=np.intp)
+        points, starts, sizes, self.net_members = [], [], [], []
+        for n, (net, pins) in enumerate(routable.items()):
+            starts.append(len(points))
+            points.extend((x, y) for d, x, y in net_pads[net] if d not in searched)
+            for i, j in pins:
+                self.pin_net[i, j], self.pin_slot[i, j] = n, len(points)
+                points.append(tuple(self.positions[i, j, 0]))
+            sizes.append(len(points) - starts[-1])
+            owners = [i for i, _ in pins]
+            self.net_members.append(np.unique(owners))
+            for i in set(owners):
+                # the net only counts for a part if it reaches another one
+                if sizes[-1] > owners.count(i):
+                    self.scored[i] = True
+        self.points = np.array(points, dtype=float).reshape(-1, 2)
+        self.net_start = np.array(starts, dtype=np.intp)
+        self.net_size = np.array(sizes, dtype=np.intp)
+        self.net_batch = np.searchsorted(BATCH_SIZES, self.net_size)
+        self.net_length = np.zeros(len(sizes))
+        for b, width in enumerate(BATCH_SIZES):
+            nets = np.nonzero(self.net_batch == b)[0]
+            if len(nets):
+                self.net_length[nets] = mst_lengths(self.points[self._rows(nets, width)])
+
+    def _rows(self, nets: np.ndarray, width: int) -> np.ndarray:
+        """(len(nets), width) indices into points of each net's pads, padded
+        by repeating its first pad"""
+        offsets = np.arange(width)
+        size = self.net_size[nets][:, None]
+        return self.net_start[nets][:, None] + np.where(offsets < size, offsets, 0)
+
+    def _score(self, comps: np.ndarray):
+        """Global score change of turning each of comps to each rotation,
+        with the others as they are -> (deltas (len(comps), 4), and per
+        (component, net) pair: component, net, new lengths (m, 4))"""
+        ci, cj = np.repeat(comps, 2), np.tile([0, 1], len(comps))
+        nets, other = self.pin_net[ci, cj], self.pin_net[ci, 1 - cj]
+        # one entry per component and net; both pins on one net move together
+        keep = (nets >= 0) & ~((cj == 1) & (other == nets))
+        ci, cj, nets, both = ci[keep], cj[keep], nets[keep], (other == nets)[keep]
+
+        lengths = np.zeros((len(ci), len(ROTATIONS)))
+        for b, width in enumerate(BATCH_SIZES):
+            sel = np.nonzero(self.net_batch[nets] == b)[0]
+            if not len(sel):
+                continue
+            pts = np.repeat(self.points[self._rows(nets[sel], width)][:, None], len(ROTATIONS), axis=1)
+            pins = [(np.arange(len(sel)), cj[sel])]
+            pair = np.nonzero(both[sel])[0]
+            if len(pair):
+                pins.append((pair, 1 - cj[sel][pair]))
+            for rows, j in pins:
+                c = ci[sel][rows]
+                pts[rows, :, self.pin_slot[c, j] - self.net_start[nets[sel][rows]]] = self.positions[c, j, 1:]
+            lengths[sel] = mst_lengths(pts.reshape(-1, width, 2)).reshape(len(sel), -1)
+
+        row_of = np.zeros(len(self.comps), dtype=np.intp)
+        row_of[comps] = np.arange(len(comps))
+        deltas = self.plane[comps, 1:] - self.plane[comps, self.choice[comps]][:, None]
+        np.add.at(deltas, row_of[ci], lengths - self.net_length[nets][:, None])
+        return deltas, ci, nets, lengths
+
+    def score(self) -> float:
+        """Total routable-net airline plus plane-pad return distance"""
+        return float(self.net_length.sum() + self.plane[np.arange(len(self.comps)), self.choice].sum())
+
+    def run(self, min_improvement: float, max_rounds: int = 100) -> int:
+        """Descend until no part gains min_improvement -> rounds run"""
+        threshold = max(min_improvement, 1e-6)
+        todo = np.nonzero(self.scored)[0]
+        rounds = 0
+        while len(todo) and rounds < max_rounds:
+            rounds += 1
+            deltas, ci, nets, lengths = self._score(todo)
+            best = np.argmin(deltas, axis=1)
+            gain = -deltas[np.arange(len(todo)), best]
+
+            # Biggest gains first; a part sharing a routable net with an
+            # already chosen one waits for the next round
+            locked, chosen = set(), []
+            for r in np.argsort(-gain, kind="stable"):
+                if gain[r] < threshold:
+                    break
+                own = {int(n) for n in self.pin_net[todo[r]] if n >= 0}
+                if not own & locked:
+                    locked |= own
+                    chosen.append(r)
+            if not chosen:
+                break
+
+            comps = todo[chosen]
+            self.choice[comps] = best[chosen] + 1
+            for j in (0, 1):
+                on_net = comps[self.pin_slot[comps, j] >= 0]
+                self.points[self.pin_slot[on_net, j]] = self.positions[on_net, j, self.choice[on_net]]
+            picked = np.nonzero(np.isin(ci, comps))[0]
+            self.net_length[nets[picked]] = lengths[picked, self.choice[ci[picked]] - 1]
+
+            touched = [self.net_members[n] for n in locked]
+            todo = np.unique(np.concatenate(touched)) if touched else np.zeros(0, dtype=np.intp)
+            todo = todo[self.scored[todo]]
+        return rounds
+
+    def rotations(self) -> List[Dict[str, Any]]:
+        """The components whose rotation changed"""
+        out = []
+        for i in np.nonzero(self.choice)[0]:
+            current, suggested = self.current_rotation[i], ROTATIONS[self.choice[i] - 1]
+            if suggested != current:
+                comp = self.comps[i]
+                out.append({
+                    "designator": comp["designator"],
+                    "current_rotation": current,
+                    "suggested_rotation": suggested,
+                    "bbox_changes": (suggested - current) % 180 != 0,
+                })
+        return out
+
+
+def optimize_rotations(components: List[Dict[str, Any]],
+                       net_pads: Dict[str, List[Tuple[str, float, float]]],
+                       min_improvement_mils: float, max_rounds: int = 100) -> Dict[str, Any]:
+    """Joint rotation search over every 2-pad component -> the global score
+    before/after and the rotations that get there"""
+    search = RotationSearch(components, net_pads)
+    initial = search.score()
+    rounds = search.run(min_improvement_mils, max_rounds)
+    final = search.score()
+    rotations = search.rotations()
+    origin = {c["designator"]: (c["x"], c["y"]) for c in search.comps}
+    return {
+        "checked_count": int(search.scored.sum()),
+        "rounds": rounds,
+        "initial_score_mils": round(initial, 1),
+        "final_score_mils": round(final, 1),
+        "improvement_mils": round(initial - final, 1),
+        "rotations": rotations,
+        # ready for place_components: same origin, new rotation
+        "placements": [{"designator": r["designator"], "x": origin[r["designator"]][0],
+                        "y": origin[r["designator"]][1], "rotation": r["suggested_rotation"]}
+                       for r in rotations],
+    }
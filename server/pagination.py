@@ -0,0 +1,97 @@
+"""
+Cursor pagination for large tool results.
+
+The first call with a limit runs the command, materializes the full
+(post-processed) result on the server and returns the first page plus a
+next_cursor. Calls with that cursor are served from the materialized
+result without going back to Altium. A materialized result expires when
+the design changes (the read cache version moves on - any mutating
+command or sandbox script), after ttl seconds as a bound on hand edits
+in Altium, or when it is the oldest of max_results.
+
+Cursor format: "<result id>:<offset>:<limit>".
+"""
+
+import itertools
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+class ResultPager:
+    """Materialized results addressed by cursor"""
+
+    def __init__(self, version: Callable[[], int], ttl: float = 300.0, max_results: int = 16,
+                 clock: Callable[[], float] = time.monotonic):
+        self.version = version
+        self.ttl = ttl
+        self.max_results = max_results
+        self.clock = clock
+        self._ids = itertools.count(1)
+        self._prefix = secrets.token_hex(3)  # cursors from a previous server run never match
+        # result id -> (tool, version, created, envelope, list_key, items)
+        self._results: "OrderedDict[str, Tuple]" = OrderedDict()
+
+    def start(self, tool: str, payload: Any, list_key: str, limit: int) -> Dict[str, Any]:
+        """Materialize payload and return its first page.
+
+        payload is either the list itself or an object holding it under
+        list_key; the other fields of the object are repeated on every page.
+        """
+        if isinstance(payload, list):
+            envelope, items = {}, payload
+        else:
+            envelope = {k: v for k, v in payload.items() if k != list_key}
+            items = payload.get(list_key) or []
+        result_id = f"{self._prefix}{next(self._ids)}"
+        self._results[result_id] = (tool, self.version(), self.clock(), envelope, list_key, items)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+        return self._page(result_id, 0, limit)
+
+    def page(self, tool: str, cursor: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        """The page a cursor points at; limit overrides the cursor's page size"""
+        invalid = {"success": False, "error": f"Invalid cursor: {cursor}"}
+        try:
+            result_id, offset, cursor_limit = cursor.rsplit(":", 2)
+            offset, cursor_limit = int(offset), int(cursor_limit)
+        except ValueError:
+            return invalid
+        if offset < 0 or cursor_limit <= 0:
+            return invalid
+        entry = self._results.get(result_id)
+        if entry is None or entry[0] != tool:
+            return {"success": False, "error": "Cursor expired or unknown - call again without a cursor"}
+        _, version, created, _, _, items = entry
+        if version != self.version() or self.clock() - created > self.ttl:
+            del self._results[result_id]
+            return {"success": False,
+                    "error": "Cursor expired (the design changed or the result is too old) - "
+                             "call again without a cursor"}
+        if offset > len(items):
+            return invalid
+        return self._page(result_id, offset, limit or cursor_limit)
+
+    def _page(self, result_id: str, offset: int, limit: int) -> Dict[str, Any]:
+        _, _, _, envelope, list_key, items = self._results[result_id]
+        limit = max(1, int(limit))
+        end = offset + limit
+        page = dict(envelope)
+        page[list_key] = items[offset:end]
+        page["total"] = len(items)
+        page["offset"] = offset
+        page["next_cursor"] = f"{result_id}:{end}:{limit}" if end < len(items) else None
+        return page
+
+    def stats(self) -> Dict[str, Any]:
+        return {"materialized_results": len(self._results), "ttl_seconds": self.ttl}
+
+
+def list_key_for(payload: Any, candidates: Iterable[str]) -> Optional[str]:
+    """First candidate key holding a list in payload"""
+    if isinstance(payload, dict):
+        for key in candidates:
+            if isinstance(payload.get(key), list):
+                return key
+    return None
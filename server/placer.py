@@ -0,0 +1,411 @@
+"""
+Simulated-annealing placement of a component cluster (optimize_placement).
+
+The cluster's components move inside a keep-in box on a BoardModel while
+everything else stays where it is. A placement costs
+
+    sum over scored nets of weight * net term
+  + OVERLAP_PENALTY * area of overlapping courtyards
+
+- net term: the net's airline (MST) length, or for plane nets (more than
+  max_pads_per_net pads, scored only when named in net_weights) the
+  distance from each cluster pad to the nearest fixed pad of the net, as
+  check_orientation does
+- courtyard: the component's bounding box grown by clearance / 2 on every
+  side, so two parts closer than the clearance overlap
+
+Moves are a shift within a window that shrinks as the temperature drops,
+a swap of two same-side parts, or an orthogonal rotation. Every move is
+priced incrementally: only the nets of the one or two moved parts are
+re-scored (a plane net only re-queries the moved pads), and their
+courtyards are checked against the rest in one vectorized pass. A
+rejected move leaves nothing to undo.
+
+Cooling is geometric from T0 (the mean uphill step of a random-move
+sample) down to T0 * COOLING_RANGE, paced by the time budget or the
+iteration count, whichever runs out first; the best placement seen wins.
+"""
+
+import math
+import random
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from board_model import BoardModel, evaluate_placement
+from mst import mst_length
+from orientation import ROTATIONS, rotate_offset
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # optional: plane nets fall back to a NumPy scan
+    cKDTree = None
+
+OVERLAP_PENALTY = 4.0  # cost per square mil of courtyard overlap
+COOLING_RANGE = 1e-3   # final temperature as a fraction of T0
+TEMPERATURE_SAMPLES = 64
+
+Move = Tuple[int, float, float, float]  # (member, x, y, rotation)
+
+
+def _areas(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """Intersection area of box with each row of boxes"""
+    ox = np.minimum(box[2], boxes[:, 2]) - np.maximum(box[0], boxes[:, 0])
+    oy = np.minimum(box[3], boxes[:, 3]) - np.maximum(box[1], boxes[:, 1])
+    return np.maximum(ox, 0.0, out=ox) * np.maximum(oy, 0.0, out=oy)
+
+
+def _area(a, b) -> float:
+    ox = min(a[2], b[2]) - max(a[0], b[0])
+    oy = min(a[3], b[3]) - max(a[1], b[1])
+    return ox * oy if ox > 0 and oy > 0 else 0.0
+
+
+class Annealer:
+    """A cluster of a BoardModel's components (members) and their current
+    placement, priced move by move"""
+
+    def __init__(self, model: BoardModel, cluster: Sequence[int], weights: Dict[int, float],
+                 keep_in: Tuple[float, float, float, float], clearance: float = 10.0,
+                 rotate: bool = True, grid: float = 1.0, max_pads_per_net: int = 40,
+                 seed: int = 0):
+        self.model = model
+        self.cluster = [int(c) for c in cluster]
+        self.keep_in = tuple(float(v) for v in keep_in)
+        self.margin = clearance / 2.0
+        self.grid = grid
+        self.rng = random.Random(seed)
+        self._halves: Dict[Tuple[int, float], Tuple[float, float]] = {}
+        current = model.current
+        member = {c: m for m, c in enumerate(self.cluster)}
+
+        self.x = [float(current.x[c]) for c in self.cluster]
+        self.y = [float(current.y[c]) for c in self.cluster]
+        self.rot = [float(current.rotation[c]) for c in self.cluster]
+        self.bottom = [bool(current.bottom[c]) for c in self.cluster]
+
+        # rotations whose box fits the keep-in, current rotation first
+        xmin, ymin, xmax, ymax = self.keep_in
+        self.allowed: List[List[float]] = []
+        for m, c in enumerate(self.cluster):
+            candidates = [self.rot[m]] + ([r for r in ROTATIONS if r != self.rot[m]] if rotate else [])
+            fits = [r for r in candidates
+                    if 2 * self._half(m, r)[0] <= xmax - xmin and 2 * self._half(m, r)[1] <= ymax - ymin]
+            if not fits:
+                raise ValueError(f"{model.designators[c]} does not fit in keep_in")
+            self.allowed.append(fits)
+            self.rot[m] = fits[0]
+
+        # Courtyards: members first, then the fixed parts near the keep-in
+        others = np.array([c for c in range(len(model)) if c not in member], dtype=np.intp)
+        fixed = model.boxes(current, others) + np.array([-1, -1, 1, 1]) * self.margin
+        near = _areas(np.array(self.keep_in) + np.array([-1, -1, 1, 1]) * self.margin, fixed) > 0
+        self.box_ids = np.concatenate((np.array(self.cluster, dtype=np.intp), others[near]))
+        self.boxes = np.concatenate((np.zeros((len(self.cluster), 4)), fixed[near]))
+        self.same_side = {side: (current.bottom[self.box_ids] == side).astype(float)
+                          for side in (False, True)}
+
+        # Nets: airline nets keep every pad position (fixed pads first),
+        # plane nets the nearest-fixed-pad distance of each cluster pad
+        self.pads: List[List[Tuple[int, int, float, float]]] = [[] for _ in self.cluster]
+        self.net_weight: List[float] = []
+        self.net_plane: List[bool] = []
+        self.net_fixed: List[Any] = []
+        self.net_points: List[list] = []
+        self.net_term: List[float] = []
+        for net, weight in weights.items():
+            pads = model.net_pads[net]
+            mine = [int(p) for p in pads if int(model.pad_comp[p]) in member]
+            fixed = np.array([p for p in pads if int(model.pad_comp[p]) not in member], dtype=np.intp)
+            if not mine:
+                continue
+            k = len(self.net_weight)
+            fx, fy = model.pad_positions(current, fixed)
+            plane = len(pads) > max_pads_per_net and len(fixed) > 0
+            self.net_weight.append(float(weight))
+            self.net_plane.append(plane)
+            if plane:
+                points = np.column_stack((fx, fy))
+                self.net_fixed.append(cKDTree(points) if cKDTree is not None else points)
+                self.net_points.append([0.0] * len(mine))
+                base = 0
+            else:
+                self.net_fixed.append(None)
+                self.net_points.append(list(zip(fx.tolist(), fy.tolist())) + [None] * len(mine))
+                base = len(fixed)
+            self.net_term.append(0.0)
+            for slot, p in enumerate(mine):
+                m = member[int(model.pad_comp[p])]
+                dx = -model.pad_dx[p] if self.bottom[m] else model.pad_dx[p]
+                self.pads[m].append((k, base + slot, float(dx), float(model.pad_dy[p])))
+        self._offsets: List[Dict[float, list]] = [{} for _ in self.cluster]
+
+        for m in range(len(self.cluster)):
+            self.x[m], self.y[m] = self._clamp(m, self.x[m], self.y[m], self.rot[m])
+        self.cost = self.reset()
+
+    # -- geometry
+
+    def _half(self, m: int, rotation: float) -> Tuple[float, float]:
+        """Half width/height of member m's box at rotation"""
+        key = (m, rotation)
+        half = self._halves.get(key)
+        if half is None:
+            c = self.cluster[m]
+            delta = math.radians(rotation - float(self.model.current.rotation[c]))
+            cos, sin = abs(round(math.cos(delta), 9)), abs(round(math.sin(delta), 9))
+            w, h = float(self.model.width[c]), float(self.model.height[c])
+            half = self._halves[key] = (w * cos + h * sin) / 2, (w * sin + h * cos) / 2
+        return half
+
+    def _courtyard(self, m: int, x: float, y: float, rotation: float) -> np.ndarray:
+        hw, hh = self._half(m, rotation)
+        hw, hh = hw + self.margin, hh + self.margin
+        return np.array([x - hw, y - hh, x + hw, y + hh])
+
+    def _clamp(self, m: int, x: float, y: float, rotation: float) -> Tuple[float, float]:
+        """Nearest position (on the grid where possible) keeping member m's
+        box inside the keep-in"""
+        hw, hh = self._half(m, rotation)
+        xmin, ymin, xmax, ymax = self.keep_in
+        out = []
+        for v, lo, hi in ((x, xmin + hw, xmax - hw), (y, ymin + hh, ymax - hh)):
+            v = min(max(v, lo), hi)
+            if self.grid > 0:
+                snapped = round(v / self.grid) * self.grid
+                if lo <= snapped <= hi:
+                    v = snapped
+            out.append(v)
+        return out[0], out[1]
+
+    def _pad_offsets(self, m: int, rotation: float) -> list:
+        offsets = self._offsets[m].get(rotation)
+        if offsets is None:
+            offsets = [rotate_offset(dx, dy, rotation) for _, _, dx, dy in self.pads[m]]
+            self._offsets[m][rotation] = offsets
+        return offsets
+
+    def _nearest(self, k: int, points: list) -> List[float]:
+        fixed = self.net_fixed[k]
+        if cKDTree is not None:
+            return self.net_fixed[k].query(points)[0].tolist()
+        pts = np.asarray(points, dtype=float)
+        return np.hypot(pts[:, None, 0] - fixed[None, :, 0],
+                        pts[:, None, 1] - fixed[None, :, 1]).min(axis=1).tolist()
+
+    def _overlap(self, boxes: Dict[int, np.ndarray]) -> float:
+        """Courtyard overlap involving the members in boxes, placed there,
+        against fixed parts and all other members"""
+        moved = list(boxes)
+        total = 0.0
+        for m, box in boxes.items():
+            areas = _areas(box, self.boxes) * self.same_side[self.bottom[m]]
+            areas[moved] = 0.0
+            total += float(areas.sum())
+        if len(moved) == 2 and self.bottom[moved[0]] == self.bottom[moved[1]]:
+            total += _area(boxes[moved[0]], boxes[moved[1]])
+        return total
+
+    # -- cost
+
+    def reset(self) -> float:
+        """Recompute every term from the current placement -> total cost"""
+        for m in range(len(self.cluster)):
+            self.boxes[m] = self._courtyard(m, self.x[m], self.y[m], self.rot[m])
+            for (k, slot, _, _), (ox, oy) in zip(self.pads[m], self._pad_offsets(m, self.rot[m])):
+                self.net_points[k][slot] = (self.x[m] + ox, self.y[m] + oy)
+        cost = 0.0
+        for k in range(len(self.net_weight)):
+            if self.net_plane[k]:
+                self.net_points[k] = list(zip(self.net_points[k], self._nearest(k, self.net_points[k])))
+                self.net_term[k] = sum(d for _, d in self.net_points[k])
+            else:
+                self.net_term[k] = mst_length(self.net_points[k])
+            cost += self.net_weight[k] * self.net_term[k]
+        overlap = 0.0
+        for m in range(len(self.cluster)):
+            areas = _areas(self.boxes[m], self.boxes[m + 1:]) * self.same_side[self.bottom[m]][m + 1:]
+            overlap += float(areas.sum())
+        return cost + OVERLAP_PENALTY * overlap
+
+    def delta(self, moves: Sequence[Move]):
+        """Cost change of the moves -> (delta, net updates, courtyards)"""
+        changed: Dict[int, Dict[int, Tuple[float, float]]] = {}
+        for m, x, y, rotation in moves:
+            for (k, slot, _, _), (ox, oy) in zip(self.pads[m], self._pad_offsets(m, rotation)):
+                changed.setdefault(k, {})[slot] = (x + ox, y + oy)
+        total = 0.0
+        updates = {}
+        for k, slots in changed.items():
+            points = self.net_points[k].copy()
+            if self.net_plane[k]:
+                new = self.net_term[k]
+                for slot, d in zip(slots, self._nearest(k, list(slots.values()))):
+                    new += d - points[slot][1]
+                    points[slot] = (slots[slot], d)
+            else:
+                for slot, point in slots.items():
+                    points[slot] = point
+                new = mst_length(points)
+            updates[k] = (new, points)
+            total += self.net_weight[k] * (new - self.net_term[k])
+        boxes = {m: self._courtyard(m, x, y, rotation) for m, x, y, rotation in moves}
+        before = self._overlap({m: self.boxes[m] for m in boxes})
+        total += OVERLAP_PENALTY * (self._overlap(boxes) - before)
+        return total, updates, boxes
+
+    def apply(self, moves: Sequence[Move], updates, boxes) -> None:
+        for m, x, y, rotation in moves:
+            self.x[m], self.y[m], self.rot[m] = x, y, rotation
+            self.boxes[m] = boxes[m]
+        for k, (term, points) in updates.items():
+            self.net_term[k], self.net_points[k] = term, points
+
+    # -- search
+
+    def propose(self, window: float) -> List[Move]:
+        """A random shift, swap or rotation"""
+        rng = self.rng
+        m = rng.randrange(len(self.cluster))
+        kind = rng.random()
+        if kind < 0.15 and len(self.allowed[m]) > 1:
+            rotation = rng.choice([r for r in self.allowed[m] if r != self.rot[m]])
+            return [(m, *self._clamp(m, self.x[m], self.y[m], rotation), rotation)]
+        if kind < 0.35 and len(self.cluster) > 1:
+            o = rng.randrange(len(self.cluster))
+            if o != m and self.bottom[o] == self.bottom[m]:
+                return [(m, *self._clamp(m, self.x[o], self.y[o], self.rot[m]), self.rot[m]),
+                        (o, *self._clamp(o, self.x[m], self.y[m], self.rot[o]), self.rot[o])]
+        x = self.x[m] + rng.uniform(-window, window)
+        y = self.y[m] + rng.uniform(-window, window)
+        return [(m, *self._clamp(m, x, y, self.rot[m]), self.rot[m])]
+
+    def run(self, time_budget: float = 2.0, iterations: int = 0) -> Dict[str, Any]:
+        """Anneal until the budget or iteration count runs out, then keep
+        the best placement seen"""
+        start = time.perf_counter()
+        initial = self.cost
+        xmin, ymin, xmax, ymax = self.keep_in
+        span = max(xmax - xmin, ymax - ymin) / 2
+
+        uphill = [d for d, _, _ in (self.delta(self.propose(span)) for _ in range(TEMPERATURE_SAMPLES))
+                  if d > 0]
+        t0 = sum(uphill) / len(uphill) if uphill else 1.0
+
+        best = (self.cost, self.x[:], self.y[:], self.rot[:])
+        count = accepted = 0
+        while True:
+            progress = (time.perf_counter() - start) / time_budget if time_budget > 0 else 0.0
+            if iterations:
+                progress = max(progress, count / iterations)
+            if progress >= 1.0:
+                break
+            temperature = t0 * COOLING_RANGE ** progress
+            window = max(self.grid, span * math.sqrt(temperature / t0))
+            moves = self.propose(window)
+            delta, updates, boxes = self.delta(moves)
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                self.apply(moves, updates, boxes)
+                self.cost += delta
+                accepted += 1
+                if self.cost < best[0] - 1e-9:
+                    best = (self.cost, self.x[:], self.y[:], self.rot[:])
+            count += 1
+
+        _, self.x, self.y, self.rot = best
+        self.cost = self.reset()
+        return {
+            "iterations": count,
+            "accepted": accepted,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+            "initial_cost": round(initial, 1),
+            "final_cost": round(self.cost, 1),
+        }
+
+    # -- results
+
+    def placements(self) -> List[Dict[str, Any]]:
+        """place_components entries for the members that moved"""
+        current = self.model.current
+        out = []
+        for m, c in enumerate(self.cluster):
+            if (abs(self.x[m] - current.x[c]) < 1e-6 and abs(self.y[m] - current.y[c]) < 1e-6
+                    and self.rot[m] == current.rotation[c]):
+                continue
+            out.append({"designator": self.model.designators[c], "x": round(self.x[m], 3),
+                        "y": round(self.y[m], 3), "rotation": self.rot[m],
+                        "layer": "bottom" if self.bottom[m] else "top"})
+        return out
+
+    def violations(self) -> List[Dict[str, str]]:
+        """Pairs still closer than the clearance"""
+        names = self.model.designators
+        out = []
+        for m, c in enumerate(self.cluster):
+            areas = _areas(self.boxes[m], self.boxes[m + 1:]) * self.same_side[self.bottom[m]][m + 1:]
+            for i in np.nonzero(areas > 0)[0]:
+                out.append({"a": names[c], "b": names[self.box_ids[m + 1 + i]]})
+        return out
+
+
+def optimize_placement(model: BoardModel, cmp_designators: Sequence[str],
+                       net_weights: Optional[Dict[str, float]] = None,
+                       keep_in: Optional[Sequence[float]] = None, clearance_mils: float = 10.0,
+                       allow_rotation: bool = True, grid_mils: float = 1.0,
+                       time_budget_s: float = 2.0, iterations: int = 0,
+                       max_pads_per_net: int = 40, seed: int = 0) -> Dict[str, Any]:
+    """Anneal the cluster's placement and score the result against the
+    current one with evaluate_placement.
+
+    keep_in is [xmin, ymin, xmax, ymax]; by default the cluster's current
+    bounding box grown by 20% of its larger side on every side. Raises
+    ValueError for unusable arguments.
+    """
+    net_weights = net_weights or {}
+    cluster, names, missing = [], [], []
+    for designator in cmp_designators or []:
+        i = model.index.get(designator)
+        if i is None:
+            missing.append(designator)
+        elif i not in cluster:
+            cluster.append(i)
+            names.append(designator)
+    if not cluster:
+        raise ValueError("None of cmp_designators are on the board")
+    if time_budget_s <= 0 and iterations <= 0:
+        raise ValueError("time_budget_s or iterations must be positive")
+
+    if keep_in is None:
+        box = model.boxes(model.current, np.array(cluster, dtype=np.intp))
+        xmin, ymin = box[:, 0].min(), box[:, 1].min()
+        xmax, ymax = box[:, 2].max(), box[:, 3].max()
+        grow = 0.2 * max(xmax - xmin, ymax - ymin)
+        keep_in = (xmin - grow, ymin - grow, xmax + grow, ymax + grow)
+    else:
+        try:
+            keep_in = tuple(float(v) for v in keep_in)
+        except (TypeError, ValueError):
+            raise ValueError("keep_in must be [xmin, ymin, xmax, ymax] in mils")
+        if len(keep_in) != 4 or keep_in[0] >= keep_in[2] or keep_in[1] >= keep_in[3]:
+            raise ValueError("keep_in must be [xmin, ymin, xmax, ymax] in mils")
+
+    weights = model.weights_for(cluster, net_weights, max_pads_per_net)
+    annealer = Annealer(model, cluster, weights, keep_in, clearance=clearance_mils,
+                        rotate=allow_rotation, grid=grid_mils,
+                        max_pads_per_net=max_pads_per_net, seed=seed)
+    stats = annealer.run(time_budget_s, iterations)
+    placements = annealer.placements()
+    metrics = evaluate_placement(model, placements, net_weights=net_weights,
+                                 cmp_designators=names, max_pads_per_net=max_pads_per_net)
+    return {
+        "placements": placements,
+        "missing_designators": missing,
+        "keep_in": [round(float(v), 3) for v in keep_in],
+        "optimizer": stats,
+        "current": metrics["current"],
+        "proposed": metrics["proposed"],
+        "delta": metrics["delta"],
+        "overlaps": metrics["overlaps"],
+        "clearance_violations": annealer.violations(),
+    }
@@ -0,0 +1,90 @@
+"""
+Field projection shared by the component, pin, schematic and primitive tools.
+
+`fields` names the record fields to keep, e.g. "designator,x,y,rotation,layer".
+A record is any object inside a list - components, pins, primitives,
+footprints, symbols. Rules:
+- Nested tables (a list of objects such as "pins" or "primitives") are
+  kept and projected with the same field set, so "x,y,net" trims both the
+  components and their pins. Name a table to keep it whole ("pins"), or use
+  dotted names to give it its own selection ("pins.net,pins.x").
+- Dotted names also select inside nested objects ("parameters.Value").
+- Identity fields (designator, footprint_name, symbol_name, type) are always
+  kept so projected records stay recognisable.
+- Objects that are not inside a list (the envelope of a primitives dump,
+  {library_name, ..., footprints: [...]}) keep their scalar fields.
+
+Projection runs on the response before anything is serialized, so
+unselected fields never reach the tool result.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Union
+
+ALWAYS_KEEP = frozenset({"designator", "footprint_name", "symbol_name", "type"})
+
+FieldTree = Dict[str, Optional["FieldTree"]]
+
+
+def parse_fields(fields: Union[None, str, Iterable[str]]) -> Optional[FieldTree]:
+    """"a,b.c" or ["a", "b.c"] -> {"a": None, "b": {"c": None}}; None when
+    no projection is requested. None in the tree means "whole value"."""
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    tree: FieldTree = {}
+    for name in fields:
+        parts = [p.strip() for p in str(name).split(".") if p.strip()]
+        node = tree
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            if last:
+                node[part] = None
+            elif node.get(part, {}) is None:
+                break  # whole value already selected
+            else:
+                node = node.setdefault(part, {})
+    return tree or None
+
+
+def _is_table(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and isinstance(value[0], dict)
+
+
+def _project_list(items: list, tree: FieldTree) -> list:
+    return [_project_record(item, tree) if isinstance(item, dict) else item for item in items]
+
+
+def _project_record(record: Dict[str, Any], tree: FieldTree) -> Dict[str, Any]:
+    out = {}
+    for key, value in record.items():
+        if key in tree:
+            sub = tree[key]
+            if sub is None:
+                out[key] = value
+            elif isinstance(value, dict):
+                out[key] = _project_record(value, sub)
+            elif isinstance(value, list):
+                out[key] = _project_list(value, sub)
+            else:
+                out[key] = value
+        elif key in ALWAYS_KEEP:
+            out[key] = value
+        elif _is_table(value):
+            out[key] = _project_list(value, tree)
+    return out
+
+
+def project(value: Any, fields: Union[None, str, Iterable[str], FieldTree]) -> Any:
+    """Apply a projection to a tool payload (a list of records, or an
+    envelope object holding record tables). Returns value unchanged when
+    fields is empty; never mutates value."""
+    tree = fields if isinstance(fields, dict) else parse_fields(fields)
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return _project_list(value, tree)
+    if isinstance(value, dict):
+        return {key: _project_list(item, tree) if _is_table(item) else item
+                for key, item in value.items()}
+    return value
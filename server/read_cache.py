@@ -0,0 +1,130 @@
+"""
+Read cache for bridge commands.
+
+Read-only commands (component dumps, pins, nets, rules, ...) are cached by
+command + params with a TTL and LRU eviction. Any command that may change
+the design clears the whole cache and bumps its version, so a read after a
+placement always goes back to Altium. The TTL bounds how stale data can get
+when the board is edited by hand in Altium, which the server cannot see.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# Commands whose response depends only on the design and their params
+READ_COMMANDS = frozenset({
+    "get_all_component_data",
+    "get_schematic_data",
+    "get_component_pins",
+    "get_component_geometry",
+    "get_net_connections",
+    "get_all_nets",
+    "get_pcb_rules",
+    "get_pcb_layers",
+    "get_pcb_layer_stackup",
+    "get_footprint_primitives",
+    "get_symbol_primitives",
+})
+
+# Read commands that use the current Altium selection when no designators
+# are given - the selection can change behind our back, so never cache those
+SELECTION_COMMANDS = frozenset({
+    "get_component_pins",
+    "get_net_connections",
+})
+
+# Commands that neither read cacheable data nor change the design: UI
+# state (selection, zoom, focused library) and output generation
+NEUTRAL_COMMANDS = frozenset({
+    "get_selected_components_coordinates",
+    "take_view_screenshot",
+    "get_library_symbol_reference",
+    "search_library_symbol",
+    "get_output_job_containers",
+    "run_output_jobs",
+    "check_placement",
+})
+
+
+def is_cacheable(command: str, params: Dict[str, Any]) -> bool:
+    if command not in READ_COMMANDS:
+        return False
+    if command in SELECTION_COMMANDS and not params.get("designators"):
+        return False
+    return True
+
+
+def invalidates(command: str) -> bool:
+    """True for commands that may change the design.
+
+    Anything not known to be read-only counts as a mutation (place_components,
+    move_components, set_component_position, layout_duplicator_apply,
+    create_net_class, the create_* commands, ...), so a new command is
+    safe by default. layout_duplicator is one too: it replicates the
+    selected tracks, arcs, vias, polygons, regions and fills.
+    """
+    return command not in READ_COMMANDS and command not in NEUTRAL_COMMANDS
+
+
+class ReadCache:
+    """TTL + LRU cache of successful read responses.
+
+    Cached responses are shared, not copied: callers must treat them as
+    read-only.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 64,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    @staticmethod
+    def key(command: str, params: Dict[str, Any]) -> str:
+        return json.dumps([command, params], sort_keys=True, default=str)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            if self.clock() - stored_at <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        self._entries[key] = (self.clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop everything and start a new version"""
+        self._entries.clear()
+        self.version += 1
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "ttl_seconds": self.ttl,
+        }
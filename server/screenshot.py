@@ -0,0 +1,510 @@
+"""
+Screenshot capture off the event loop.
+
+get_screenshot used to start a raw thread and join it inside the async
+tool, so every other MCP request stalled for as long as the capture took
+(up to the 10 s timeout). ScreenshotService runs capture and encoding on
+its own bounded thread pool and awaits the result. A capture that times
+out keeps its worker until it finishes, and requests beyond max_pending
+are turned away instead of queueing up behind it.
+
+Capture backends are swappable:
+- GdiBackend finds the Altium window and copies it with GDI (pywin32,
+  Windows only)
+- SyntheticBackend draws a PCB-like test frame, with an optional delay,
+  so the pipeline runs on any OS. It is only used when configured by
+  name; without GDI, "auto" and "gdi" get UnavailableBackend, whose
+  captures fail
+
+A backend returns a Frame: the raw top-down BGRX pixel buffer exactly as
+GetBitmapBits returns it, plus the window's title and class and where the
+graphical view pane sits in it.
+
+Encoding works straight from that buffer and encodes once. A crop is
+decoded from the buffer with an offset and the window's row stride, so
+only the pixels inside it are converted. The image is then downscaled to
+max_dimension (box-reduced first, then resampled) and saved as PNG, JPEG
+or WebP. The debug copy of the full window, when enabled, is written by
+a separate thread after the result is on its way.
+
+Diff mode keeps the last image of each view type and compares the new one
+in tile_size squares (a vectorized per-pixel difference, any channel above
+tolerance marks the tile). Changed tiles are merged into rectangles (runs
+along a tile row, then runs of the same columns down the rows), and only
+those are encoded. Nothing changed gives "unchanged" and no image; a size
+or crop change, or more than FULL_FRAME_FRACTION of the tiles (or
+MAX_REGIONS rectangles) changed, gives the whole frame.
+"""
+
+import asyncio
+import io
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, features
+
+logger = logging.getLogger("AltiumMCPServer")
+
+CAPTURE_BACKENDS = ("auto", "gdi", "synthetic")
+IMAGE_FORMATS = {"png": "PNG", "jpeg": "JPEG", "jpg": "JPEG", "webp": "WEBP"}
+VIEW_CLASSES = {"pcb": "View_Graphical", "sch": "SchView"}  # child window of the document view
+
+Box = Tuple[int, int, int, int]  # left, top, right, bottom in window pixels
+
+FULL_FRAME_FRACTION = 0.5  # changed tiles above this fraction send the whole frame
+MAX_REGIONS = 16           # as do more changed rectangles than this
+
+
+class Frame:
+    """One captured window: width x height BGRX pixels, top row first"""
+
+    def __init__(self, pixels: Any, width: int, height: int, title: str = "", window_class: str = "",
+                 view_rect: Optional[Box] = None):
+        self.pixels = pixels
+        self.width = width
+        self.height = height
+        self.title = title
+        self.window_class = window_class
+        self.view_rect = view_rect
+
+    def image(self, box: Optional[Box] = None) -> Image.Image:
+        """RGB image of the window, or of box, decoded from the buffer.
+        Only the rows and columns inside box are read."""
+        if box is None:
+            return Image.frombuffer("RGB", (self.width, self.height), self.pixels, "raw", "BGRX", 0, 1)
+        left, top, right, bottom = clip(box, self.width, self.height)
+        stride = self.width * 4
+        start = memoryview(self.pixels)[top * stride + left * 4:]
+        return Image.frombuffer("RGB", (right - left, bottom - top), start, "raw", "BGRX", stride, 1)
+
+
+def clip(box: Box, width: int, height: int) -> Box:
+    """box limited to a width x height window, at least one pixel"""
+    left = min(max(int(box[0]), 0), width - 1)
+    top = min(max(int(box[1]), 0), height - 1)
+    return left, top, min(max(int(box[2]), left + 1), width), min(max(int(box[3]), top + 1), height)
+
+
+def zoom_region(view_rect: Box, zoom_width: float, zoom_height: float) -> Box:
+    """Where a zoom_width x zoom_height rectangle lands in the view pane:
+    scaled to fit and centred, as GraphicalView_ZoomOnRect places it"""
+    left, top, right, bottom = view_rect
+    view_width, view_height = right - left, bottom - top
+    if view_width <= 0 or view_height <= 0 or zoom_width <= 0 or zoom_height <= 0:
+        return view_rect
+    scale = min(view_width / zoom_width, view_height / zoom_height)
+    width, height = round(zoom_width * scale), round(zoom_height * scale)
+    left += (view_width - width) // 2
+    top += (view_height - height) // 2
+    return left, top, left + width, top + height
+
+
+def check_options(image_format: str = "png", quality: int = 80, max_dimension: int = 0) -> str:
+    """Normalized image format name; raises ValueError for bad options"""
+    image_format = (image_format or "png").strip().lower()
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"image_format must be one of {sorted(set(IMAGE_FORMATS) - {'jpg'})}")
+    if image_format == "webp" and not features.check("webp"):
+        raise ValueError("WebP encoding is not available in this Pillow build")
+    if not 1 <= quality <= 100:
+        raise ValueError("quality must be between 1 and 100")
+    if max_dimension < 0:
+        raise ValueError("max_dimension must be 0 (full size) or positive")
+    return "jpeg" if image_format == "jpg" else image_format
+
+
+def downscale(image: Image.Image, max_dimension: int) -> Image.Image:
+    """image shrunk so neither side exceeds max_dimension (0: unchanged)"""
+    largest = max(image.size)
+    if not max_dimension or largest <= max_dimension:
+        return image
+    scale = max_dimension / largest
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+
+def changed_tiles(previous: np.ndarray, current: np.ndarray, tile_size: int, tolerance: int = 0) -> np.ndarray:
+    """Grid (rows x columns of tiles) marking tiles where any channel of
+    any pixel differs by more than tolerance; edge tiles may be partial"""
+    height, width, channels = current.shape
+    # rows of channel bytes: a tile is tile_size rows by tile_size * channels bytes
+    a, b = previous.reshape(height, -1), current.reshape(height, -1)
+    if tolerance:
+        differs = np.maximum(a, b) - np.minimum(a, b) > tolerance  # |a - b| without widening
+    else:
+        differs = a != b
+    rows, cols = -(-height // tile_size), -(-width // tile_size)
+    span = tile_size * channels
+    if height % tile_size or width % tile_size:
+        padded = np.zeros((rows * tile_size, cols * span), dtype=bool)
+        padded[:height, :width * channels] = differs
+        differs = padded
+    # max over each tile's rows, then over its bytes
+    rows_max = differs.view(np.uint8).reshape(rows, tile_size, cols * span).max(axis=1)
+    return rows_max.reshape(rows, cols, span).max(axis=2).astype(bool)
+
+
+def tile_regions(grid: np.ndarray) -> List[Box]:
+    """Changed tiles merged into rectangles, in tile units (left, top,
+    right, bottom): runs along each row, then equal runs on adjacent rows"""
+    open_runs: Dict[Tuple[int, int], int] = {}  # (start, end) column run -> first row
+    regions = []
+    for row in range(grid.shape[0] + 1):
+        runs = set()
+        if row < grid.shape[0]:
+            edges = np.flatnonzero(np.diff(np.r_[0, grid[row].astype(np.int8), 0]))
+            runs = set(zip(edges[::2].tolist(), edges[1::2].tolist()))
+        for run in [r for r in open_runs if r not in runs]:
+            regions.append((run[0], open_runs.pop(run), run[1], row))
+        for run in runs:
+            open_runs.setdefault(run, row)
+    return sorted(regions, key=lambda r: (r[1], r[0]))
+
+
+def encode(image: Image.Image, image_format: str = "png", quality: int = 80,
+           max_dimension: int = 0) -> Tuple[bytes, Tuple[int, int]]:
+    """Encode once, downscaled so neither side exceeds max_dimension (0: full size).
+
+    Returns:
+        (encoded bytes, (width, height) of the encoded image)
+    """
+    image = downscale(image, max_dimension)
+    buffer = io.BytesIO()
+    if image_format == "png":
+        image.save(buffer, format="PNG")
+    else:
+        image.save(buffer, format=IMAGE_FORMATS[image_format], quality=quality)
+    return buffer.getvalue(), image.size
+
+
+class CaptureBackend:
+    """Base class: subclasses implement capture"""
+
+    name = "base"
+
+    def capture(self, view_type: str) -> Frame:
+        """Capture the Altium window; raises RuntimeError on failure"""
+        raise NotImplementedError
+
+
+class GdiBackend(CaptureBackend):
+    """The Altium main window, brought to the front and copied with BitBlt"""
+
+    name = "gdi"
+    settle_seconds = 0.5  # time for the window to repaint after SetForegroundWindow
+
+    @staticmethod
+    def available() -> bool:
+        if sys.platform != "win32":
+            return False
+        try:
+            import win32gui  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def capture(self, view_type: str) -> Frame:
+        import win32con
+        import win32gui
+        import win32ui
+
+        # windows with Altium and .PrjPcb in the title first, any Altium window as fallback
+        projects, fallback = [], []
+
+        def collect(hwnd, _):
+            if win32gui.IsWindowVisible(hwnd):
+                title = win32gui.GetWindowText(hwnd)
+                if "Altium" in title:
+                    (projects if ".PrjPcb" in title else fallback).append(hwnd)
+            return True
+
+        win32gui.EnumWindows(collect, 0)
+        windows = projects or fallback
+        if not windows:
+            raise RuntimeError(f"No Altium windows found for {view_type} view")
+        hwnd = windows[0]
+        left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+        width, height = right - left, bottom - top
+        if width <= 0 or height <= 0:
+            raise RuntimeError(f"Invalid window dimensions: {width}x{height}")
+
+        try:
+            win32gui.SetForegroundWindow(hwnd)
+            time.sleep(self.settle_seconds)
+        except Exception as e:
+            logger.warning(f"Could not bring window to foreground: {e}")
+
+        # the document view pane, for cropping: the largest child of its class
+        panes = []
+
+        def collect_panes(child, _):
+            if win32gui.IsWindowVisible(child) and win32gui.GetClassName(child) == VIEW_CLASSES.get(view_type):
+                l, t, r, b = win32gui.GetWindowRect(child)
+                panes.append((l - left, t - top, r - left, b - top))
+            return True
+
+        try:
+            win32gui.EnumChildWindows(hwnd, collect_panes, 0)
+        except Exception as e:
+            logger.warning(f"Could not find the {view_type} view pane: {e}")
+        view_rect = max(panes, key=lambda p: (p[2] - p[0]) * (p[3] - p[1])) if panes else None
+
+        hwnd_dc = win32gui.GetWindowDC(hwnd)
+        mfc_dc = win32ui.CreateDCFromHandle(hwnd_dc)
+        save_dc = mfc_dc.CreateCompatibleDC()
+        bitmap = win32ui.CreateBitmap()
+        try:
+            bitmap.CreateCompatibleBitmap(mfc_dc, width, height)
+            save_dc.SelectObject(bitmap)
+            save_dc.BitBlt((0, 0), (width, height), mfc_dc, (0, 0), win32con.SRCCOPY)
+            info = bitmap.GetInfo()
+            pixels = bitmap.GetBitmapBits(True)
+        finally:
+            win32gui.DeleteObject(bitmap.GetHandle())
+            save_dc.DeleteDC()
+            mfc_dc.DeleteDC()
+            win32gui.ReleaseDC(hwnd, hwnd_dc)
+        return Frame(pixels, info["bmWidth"], info["bmHeight"], win32gui.GetWindowText(hwnd),
+                     win32gui.GetClassName(hwnd), view_rect)
+
+
+class SyntheticBackend(CaptureBackend):
+    """A PCB-like frame: dark background, grid, traces, component bodies and pads.
+    The view pane leaves room for a toolbar, a side panel and a status bar.
+
+    Args:
+        width, height: frame size in pixels
+        delay: seconds every capture takes, like the GDI window settle time
+        seed: layout of the drawn components
+    """
+
+    name = "synthetic"
+
+    def __init__(self, width: int = 1920, height: int = 1080, delay: float = 0.0, seed: int = 0):
+        self.width, self.height, self.delay = width, height, delay
+        self.view_rect = (width // 6, min(60, height // 4), width, height - min(24, height // 8))
+        rng = np.random.default_rng(seed)
+        count = max(width * height // 20_000, 1)
+        self.boxes = np.column_stack([rng.integers(0, width, count), rng.integers(0, height, count),
+                                      rng.integers(10, 80, count), rng.integers(6, 40, count)])
+        # horizontal and vertical trace segments: x, y, length, vertical
+        self.traces = np.column_stack([rng.integers(0, width, 4 * count), rng.integers(0, height, 4 * count),
+                                       rng.integers(20, 300, 4 * count), rng.integers(0, 2, 4 * count)])
+        self.captures = 0
+
+    def move(self, index: int, dx: int, dy: int) -> None:
+        """Move one drawn component, as a placement step would"""
+        self.boxes[index, :2] += (dx, dy)
+
+    def render(self) -> np.ndarray:
+        frame = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+        frame[..., :3] = (24, 16, 0)  # BGR: Altium's dark blue-black
+        frame[::50, :, :3] = frame[:, ::50, :3] = (60, 50, 40)
+        for x, y, length, vertical in self.traces.tolist():
+            if vertical:
+                frame[y:y + length, x:x + 3, :3] = (60, 60, 220)  # top layer copper
+            else:
+                frame[y:y + 3, x:x + length, :3] = (230, 90, 40)  # bottom layer copper
+        for x, y, w, h in self.boxes.tolist():
+            frame[y:y + h, x:x + w, :3] = (40, 200, 230)  # silkscreen body
+            frame[y + 2:y + h - 2, x + 2:x + 8, :3] = (40, 40, 200)  # pads
+            frame[y + 2:y + h - 2, x + w - 8:x + w - 2, :3] = (40, 40, 200)
+        return frame
+
+    def capture(self, view_type: str) -> Frame:
+        if self.delay:
+            time.sleep(self.delay)
+        self.captures += 1
+        return Frame(self.render().tobytes(), self.width, self.height,
+                     f"Synthetic {view_type.upper()} view", "SyntheticFrame", self.view_rect)
+
+
+class UnavailableBackend(CaptureBackend):
+    """Stands in for GDI where it cannot run: every capture fails, so a
+    screenshot is never silently replaced by a synthetic frame"""
+
+    name = "unavailable"
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+    def capture(self, view_type: str) -> Frame:
+        raise RuntimeError(self.reason)
+
+
+def make_backend(kind: str = "auto") -> CaptureBackend:
+    """Build a capture backend: "gdi", "synthetic", or "auto" (GDI where
+    available). Synthetic frames are only used when asked for by name."""
+    if kind not in CAPTURE_BACKENDS:
+        logger.warning(f"Unknown screenshot backend '{kind}', using 'auto'")
+        kind = "auto"
+    if kind == "synthetic":
+        return SyntheticBackend()
+    if GdiBackend.available():
+        return GdiBackend()
+    logger.warning("GDI capture unavailable, screenshots will fail")
+    return UnavailableBackend("GDI screen capture is unavailable (needs Windows and pywin32); "
+                              "set screenshot_backend to 'synthetic' in config.json for test frames")
+
+
+class ScreenshotService:
+    """Capture and encode on a bounded thread pool, awaited by the tools.
+
+    Args:
+        backend: where frames come from
+        max_workers: capture threads (one: captures raise the window, so
+            they should not overlap)
+        max_pending: captures running or waiting; more are refused
+        timeout: seconds a caller waits for its capture
+        debug_dir: also save every full window there as screenshot_<view>.png
+            (in the background; off when None)
+    """
+
+    def __init__(self, backend: CaptureBackend, max_workers: int = 1, max_pending: int = 4,
+                 timeout: float = 10.0, debug_dir: Optional[Path] = None):
+        self.backend = backend
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.debug_dir = Path(debug_dir) if debug_dir else None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screenshot")
+        self.debug_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot-debug")
+        self.pending = 0  # only touched on the event loop thread
+        self.last: Dict[str, Tuple[Optional[Box], np.ndarray]] = {}  # view type -> crop box, RGB pixels
+        self.last_lock = threading.Lock()
+
+    @staticmethod
+    def _save_debug(frame: Frame, path: str) -> None:
+        try:
+            frame.image().save(path)
+            logger.info(f"Saved debug screenshot to {path}")
+        except Exception as e:
+            logger.warning(f"Could not save debug screenshot to {path}: {e}")
+
+    def _diff(self, view_type: str, box: Optional[Box], pixels: np.ndarray, tile_size: int,
+              tolerance: int) -> Optional[Dict[str, Any]]:
+        """Changed rectangles against the last image of the view, or None
+        when the whole frame should be sent"""
+        with self.last_lock:
+            previous = self.last.get(view_type)
+            self.last[view_type] = (box, pixels)
+        if previous is None or previous[0] != box or previous[1].shape != pixels.shape:
+            return None
+        grid = changed_tiles(previous[1], pixels, tile_size, tolerance)
+        regions = tile_regions(grid)
+        if grid.mean() > FULL_FRAME_FRACTION or len(regions) > MAX_REGIONS:
+            return None
+        height, width = pixels.shape[:2]
+        return {
+            "tile_count": grid.size,
+            "changed_tile_count": int(grid.sum()),
+            "regions": [{"x": left * tile_size, "y": top * tile_size,
+                         "width": min(right * tile_size, width) - left * tile_size,
+                         "height": min(bottom * tile_size, height) - top * tile_size}
+                        for left, top, right, bottom in regions],
+        }
+
+    def _capture(self, view_type: str, image_format: str, quality: int, max_dimension: int,
+                 zoom: Optional[Tuple[float, float]], diff: bool, tile_size: int,
+                 tolerance: int) -> Dict[str, Any]:
+        """Worker: capture and encode one frame, or its changed regions"""
+        frame = self.backend.capture(view_type)
+        debug_file = None
+        if self.debug_dir is not None:
+            debug_file = str(self.debug_dir / f"screenshot_{view_type}.png")
+            self.debug_executor.submit(self._save_debug, frame, debug_file)
+        box = None
+        if zoom and frame.view_rect:
+            box = clip(zoom_region(frame.view_rect, *zoom), frame.width, frame.height)
+        image = downscale(frame.image(box), max_dimension)
+        width, height = image.size
+        # every capture is remembered, so a diff can follow a plain screenshot
+        changes = None
+        if diff:
+            changes = self._diff(view_type, box, np.asarray(image), tile_size, tolerance)
+        else:
+            with self.last_lock:
+                self.last[view_type] = (box, np.asarray(image))
+        if changes is None:
+            data = encode(image, image_format, quality)[0]
+            image_bytes, mode = len(data), "full"
+        else:
+            for region in changes["regions"]:
+                x, y = region["x"], region["y"]
+                tile = image.crop((x, y, x + region["width"], y + region["height"]))
+                region["image"] = encode(tile, image_format, quality)[0]
+            image_bytes = sum(len(region["image"]) for region in changes["regions"])
+            mode = "tiles" if changes["regions"] else "unchanged"
+        result = {
+            "success": True,
+            "width": width,
+            "height": height,
+            "window_width": frame.width,
+            "window_height": frame.height,
+            "crop_box": list(box) if box else None,
+            "window_title": frame.title,
+            "window_class": frame.window_class,
+            "view_type": view_type,
+            "image_format": IMAGE_FORMATS[image_format],
+            "image_bytes": image_bytes,
+            "debug_file": debug_file,
+        }
+        if diff:
+            result["diff"] = mode
+        if changes is None:
+            result["image"] = data
+        else:
+            result.update(changes, tile_size=tile_size)
+        return result
+
+    async def capture(self, view_type: str, image_format: str = "png", quality: int = 80,
+                      max_dimension: int = 0, zoom: Optional[Tuple[float, float]] = None,
+                      diff: bool = False, tile_size: int = 64, tolerance: int = 0) -> Dict[str, Any]:
+        """Capture the view without blocking the event loop.
+
+        Args:
+            view_type: "pcb" or "sch"
+            image_format, quality, max_dimension: see encode (format
+                already checked by check_options)
+            zoom: (width, height) of the zoomed rectangle, to crop to where
+                it landed in the view pane; None keeps the whole window
+            diff: compare with the last image of this view type and return
+                only the changed regions
+            tile_size: diff tile side in pixels (of the returned image)
+            tolerance: per-channel difference a diff ignores
+
+        Returns the metadata plus the encoded image bytes under "image" (or,
+        for a diff, "diff": "full", "tiles" or "unchanged", and "regions"
+        [{x, y, width, height, image}]), or success False with an error.
+        """
+        if self.pending >= self.max_pending:
+            return {"success": False, "error": f"{self.pending} screenshots already in progress, try again shortly"}
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        future = loop.run_in_executor(self.executor, self._capture, view_type, image_format, quality,
+                                      max_dimension, zoom, diff, tile_size, tolerance)
+
+        def release(_):
+            self.pending -= 1
+        # the slot stays taken until the worker is really done, even after a timeout
+        future.add_done_callback(release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Screenshot capture timed out after {self.timeout} s")
+            return {"success": False, "error": "Screenshot operation timed out"}
+        except Exception as e:
+            logger.error(f"Screenshot capture failed: {e}")
+            return {"success": False, "error": f"Screenshot capture failed: {e}"}
+
+    def status(self) -> Dict[str, Any]:
+        return {"screenshot_backend": self.backend.name, "screenshots_pending": self.pending}
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False)
+        self.debug_executor.shutdown(wait=True)
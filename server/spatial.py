@@ -0,0 +1,273 @@
+"""
+Spatial index over component bounding boxes and pads.
+
+check_placement used to compare every target against every component on
+the board inside the script, with a bounding-box prefilter in
+DelphiScript - fine for a handful of targets, far too slow for the whole
+board. BoardIndex holds the boxes (from get_all_component_data) and pad
+centers (from get_component_pins) in uniform grids built once per
+snapshot, like BoardModel, and answers region, nearest-component and
+close-pair queries in Python. Only the close pairs go to Altium for the
+precise primitive-to-primitive measurement.
+
+SpatialIndex is a uniform grid in CSR form: every box is listed in each
+cell it touches, the (cell, box) entries sorted by cell, and a query
+gathers the entries of the cells it covers before testing the boxes
+exactly. The cell size follows the typical box size and the board's
+density, so a query touches a few cells and a few boxes per cell. Region
+queries spanning a large part of the board skip the grid and scan every
+box.
+
+Boxes are xmin, ymin, xmax, ymax in mils. A component's box is
+get_all_component_data's width/height placed at box_left/box_bottom when
+the script reports them, else centered on the component origin.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from board_model import is_bottom
+
+# Grids never get more cells than this many per box
+CELLS_PER_BOX = 4
+# Queries covering more cells than this fraction of the grid scan all boxes
+SCAN_FRACTION = 0.25
+
+
+def expand_runs(starts: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """For runs of counts[i] consecutive integers from starts[i]: (run
+    index, value) of every element"""
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.cumsum(counts) - counts
+    return owner, np.repeat(starts - offsets, counts) + np.arange(int(counts.sum()))
+
+
+class SpatialIndex:
+    """Uniform grid over (n, 4) boxes xmin, ymin, xmax, ymax"""
+
+    def __init__(self, boxes: Any, cell: Optional[float] = None):
+        self.boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        n = len(self.boxes)
+        if n:
+            self.origin = self.boxes[:, :2].min(axis=0)
+            span = np.maximum(self.boxes[:, 2:].max(axis=0) - self.origin, 1.0)
+        else:
+            self.origin, span = np.zeros(2), np.ones(2)
+        if cell is None:
+            size = np.maximum(self.boxes[:, 2] - self.boxes[:, 0], self.boxes[:, 3] - self.boxes[:, 1])
+            typical = float(np.median(size)) if n else 1.0
+            cell = max(typical, float(np.sqrt(span[0] * span[1] / max(n, 1))), 1.0)
+        # cap the cell count for sparse boards spread over a large extent
+        cell = max(cell, float(np.sqrt(span[0] * span[1] / (CELLS_PER_BOX * max(n, 1)))))
+        self.cell = float(cell)
+        self.shape = (int(span[0] // self.cell) + 1, int(span[1] // self.cell) + 1)
+
+        owner, keys = self._cells(self.boxes)
+        order = np.argsort(keys, kind="stable")
+        self.entries = owner[order]
+        self.starts = np.searchsorted(keys[order], np.arange(self.shape[0] * self.shape[1] + 1))
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def _cells(self, boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(box index, cell key) for every grid cell each box touches"""
+        nx, ny = self.shape
+        low = np.floor((boxes[:, :2] - self.origin) / self.cell).astype(np.intp)
+        high = np.floor((boxes[:, 2:] - self.origin) / self.cell).astype(np.intp)
+        x0, y0 = np.clip(low[:, 0], 0, nx - 1), np.clip(low[:, 1], 0, ny - 1)
+        x1, y1 = np.clip(high[:, 0], 0, nx - 1), np.clip(high[:, 1], 0, ny - 1)
+        # boxes entirely off the grid touch no cell
+        inside = (high[:, 0] >= 0) & (high[:, 1] >= 0) & (low[:, 0] < nx) & (low[:, 1] < ny)
+        width = np.where(inside, x1 - x0 + 1, 0)
+        counts = width * (y1 - y0 + 1)
+        owner, local = expand_runs(np.zeros(len(boxes), dtype=np.intp), counts)
+        step = width[owner]
+        return owner, (y0[owner] + local // step) * nx + x0[owner] + local % step
+
+    def _candidates(self, boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(query index, box index) for the boxes sharing a cell with each
+        query box, with repeats"""
+        query, keys = self._cells(boxes)
+        counts = self.starts[keys + 1] - self.starts[keys]
+        run, position = expand_runs(self.starts[keys], counts)
+        return query[run], self.entries[position]
+
+    def _covers_most(self, boxes: np.ndarray) -> bool:
+        cells = np.prod(np.maximum((boxes[:, 2:] - boxes[:, :2]) / self.cell + 1, 1), axis=1).sum()
+        return cells > SCAN_FRACTION * self.shape[0] * self.shape[1]
+
+    def query(self, xmin: float, ymin: float, xmax: float, ymax: float) -> np.ndarray:
+        """Sorted indices of the boxes intersecting the rectangle (touching
+        counts)"""
+        rect = np.array([[xmin, ymin, xmax, ymax]], dtype=float)
+        if not len(self) or xmin > xmax or ymin > ymax:
+            return np.zeros(0, dtype=np.intp)
+        if self._covers_most(rect):
+            found = np.arange(len(self))
+        else:
+            found = np.unique(self._candidates(rect)[1])
+        b = self.boxes[found]
+        hit = (b[:, 0] <= xmax) & (b[:, 2] >= xmin) & (b[:, 1] <= ymax) & (b[:, 3] >= ymin)
+        return found[hit]
+
+    def distances(self, x: float, y: float, items: np.ndarray) -> np.ndarray:
+        """Distance from (x, y) to each of the boxes, 0 inside"""
+        b = self.boxes[items]
+        dx = np.maximum(np.maximum(b[:, 0] - x, x - b[:, 2]), 0)
+        dy = np.maximum(np.maximum(b[:, 1] - y, y - b[:, 3]), 0)
+        return np.hypot(dx, dy)
+
+    def nearest(self, x: float, y: float, k: int, mask: Optional[np.ndarray] = None
+                ) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and distances of the k boxes closest to (x, y), nearest
+        first (ties by index); mask limits the search to some boxes"""
+        if k <= 0 or not len(self):
+            return np.zeros(0, dtype=np.intp), np.zeros(0)
+        far = max(abs(x - self.origin[0]), abs(x - self.origin[0] - self.shape[0] * self.cell),
+                  abs(y - self.origin[1]), abs(y - self.origin[1] - self.shape[1] * self.cell))
+        radius = self.cell
+        while True:
+            # every box within radius intersects the square around the point
+            found = self.query(x - radius, y - radius, x + radius, y + radius)
+            if mask is not None:
+                found = found[mask[found]]
+            dist = self.distances(x, y, found)
+            order = np.lexsort((found, dist))[:k]
+            if radius >= far or (len(order) == k and dist[order[-1]] <= radius):
+                return found[order], dist[order]
+            radius *= 2
+
+    def pairs(self, items: np.ndarray, distance: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(item, other) for each box within distance of one of the given
+        boxes, by the bounding-box rule check_placement uses: the overlap
+        along both axes is more than -distance. Includes (i, i) and both
+        orders when both boxes are among items."""
+        items = np.asarray(items, dtype=np.intp)
+        if not len(items) or not len(self):
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        grown = self.boxes[items] + np.array([-distance, -distance, distance, distance])
+        run, other = self._candidates(grown)
+        # each (query, box) once
+        unique = np.unique(run * len(self) + other)
+        run, other = unique // len(self), unique % len(self)
+        a, b = self.boxes[items[run]], self.boxes[other]
+        ox = np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0])
+        oy = np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1])
+        close = (ox > -distance) & (oy > -distance)
+        return items[run[close]], other[close]
+
+
+class BoardIndex:
+    """Component boxes and pad centers of a board snapshot, indexed"""
+
+    _last: Optional[Tuple[list, Optional[list], "BoardIndex"]] = None
+
+    def __init__(self, components: Iterable[Dict[str, Any]], pins: Optional[Iterable[Dict[str, Any]]] = None):
+        # first entry per designator, like ComponentIndex
+        first: Dict[str, Dict[str, Any]] = {}
+        for component in components:
+            if component.get("designator") is not None:
+                first.setdefault(component["designator"], component)
+        self.designators: List[str] = list(first)
+        self.index: Dict[str, int] = {d: i for i, d in enumerate(self.designators)}
+        rows = list(first.values())
+        self.layers = [str(c.get("layer", "")) for c in rows]
+        self.bottom = np.array([is_bottom(layer) for layer in self.layers], dtype=bool)
+        self.x = np.array([float(c.get("x", 0)) for c in rows])
+        self.y = np.array([float(c.get("y", 0)) for c in rows])
+        width = np.array([float(c.get("width") or 0) for c in rows])
+        height = np.array([float(c.get("height") or 0) for c in rows])
+        left = np.array([float(c["box_left"]) if c.get("box_left") is not None else np.nan for c in rows])
+        low = np.array([float(c["box_bottom"]) if c.get("box_bottom") is not None else np.nan for c in rows])
+        left = np.where(np.isnan(left), self.x - width / 2, left)
+        low = np.where(np.isnan(low), self.y - height / 2, low)
+        self.grid = SpatialIndex(np.column_stack((left, low, left + width, low + height)))
+
+        self.pads: List[Dict[str, Any]] = []
+        pad_comp, pad_x, pad_y = [], [], []
+        for entry in pins or []:
+            i = self.index.get(entry.get("designator"))
+            if i is None:
+                continue
+            for pin in entry.get("pins", []):
+                if "x" not in pin or "y" not in pin:
+                    continue
+                self.pads.append({"designator": self.designators[i], "name": pin.get("name", ""),
+                                  "net": pin.get("net", ""), "x": pin["x"], "y": pin["y"]})
+                pad_comp.append(i)
+                pad_x.append(float(pin["x"]))
+                pad_y.append(float(pin["y"]))
+        self.pad_comp = np.array(pad_comp, dtype=np.intp)
+        points = np.column_stack((pad_x, pad_y)) if pad_x else np.zeros((0, 2))
+        self.pad_grid = SpatialIndex(np.hstack((points, points)))
+
+    @classmethod
+    def of(cls, components: list, pins: Optional[list] = None) -> "BoardIndex":
+        """Index for this snapshot, reusing the last one if both lists are
+        the same objects"""
+        last = cls._last
+        if last is not None and last[0] is components and last[1] is pins:
+            return last[2]
+        index = cls(components, pins)
+        cls._last = (components, pins, index)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.designators)
+
+    def _side_mask(self, layer: str) -> Optional[np.ndarray]:
+        """None for any side, else the components on the "top"/"bottom" side"""
+        layer = str(layer or "").strip().lower()
+        if not layer:
+            return None
+        if layer not in ("top", "bottom"):
+            raise ValueError("layer must be 'top', 'bottom' or empty")
+        return self.bottom if layer == "bottom" else ~self.bottom
+
+    def _component(self, i: int) -> Dict[str, Any]:
+        box = self.grid.boxes[i]
+        return {"designator": self.designators[i], "layer": self.layers[i],
+                "x": float(self.x[i]), "y": float(self.y[i]),
+                "box": [round(float(v), 3) for v in box]}
+
+    def region(self, x1: float, y1: float, x2: float, y2: float, layer: str = "",
+               include_pads: bool = False) -> Dict[str, Any]:
+        """Components whose boxes intersect the rectangle (corners in any
+        order), optionally with the pads whose centers fall inside it"""
+        xmin, xmax = sorted((float(x1), float(x2)))
+        ymin, ymax = sorted((float(y1), float(y2)))
+        mask = self._side_mask(layer)
+        found = self.grid.query(xmin, ymin, xmax, ymax)
+        if mask is not None:
+            found = found[mask[found]]
+        result = {"region": [xmin, ymin, xmax, ymax], "component_count": len(found),
+                  "components": [self._component(i) for i in found.tolist()]}
+        if include_pads:
+            pads = self.pad_grid.query(xmin, ymin, xmax, ymax)
+            if mask is not None:
+                pads = pads[mask[self.pad_comp[pads]]]
+            result["pad_count"] = len(pads)
+            result["pads"] = [self.pads[p] for p in pads.tolist()]
+        return result
+
+    def nearest(self, x: float, y: float, k: int = 5, layer: str = "") -> List[Dict[str, Any]]:
+        """The k components whose boxes are closest to (x, y), nearest
+        first, with distance_mils (0 = the point is inside the box)"""
+        found, dist = self.grid.nearest(float(x), float(y), int(k), self._side_mask(layer))
+        return [dict(self._component(i), distance_mils=round(float(d), 3))
+                for i, d in zip(found.tolist(), dist.tolist())]
+
+    def close_pairs(self, targets: Sequence[int], distance: float) -> List[Tuple[int, int]]:
+        """Same-side component pairs with at least one target whose boxes
+        are closer than distance by check_placement's prefilter rule, each
+        pair once: (target, other), and between two targets the earlier
+        target first. Ordered by target, then other."""
+        rank = np.full(len(self), len(self), dtype=np.intp)
+        rank[np.asarray(targets, dtype=np.intp)] = np.arange(len(targets))
+        a, b = self.grid.pairs(np.asarray(targets, dtype=np.intp), distance)
+        keep = (a != b) & (self.bottom[a] == self.bottom[b]) & ~(rank[b] < rank[a])
+        a, b = a[keep], b[keep]
+        order = np.lexsort((b, rank[a]))
+        return list(zip(a[order].tolist(), b[order].tolist()))
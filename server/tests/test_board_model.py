@@ -0,0 +1,132 @@
+"""
+Board model tests: placement parsing, predicted pad positions and boxes,
+and placement scoring against the current layout.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from board_model import BoardModel, evaluate_placement, is_bottom, parse_placements
+
+
+def part(designator, x, y, rotation=0, layer="Top Layer", width=40, height=20, pins=()):
+    component = {"designator": designator, "x": x, "y": y, "rotation": rotation,
+                 "layer": layer, "width": width, "height": height}
+    pin_entry = {"designator": designator, "x": x, "y": y, "rotation": rotation, "layer": layer,
+                 "pins": [{"name": str(i + 1), "net": net, "dx": dx, "dy": dy}
+                          for i, (net, dx, dy) in enumerate(pins)]}
+    return component, pin_entry
+
+
+def model_of(*parts):
+    return BoardModel([c for c, _ in parts], [p for _, p in parts])
+
+
+class ParsePlacementsTest(unittest.TestCase):
+
+    def test_normalizes(self):
+        placements, errors = parse_placements([{"designator": " R1 ", "x": "10", "y": 20},
+                                               {"designator": "C1", "x": 0, "y": 0,
+                                                "rotation": 90, "layer": "Bottom"}])
+        self.assertEqual(errors, [])
+        self.assertEqual(placements, [
+            {"designator": "R1", "x": 10.0, "y": 20.0, "rotation": -1.0, "layer": ""},
+            {"designator": "C1", "x": 0.0, "y": 0.0, "rotation": 90.0, "layer": "bottom"}])
+
+    def test_errors(self):
+        _, errors = parse_placements(["R1", {"designator": "R1", "x": 1}, {"designator": "a|b", "x": 1, "y": 1},
+                                      {"designator": "R1", "x": 1, "y": 1, "layer": "inner"},
+                                      {"designator": "R1", "x": "left", "y": 1}])
+        self.assertEqual(len(errors), 5)
+        self.assertIn("placements[0] must be an object", errors)
+        self.assertEqual(parse_placements("R1")[1], ["placements must be a list"])
+
+    def test_is_bottom(self):
+        self.assertTrue(all(map(is_bottom, ("bottom", "Bottom Layer", "BottomLayer"))))
+        self.assertFalse(any(map(is_bottom, ("top", "Top Layer", "", None))))
+
+
+class BoardModelTest(unittest.TestCase):
+
+    def test_pad_positions_follow_pin_convention(self):
+        board = SyntheticBoard(count=200, seed=1)
+        model = BoardModel(list(board.components.values()), board.get_component_pins({}))
+        moves = []
+        for k, designator in enumerate(sorted(board.components)[:40]):
+            component = board.components[designator]
+            component.update(x=component["x"] + 100, rotation=(component["rotation"] + 90 * k) % 360,
+                             layer="BottomLayer" if k % 3 else "TopLayer")
+            moves.append({"designator": designator, "x": component["x"], "y": component["y"],
+                          "rotation": component["rotation"], "layer": "bottom" if k % 3 else "top"})
+        state, missing = model.apply(moves)
+        self.assertEqual(missing, [])
+        px, py = model.pad_positions(state)
+        expected = [(pin["x"], pin["y"]) for entry in board.get_component_pins({}) for pin in entry["pins"]]
+        np.testing.assert_allclose(np.column_stack((px, py)), expected, atol=1e-3)
+
+    def test_boxes_swap_on_quarter_turn(self):
+        model = model_of(part("U1", 100, 100, rotation=90, width=40, height=20))
+        state, _ = model.apply([{"designator": "U1", "x": 0, "y": 0, "rotation": 180, "layer": ""}])
+        np.testing.assert_allclose(model.boxes(state)[0], [-10, -20, 10, 20])
+        state, _ = model.apply([{"designator": "U1", "x": 0, "y": 0, "rotation": 270, "layer": ""}])
+        np.testing.assert_allclose(model.boxes(state)[0], [-20, -10, 20, 10])
+
+    def test_overlaps_same_side_only(self):
+        model = model_of(part("A", 0, 0), part("B", 30, 0), part("C", 0, 0, layer="Bottom Layer"),
+                         part("D", 500, 0))
+        pairs = model.overlaps(model.current, np.array([0, 1]))
+        self.assertEqual(pairs, [(0, 1, 10.0, 20.0)])
+
+    def test_of_memoizes_snapshot(self):
+        components, pins = [part("A", 0, 0)[0]], [part("A", 0, 0)[1]]
+        self.assertIs(BoardModel.of(components, pins), BoardModel.of(components, pins))
+        self.assertIsNot(BoardModel.of(components, pins), BoardModel.of(list(components), pins))
+
+
+class EvaluatePlacementTest(unittest.TestCase):
+
+    def setUp(self):
+        gnd = [part(f"G{i}", 5000 + 50 * i, 5000, pins=[("GND", 0, 0)]) for i in range(50)]
+        self.model = model_of(
+            part("U1", 0, 0, width=100, height=100, pins=[("SW", 50, 0), ("EN", -50, 0), ("GND", 0, -50)]),
+            part("L1", 1000, 0, pins=[("SW", -20, 0), ("OUT", 20, 0)]),
+            part("R1", 0, 500, pins=[("EN", 0, 0)]),
+            *gnd)
+
+    def test_moving_closer_improves_airline(self):
+        result = evaluate_placement(self.model, [{"designator": "L1", "x": 100, "y": 0,
+                                                  "rotation": -1, "layer": ""}])
+        self.assertEqual(result["scope"], ["L1"])
+        # regressions first; OUT has a single pad and never changes
+        self.assertEqual([n["net"] for n in result["nets"]], ["OUT", "SW"])
+        self.assertAlmostEqual(result["current"]["weighted_airline_mils"], 930.0)
+        self.assertAlmostEqual(result["proposed"]["weighted_airline_mils"], 30.0)
+        self.assertAlmostEqual(result["delta"]["weighted_airline_mils"], -900.0)
+        # L1's box now touches U1's (U1 spans x <= 50, L1 spans x >= 80): no overlap
+        self.assertEqual(result["proposed"]["overlap_count"], 0)
+
+    def test_weights_planes_and_overlap(self):
+        # L1 turned a quarter: a 20 x 40 box at x 40..60 reaching 10 mils into U1
+        placements = [{"designator": "L1", "x": 50, "y": 0, "rotation": 90, "layer": ""},
+                      {"designator": "R1", "x": 0, "y": 100, "rotation": -1, "layer": ""}]
+        result = evaluate_placement(self.model, placements, net_weights={"SW": 5, "EN": 0},
+                                    cmp_designators=["U1", "L1", "R1", "X9"])
+        self.assertEqual(result["missing_designators"], ["X9"])
+        nets = {n["net"]: n for n in result["nets"]}
+        self.assertNotIn("EN", nets)      # weight 0
+        self.assertNotIn("GND", nets)     # plane net (51 pads) not named in net_weights
+        self.assertEqual(nets["SW"]["weight"], 5.0)
+        self.assertEqual(result["proposed"]["weighted_airline_mils"],
+                         round(5 * nets["SW"]["airline_mils"] + nets["OUT"]["airline_mils"], 1))
+        self.assertEqual(result["overlaps"], [{"a": "U1", "b": "L1", "overlap_x_mils": 10.0, "overlap_y_mils": 40.0}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+Local board renderer tests: pixel colours of boxes and pads (rectangular,
+rotated and round) on a small hand-made board at 1 pixel per mil, zoom and
+view boxes, the layer filter, net highlighting and airlines, and the
+Euler tours the airlines are drawn from.
+"""
+
+import io
+import os
+import sys
+import unittest
+
+import numpy as np
+from PIL import Image
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from board_render import DIM_INK, INK, BoardScene, _euler_tour, render_board, to_png
+from mst import spanning_tree
+
+
+def pad(x, y, net, width=20, height=20, layer="TopLayer", shape="Rectangular", rotation=0):
+    return {"name": str(x), "net": net, "x": x, "y": y, "width": width, "height": height,
+            "layer": layer, "shape": shape, "rotation": rotation}
+
+
+# 1000 x 1000 mils; A runs U1 -> R1 along y=500, B from U1 down to J1's
+# through-hole pad
+COMPONENTS = [
+    {"designator": "U1", "x": 300, "y": 500, "width": 200, "height": 100, "layer": "TopLayer"},
+    {"designator": "R1", "x": 700, "y": 500, "width": 100, "height": 50, "layer": "BottomLayer"},
+    {"designator": "J1", "x": 500, "y": 200, "width": 100, "height": 100, "layer": "TopLayer"},
+    {"designator": "Q1", "x": 800, "y": 800, "width": 100, "height": 100, "layer": "TopLayer"},
+]
+PINS = [
+    {"designator": "U1", "pins": [pad(250, 500, "A"), pad(350, 500, "B", 40, 60)]},
+    {"designator": "R1", "pins": [pad(680, 500, "A", layer="BottomLayer"),
+                                  pad(720, 500, "GND", layer="BottomLayer")]},
+    {"designator": "J1", "pins": [pad(500, 200, "B", 60, 60, "MultiLayer", "Round")]},
+    {"designator": "Q1", "pins": [pad(800, 800, "", 60, 20, rotation=90)]},
+]
+VIEW = (0, 0, 1000, 1000)
+
+
+def draw(scene, **options):
+    options.setdefault("labels", False)
+    result = render_board(scene, box=VIEW, size=1000, **options)
+    return np.asarray(result["image"]), result
+
+
+class RenderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = BoardScene(COMPONENTS, PINS)
+
+    def test_colours(self):
+        pixels, result = draw(self.scene, airlines=False)
+        self.assertEqual(result["image"].mode, "P")
+        self.assertEqual((result["image"].size, result["scale_px_per_mil"]), ((1000, 1000), 1.0))
+        # image (x, y) is board (x, 1000 - y)
+        self.assertEqual(pixels[500, 200], INK["top_body"])
+        self.assertEqual(pixels[500, 650], INK["bottom_body"])
+        self.assertEqual(pixels[500, 250], INK["top_pad"])
+        self.assertEqual(pixels[520, 360], INK["top_pad"])
+        self.assertEqual(pixels[500, 680], INK["bottom_pad"])
+        # round through-hole pad: inside the circle only
+        self.assertEqual(pixels[800, 525], INK["multi_pad"])
+        self.assertEqual(pixels[825, 525], 0)
+        # 60 x 20 turned 90 degrees stands upright
+        self.assertEqual(pixels[175, 800], INK["top_pad"])
+        self.assertEqual(pixels[200, 825], 0)
+        self.assertEqual((result["component_count"], result["pad_count"], result["airline_count"]), (4, 6, 0))
+        png = Image.open(io.BytesIO(to_png(result["image"])))
+        np.testing.assert_array_equal(np.asarray(png), pixels)
+
+    def test_airlines_and_highlight(self):
+        pixels, result = draw(self.scene)
+        self.assertEqual(pixels[500, 500], INK["airline"])
+        self.assertEqual(result["airline_count"], 2)
+        pixels, result = draw(self.scene, highlight_nets=["A", "NOPE"])
+        self.assertEqual(result["unknown_nets"], ["NOPE"])
+        self.assertEqual(pixels[500, 500], INK["highlight"])
+        self.assertEqual(pixels[500, 250], INK["highlight"])
+        # everything off net A is dimmed
+        self.assertEqual(pixels[500, 200], DIM_INK["top_body"])
+        self.assertEqual(pixels[480, 340], DIM_INK["top_pad"])
+        self.assertEqual(pixels[800, 525], DIM_INK["multi_pad"])
+        # net B's airline is dimmed, A's stays bright where they cross
+        self.assertIn(DIM_INK["airline"], pixels)
+        self.assertNotIn(INK["airline"], pixels)
+        # nets above max_pads_per_net get none
+        self.assertEqual(draw(self.scene, max_pads_per_net=1)[1]["airline_count"], 0)
+
+    def test_layer_filter(self):
+        pixels, result = draw(self.scene, layers=["top"], airlines=False)
+        self.assertEqual(pixels[500, 680], 0)
+        self.assertEqual(pixels[500, 650], 0)
+        self.assertEqual(pixels[800, 525], INK["multi_pad"])
+        self.assertEqual((result["component_count"], result["pad_count"]), (3, 4))
+        pixels, result = draw(self.scene, layers=["Bottom"], airlines=False)
+        self.assertEqual(pixels[500, 250], 0)
+        self.assertEqual((result["component_count"], result["pad_count"]), (1, 3))
+
+    def test_zoom_and_box(self):
+        result = render_board(self.scene, zoom_to=["R1", "X9"], size=300)
+        # R1's box with the 100 mil minimum margin
+        self.assertEqual(result["view_box"], [550, 375, 850, 625])
+        self.assertEqual(result["missing_designators"], ["X9"])
+        self.assertEqual((result["image"].size, result["component_count"]), ((300, 250), 1))
+        result = render_board(self.scene, box=[1000, 1000, 0, 500], size=200)
+        self.assertEqual((result["view_box"], result["image"].size), ([0, 500, 1000, 1000], (200, 100)))
+        whole = render_board(self.scene, size=100)
+        self.assertEqual(whole["view_box"], [100, 50, 950, 950])
+        self.assertEqual(whole["component_count"], 4)
+
+    def test_invalid_options(self):
+        for options in [{"size": 8}, {"size": 10000}, {"layers": ["inner"]},
+                        {"box": [0, 0, 10]}, {"box": [0, 0, 0, 10]}]:
+            with self.subTest(options=options), self.assertRaises(ValueError):
+                render_board(self.scene, **options)
+
+    def test_courtyards_and_memo(self):
+        board = SyntheticBoard(40, seed=1)
+        components = list(board.components.values())
+        pins = board.get_component_pins({})
+        geometry = board.get_component_geometry({})
+        scene = BoardScene.of(components, pins, geometry)
+        self.assertIs(BoardScene.of(components, pins, geometry), scene)
+        self.assertIsNot(BoardScene.of(components, pins), scene)
+        self.assertEqual(len(scene.courtyard_seg), 4 * len(components))
+        with_courtyards = np.asarray(render_board(scene)["image"])
+        self.assertIn(INK["courtyard"], with_courtyards)
+        self.assertNotIn(INK["courtyard"], np.asarray(render_board(scene, courtyards=False)["image"]))
+        result = render_board(scene, labels=False)
+        self.assertEqual((result["component_count"], result["pad_count"]),
+                         (len(components), sum(len(e["pins"]) for e in pins)))
+
+
+class EulerTourTest(unittest.TestCase):
+
+    def test_tour_walks_every_edge_twice(self):
+        rng = np.random.default_rng(3)
+        for n in (1, 2, 3, 10, 200):
+            with self.subTest(n=n):
+                points = rng.random((n, 2)) * 1000
+                edges = spanning_tree(points).edges
+                walk = _euler_tour(edges, n)
+                self.assertEqual(len(walk), 2 * (n - 1) + 1)
+                self.assertEqual((walk[0], walk[-1]), (0, 0))
+                steps = sorted(tuple(sorted(step)) for step in zip(walk, walk[1:]))
+                expected = sorted(tuple(sorted(e)) for e in edges.tolist() for _ in range(2))
+                self.assertEqual(steps, expected)
+
+    def test_scene_airlines(self):
+        scene = BoardScene(COMPONENTS, PINS)
+        tree = scene.airlines()
+        self.assertEqual([scene.net_names[k] for k in tree.nets], ["A", "B"])
+        self.assertEqual(tree.segment_count.tolist(), [1, 1])
+        np.testing.assert_array_equal(tree.boxes[0], [250, 500, 680, 500])
+        self.assertIs(scene.airlines(40), tree)
+        self.assertEqual(len(scene.airlines(1).nets), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Bridge transport tests against the simulated Altium backend.
+
+These run anywhere (no Altium, no Windows): SimulatedAltium stands in for
+X2.EXE and the bridge script, following the same file protocol.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import make_bridge
+
+LAUNCH_DELAY = 0.3  # simulated X2.EXE launch + script compile
+
+
+HANDLERS = {
+    "echo": lambda req: {"value": req.get("value")},
+    "fail": lambda req: 1 / 0,
+}
+
+
+class BridgeTransportTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    async def test_launch_mode_launches_per_command(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS, "launch")
+        for i in range(3):
+            response = await bridge.execute_command("echo", {"value": i})
+            self.assertEqual(response, {"success": True, "result": {"value": i}})
+        self.assertEqual(sim.launch_count, 3)
+
+    async def test_error_response(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS, "launch")
+        response = await bridge.execute_command("fail", {})
+        self.assertFalse(response["success"])
+        self.assertIn("division", response["error"])
+
+    async def test_resident_mode_launches_once(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS, "resident")
+        try:
+            for i in range(10):
+                response = await bridge.execute_command("echo", {"value": i})
+                self.assertEqual(response["result"], {"value": i})
+            self.assertEqual(sim.launch_count, 1)
+            self.assertTrue(bridge.resident_transport.is_alive())
+            self.assertEqual(bridge.status()["resident_fallbacks"], 0)
+        finally:
+            sim.stop_resident()
+
+    async def test_resident_latency_beats_launch(self):
+        launch_dir = self.tmp / "launch"
+        launch_dir.mkdir()
+        launch_bridge, _ = make_bridge(launch_dir, HANDLERS, "launch", launch_delay=LAUNCH_DELAY)
+        resident_bridge, sim = make_bridge(self.tmp, HANDLERS, "resident", launch_delay=LAUNCH_DELAY)
+        try:
+            await resident_bridge.execute_command("echo", {})  # start-up
+            start = time.perf_counter()
+            for _ in range(5):
+                await resident_bridge.execute_command("echo", {})
+            resident = (time.perf_counter() - start) / 5
+
+            start = time.perf_counter()
+            for _ in range(2):
+                await launch_bridge.execute_command("echo", {})
+            launch = (time.perf_counter() - start) / 2
+        finally:
+            sim.stop_resident()
+        self.assertGreater(launch, LAUNCH_DELAY)
+        self.assertLess(resident, LAUNCH_DELAY / 3)
+
+    async def test_crashed_resident_falls_back_then_restarts(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS, "resident")
+        try:
+            await bridge.execute_command("echo", {"value": 1})
+            sim.crash_resident()
+            time.sleep(0.4)  # heartbeat goes stale
+            self.assertFalse(bridge.resident_transport.is_alive())
+
+            # Next command relaunches the loop rather than failing
+            response = await bridge.execute_command("echo", {"value": 2})
+            self.assertEqual(response["result"], {"value": 2})
+            self.assertEqual(sim.launch_count, 2)
+        finally:
+            sim.stop_resident()
+
+    async def test_unresponsive_resident_falls_back_to_launch(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS, "resident")
+        try:
+            await bridge.execute_command("echo", {})
+            sim.paused.set()  # still beating, no longer serving
+            response = await bridge.execute_command("echo", {"value": 3})
+            self.assertEqual(response["result"], {"value": 3})
+            self.assertEqual(bridge.resident_transport.fallback_count, 1)
+            self.assertFalse((self.tmp / "resident_request.json").exists())
+        finally:
+            sim.stop_resident()
+
+
+class BridgeBatchTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    async def test_batch_runs_in_one_launch(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS, "launch")
+        results = await bridge.execute_batch([
+            ("echo", {"value": "a"}),
+            ("fail", {}),
+            ("echo", {"value": "b"}),
+        ])
+        self.assertEqual(sim.launch_count, 1)
+        self.assertEqual(sim.commands_run, ["echo", "fail", "echo"])
+        self.assertEqual(results[0], {"success": True, "result": {"value": "a"}})
+        self.assertFalse(results[1]["success"])
+        self.assertEqual(results[2]["result"], {"value": "b"})
+        # Sub-request files are cleaned up
+        self.assertEqual(list(self.tmp.glob("batch_*.json")), [])
+
+    async def test_batch_over_resident_transport(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS, "resident")
+        try:
+            results = await bridge.execute_batch([("echo", {"value": i}) for i in range(4)])
+            self.assertEqual([r["result"]["value"] for r in results], [0, 1, 2, 3])
+            self.assertEqual(sim.launch_count, 1)
+        finally:
+            sim.stop_resident()
+
+    async def test_failed_envelope_fails_every_entry(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS, "launch")
+        bridge.launch_transport.timeout = 0.2
+        sim.launch = lambda proc_name="Altium_API>Run": True  # Altium never answers
+        results = await bridge.execute_batch([("echo", {}), ("echo", {})])
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(not r["success"] for r in results))
+
+    async def test_single_command_batch_skips_envelope(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS, "launch")
+        results = await bridge.execute_batch([("echo", {"value": 1})])
+        self.assertEqual(results, [{"success": True, "result": {"value": 1}}])
+        self.assertEqual(sim.commands_run, ["echo"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+"""
+Local clearance check tests: primitive shapes with known distances (pads
+of each shape, tracks, arcs, fills, regions, containment), the vectorized
+distances against a scalar reference on a synthetic board, and the
+check_placement-shaped result.
+"""
+
+import math
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import clearance
+from altium_sim import SyntheticBoard
+from clearance import ClearanceModel, check_clearance, primitive_shapes
+
+
+def component(designator, *primitives, x=0.0, y=0.0, layer="Top Layer"):
+    """Geometry entry whose box is the extent of its primitives' vertices"""
+    points = [p for prim in primitives for vertices, r, _ in primitive_shapes(prim)
+              for vx, vy in vertices for p in ((vx - r, vy - r), (vx + r, vy + r))]
+    xs, ys = [p[0] for p in points], [p[1] for p in points]
+    return {"designator": designator, "layer": layer, "x": x, "y": y, "rotation": 0,
+            "box_left": min(xs), "box_bottom": min(ys),
+            "width": max(xs) - min(xs), "height": max(ys) - min(ys), "primitives": list(primitives)}
+
+
+def pad(x, y, w=20, h=20, shape="Rectangular", rotation=0, **extra):
+    return dict({"type": "pad", "x": x, "y": y, "width": w, "height": h, "shape": shape,
+                 "rotation": rotation, "layer": "Top Layer"}, **extra)
+
+
+def track(x1, y1, x2, y2, width=10, layer="Top Overlay"):
+    return {"type": "track", "x1": x1, "y1": y1, "x2": x2, "y2": y2, "width": width, "layer": layer}
+
+
+def distance(*components):
+    model = ClearanceModel(list(components))
+    return float(model.distances([0], [1])[0][0])
+
+
+def reference_distance(shapes_a, shapes_b):
+    """Scalar segment-by-segment distance with even-odd containment"""
+    def segments(vertices, closed):
+        ends = vertices[1:] + vertices[:1] if closed else vertices[1:] or vertices
+        return list(zip(vertices, ends))
+
+    def to_segment(p, a, b):
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        length2 = dx * dx + dy * dy
+        t = 0.0 if length2 == 0 else min(max(((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length2, 0.0), 1.0)
+        return math.hypot(a[0] + t * dx - p[0], a[1] + t * dy - p[1])
+
+    def crosses(p, q, r, s):
+        def orient(a, b, c):
+            return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+        return orient(p, q, r) * orient(p, q, s) < 0 and orient(r, s, p) * orient(r, s, q) < 0
+
+    def inside(point, vertices):
+        hit = False
+        for (ax, ay), (bx, by) in segments(vertices, True):
+            if (ay > point[1]) != (by > point[1]) and point[0] < ax + (point[1] - ay) * (bx - ax) / (by - ay):
+                hit = not hit
+        return hit
+
+    best = math.inf
+    for va, ra, ca in shapes_a:
+        for vb, rb, cb in shapes_b:
+            if (cb and inside(va[0], vb)) or (ca and inside(vb[0], va)):
+                return 0.0
+            for p, q in segments(va, ca):
+                for r, s in segments(vb, cb):
+                    d = 0.0 if crosses(p, q, r, s) else min(
+                        to_segment(p, r, s), to_segment(q, r, s), to_segment(r, p, q), to_segment(s, p, q))
+                    best = min(best, max(d - ra - rb, 0.0))
+    return best
+
+
+class ShapeDistanceTest(unittest.TestCase):
+
+    def test_rectangular_pads(self):
+        self.assertAlmostEqual(distance(component("A", pad(0, 0)), component("B", pad(30, 0))), 10.0)
+        # rotated 45 degrees: corner at 10 * sqrt(2)
+        self.assertAlmostEqual(distance(component("A", pad(0, 0, rotation=45)), component("B", pad(30, 0))),
+                               20 - 10 * math.sqrt(2))
+        # diagonal neighbours measure corner to corner
+        self.assertAlmostEqual(distance(component("A", pad(0, 0)), component("B", pad(30, 40))), math.hypot(10, 20))
+
+    def test_round_oval_and_rounded_pads(self):
+        self.assertAlmostEqual(distance(component("A", pad(0, 0, shape="Round")),
+                                        component("B", pad(30, 30, shape="Round"))), math.hypot(30, 30) - 20)
+        # oval 40 x 20 along x: ends at +-10 with radius 10
+        self.assertAlmostEqual(distance(component("A", pad(0, 0, w=40, shape="Round")),
+                                        component("B", pad(50, 0))), 20.0)
+        rounded = pad(0, 0, shape="RoundedRectangular", corner_pct=100)  # = round
+        self.assertAlmostEqual(distance(component("A", rounded), component("B", pad(30, 30, shape="Round"))),
+                               math.hypot(30, 30) - 20)
+        octagon = pad(0, 0, w=40, h=40, shape="Octagonal")  # chamfer 10: corner edge (10, 20)-(20, 10)
+        self.assertAlmostEqual(distance(component("A", octagon), component("B", pad(40, 40, w=0.0, h=0.0))),
+                               math.hypot(25, 25))
+
+    def test_tracks_arcs_fills_regions(self):
+        self.assertEqual(distance(component("A", track(-50, 0, 50, 0)), component("B", track(0, -50, 0, 50))), 0.0)
+        self.assertAlmostEqual(distance(component("A", track(0, 0, 100, 0, width=10)),
+                                        component("B", track(0, 30, 100, 30, width=6))), 22.0)
+        arc = {"type": "arc", "cx": 0, "cy": 0, "radius": 100, "start_angle": 0, "end_angle": 90,
+               "width": 4, "layer": "Top Overlay"}
+        # the chord near 0 degrees sags by at most R * (1 - cos 5deg)
+        got = distance(component("A", arc), component("B", pad(130, 0)))
+        self.assertGreaterEqual(got, 18.0)
+        self.assertLessEqual(got, 18.0 + 100 * (1 - math.cos(math.radians(5))))
+        fill = {"type": "fill", "x1": 0, "y1": 0, "x2": 40, "y2": 20, "rotation": 90, "layer": "Top Layer"}
+        # rotated about its center (20, 10): spans x 10..30, y -10..30
+        self.assertAlmostEqual(distance(component("A", fill), component("B", pad(50, 10))), 10.0)
+        region = {"type": "region", "layer": "Top Layer", "vertices": [[0, 0], [100, 0], [0, 100]]}
+        self.assertAlmostEqual(distance(component("A", region), component("B", pad(70, 70, w=0, h=0))),
+                               70 * math.sqrt(2) - 50 * math.sqrt(2))
+
+    def test_containment(self):
+        big = {"type": "region", "layer": "Top Layer", "vertices": [[-100, -100], [100, -100], [100, 100], [-100, 100]]}
+        self.assertEqual(distance(component("A", big), component("B", pad(0, 0))), 0.0)
+        self.assertEqual(distance(component("B", pad(0, 0)), component("A", big)), 0.0)
+        # a courtyard drawn as lines closes into an outline
+        outline = [track(-100, -100, 100, -100, layer="Mechanical 15"), track(100, -100, 100, 100, layer="Mechanical 15"),
+                   track(100, 100, -100, 100, layer="Mechanical 15"), track(-100, 100, -100, -100, layer="Mechanical 15")]
+        self.assertEqual(distance(component("A", *outline), component("B", pad(0, 0))), 0.0)
+        model = ClearanceModel([component("A", *outline), component("B", pad(0, 0))])
+        _, near_a, near_b = model.distances([0], [1])
+        self.assertEqual([model.kind_of(near_a[0]), model.kind_of(near_b[0])], ["courtyard", "pad"])
+
+    def test_kinds_filter(self):
+        a = component("A", pad(0, 0), track(10, 0, 40, 0, width=2))  # silk reaching toward B
+        b = component("B", pad(60, 0))
+        self.assertAlmostEqual(ClearanceModel([a, b]).distances([0], [1])[0][0], 9.0)
+        self.assertAlmostEqual(ClearanceModel([a, b], kinds=["pad"]).distances([0], [1])[0][0], 40.0)
+        self.assertTrue(np.isinf(ClearanceModel([a, b], kinds=["courtyard"]).distances([0], [1])[0][0]))
+        with self.assertRaises(ValueError):
+            ClearanceModel([a, b], kinds=["paste"])
+
+
+class BoardCheckTest(unittest.TestCase):
+
+    def setUp(self):
+        self.board = SyntheticBoard(count=300, seed=5)
+        self.geometry = self.board.get_component_geometry({})
+        self.model = ClearanceModel(self.geometry)
+
+    def test_distances_match_reference(self):
+        pairs = self.model.board.close_pairs(range(len(self.model)), 60)
+        self.assertGreater(len(pairs), 20)
+        a, b = np.array(pairs).T
+        old_chunk = clearance.CHUNK
+        clearance.CHUNK = 500  # many chunks
+        try:
+            got, _, _ = self.model.distances(a, b)
+            limited, _, _ = self.model.distances(a, b, limit=8.0)
+        finally:
+            clearance.CHUNK = old_chunk
+        by_name = {g["designator"]: g for g in self.geometry}
+        names = self.model.board.designators
+
+        def shapes_of(c):
+            primitives = by_name[names[c]]["primitives"]
+            shapes = [s for p in primitives for s in primitive_shapes(p)]
+            courtyard = [v for p in primitives if p.get("layer") == "Mechanical 15"
+                         for v in primitive_shapes(p)[0][0]]
+            return shapes + [(clearance.convex_hull(courtyard), 0.0, True)]
+
+        for r, (i, j) in enumerate(pairs):
+            with self.subTest(a=names[i], b=names[j]):
+                expected = reference_distance(shapes_of(i), shapes_of(j))
+                self.assertAlmostEqual(got[r], expected, places=6)
+                self.assertEqual(limited[r], got[r] if got[r] < 8.0 else np.inf)
+
+    def test_result_shape(self):
+        result = check_clearance(self.model, clearance_mils=6)
+        self.assertEqual(list(result), ["checked_count", "clearance_mils", "candidate_pairs",
+                                        "close_pairs_measured", "violation_count",
+                                        "missing_designators", "violations"])
+        self.assertEqual(result["checked_count"], 300)
+        self.assertEqual(result["violation_count"], len(result["violations"]))
+        for violation in result["violations"]:
+            self.assertTrue(violation["type"] == "bounding_box_overlap" or violation["distance_mils"] < 6)
+            self.assertEqual(violation["type"] == "bounding_box_overlap", "overlap_x_mils" in violation)
+            self.assertEqual(self.board.components[violation["b"]]["x"], violation["b_x"])
+        # targets: only pairs involving them, unknown designators reported
+        target = result["violations"][0]["a"]
+        some = check_clearance(self.model, [target, "X99", target], clearance_mils=6)
+        self.assertEqual((some["checked_count"], some["missing_designators"]), (1, ["X99"]))
+        self.assertTrue(some["violations"])
+        self.assertTrue(all(target in (v["a"], v["b"]) for v in some["violations"]))
+
+    def test_clearance_threshold(self):
+        parts = [component("A", pad(0, 0)), component("B", pad(25, 0)), component("C", pad(0, 45))]
+        model = ClearanceModel(parts)
+        result = check_clearance(model, clearance_mils=5)
+        self.assertEqual(result["violations"], [])
+        result = check_clearance(model, clearance_mils=10)
+        self.assertEqual([(v["a"], v["b"], v["type"], v["distance_mils"]) for v in result["violations"]],
+                         [("A", "B", "clearance", 5.0)])
+        self.assertEqual(result["violations"][0]["closest"], ["pad", "pad"])
+
+
+if __name__ == "__main__":
+    unittest.main()
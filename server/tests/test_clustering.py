@@ -0,0 +1,134 @@
+"""
+Placement clustering tests: clique-expanded affinity against a dense
+reference, Louvain on planted communities, and suggest_clusters on a
+synthetic board of regulator-like blocks joined by small buses.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from clustering import PACKING_DENSITY, affinity, louvain, suggest_clusters
+from netgraph import NetGraph
+from test_netgraph import PINS, entry
+
+
+def dense(indptr, indices, weights):
+    n = len(indptr) - 1
+    matrix = np.zeros((n, n))
+    for i in range(n):
+        matrix[i, indices[indptr[i]:indptr[i + 1]]] = weights[indptr[i]:indptr[i + 1]]
+    return matrix
+
+
+def modularity(matrix, labels):
+    total = matrix.sum()
+    strength = matrix.sum(axis=1)
+    same = labels[:, None] == labels[None, :]
+    return float(((matrix - np.outer(strength, strength) / total) * same).sum() / total)
+
+
+class AffinityTest(unittest.TestCase):
+
+    def test_clique_expansion(self):
+        graph = NetGraph(PINS)
+        comps = np.arange(len(graph))
+        follow = graph.followed(max_pads_per_net=3)
+        matrix = dense(*affinity(graph, comps, follow))
+        expected = np.zeros_like(matrix)
+        for k, name in enumerate(graph.net_names):
+            if not follow[k]:
+                continue
+            on = sorted({graph.index[e["designator"]] for e in PINS for p in e["pins"] if p["net"] == name})
+            for a in on:
+                for b in on:
+                    if a != b:
+                        expected[a, b] += 1.0 / (len(on) - 1)
+        np.testing.assert_allclose(matrix, expected)
+        # a subset keeps only the pairs inside it, numbered in subset order; weights still
+        # count every part on the net (FILT has three)
+        sub = np.array([graph.index["C1"], graph.index["R1"]])
+        np.testing.assert_allclose(dense(*affinity(graph, sub, follow)), [[0, 0.5], [0.5, 0]])
+
+
+class LouvainTest(unittest.TestCase):
+
+    def test_planted_communities(self):
+        rng = np.random.default_rng(0)
+        sizes = [12, 8, 20, 6, 15]
+        group = np.repeat(np.arange(len(sizes)), sizes)
+        n = len(group)
+        same = group[:, None] == group[None, :]
+        matrix = np.where(same, rng.random((n, n)) < 0.6, rng.random((n, n)) < 0.01).astype(float)
+        matrix = np.triu(matrix, 1)
+        matrix = matrix + matrix.T
+        rows, cols = np.nonzero(matrix)
+        indptr = np.searchsorted(rows, np.arange(n + 1))
+        labels = louvain(indptr, cols, matrix[rows, cols])
+        self.assertEqual(len(set(labels.tolist())), len(sizes))
+        self.assertTrue(all(len(set(labels[group == g].tolist())) == 1 for g in range(len(sizes))))
+        self.assertGreaterEqual(modularity(matrix, labels), modularity(matrix, group) - 1e-9)
+
+    def test_edgeless(self):
+        self.assertEqual(louvain(np.zeros(4, dtype=np.intp), np.zeros(0, dtype=np.intp), np.zeros(0)).tolist(),
+                         [0, 1, 2])
+
+
+class SuggestClustersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.board = SyntheticBoard(count=0, seed=3)
+        # blocks of 5-25 parts, every four sharing a bus net; more blocks
+        # than max_pads_per_net, so +3V3 counts as a plane
+        self.blocks = [self.board.add_circuit(self.board.rng.randint(5, 25), link=f"BUS{i // 4}")
+                       for i in range(48)]
+        self.components = list(self.board.components.values())
+        self.graph = NetGraph(self.board.get_component_pins({}))
+
+    def test_blocks_stay_together(self):
+        result = suggest_clusters(self.graph, self.components, max_cluster_size=30)
+        where = {d: i for i, c in enumerate(result["clusters"]) for d in c["designators"]}
+        for block in self.blocks:
+            with self.subTest(block=block[0]):
+                self.assertEqual(len({where[d] for d in block}), 1)
+        self.assertEqual(result["component_count"], sum(map(len, self.blocks)))
+        self.assertEqual(result["unclustered_count"], 0)
+        sizes = [c["size"] for c in result["clusters"]]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertLessEqual(max(sizes), 30)
+        for cluster in result["clusters"]:
+            self.assertTrue(cluster["anchor"].startswith("U"))
+            self.assertEqual(cluster["anchor_pad_count"], 16)
+            self.assertTrue(all(net.startswith("BUS") for net in cluster["external_nets"]))
+            area = sum(self.board.components[d]["width"] * self.board.components[d]["height"]
+                       for d in cluster["designators"]) / PACKING_DENSITY
+            self.assertAlmostEqual(cluster["suggested_area"]["area_sq_mils"], area, places=1)
+            self.assertAlmostEqual(cluster["suggested_area"]["width_mils"], area ** 0.5, places=1)
+
+    def test_size_limit_and_subset(self):
+        capped = suggest_clusters(self.graph, self.components, max_cluster_size=12)
+        self.assertLessEqual(max(c["size"] for c in capped["clusters"]), 12)
+        subset = self.blocks[0] + self.blocks[5] + ["X1"]
+        result = suggest_clusters(self.graph, self.components, designators=subset)
+        self.assertEqual(result["missing_designators"], ["X1"])
+        self.assertEqual(sorted(d for c in result["clusters"] for d in c["designators"]), sorted(subset[:-1]))
+        with self.assertRaises(ValueError):
+            suggest_clusters(self.graph, self.components, resolution=0)
+
+    def test_unconnected_parts(self):
+        pins = [entry("U1", "A", "B", "GND"), entry("R1", "A", "GND"), entry("R2", "B", "GND"),
+                entry("TP1", "GND"), entry("TP2", "")]
+        result = suggest_clusters(NetGraph(pins), [], max_pads_per_net=3)
+        self.assertEqual([c["designators"] for c in result["clusters"]], [["U1", "R1", "R2"]])
+        self.assertEqual(result["unclustered_count"], 2)
+        self.assertEqual(result["clusters"][0]["suggested_area"]["area_sq_mils"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Columnar encoding tests: round trips, string table sharing and column decoding.
+"""
+
+import json
+import math
+import os
+import sys
+import unittest
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import columnar
+from altium_sim import SyntheticBoard
+
+
+class ColumnarTest(unittest.TestCase):
+
+    def setUp(self):
+        self.board = SyntheticBoard(count=300, seed=3)
+
+    def test_components_round_trip(self):
+        components = list(self.board.components.values())
+        payload = json.loads(columnar.dumps(columnar.encode_components(components), "columnar"))
+        self.assertEqual(columnar.decode_rows(payload), components)
+
+    def test_pins_round_trip_and_shared_strings(self):
+        pins = self.board.get_component_pins({})
+        payload = columnar.encode_component_pins(pins)
+        rows = columnar.decode_rows(payload, "pins")
+        self.assertEqual(len(rows), sum(len(c["pins"]) for c in pins))
+        self.assertEqual(rows[0], {"designator": pins[0]["designator"], **pins[0]["pins"][0]})
+        # "TopLayer" appears in both tables but once in the string table
+        self.assertEqual(payload["strings"].count("TopLayer"), 1)
+        self.assertEqual(len(columnar.decode_rows(payload, "components")), len(pins))
+
+    def test_missing_and_mixed_values(self):
+        rows = [{"a": "x", "b": 1}, {"b": None, "c": {"n": 1}}, {"a": "y", "b": "two"}]
+        payload = columnar.encode_components(rows)
+        table = payload["tables"]["components"]
+        self.assertEqual(table["string_fields"], ["a"])
+        self.assertEqual(table["columns"]["a"], [0, -1, 1])
+        self.assertEqual(columnar.decode_rows(payload),
+                         [{"a": "x", "b": 1}, {"c": {"n": 1}}, {"a": "y", "b": "two"}])
+
+    def test_decode_columns(self):
+        rows = [{"designator": "R1", "x": 1.5}, {"designator": "R2"}]
+        columns = columnar.decode_columns(columnar.encode_components(rows))
+        self.assertEqual(list(columns["designator"]), ["R1", "R2"])
+        self.assertEqual(columns["x"][0], 1.5)
+        self.assertTrue(math.isnan(columns["x"][1]) if columnar.np is not None
+                        else columns["x"][1] is None)
+
+        plain = columnar.decode_columns(columnar.encode_components(rows), as_numpy=False)
+        self.assertEqual(plain["x"], [1.5, None])
+
+    def test_columnar_is_smaller(self):
+        pins = self.board.get_component_pins({})
+        compact = columnar.dumps(columnar.encode_component_pins(pins), "columnar")
+        self.assertLess(len(compact), len(json.dumps(pins, indent=2)) / 3)
+
+    def test_rejects_other_payloads(self):
+        with self.assertRaises(ValueError):
+            columnar.decode_rows({"components": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
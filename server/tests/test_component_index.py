@@ -0,0 +1,121 @@
+"""
+ComponentIndex and PropertyIndex tests: lookups, filters, property queries
+and snapshot memoization.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from component_index import ComponentIndex, PropertyIndex
+
+COMPONENTS = [
+    {"designator": "R1", "footprint": "0402", "layer": "TopLayer", "rotation": 90},
+    {"designator": "R2", "footprint": "0402", "layer": "BottomLayer", "rotation": 0},
+    {"designator": "C1", "footprint": "0603", "layer": "TopLayer", "rotation": 90.0},
+    {"designator": "U1", "footprint": "QFN32", "layer": "TopLayer", "rotation": 270, "description": "MCU"},
+]
+
+SCHEMATIC = [
+    {"designator": "U1", "sheet": "C:\\proj\\MCU.SchDoc", "parameters": {}},
+    {"designator": "U1", "sheet": "C:\\proj\\Power.SchDoc", "parameters": {}},
+    {"designator": "C1", "sheet": "C:\\proj\\Power.SchDoc", "parameters": {}},
+]
+
+
+def linear_filter(component_list, designators):
+    """The loop get_component_data used before the index"""
+    components, missing = [], []
+    for designator in designators:
+        for component in component_list:
+            if component.get("designator") == designator:
+                components.append(component)
+                break
+        else:
+            missing.append(designator)
+    return components, missing
+
+
+class ComponentIndexTest(unittest.TestCase):
+
+    def test_lookup_matches_linear_scan(self):
+        index = ComponentIndex(COMPONENTS)
+        request = ["U1", "R9", "R1", "C1"]
+        self.assertEqual(index.lookup(request), linear_filter(COMPONENTS, request))
+
+    def test_duplicate_designator_returns_first(self):
+        index = ComponentIndex(SCHEMATIC)
+        self.assertIs(index.get("U1"), SCHEMATIC[0])
+        self.assertEqual(len(index), 2)
+
+    def test_secondary_lookups(self):
+        index = ComponentIndex(COMPONENTS)
+        self.assertEqual([c["designator"] for c in index.with_footprint("0402")], ["R1", "R2"])
+        self.assertEqual([c["designator"] for c in index.on_layer("TopLayer")], ["R1", "C1", "U1"])
+        self.assertEqual(index.with_footprint("SOT23"), [])
+
+    def test_sheet_by_path_or_file_name(self):
+        index = ComponentIndex(SCHEMATIC)
+        self.assertEqual(len(index.on_sheet("C:\\proj\\Power.SchDoc")), 2)
+        self.assertEqual(len(index.on_sheet("power.schdoc")), 2)
+
+    def test_select_combines_filters(self):
+        index = ComponentIndex(COMPONENTS)
+        found, missing = index.select(["R1", "R2", "X1"], layer="TopLayer")
+        self.assertEqual([c["designator"] for c in found], ["R1"])
+        self.assertEqual(missing, ["X1"])
+
+        found, _ = index.select(footprint="0402", layer="BottomLayer")
+        self.assertEqual([c["designator"] for c in found], ["R2"])
+
+        found, _ = index.select()
+        self.assertEqual(len(found), 4)
+
+    def test_of_reuses_index_for_same_snapshot(self):
+        snapshot = list(COMPONENTS)
+        self.assertIs(ComponentIndex.of(snapshot), ComponentIndex.of(snapshot))
+        self.assertIsNot(ComponentIndex.of(snapshot), ComponentIndex.of(list(COMPONENTS)))
+
+
+class PropertyIndexTest(unittest.TestCase):
+
+    def test_names_and_values(self):
+        properties = PropertyIndex(COMPONENTS)
+        self.assertEqual(properties.names(),
+                         ["description", "designator", "footprint", "layer", "rotation"])
+        self.assertEqual(properties.values("description"), [{"designator": "U1", "value": "MCU"}])
+        self.assertEqual(properties.values("nope"), [])
+
+    def test_where_value(self):
+        properties = PropertyIndex(COMPONENTS)
+        self.assertEqual(properties.where("footprint", "0402"), ["R1", "R2"])
+        # Numbers compare by value, whatever their JSON spelling
+        self.assertEqual(properties.where("rotation", "90"), ["R1", "C1"])
+        self.assertEqual(properties.where("rotation", 90.0), ["R1", "C1"])
+        # Numeric-looking strings are not reformatted
+        self.assertEqual(properties.where("footprint", "402"), [])
+
+    def test_where_pattern(self):
+        properties = PropertyIndex(COMPONENTS)
+        self.assertEqual(properties.where("footprint", pattern="06*"), ["C1"])
+        self.assertEqual(properties.where("layer", pattern="*layer"), ["R1", "C1", "U1", "R2"])
+
+    def test_add_updates_built_columns(self):
+        properties = PropertyIndex(COMPONENTS)
+        self.assertEqual(properties.where("footprint", "0402"), ["R1", "R2"])
+        properties.add({"designator": "R3", "footprint": "0402", "mpn": "RC0402"})
+        self.assertEqual(properties.where("footprint", "0402"), ["R1", "R2", "R3"])
+        self.assertIn("mpn", properties)
+        self.assertEqual(properties.where("mpn", "RC0402"), ["R3"])
+
+    def test_component_index_exposes_properties(self):
+        index = ComponentIndex(COMPONENTS)
+        self.assertIs(index.properties, index.properties)
+        self.assertEqual(index.properties.distinct("layer")["BottomLayer"], ["R2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
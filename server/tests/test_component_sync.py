@@ -0,0 +1,128 @@
+"""
+Component delta sync tests against a mutating synthetic board.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from component_sync import ComponentSync
+from altium_sim import SyntheticBoard, make_bridge
+
+
+class ComponentSyncTest(unittest.TestCase):
+
+    def test_delta_keeps_order_and_appends_new(self):
+        sync = ComponentSync()
+        sync.merge({"success": True, "result": {
+            "stamp": "a", "full": True,
+            "components": [{"designator": "R1", "x": 0}, {"designator": "R2", "x": 0}],
+            "removed": []}})
+        response = sync.merge({"success": True, "result": {
+            "stamp": "b", "full": False,
+            "components": [{"designator": "R2", "x": 5}, {"designator": "C1", "x": 1}],
+            "removed": ["R1"]}})
+        self.assertEqual(response["result"], [{"designator": "R2", "x": 5}, {"designator": "C1", "x": 1}])
+        self.assertEqual(sync.request_params(), {"delta": True, "since": "b"})
+
+    def test_plain_list_is_full_snapshot(self):
+        sync = ComponentSync()
+        response = sync.merge({"success": True, "result": [{"designator": "R1"}]})
+        self.assertEqual(response["result"], [{"designator": "R1"}])
+        self.assertEqual(sync.stamp, "")
+        # sizes come from the transport; batch entries have none
+        self.assertEqual((sync.last_bytes, sync.bytes_received), (0, 0))
+        sync.merge({"success": True, "result": [{"designator": "R1"}]}, raw_bytes=60)
+        self.assertEqual((sync.last_bytes, sync.bytes_received), (60, 60))
+
+    def test_duplicate_designators_disable_delta(self):
+        sync = ComponentSync()
+        sync.merge({"success": True, "result": {
+            "stamp": "a", "full": True,
+            "components": [{"designator": "R1"}, {"designator": "R1"}], "removed": []}})
+        self.assertEqual(len(sync.snapshot), 2)
+        self.assertEqual(sync.stamp, "")
+
+    def test_errors_pass_through(self):
+        sync = ComponentSync()
+        response = {"success": False, "error": "no board"}
+        self.assertIs(sync.merge(response), response)
+
+
+class BridgeDeltaSyncTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.board = SyntheticBoard(count=2000, seed=1)
+        self.bridge, self.sim = make_bridge(self.tmp, {
+            "get_all_component_data": self.board.get_all_component_data,
+            "place_components": lambda req: "ok",
+        })
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def assert_matches_board(self, response):
+        self.assertTrue(response["success"])
+        by_designator = {c["designator"]: c for c in response["result"]}
+        self.assertEqual(len(by_designator), len(response["result"]))
+        self.assertEqual(by_designator, self.board.components)
+
+    async def test_merged_snapshot_tracks_mutations(self):
+        sync = self.bridge.component_sync
+        full = await self.bridge.execute_command("get_all_component_data", {}, use_cache=False)
+        self.assert_matches_board(full)
+        full_bytes = sync.last_bytes
+        # measured from the response file: 2000 components are well over 100 KB
+        self.assertGreater(full_bytes, 100_000)
+
+        for _ in range(5):
+            self.board.mutate(moves=20, adds=3, removes=2)
+            response = await self.bridge.execute_command("get_all_component_data", {}, use_cache=False)
+            self.assert_matches_board(response)
+            self.assertEqual(sync.last_changed, 23)
+            self.assertEqual(sync.last_removed, 2)
+            self.assertLess(sync.last_bytes, full_bytes / 20)
+        self.assertEqual(sync.full_syncs, 1)
+        self.assertEqual(sync.delta_syncs, 5)
+        self.assertGreater(sync.bytes_received, full_bytes)
+
+    async def test_unchanged_board_sends_nothing(self):
+        await self.bridge.execute_command("get_all_component_data", {}, use_cache=False)
+        response = await self.bridge.execute_command("get_all_component_data", {}, use_cache=False)
+        self.assert_matches_board(response)
+        self.assertEqual(self.bridge.component_sync.last_changed, 0)
+
+    async def test_stamp_mismatch_falls_back_to_full(self):
+        await self.bridge.execute_command("get_all_component_data", {}, use_cache=False)
+        self.bridge.component_sync.stamp = "stale"
+        self.board.mutate(moves=5)
+        response = await self.bridge.execute_command("get_all_component_data", {}, use_cache=False)
+        self.assert_matches_board(response)
+        self.assertEqual(self.bridge.component_sync.full_syncs, 2)
+
+    async def test_delta_through_batch(self):
+        await self.bridge.execute_command("get_all_component_data", {}, use_cache=False)
+        self.board.mutate(moves=4)
+        results = await self.bridge.execute_batch([
+            ("place_components", {"placements": []}),
+            ("get_all_component_data", {}),
+        ])
+        self.assert_matches_board(results[1])
+        self.assertEqual(self.bridge.component_sync.delta_syncs, 1)
+
+    async def test_disabled_sends_plain_request(self):
+        self.bridge.component_sync.enabled = False
+        response = await self.bridge.execute_command("get_all_component_data", {})
+        self.assert_matches_board(response)
+        self.assertEqual(self.bridge.component_sync.full_syncs, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Layout duplicator matching tests: duplicated channels with shuffled
+designators, rotated or mirrored copies, symmetric parts, description
+tie-breaks and a destination whose wiring differs.
+"""
+
+import copy
+import os
+import random
+import sys
+import unittest
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from duplicator_match import match_groups
+
+
+def channel(count=200, seed=0):
+    """(source entries, destination entries, source -> destination) for
+    a random channel and its copy, the destination in shuffled order"""
+    board = SyntheticBoard(count=count * 3, seed=seed)
+    source = random.Random(seed).sample(sorted(board.components), count)
+    destination = board.duplicate(source, dx=9000, dy=-500)
+    shuffled = list(destination)
+    random.Random(seed + 1).shuffle(shuffled)
+    data = board.get_layout_duplicator({"source": source, "destination": shuffled})
+    return data["source_components"], data["destination_components"], dict(zip(source, destination))
+
+
+def part(designator, nets, x=0.0, y=0.0, footprint="0402", description="cap"):
+    return {"designator": designator, "footprint": footprint, "description": description,
+            "pins": [{"name": str(i + 1), "net": net, "x": x + 40 * i, "y": y}
+                     for i, net in enumerate(nets)]}
+
+
+def pairs(result):
+    return dict(zip(result["source_designators"], result["destination_designators"]))
+
+
+class MatchGroupsTest(unittest.TestCase):
+
+    def test_recovers_duplicated_channel(self):
+        source, destination, truth = channel()
+        result = match_groups(source, destination)
+        self.assertEqual(pairs(result), truth)
+        self.assertEqual((result["unmatched_source"], result["unmatched_destination"]), ([], []))
+        self.assertEqual(result["source_designators"], [c["designator"] for c in source])
+        self.assertEqual(result["ambiguous_count"], len(result["ambiguous"]))
+        self.assertTrue(all(a["reason"] == "symmetric" for a in result["ambiguous"]))
+
+    def test_rotated_and_mirrored_copy(self):
+        source, destination, truth = channel(seed=1)
+        for component in destination:
+            for pin in component["pins"]:
+                pin["x"], pin["y"] = -pin["y"], -pin["x"]  # mirrored about y = -x
+        self.assertEqual(pairs(match_groups(source, destination)), truth)
+
+    def test_symmetric_parts_follow_position(self):
+        # four decoupling caps on the same rails: only position tells them apart
+        source = [part(f"C{i}", ["GND", "+3V3"], x=100 * i) for i in range(1, 5)] + \
+                 [part("U1", ["A", "B", "+3V3", "GND"], y=300, footprint="SOIC8", description="ic"),
+                  part("R1", ["A", "+3V3"], y=600), part("R2", ["B", "+3V3"], y=700)]
+        destination = [part(f"C{i}", ["GND", "+3V3"], x=5000 + 100 * (i - 10)) for i in (13, 11, 14, 12)] + \
+                      [part("U9", ["A2", "B2", "+3V3", "GND"], x=5000, y=300, footprint="SOIC8", description="ic"),
+                       part("R9", ["B2", "+3V3"], x=5000, y=700), part("R8", ["A2", "+3V3"], x=5000, y=600)]
+        result = match_groups(source, destination)
+        self.assertEqual(pairs(result), {"C1": "C11", "C2": "C12", "C3": "C13", "C4": "C14",
+                                         "U1": "U9", "R1": "R8", "R2": "R9"})
+        ambiguous = {a["source"]: a for a in result["ambiguous"]}
+        self.assertEqual(sorted(ambiguous), ["C1", "C2", "C3"])  # C4 is forced by then
+        self.assertEqual(ambiguous["C1"]["candidates"][0], "C11")
+        self.assertEqual(ambiguous["C1"]["candidate_count"], 4)
+
+    def test_description_breaks_ties(self):
+        # same footprint and wiring, different values; the copy is laid out the other way round
+        source = [part("R1", ["IN", "OUT"], x=0, description="10k"), part("R2", ["IN", "OUT"], x=100, description="1k")]
+        destination = [part("R3", ["IN2", "OUT2"], x=0, description="1k"),
+                       part("R4", ["IN2", "OUT2"], x=100, description="10k")]
+        result = match_groups(source, destination)
+        self.assertEqual(pairs(result), {"R1": "R4", "R2": "R3"})
+        self.assertEqual(result["ambiguous"], [])
+        # descriptions that differ between the channels are ignored rather than blocking the match
+        destination[0]["description"] = destination[1]["description"] = "resistor"
+        self.assertEqual(len(pairs(match_groups(source, destination))), 2)
+
+    def test_differing_connectivity(self):
+        source, destination, truth = channel(seed=2)
+        extra = copy.deepcopy(destination[3])
+        extra["designator"] = "X1"
+        dropped = destination.pop(7)["designator"]
+        destination.append(extra)
+        result = match_groups(source, destination)
+        got = pairs(result)
+        missing = next(s for s, d in truth.items() if d == dropped)
+        self.assertEqual(result["unmatched_destination"], ["X1"])
+        self.assertEqual(result["unmatched_source"], [missing])
+        self.assertEqual(got, {s: d for s, d in truth.items() if s != missing})
+        self.assertGreater(result["connectivity_differs_count"], 0)
+        for entry in result["ambiguous"]:
+            self.assertIn(entry["reason"], ("symmetric", "connectivity differs"))
+
+    def test_footprint_mismatch_and_empty(self):
+        source = [part("R1", ["A", "B"]), part("U1", ["A", "B", "C"], footprint="SOT23")]
+        destination = [part("R5", ["A2", "B2"]), part("Q1", ["A2", "B2", "C2"], footprint="SOT223")]
+        result = match_groups(source, destination)
+        self.assertEqual(pairs(result), {"R1": "R5"})
+        self.assertEqual((result["unmatched_source"], result["unmatched_destination"]), (["U1"], ["Q1"]))
+        empty = match_groups([], [])
+        self.assertEqual((empty["matched_count"], empty["source_designators"]), (0, []))
+        unwired = match_groups([part("TP1", ["", ""])], [part("TP2", ["", ""])])
+        self.assertEqual(pairs(unwired), {"TP1": "TP2"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,248 @@
+"""
+Library preview tests: batch spec parsing (fields, the auto body rectangle
+and the lines the scripts would reject), dump normalization, pin and pad
+geometry, pixel colours of symbol bodies, pads and drills, SVG output and
+contact sheet layout.
+"""
+
+import json
+import os
+import sys
+import unittest
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from library_render import (BODY_FILL, BODY_LINE, CAPTION_PX, FOOTPRINT_BACKGROUND, HOLE_COLOUR, PIN_COLOUR,
+                            SYMBOL_BACKGROUND, contact_sheet, contact_sheet_svg, footprint_drawing, layer_style,
+                            library_items, load_source, parse_footprint_spec, parse_symbol_spec, render_png,
+                            render_preview, render_svg, select, symbol_drawing)
+
+SYMBOL_SPEC = """LIBRARY|C:\\libs\\test.SchLib
+SYMBOL|OPAMP|Dual op amp|2
+PIN|1|OUT|eElectricOutput|eRotate0|300|0|1
+PIN|2|\\I\\N-|eElectricInput|eRotate180|-300|100|1|200
+PIN|8|V+|eElectricPower|eRotate90|0|200|0|100|1|0
+PIN|7|OUT|eElectricOutput|eRotate0|300|0|2
+SYMBOL|BOX|Drawn body|1
+PIN|1|A|eElectricPassive|eRotate180|0|0
+GRAPHIC|rectangle|1|2|1|0|-100|400|100
+GRAPHIC|arc|1|1|200|0|50|0|180
+GRAPHIC|polygon|1|1|1|0|0|50|50|100|0
+GRAPHIC|label|1|100|-50|Hello
+PIN|2|B|eElectricPassive|eRotate0|400|0.5
+GRAPHIC|spline|1|1|0|0
+"""
+
+FOOTPRINT_SPEC = """PAD|0|0|0|0|TopLayer|0|0|0|0|0|10|10|1
+FPLIB|C:\\libs\\test.PcbLib
+FOOTPRINT|TH2|Two through-hole pads
+PAD|1|0|0|0|MultiLayer|1|40|0|0|0|80|80|1
+PAD|2|200|0|0|MultiLayer|1|40|2|100|0|80|140|2
+TRACK|-100|100|300|100|10|TopOverlay
+REGION|Mechanical15|0|-100|-100|300|-100|300|-50
+TEXT|0|150|50|5|0|TopOverlay|0|0|TH<NL>2
+WIRE|1|2
+"""
+
+
+def pin_lines(drawing):
+    return [p.tolist() for p, _, _, stroke, width in drawing.shapes if stroke == PIN_COLOUR]
+
+
+class SpecTest(unittest.TestCase):
+
+    def test_symbol_spec(self):
+        symbols, problems = parse_symbol_spec(SYMBOL_SPEC)
+        self.assertEqual([s["symbol_name"] for s in symbols], ["OPAMP", "BOX"])
+        opamp, box = symbols
+        pins = [p for p in opamp["primitives"] if p["type"] == "pin"]
+        self.assertEqual([p["pin_number"] for p in pins], ["1", "2", "8", "7"])
+        self.assertEqual((pins[1]["electrical"], pins[1]["orientation"], pins[1]["length"]), (0, 2, 200))
+        self.assertEqual((pins[2]["owner_part_id"], pins[2]["show_name"], pins[2]["show_designator"]), (0, True, False))
+        # no graphics: one body per part around its pins and the shared ones
+        bodies = [p for p in opamp["primitives"] if p["type"] == "rectangle"]
+        self.assertEqual([(b["owner_part_id"], b["x1"], b["y1"], b["x2"], b["y2"]) for b in bodies],
+                         [(1, -300, -100, 300, 300), (2, 0, -100, 300, 300)])
+        kinds = [p["type"] for p in box["primitives"]]
+        self.assertEqual(kinds, ["rectangle", "arc", "polygon", "label", "pin"])
+        rectangle, arc, polygon, label = box["primitives"][:4]
+        self.assertEqual((rectangle["line_width"], rectangle["is_solid"], rectangle["x2"]), (2, True, 400))
+        self.assertEqual((arc["cx"], arc["radius"], arc["end_angle"]), (200, 50, 180))
+        self.assertEqual(polygon["vertices"], [{"x": 0, "y": 0}, {"x": 50, "y": 50}, {"x": 100, "y": 0}])
+        self.assertEqual((label["text"], label["x"]), ("Hello", 100))
+        self.assertEqual([p["line"] for p in problems], [13, 14])
+        self.assertIn("whole number", problems[0]["error"])
+        self.assertIn("spline", problems[1]["error"])
+
+    def test_part_count_follows_owners(self):
+        # like CreateSchematicSymbol, a pin of part 2 makes a second part (and body)
+        symbols, problems = parse_symbol_spec("SYMBOL|X|d\nPIN|1|A|0|0|0|0\nPIN|2|B|0|0|0|100|2\n")
+        self.assertEqual(problems, [])
+        self.assertEqual(symbols[0]["part_count"], 2)
+        self.assertEqual([(p["type"], p["owner_part_id"]) for p in symbols[0]["primitives"]],
+                         [("rectangle", 1), ("rectangle", 2), ("pin", 1), ("pin", 2)])
+        self.assertEqual(parse_symbol_spec("SYMBOL|Y|d|1\nGRAPHIC|line|3|1|0|0|10|0\n")[0][0]["part_count"], 3)
+
+    def test_footprint_spec(self):
+        footprints, problems = parse_footprint_spec(FOOTPRINT_SPEC)
+        self.assertEqual(len(footprints), 1)
+        primitives = footprints[0]["primitives"]
+        self.assertEqual([p["type"] for p in primitives], ["pad", "pad", "track", "region", "text"])
+        slot = primitives[1]
+        self.assertEqual((slot["hole_type"], slot["hole_width"], slot["top_y_size"], slot["top_shape"]),
+                         (2, 100, 140, 2))
+        self.assertEqual(primitives[2]["layer"], "TopOverlay")
+        self.assertEqual(len(primitives[3]["vertices"]), 3)
+        self.assertEqual(primitives[4]["text"], "TH\r\n2")
+        self.assertEqual([p["line"] for p in problems], [1, 9])
+
+    def test_sources(self):
+        kind, entries, _ = load_source(SYMBOL_SPEC)
+        self.assertEqual((kind, len(entries)), ("symbol", 2))
+        self.assertEqual(load_source(FOOTPRINT_SPEC)[0], "footprint")
+        single = {"library_name": "x", "footprint_name": "TH2", "primitives": []}
+        self.assertEqual(load_source(json.dumps(single)), ("footprint", [single], []))
+        everything = {"library_name": "x", "symbol_count": 2, "symbols": entries}
+        self.assertEqual(library_items(everything), ("symbol", entries))
+        for bad in ("NET|A", {"symbol_count": 1, "symbols": [{"name": "A", "pins": 2}]}, {"symbols": []}, 3):
+            with self.subTest(bad=bad), self.assertRaises(ValueError):
+                load_source(bad) if isinstance(bad, str) else library_items(bad)
+
+    def test_select(self):
+        entries = [{"symbol_name": n, "primitives": []} for n in ("LM358", "LM324", "NE555")]
+        chosen, missing = select(entries, ["lm*", "TL07?"])
+        self.assertEqual(([e["symbol_name"] for e in chosen], missing), (["LM358", "LM324"], ["TL07?"]))
+        self.assertEqual(select(entries, None), (entries, []))
+
+
+class SymbolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.symbols = parse_symbol_spec(SYMBOL_SPEC)[0]
+
+    def test_pins_and_parts(self):
+        part1 = symbol_drawing(self.symbols[0])
+        # pins run from their location away from the body: 0 right, 90 up, 180 left
+        self.assertEqual(pin_lines(part1), [[[300, 0], [600, 0]], [[-300, 100], [-500, 100]], [[0, 200], [0, 300]]])
+        texts = {t[2]: t for t in part1.texts}
+        # overbar markers dropped; names inside the body, V+ hides its number
+        self.assertEqual(sorted(texts), ["1", "2", "IN-", "OUT", "V+"])
+        self.assertEqual(texts["OUT"][:2] + texts["OUT"][5:], (260, 0, "rm", 0))
+        self.assertEqual(texts["IN-"][:2] + texts["IN-"][5:], (-260, 100, "lm", 0))
+        self.assertEqual(texts["V+"][:2] + texts["V+"][5:], (0, 160, "rm", 90))
+        self.assertEqual(pin_lines(symbol_drawing(self.symbols[0], part=2)), [[[0, 200], [0, 300]],
+                                                                              [[300, 0], [600, 0]]])
+
+    def test_pixels(self):
+        drawing = symbol_drawing(self.symbols[1])
+        x1, y1, x2, y2 = drawing.bounds()
+        image = render_png(drawing, size=400)
+        scale = (400 - 16) / (x2 - x1)
+        pixels = np.asarray(image)
+
+        def at(x, y):
+            return tuple(pixels[round(8 + (y2 - y) * scale), round(8 + (x - x1) * scale)])
+
+        self.assertEqual(image.width, 400)
+        self.assertEqual(at(300, 50), BODY_FILL)
+        self.assertEqual(at(0, 30), BODY_LINE)
+        self.assertEqual(at(-150, 0), PIN_COLOUR)
+        self.assertEqual(at(-150, 80), SYMBOL_BACKGROUND)
+        # the number sits above its pin
+        label = pixels[round(8 + (y2 - 30) * scale) - 12:round(8 + (y2 - 0) * scale) - 3,
+                       round(8 + (-180 - x1) * scale):round(8 + (-120 - x1) * scale)]
+        self.assertTrue((label == PIN_COLOUR).all(axis=2).any())
+
+    def test_svg(self):
+        svg = render_svg(symbol_drawing(self.symbols[1]), size=300)
+        root = ET.fromstring(svg)
+        ns = "{http://www.w3.org/2000/svg}"
+        self.assertEqual(root.get("width"), "300")
+        self.assertEqual(len(root.findall(f"{ns}polygon")), 2)
+        self.assertEqual(len(root.findall(f"{ns}polyline")), 2)  # the arc and the pin
+        self.assertEqual(sorted(t.text for t in root.findall(f"{ns}text")), ["1", "A", "Hello"])
+        # y is flipped: the label at y=-50 is drawn below the origin
+        label = [t for t in root.findall(f"{ns}text") if t.text == "Hello"][0]
+        self.assertEqual(label.get("y"), "50")
+
+    def test_skipped(self):
+        symbol = {"symbol_name": "X", "primitives": [{"type": "unknown", "object_id": 7},
+                                                     {"type": "line", "x1": 0}]}
+        self.assertEqual(symbol_drawing(symbol).skipped, {"unknown": 1, "line": 1})
+
+
+class FootprintTest(unittest.TestCase):
+
+    def test_layers_and_drills(self):
+        footprint = parse_footprint_spec(FOOTPRINT_SPEC)[0][0]
+        drawing = footprint_drawing(footprint)
+        # mechanical first, copper, overlay, then drills
+        colours = [s[2] or s[3] for s in drawing.shapes]
+        self.assertEqual(colours, [layer_style("Mechanical15")[0], layer_style("MultiLayer")[0],
+                                   layer_style("MultiLayer")[0], layer_style("TopOverlay")[0],
+                                   HOLE_COLOUR, HOLE_COLOUR])
+        slot = drawing.shapes[-1]
+        self.assertEqual((slot[0].tolist(), slot[4]), ([[170, 0], [230, 0]], 40))
+        self.assertEqual([t[2] for t in drawing.texts], ["2", "1", "TH 2"])
+        self.assertEqual(layer_style("Bottom Layer")[0], (0, 0, 255))
+
+        x1, y1, x2, y2 = drawing.bounds()
+        image = render_png(drawing, size=500)
+        scale = (500 - 16) / max(x2 - x1, y2 - y1)
+        pixels = np.asarray(image)
+
+        def at(x, y):
+            return tuple(pixels[round(8 + (y2 - y) * scale), round(8 + (x - x1) * scale)])
+
+        self.assertEqual(at(0, 30), layer_style("MultiLayer")[0])
+        self.assertEqual(at(-15, 0), HOLE_COLOUR)
+        self.assertEqual(at(0, 45), FOOTPRINT_BACKGROUND)
+        self.assertEqual(at(200, 60), layer_style("MultiLayer")[0])
+        self.assertEqual(at(225, 10), HOLE_COLOUR)
+        self.assertEqual(at(290, -70), layer_style("Mechanical15")[0])
+
+    def test_dump_fields(self):
+        dump = {"footprint_name": "V", "primitives": [
+            {"type": "pad", "name": "1", "x": 0, "y": 0, "rotation": 0, "layer": "TopLayer",
+             "top_x_size": 60, "top_y_size": 40, "top_shape": 9, "corner_pct": 50, "hole_size": 0},
+            {"type": "via", "x": 100, "y": 0, "size": 30, "hole_size": 12},
+            {"type": "component_body"}]}
+        drawing = footprint_drawing(dump)
+        self.assertEqual(drawing.skipped, {"component_body": 1})
+        pad = drawing.shapes[0]
+        self.assertEqual((pad[1], pad[4]), (True, 20))
+        self.assertEqual([s[4] for s in drawing.shapes[1:]], [30, 12])
+
+
+class SheetTest(unittest.TestCase):
+
+    def test_contact_sheet(self):
+        symbols = parse_symbol_spec(SYMBOL_SPEC)[0]
+        drawings = [symbol_drawing(s) for s in symbols * 3 + symbols[:1]]
+        sheet = contact_sheet(drawings, cell_size=100)
+        self.assertEqual(sheet.size, (300, 3 * (100 + CAPTION_PX)))
+        self.assertEqual(contact_sheet(drawings, cell_size=100, columns=7).size, (700, 100 + CAPTION_PX))
+        root = ET.fromstring(contact_sheet_svg(drawings, cell_size=100))
+        self.assertEqual(len(root.findall("{http://www.w3.org/2000/svg}svg")), 7)
+        with self.assertRaises(ValueError):
+            contact_sheet(drawings * 100, cell_size=2000)
+
+    def test_render_preview(self):
+        kind, entries, _ = load_source(SYMBOL_SPEC)
+        result, image = render_preview(kind, entries, ["box", "nope"], size=200)
+        self.assertEqual((result["count"], result["missing_names"], image.width), (1, ["nope"], 200))
+        self.assertEqual(len(result["bounds_mils"]), 4)
+        result, svg = render_preview(kind, entries, image_format="svg", cell_size=64)
+        self.assertEqual((result["count"], ET.fromstring(svg).get("width")), (2, "128"))
+        for options in [{"image_format": "gif"}, {"size": 4}, {"cell_size": 10}, {"part": 0},
+                        {"names": ["nope"]}]:
+            with self.subTest(options=options), self.assertRaises(ValueError):
+                render_preview(kind, entries, **options)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Minimum spanning tree tests: every size path against a brute-force Prim,
+edge lists, degenerate point sets (duplicates, collinear, tiny), and
+incremental add/delete pricing against recomputation.
+"""
+
+import math
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import mst
+
+
+def reference_length(points):
+    n = len(points)
+    if n < 2:
+        return 0.0
+    in_tree, best, total = [False] * n, [math.inf] * n, 0.0
+    best[0] = 0.0
+    for _ in range(n):
+        u = min((i for i in range(n) if not in_tree[i]), key=lambda i: best[i])
+        in_tree[u] = True
+        total += best[u]
+        for v in range(n):
+            if not in_tree[v]:
+                best[v] = min(best[v], math.dist(points[u], points[v]))
+    return total
+
+
+def random_points(n, seed=0, grid=None):
+    rng = random.Random(seed)
+    if grid:  # snapped coordinates produce coincident points
+        return [(rng.randrange(grid) * 25.0, rng.randrange(grid) * 25.0) for _ in range(n)]
+    return [(rng.uniform(0, 8000), rng.uniform(0, 6000)) for _ in range(n)]
+
+
+class SpanningTreeTest(unittest.TestCase):
+
+    def assertValidTree(self, points, tree):
+        n = len(points)
+        self.assertEqual(tree.edges.shape, (max(n - 1, 0), 2))
+        pts = np.asarray(points, dtype=float)
+        if n > 1:
+            measured = np.hypot(*(pts[tree.edges[:, 0]] - pts[tree.edges[:, 1]]).T)
+            np.testing.assert_allclose(measured, tree.edge_lengths)
+        self.assertAlmostEqual(float(tree.edge_lengths.sum()), tree.length, places=6)
+        # n - 1 edges that reach every point form a spanning tree
+        parent = list(range(n))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        for a, b in tree.edges.tolist():
+            parent[find(a)] = find(b)
+        self.assertEqual(len({find(i) for i in range(n)}), min(n, 1))
+
+    def test_matches_reference_on_every_path(self):
+        for n in (2, 3, mst.SMALL_MAX, mst.SMALL_MAX + 1, mst.DENSE_MAX, mst.DENSE_MAX + 1, 400):
+            with self.subTest(n=n):
+                points = random_points(n, seed=n)
+                tree = mst.spanning_tree(points)
+                self.assertAlmostEqual(tree.length, reference_length(points), places=6)
+                self.assertAlmostEqual(mst.mst_length(points), tree.length, places=6)
+                self.assertValidTree(points, tree)
+
+    def test_without_scipy(self):
+        points = random_points(300, seed=1)
+        with mock.patch.object(mst, "Delaunay", None):
+            tree = mst.spanning_tree(points)
+        self.assertAlmostEqual(tree.length, reference_length(points), places=6)
+        self.assertValidTree(points, tree)
+
+    def test_coincident_points(self):
+        points = random_points(300, seed=2, grid=20)  # 400 grid cells, many repeats
+        tree = mst.spanning_tree(points)
+        self.assertAlmostEqual(tree.length, reference_length(points), places=6)
+        self.assertValidTree(points, tree)
+        self.assertEqual(mst.mst_length([(5, 5)] * 200), 0.0)
+
+    def test_collinear_points(self):
+        points = [(100.0 + 3 * i, 50.0 - 2 * i) for i in range(200)]
+        random.Random(3).shuffle(points)
+        tree = mst.spanning_tree(points)
+        self.assertAlmostEqual(tree.length, 199 * math.hypot(3, 2), places=6)
+        self.assertValidTree(points, tree)
+
+    def test_tiny_and_array_inputs(self):
+        self.assertEqual(mst.mst_length([]), 0.0)
+        self.assertEqual(mst.mst_length([(1, 1)]), 0.0)
+        self.assertEqual(mst.mst_length([(0, 0), (3, 4)]), 5.0)
+        self.assertEqual(mst.mst_length(np.array([[0, 0], [3, 4], [3, 0]])), 7.0)
+        self.assertEqual(mst.spanning_tree([]).edge_list(), [])
+        self.assertEqual(mst.spanning_tree([(0, 0), (0, 10)]).edge_list(), [[0, 1]])
+        with self.assertRaises(ValueError):
+            mst.spanning_tree([1, 2, 3])
+
+    def test_batched_lengths(self):
+        sets = [random_points(n, seed=n) for n in (1, 2, 5, 9)] + [random_points(9, seed=1, grid=3)]
+        # pad every set to 9 points by repeating its first point
+        batch = np.array([s + [s[0]] * (9 - len(s)) for s in sets])
+        np.testing.assert_allclose(mst.mst_lengths(batch), [reference_length(s) for s in sets])
+        self.assertEqual(mst.mst_lengths(np.zeros((0, 4, 2))).shape, (0,))
+
+    def test_length_only_path(self):
+        for n in (3, mst.SMALL_MAX + 1, mst.LENGTH_SMALL_MAX, mst.LENGTH_SMALL_MAX + 1):
+            for points in (random_points(n, seed=n), random_points(n, seed=n, grid=4)):
+                with self.subTest(n=n):
+                    expected = reference_length(points)
+                    self.assertAlmostEqual(mst.mst_length(points), expected, places=6)
+                    self.assertAlmostEqual(mst.mst_length(np.array(points)), expected, places=6)
+
+
+class IncrementalTreeTest(unittest.TestCase):
+
+    def test_lengths_with_matches_recompute(self):
+        rng = random.Random(4)
+        for trial in range(60):
+            points = random_points(rng.randint(1, 30), seed=trial, grid=8 if trial % 4 == 0 else None)
+            candidates = random_points(5, seed=100 + trial) + [points[0]]
+            got = mst.IncrementalTree(points).lengths_with(candidates)
+            expected = [reference_length(points + [c]) for c in candidates]
+            np.testing.assert_allclose(got, expected, atol=1e-6)
+
+    def test_without_matches_recompute(self):
+        rng = random.Random(5)
+        for trial in range(60):
+            points = random_points(rng.randint(2, 30), seed=trial)
+            drop = rng.sample(range(len(points)), rng.randint(1, 2) if len(points) > 2 else 1)
+            rest = [p for i, p in enumerate(points) if i not in drop]
+            tree = mst.IncrementalTree(points).without(drop)
+            self.assertAlmostEqual(tree.length, reference_length(rest), places=6)
+            # moving a point = delete it, then add it at the new position
+            candidate = (rng.uniform(0, 8000), rng.uniform(0, 6000))
+            self.assertAlmostEqual(float(tree.lengths_with([candidate])[0]),
+                                   reference_length(rest + [candidate]), places=6)
+
+    def test_empty(self):
+        self.assertEqual(mst.IncrementalTree([]).lengths_with([(1, 1)]).tolist(), [0.0])
+        self.assertEqual(mst.IncrementalTree([(0, 0)]).lengths_with([(3, 4)]).tolist(), [5.0])
+        self.assertEqual(mst.IncrementalTree([(0, 0)]).without([0]).length, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
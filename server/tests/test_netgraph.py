@@ -0,0 +1,147 @@
+"""
+Connectivity graph tests: neighbourhoods, groups and shared nets on a
+small hand-made board, and against a plain breadth-first search and
+union-find on a synthetic one (with and without scipy).
+"""
+
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import netgraph
+from altium_sim import SyntheticBoard
+from netgraph import NetGraph
+
+
+def entry(designator, *nets):
+    return {"designator": designator, "pins": [{"name": str(i + 1), "net": net} for i, net in enumerate(nets)]}
+
+
+# U1 drives a filter R1-C1 into U2; R2 is a pull-up; J1 and U3 form a
+# separate circuit. Every part is on GND or +5V.
+PINS = [
+    entry("U1", "OUT", "EN", "GND", "+5V"),
+    entry("R1", "OUT", "FILT"),
+    entry("C1", "FILT", "GND"),
+    entry("U2", "FILT", "GND", "+5V"),
+    entry("R2", "EN", "+5V"),
+    entry("J1", "SIG", "GND"),
+    entry("U3", "SIG", "", "+5V"),
+    entry("TP1", ""),
+]
+
+
+def reference_hops(pins, seeds, hops, followed):
+    nets = {e["designator"]: {p["net"] for p in e["pins"] if p["net"] and followed(p["net"])} for e in pins}
+    distance = {s: 0 for s in seeds}
+    frontier = list(seeds)
+    for hop in range(1, hops + 1):
+        reach = set().union(*(nets[d] for d in frontier)) if frontier else set()
+        frontier = [d for d in nets if d not in distance and nets[d] & reach]
+        distance.update((d, hop) for d in frontier)
+    return {d: h for d, h in distance.items() if h}
+
+
+def reference_groups(pins, followed):
+    parent = {e["designator"]: e["designator"] for e in pins}
+
+    def find(d):
+        while parent[d] != d:
+            d = parent[d]
+        return d
+    first = {}
+    for e in pins:
+        for p in e["pins"]:
+            if p["net"] and followed(p["net"]):
+                parent[find(e["designator"])] = find(first.setdefault(p["net"], e["designator"]))
+    groups = {}
+    for d in parent:
+        groups.setdefault(find(d), set()).add(d)
+    return {frozenset(g) for g in groups.values() if len(g) >= 2}
+
+
+class SmallBoardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = NetGraph(PINS)
+
+    def test_neighbourhood_skips_plane_nets(self):
+        result = self.graph.neighbourhood(["U1"], hops=1, max_pads_per_net=3)
+        self.assertEqual([(c["designator"], c["hops"], c["via_net"]) for c in result["components"]],
+                         [("R1", 1, "OUT"), ("R2", 1, "EN")])
+        self.assertEqual(result["skipped_nets"], ["+5V", "GND"])
+        two = self.graph.neighbourhood(["U1"], hops=2, max_pads_per_net=3)
+        self.assertEqual({c["designator"]: c["hops"] for c in two["components"]}, {"R1": 1, "R2": 1, "C1": 2, "U2": 2})
+        # following every net reaches the whole board in one hop, except the unconnected test point
+        every = self.graph.neighbourhood(["U1"], hops=1, max_pads_per_net=0)
+        self.assertEqual(every["component_count"], 6)
+        named = self.graph.neighbourhood(["U1", "X9", "U1"], hops=3, max_pads_per_net=0, exclude_nets=["GND", "+5V"])
+        self.assertEqual((named["designators"], named["missing_designators"]), (["U1"], ["X9"]))
+        self.assertEqual(named["component_count"], 4)
+        self.assertEqual(self.graph.neighbourhood(["U1"], hops=0)["components"], [])
+        with self.assertRaises(ValueError):
+            self.graph.neighbourhood(["U1"], hops=-1)
+
+    def test_groups(self):
+        named = lambda groups: [sorted(self.graph.designators[i] for i in g) for g in groups]
+        self.assertEqual(named(self.graph.groups(max_pads_per_net=3)),
+                         [["C1", "R1", "R2", "U1", "U2"], ["J1", "U3"]])
+        self.assertEqual(named(self.graph.groups(exclude_nets=["GND", "+5V"], min_size=1))[-1], ["TP1"])
+        self.assertEqual(len(self.graph.groups(max_pads_per_net=0)), 1)
+
+    def test_shared_nets(self):
+        result = self.graph.shared_nets(["U1", "U2", "C1", "Q7"])
+        self.assertEqual(result["missing_designators"], ["Q7"])
+        self.assertEqual([(n["net"], n["pins"]) for n in result["nets"]],
+                         [("GND", {"U1": ["3"], "U2": ["2"], "C1": ["2"]}),
+                          ("+5V", {"U1": ["4"], "U2": ["3"]}),
+                          ("FILT", {"C1": ["1"], "U2": ["1"]})])
+        self.assertEqual(self.graph.shared_nets(["J1", "R2"])["nets"], [])
+
+    def test_memoized_on_snapshot(self):
+        self.assertIs(NetGraph.of(PINS), NetGraph.of(PINS))
+        self.assertIsNot(NetGraph.of(list(PINS)), NetGraph.of(PINS))
+
+
+class SyntheticBoardTest(unittest.TestCase):
+
+    def setUp(self):
+        # a sparse netlist, so followed nets leave several groups
+        board = SyntheticBoard(count=1500, seed=6)
+        self.pins = board.get_component_pins({})
+        self.graph = NetGraph(self.pins)
+        self.counts = {}
+        for e in self.pins:
+            for p in e["pins"]:
+                self.counts[p["net"]] = self.counts.get(p["net"], 0) + 1
+
+    def test_neighbourhood_matches_search(self):
+        rng = random.Random(0)
+        followed = lambda net: self.counts[net] <= 3
+        for trial in range(20):
+            seeds = rng.sample(self.graph.designators, rng.choice([1, 3]))
+            hops = rng.choice([1, 2, 5])
+            with self.subTest(seeds=seeds, hops=hops):
+                result = self.graph.neighbourhood(seeds, hops=hops, max_pads_per_net=3)
+                self.assertEqual({c["designator"]: c["hops"] for c in result["components"]},
+                                 reference_hops(self.pins, seeds, hops, followed))
+
+    def test_groups_match_union_find(self):
+        for threshold in (2, 3, 5):
+            followed = lambda net: self.counts[net] <= threshold
+            expected = reference_groups(self.pins, followed)
+            for scipy_graph in (True, False):
+                with self.subTest(threshold=threshold, scipy=scipy_graph), \
+                        mock.patch.object(netgraph, "csr_matrix", netgraph.csr_matrix if scipy_graph else None):
+                    groups = self.graph.groups(max_pads_per_net=threshold)
+                    self.assertEqual({frozenset(self.graph.designators[i] for i in g) for g in groups}, expected)
+                    self.assertEqual([len(g) for g in groups], sorted((len(g) for g in groups), reverse=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
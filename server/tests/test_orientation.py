@@ -0,0 +1,192 @@
+"""
+Orientation check tests: per-net scoring against brute force, the
+rotation suggestions of check_rotations, and the joint rotation search.
+"""
+
+import math
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import orientation
+from mst import spanning_tree
+from altium_sim import SyntheticBoard
+from orientation import NetScorer, RotationSearch, check_rotations, optimize_rotations, rotate_offset
+
+
+def net(count, seed, owner="R1", owned=1):
+    rng = random.Random(seed)
+    pads = [(f"U{i}", rng.uniform(0, 4000), rng.uniform(0, 3000)) for i in range(count)]
+    return pads + [(owner, rng.uniform(0, 4000), rng.uniform(0, 3000)) for _ in range(owned)]
+
+
+def capacitor(designator, x, y, rotation, nets=("VDD", "GND"), layer="Top Layer"):
+    return {"designator": designator, "x": x, "y": y, "rotation": rotation, "layer": layer,
+            "pins": [{"name": "1", "net": nets[0], "dx": -20, "dy": 0},
+                     {"name": "2", "net": nets[1], "dx": 20, "dy": 0}]}
+
+
+def with_own_pads(comps, fixed):
+    """net_pads from fixed (designator, x, y, net) pads plus the pads of comps as placed"""
+    net_pads = {}
+    for designator, x, y, net_name in fixed:
+        net_pads.setdefault(net_name, []).append((designator, x, y))
+    for comp in comps:
+        for pin in comp["pins"]:
+            ox, oy = rotate_offset(pin["dx"], pin["dy"], comp["rotation"])
+            net_pads.setdefault(pin["net"], []).append((comp["designator"], comp["x"] + ox, comp["y"] + oy))
+    return net_pads
+
+
+def turned(comps, rotations):
+    return [dict(c, rotation=rotations.get(c["designator"], c["rotation"])) for c in comps]
+
+
+class NetScorerTest(unittest.TestCase):
+
+    POSITIONS = [(100.0, 100.0), (2000.0, 1500.0), (3900.0, 50.0)]
+
+    def test_routable_net_excludes_own_pads(self):
+        for owned in (1, 2):
+            pads = net(12, seed=owned, owned=owned)
+            metric, values = NetScorer(pads).score("R1", self.POSITIONS)
+            self.assertEqual(metric, "net_airline_mils")
+            others = [(x, y) for d, x, y in pads if d != "R1"]
+            for value, position in zip(values, self.POSITIONS):
+                self.assertAlmostEqual(value, spanning_tree(others + [position]).length, places=6)
+
+    def test_plane_net_nearest_pad(self):
+        pads = net(orientation.PLANE_NET_PAD_COUNT + 10, seed=3, owned=2)
+        # put one of R1's own pads right on the first query point
+        pads[-1] = ("R1",) + self.POSITIONS[0]
+        others = [(x, y) for d, x, y in pads if d != "R1"]
+        expected = [min(math.dist(p, o) for o in others) for p in self.POSITIONS]
+        for kdtree in (orientation.cKDTree, None):
+            with self.subTest(kdtree=kdtree), mock.patch.object(orientation, "cKDTree", kdtree):
+                metric, values = NetScorer(pads).score("R1", self.POSITIONS)
+                self.assertEqual(metric, "nearest_return_mils")
+                for value, want in zip(values, expected):
+                    self.assertAlmostEqual(value, want, places=6)
+
+    def test_net_with_only_own_pads(self):
+        self.assertIsNone(NetScorer([("R1", 0, 0), ("R1", 40, 0)]).score("R1", [(0, 0)]))
+
+
+class CheckRotationsTest(unittest.TestCase):
+
+    def test_cap_with_ground_pad_facing_away(self):
+        # C1 at (200, 0), rotation 0: VDD pad at (180, 0), GND pad at
+        # (220, 0) - facing away from the IC's ground pad at (100, 0)
+        gnd = [("U1", 100, 0)] + [(f"U{i}", 5000 + 10 * i, 5000) for i in range(2, 60)]
+        net_pads = {"VDD": [("U1", 200, 1000), ("C1", 180, 0)], "GND": gnd + [("C1", 220, 0)]}
+        suggestions, checked = check_rotations([capacitor("C1", 200, 0, 0)], net_pads, 25)
+        self.assertEqual(checked, 1)
+        s = suggestions[0]
+        self.assertEqual((s["current_rotation"], s["suggested_rotation"]), (0, 180))
+        self.assertFalse(s["bbox_changes"])
+        self.assertEqual(s["improvement_mils"], 40.0)
+        self.assertEqual(s["current_pads"], [{"pin": "1", "net": "VDD", "net_airline_mils": 1000.2},
+                                             {"pin": "2", "net": "GND", "nearest_return_mils": 120.0}])
+        self.assertEqual(s["suggested_pads"][1], {"pin": "2", "net": "GND", "nearest_return_mils": 80.0})
+
+    def test_threshold_and_skips(self):
+        # R1 pin 1 (net A) sits on the left but A's other pad is on the right
+        net_pads = {"A": [("U1", 1000, 0), ("R1", -20, 0)], "B": [("U2", -1000, 0), ("R1", 20, 0)]}
+        comps = [
+            capacitor("R1", 0, 0, 0, nets=("A", "B")),
+            {"designator": "U9", "x": 0, "y": 0, "pins": [{"name": "1"}]},  # not 2 pads
+            capacitor("R2", 0, 0, 0, nets=("", "")),  # no nets: not checked
+        ]
+        suggestions, checked = check_rotations(comps, net_pads, 25)
+        self.assertEqual(checked, 1)
+        self.assertEqual(suggestions[0]["suggested_rotation"], 180)
+        self.assertEqual(suggestions[0]["improvement_mils"], 80.0)
+        self.assertEqual(check_rotations(comps, net_pads, 100)[0], [])
+
+    def test_bottom_layer_mirrors_offsets(self):
+        net_pads = {"A": [("U1", -500, 0), ("R1", 0, 0)], "B": [("U2", 500, 0), ("R1", 0, 0)]}
+        top = capacitor("R1", 0, 0, 0, nets=("A", "B"))
+        bottom = dict(top, layer="Bottom Layer")
+        self.assertEqual(check_rotations([top], net_pads, 1)[0], [])
+        self.assertEqual(check_rotations([bottom], net_pads, 1)[0][0]["suggested_rotation"], 180)
+
+    def test_rotate_offset(self):
+        x, y = rotate_offset(20, 0, 90)
+        self.assertAlmostEqual(x, 0)
+        self.assertAlmostEqual(y, 20)
+
+
+
+class RotationSearchTest(unittest.TestCase):
+
+    def test_joint_avoids_conflicting_suggestions(self):
+        # Two caps on the same nets A and C, whose other pads sit below them
+        comps = [capacitor("C1", 0, 0, 270, nets=("A", "C")), capacitor("C2", 0, 60, 0, nets=("A", "C"))]
+        fixed = [("U1", 0, -100, "A"), ("U1", 10, -100, "C")]
+        net_pads = with_own_pads(comps, fixed)
+
+        def board_score(rotations):
+            placed = turned(comps, rotations)
+            return RotationSearch(placed, with_own_pads(placed, fixed)).score()
+
+        # Each suggestion helps on its own; applied together they make it worse
+        suggestions, _ = check_rotations(comps, net_pads, 1)
+        greedy = {s["designator"]: s["suggested_rotation"] for s in suggestions}
+        self.assertEqual(greedy, {"C1": 0, "C2": 90})
+        self.assertGreater(board_score(greedy), board_score({}))
+
+        result = optimize_rotations(comps, net_pads, 1)
+        self.assertEqual([(r["designator"], r["suggested_rotation"]) for r in result["rotations"]],
+                         [("C2", 90)])
+        self.assertEqual(result["placements"], [{"designator": "C2", "x": 0, "y": 60, "rotation": 90}])
+        self.assertAlmostEqual(result["initial_score_mils"], board_score({}), places=1)
+        self.assertAlmostEqual(result["final_score_mils"], board_score({"C2": 90}), places=1)
+        self.assertEqual(optimize_rotations(comps, net_pads, 10)["rotations"], [])
+
+    def test_plane_nets_match_check_mode(self):
+        # exactly PLANE_NET_PAD_COUNT pads besides C1's own: routable in both modes
+        for extra, plane in ((0, False), (1, True)):
+            with self.subTest(extra=extra):
+                others = net(orientation.PLANE_NET_PAD_COUNT + extra, seed=5, owned=0)
+                comps = [capacitor("C1", 2000, 1500, 0, nets=("GND", "GND"))]
+                net_pads = with_own_pads(comps, [(d, x, y, "GND") for d, x, y in others])
+                metric, _ = NetScorer(net_pads["GND"]).score("C1", [(2000, 1500)])
+                self.assertEqual(metric, "nearest_return_mils" if plane else "net_airline_mils")
+                self.assertEqual(RotationSearch(comps, net_pads).plane.any(), plane)
+
+    def test_result_is_consistent_and_locally_optimal(self):
+        board = SyntheticBoard(count=300, seed=2)
+        comps = board.get_component_pins({})
+        for comp in comps:
+            comp["layer"] = "Bottom Layer" if comp["layer"] == "BottomLayer" else "Top Layer"
+        net_pads = {}
+        for comp in comps:
+            for pin in comp["pins"]:
+                net_pads.setdefault(pin["net"], []).append((comp["designator"], pin["x"], pin["y"]))
+
+        search = RotationSearch(comps, net_pads)
+        before = search.score()
+        search.run(min_improvement=1.0)
+        rotations = {r["designator"]: r["suggested_rotation"] for r in search.rotations()}
+        self.assertTrue(rotations)
+        self.assertLess(search.score(), before)
+
+        # Rebuilt from scratch with the rotations applied (searched parts'
+        # pads are placed from their rotation), the board scores the same
+        fresh = RotationSearch(turned(comps, rotations), net_pads)
+        self.assertAlmostEqual(fresh.score(), search.score(), places=4)
+
+        # and no single part gains 1 mil from another turn
+        deltas = search._score(np.nonzero(search.scored)[0])[0]
+        self.assertGreater(deltas.min(), -1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
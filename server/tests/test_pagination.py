@@ -0,0 +1,108 @@
+"""
+Cursor pagination tests: page walking, envelopes and expiry on design changes.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pagination import ResultPager, list_key_for
+from altium_sim import FakeClock, make_bridge
+
+
+def walk(pager, tool, first):
+    pages = [first]
+    while pages[-1]["next_cursor"]:
+        pages.append(pager.page(tool, pages[-1]["next_cursor"]))
+    return pages
+
+
+class ResultPagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.version = 0
+        self.clock = FakeClock()
+        self.pager = ResultPager(version=lambda: self.version, ttl=60, clock=self.clock)
+
+    def test_pages_cover_list_once(self):
+        items = list(range(25))
+        pages = walk(self.pager, "t", self.pager.start("t", items, "nets", 10))
+        self.assertEqual([len(p["nets"]) for p in pages], [10, 10, 5])
+        self.assertEqual(sum((p["nets"] for p in pages), []), items)
+        self.assertEqual(pages[-1]["offset"], 20)
+        self.assertTrue(all(p["total"] == 25 for p in pages))
+
+    def test_envelope_repeated(self):
+        payload = {"library_name": "Lib", "footprint_count": 3, "footprints": ["a", "b", "c"]}
+        first = self.pager.start("t", payload, "footprints", 2)
+        self.assertEqual(first["library_name"], "Lib")
+        second = self.pager.page("t", first["next_cursor"])
+        self.assertEqual(second, {"library_name": "Lib", "footprint_count": 3, "footprints": ["c"],
+                                  "total": 3, "offset": 2, "next_cursor": None})
+
+    def test_limit_override(self):
+        first = self.pager.start("t", list(range(10)), "nets", 2)
+        second = self.pager.page("t", first["next_cursor"], limit=5)
+        self.assertEqual(second["nets"], [2, 3, 4, 5, 6])
+
+    def test_expires_on_version_change_and_ttl(self):
+        first = self.pager.start("t", list(range(10)), "nets", 2)
+        self.version += 1
+        self.assertFalse(self.pager.page("t", first["next_cursor"])["success"])
+
+        self.version += 1
+        first = self.pager.start("t", list(range(10)), "nets", 2)
+        self.clock.now = 61
+        self.assertFalse(self.pager.page("t", first["next_cursor"])["success"])
+
+    def test_bad_cursors(self):
+        first = self.pager.start("t", list(range(10)), "nets", 2)
+        self.assertFalse(self.pager.page("other_tool", first["next_cursor"])["success"])
+        self.assertFalse(self.pager.page("t", "garbage")["success"])
+        self.assertFalse(self.pager.page("t", "zz9:2:2")["success"])
+        result_id = first["next_cursor"].rsplit(":", 2)[0]
+        for offset, limit in ((-5, 10), (11, 2), (2, 0), (2, -3)):
+            with self.subTest(offset=offset, limit=limit):
+                page = self.pager.page("t", f"{result_id}:{offset}:{limit}")
+                self.assertEqual(page["error"], f"Invalid cursor: {result_id}:{offset}:{limit}")
+        # the end of the list is a valid (empty) page
+        self.assertEqual(self.pager.page("t", f"{result_id}:10:2")["nets"], [])
+
+    def test_oldest_result_evicted(self):
+        pager = ResultPager(version=lambda: 0, max_results=2)
+        first = pager.start("t", [1, 2], "nets", 1)
+        pager.start("t", [1, 2], "nets", 1)
+        pager.start("t", [1, 2], "nets", 1)
+        self.assertFalse(pager.page("t", first["next_cursor"])["success"])
+
+    def test_list_key_for(self):
+        self.assertEqual(list_key_for({"symbols": [], "x": 1}, ("primitives", "symbols")), "symbols")
+        self.assertIsNone(list_key_for([1, 2], ("symbols",)))
+
+
+class BridgePagerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_later_pages_skip_altium_until_design_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bridge, sim = make_bridge(Path(tmp), {
+                "get_all_nets": lambda req: [f"N{i}" for i in range(100)],
+                "place_components": lambda req: "ok",
+            })
+
+            response = await bridge.execute_command("get_all_nets", {}, use_cache=False)
+            first = bridge.pager.start("get_all_nets", response["result"], "nets", 30)
+            second = bridge.pager.page("get_all_nets", first["next_cursor"])
+            self.assertEqual(second["nets"][0], "N30")
+            self.assertEqual(sim.launch_count, 1)
+
+            await bridge.execute_command("place_components", {"placements": []})
+            self.assertFalse(bridge.pager.page("get_all_nets", second["next_cursor"])["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Placer tests: incremental move pricing against a full recompute, keep-in
+and clearance handling, and the optimize_placement result.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from board_model import BoardModel
+from placer import Annealer, optimize_placement
+from test_board_model import model_of, part
+
+
+def synthetic_cluster(count=400, size=40, seed=0):
+    board = SyntheticBoard(count=count, seed=seed)
+    model = BoardModel(list(board.components.values()), board.get_component_pins({}))
+    cx, cy = float(np.median(model.current.x)), float(np.median(model.current.y))
+    order = np.argsort(np.hypot(model.current.x - cx, model.current.y - cy))
+    return model, [int(i) for i in order[:size]]
+
+
+class AnnealerTest(unittest.TestCase):
+
+    def test_incremental_cost_matches_recompute(self):
+        model, cluster = synthetic_cluster()
+        # GND named: the plane-net (nearest fixed pad) term is exercised too
+        weights = model.weights_for(cluster, {"GND": 0.5, "+3V3": 2}, 40)
+        box = model.boxes(model.current, np.array(cluster))
+        keep_in = (box[:, 0].min(), box[:, 1].min(), box[:, 2].max(), box[:, 3].max())
+        annealer = Annealer(model, cluster, weights, keep_in, clearance=10, seed=3)
+        for step in range(300):
+            moves = annealer.propose(window=200)
+            delta, updates, boxes = annealer.delta(moves)
+            if step % 2:
+                annealer.apply(moves, updates, boxes)
+                annealer.cost += delta
+        self.assertAlmostEqual(annealer.cost, annealer.reset(), places=4)
+
+    def test_run_keeps_parts_in_keep_in(self):
+        model, cluster = synthetic_cluster()
+        keep_in = (-500.0, -500.0, 500.0, 500.0)  # away from where the parts are now
+        annealer = Annealer(model, cluster, model.weights_for(cluster, {}, 40), keep_in, seed=1)
+        stats = annealer.run(time_budget=60, iterations=2000)
+        self.assertEqual(stats["iterations"], 2000)
+        self.assertLessEqual(stats["final_cost"], stats["initial_cost"])
+        for entry in annealer.placements():
+            i = model.index[entry["designator"]]
+            state, _ = model.apply([entry])
+            xmin, ymin, xmax, ymax = model.boxes(state, np.array([i]))[0]
+            self.assertTrue(xmin >= -500 and ymin >= -500 and xmax <= 500 and ymax <= 500)
+
+    def test_part_larger_than_keep_in(self):
+        model = model_of(part("U1", 0, 0, width=100, height=100))
+        with self.assertRaises(ValueError):
+            Annealer(model, [0], {}, (0, 0, 50, 500))
+
+
+class OptimizePlacementTest(unittest.TestCase):
+
+    def setUp(self):
+        # R1 is far from its only connection, A's pad at the origin
+        self.model = model_of(part("A", 0, 0, pins=[("N1", 0, 0)]),
+                              part("R1", 1000, 0, pins=[("N1", -20, 0), ("N2", 20, 0)]))
+
+    def test_pulls_part_in_with_clearance(self):
+        result = optimize_placement(self.model, ["R1", "X9"], keep_in=[-200, -100, 600, 100],
+                                    clearance_mils=10, iterations=3000, time_budget_s=60)
+        self.assertEqual(result["missing_designators"], ["X9"])
+        self.assertEqual([p["designator"] for p in result["placements"]], ["R1"])
+        self.assertEqual(result["current"]["weighted_airline_mils"], 980.0)
+        # best possible is 20 (rotated beside A) or 30 (end-on), 10 mils apart
+        self.assertLessEqual(result["proposed"]["weighted_airline_mils"], 30.0)
+        self.assertEqual(result["overlaps"], [])
+        self.assertEqual(result["clearance_violations"], [])
+        self.assertEqual(result["placements"][0]["layer"], "top")
+
+    def test_fixed_rotation_and_repeatable(self):
+        first = optimize_placement(self.model, ["R1"], keep_in=[-200, -100, 600, 100],
+                                   allow_rotation=False, iterations=500, time_budget_s=60, seed=7)
+        second = optimize_placement(self.model, ["R1"], keep_in=[-200, -100, 600, 100],
+                                    allow_rotation=False, iterations=500, time_budget_s=60, seed=7)
+        self.assertEqual(first["placements"], second["placements"])
+        self.assertEqual(first["placements"][0]["rotation"], 0.0)
+
+    def test_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            optimize_placement(self.model, ["X9"])
+        with self.assertRaises(ValueError):
+            optimize_placement(self.model, ["R1"], keep_in=[0, 0, -10, 10])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Field projection tests over component, pin, schematic and primitive payloads.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from projection import parse_fields, project
+
+PINS = [{
+    "designator": "R1", "x": 10, "y": 20, "rotation": 90, "layer": "TopLayer",
+    "pins": [{"name": "1", "net": "GND", "x": 0, "y": 20, "width": 20},
+             {"name": "2", "net": "VCC", "x": 20, "y": 20, "width": 20}],
+}]
+
+FOOTPRINT_DUMP = {
+    "library_name": "Passives.PcbLib", "footprint_name": "0402",
+    "primitives": [{"type": "pad", "name": "1", "x": -20, "y": 0, "layer": "TopLayer", "plated": True},
+                   {"type": "track", "x1": 0, "y1": 0, "x2": 5, "y2": 5, "layer": "Mechanical1"}],
+}
+
+
+class ProjectionTest(unittest.TestCase):
+
+    def test_parse_fields(self):
+        self.assertIsNone(parse_fields(""))
+        self.assertIsNone(parse_fields(None))
+        self.assertEqual(parse_fields("x, y,pins.net"), {"x": None, "y": None, "pins": {"net": None}})
+        # A whole-value selection wins over a dotted one, in either order
+        self.assertEqual(parse_fields("pins,pins.net"), {"pins": None})
+        self.assertEqual(parse_fields(["pins.net", "pins"]), {"pins": None})
+
+    def test_components(self):
+        components = [{"designator": "R1", "x": 1, "y": 2, "footprint": "0402", "description": "10k"}]
+        self.assertEqual(project(components, "x,y"), [{"designator": "R1", "x": 1, "y": 2}])
+        self.assertIs(project(components, ""), components)
+
+    def test_nested_tables_inherit_selection(self):
+        result = project(PINS, "x,y,net")
+        self.assertEqual(result, [{"designator": "R1", "x": 10, "y": 20,
+                                   "pins": [{"net": "GND", "x": 0, "y": 20},
+                                            {"net": "VCC", "x": 20, "y": 20}]}])
+
+    def test_dotted_table_selection(self):
+        result = project(PINS, "rotation,pins.net")
+        self.assertEqual(result[0], {"designator": "R1", "rotation": 90,
+                                     "pins": [{"net": "GND"}, {"net": "VCC"}]})
+        self.assertEqual(project(PINS, "pins")[0]["pins"], PINS[0]["pins"])
+
+    def test_nested_object_selection(self):
+        schematic = [{"designator": "U1", "sheet": "a.SchDoc",
+                      "parameters": {"Value": "MCU", "Manufacturer": "ST"}}]
+        self.assertEqual(project(schematic, "parameters.Value"),
+                         [{"designator": "U1", "parameters": {"Value": "MCU"}}])
+
+    def test_primitive_dump_envelope(self):
+        result = project(FOOTPRINT_DUMP, "x,y,layer")
+        self.assertEqual(result["library_name"], "Passives.PcbLib")
+        self.assertEqual(result["primitives"], [
+            {"type": "pad", "x": -20, "y": 0, "layer": "TopLayer"},
+            {"type": "track", "layer": "Mechanical1"}])
+
+    def test_does_not_mutate(self):
+        project(PINS, "x")
+        self.assertIn("width", PINS[0]["pins"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Read cache tests: TTL/LRU behaviour and bridge-level hits and invalidation.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from read_cache import ReadCache, invalidates, is_cacheable
+from altium_sim import FakeClock, make_bridge
+
+
+class ReadCacheTest(unittest.TestCase):
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = ReadCache(ttl=10, clock=clock)
+        key = ReadCache.key("get_all_nets", {})
+        cache.put(key, {"success": True})
+        clock.now = 9
+        self.assertIsNotNone(cache.get(key))
+        clock.now = 11
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_lru_eviction(self):
+        cache = ReadCache(max_entries=2)
+        cache.put("a", {})
+        cache.put("b", {})
+        cache.get("a")  # a is now most recently used
+        cache.put("c", {})
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_key_ignores_param_order(self):
+        self.assertEqual(ReadCache.key("x", {"a": 1, "b": 2}), ReadCache.key("x", {"b": 2, "a": 1}))
+
+    def test_invalidate_bumps_version(self):
+        cache = ReadCache()
+        cache.put("a", {})
+        cache.invalidate()
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.version, 1)
+
+    def test_classification(self):
+        self.assertTrue(is_cacheable("get_all_component_data", {}))
+        self.assertTrue(is_cacheable("get_component_pins", {"designators": ["R1"]}))
+        self.assertFalse(is_cacheable("get_component_pins", {}))  # uses the selection
+        self.assertTrue(invalidates("place_components"))
+        self.assertTrue(invalidates("some_future_command"))
+        self.assertTrue(invalidates("layout_duplicator"))
+        self.assertFalse(invalidates("get_all_nets"))
+        self.assertFalse(invalidates("take_view_screenshot"))
+
+
+HANDLERS = {
+    "get_all_component_data": lambda req: [{"designator": "R1"}],
+    "get_component_pins": lambda req: req.get("designators", ["SEL"]),
+    "get_all_nets": lambda req: ["GND"],
+    "place_components": lambda req: "ok",
+}
+
+
+class BridgeCacheTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    async def test_repeated_reads_launch_once(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS)
+        for _ in range(3):
+            response = await bridge.execute_command("get_all_component_data", {})
+            self.assertEqual(response["result"], [{"designator": "R1"}])
+        self.assertEqual(sim.launch_count, 1)
+        self.assertEqual(bridge.status()["read_cache"]["hits"], 2)
+
+    async def test_mutation_invalidates(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS)
+        await bridge.execute_command("get_all_component_data", {})
+        await bridge.execute_command("place_components", {"placements": []})
+        await bridge.execute_command("get_all_component_data", {})
+        self.assertEqual(sim.commands_run,
+                         ["get_all_component_data", "place_components", "get_all_component_data"])
+
+    async def test_bypass_refreshes_entry(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS)
+        await bridge.execute_command("get_all_nets", {})
+        await bridge.execute_command("get_all_nets", {}, use_cache=False)
+        await bridge.execute_command("get_all_nets", {})
+        self.assertEqual(sim.launch_count, 2)
+
+    async def test_selection_reads_not_cached(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS)
+        await bridge.execute_command("get_component_pins", {})
+        await bridge.execute_command("get_component_pins", {})
+        self.assertEqual(sim.launch_count, 2)
+
+    async def test_failed_reads_not_cached(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS)
+        sim.handlers["get_all_nets"] = lambda req: 1 / 0
+        await bridge.execute_command("get_all_nets", {})
+        sim.handlers["get_all_nets"] = lambda req: ["GND"]
+        response = await bridge.execute_command("get_all_nets", {})
+        self.assertEqual(response["result"], ["GND"])
+
+    async def test_batch_uses_and_fills_cache(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS)
+        await bridge.execute_command("get_all_nets", {})
+        results = await bridge.execute_batch([
+            ("get_all_nets", {}),
+            ("get_component_pins", {"designators": ["R1"]}),
+        ])
+        self.assertEqual(results[0]["result"], ["GND"])
+        self.assertEqual(results[1]["result"], ["R1"])
+        # Only the pins read went to Altium, as a single command
+        self.assertEqual(sim.commands_run, ["get_all_nets", "get_component_pins"])
+
+        await bridge.execute_command("get_component_pins", {"designators": ["R1"]})
+        self.assertEqual(len(sim.commands_run), 2)
+
+    async def test_batch_reads_after_mutation_go_to_altium(self):
+        bridge, sim = make_bridge(self.tmp, HANDLERS)
+        await bridge.execute_command("get_all_nets", {})
+        await bridge.execute_batch([
+            ("place_components", {"placements": []}),
+            ("get_all_nets", {}),
+        ])
+        self.assertEqual(sim.commands_run, ["get_all_nets", "place_components", "get_all_nets"])
+        # The read that followed the mutation is fresh and cached
+        await bridge.execute_command("get_all_nets", {})
+        self.assertEqual(len(sim.commands_run), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
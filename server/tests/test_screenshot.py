@@ -0,0 +1,262 @@
+"""
+Screenshot service tests with the synthetic capture backend: the event
+loop and bridge commands keep running while a capture is in flight,
+timeouts and the pending limit, backend selection, encoding options
+(crop decoded from the raw buffer, downscaling, JPEG/WebP) and tile diffs.
+"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from screenshot import (ScreenshotService, SyntheticBackend, UnavailableBackend, changed_tiles, check_options,
+                        encode, make_backend, tile_regions, zoom_region)
+from altium_sim import make_bridge
+
+CAPTURE_DELAY = 0.6  # like the GDI window settle time
+
+
+class ScreenshotServiceTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    async def test_capture_round_trip(self):
+        backend = SyntheticBackend(320, 200)
+        service = ScreenshotService(backend, debug_dir=self.tmp)
+        result = await service.capture("pcb")
+        self.assertTrue(result["success"])
+        self.assertEqual((result["width"], result["height"], result["image_format"]), (320, 200, "PNG"))
+        image = Image.open(io.BytesIO(result["image"]))
+        # BGRX buffer decoded to the drawn RGB colours
+        expected = backend.render()[..., 2::-1]
+        np.testing.assert_array_equal(np.asarray(image.convert("RGB")), expected)
+        self.assertEqual((result["crop_box"], result["image_bytes"]), (None, len(result["image"])))
+        # the debug copy is written in the background
+        self.assertEqual(result["debug_file"], str(self.tmp / "screenshot_pcb.png"))
+        self.assertEqual(service.status(), {"screenshot_backend": "synthetic", "screenshots_pending": 0})
+        service.shutdown()
+        with Image.open(result["debug_file"]) as saved:
+            np.testing.assert_array_equal(np.asarray(saved.convert("RGB")), expected)
+        self.assertIsNone((await ScreenshotService(backend).capture("pcb"))["debug_file"])
+
+    async def test_zoom_crop_and_formats(self):
+        backend = SyntheticBackend(800, 600)
+        service = ScreenshotService(backend)
+        result = await service.capture("pcb", "jpeg", 90, 0, zoom=(1000.0, 500.0))
+        left, top, right, bottom = result["crop_box"]
+        self.assertEqual((result["width"], result["height"]), (right - left, bottom - top))
+        self.assertEqual((result["window_width"], result["window_height"], result["image_format"]),
+                         (800, 600, "JPEG"))
+        # the zoomed rectangle fills the pane's width, centred vertically
+        view = backend.view_rect
+        self.assertEqual((left, right), (view[0], view[2]))
+        self.assertAlmostEqual((right - left) / (bottom - top), 2.0, delta=0.02)
+        self.assertAlmostEqual(top - view[1], view[3] - bottom, delta=1)
+        image = Image.open(io.BytesIO(result["image"]))
+        self.assertEqual(image.format, "JPEG")
+        expected = backend.render()[top:bottom, left:right, 2::-1].astype(int)
+        self.assertLess(np.abs(np.asarray(image, dtype=int) - expected).mean(), 4)
+        small = await service.capture("pcb", "webp", 60, 200)
+        self.assertEqual((small["width"], small["height"]), (200, 150))
+        self.assertEqual(Image.open(io.BytesIO(small["image"])).format, "WEBP")
+
+
+    async def test_loop_stays_responsive(self):
+        service = ScreenshotService(SyntheticBackend(640, 480, delay=CAPTURE_DELAY))
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+        task = asyncio.create_task(ticker())
+        try:
+            result = await service.capture("pcb")
+        finally:
+            task.cancel()
+        self.assertTrue(result["success"])
+        # the loop kept turning the whole time, never stalled by the capture
+        self.assertGreater(len(ticks), CAPTURE_DELAY / 0.01 / 3)
+        self.assertLess(max(np.diff(ticks)), CAPTURE_DELAY / 3)
+
+    async def test_bridge_commands_during_capture(self):
+        bridge, _ = make_bridge(self.tmp, {"echo": lambda req: {"value": req.get("value")}})
+        service = ScreenshotService(SyntheticBackend(640, 480, delay=CAPTURE_DELAY))
+        capture = asyncio.create_task(service.capture("pcb"))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        response = await bridge.execute_command("echo", {"value": 1})
+        elapsed = time.perf_counter() - start
+        self.assertEqual(response["result"], {"value": 1})
+        self.assertFalse(capture.done())
+        self.assertLess(elapsed, CAPTURE_DELAY)
+        self.assertTrue((await capture)["success"])
+
+    async def test_timeout_and_pending_limit(self):
+        backend = SyntheticBackend(64, 64, delay=CAPTURE_DELAY)
+        service = ScreenshotService(backend, max_pending=2, timeout=0.1)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(service.capture("pcb") for _ in range(3)))
+        self.assertLess(time.perf_counter() - start, CAPTURE_DELAY)
+        self.assertEqual([r["success"] for r in results], [False] * 3)
+        self.assertIn("timed out", results[0]["error"])
+        self.assertIn("in progress", results[2]["error"])
+        # timed-out captures hold their slots until the worker finishes them
+        self.assertEqual(service.pending, 2)
+        refused = await service.capture("pcb")
+        self.assertIn("in progress", refused["error"])
+        await asyncio.sleep(2 * CAPTURE_DELAY + 0.2)
+        self.assertEqual(service.pending, 0)
+        self.assertEqual(backend.captures, 2)
+
+    async def test_backend_error(self):
+        class Broken(SyntheticBackend):
+            def capture(self, view_type):
+                raise RuntimeError("No Altium windows found")
+        result = await ScreenshotService(Broken()).capture("sch")
+        self.assertFalse(result["success"])
+        self.assertIn("No Altium windows found", result["error"])
+
+
+class EncodeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = SyntheticBackend(640, 360, seed=2)
+        self.frame = self.backend.capture("pcb")
+        self.pixels = self.backend.render()[..., 2::-1]
+
+    def test_crop_reads_buffer_in_place(self):
+        for box in [(0, 0, 640, 360), (10, 20, 330, 200), (600, 350, 700, 400), (-5, -5, 3, 2)]:
+            with self.subTest(box=box):
+                image = self.frame.image(box)
+                left, top = max(box[0], 0), max(box[1], 0)
+                np.testing.assert_array_equal(np.asarray(image),
+                                              self.pixels[top:min(box[3], 360), left:min(box[2], 640)])
+
+    def test_encode_options(self):
+        image = self.frame.image()
+        png, size = encode(image)
+        self.assertEqual(size, (640, 360))
+        np.testing.assert_array_equal(np.asarray(Image.open(io.BytesIO(png))), self.pixels)
+        jpeg, _ = encode(image, "jpeg", 50)
+        self.assertEqual(Image.open(io.BytesIO(jpeg)).format, "JPEG")
+        self.assertLess(len(jpeg), len(encode(image, "jpeg", 95)[0]))
+        self.assertEqual(encode(image, "png", max_dimension=100)[1], (100, 56))
+        self.assertEqual(encode(image, "png", max_dimension=1000)[1], (640, 360))
+
+    def test_zoom_region_and_options(self):
+        self.assertEqual(zoom_region((0, 0, 400, 200), 100, 100), (100, 0, 300, 200))
+        self.assertEqual(zoom_region((10, 10, 110, 410), 200, 100), (10, 185, 110, 235))
+        self.assertEqual(zoom_region((0, 0, 400, 200), 0, 100), (0, 0, 400, 200))
+        self.assertEqual(check_options("JPG", 80, 0), "jpeg")
+        for bad in [("gif", 80, 0), ("png", 0, 0), ("webp", 101, 0), ("png", 80, -1)]:
+            with self.subTest(options=bad), self.assertRaises(ValueError):
+                check_options(*bad)
+
+class TileDiffTest(unittest.IsolatedAsyncioTestCase):
+
+    def test_changed_tiles(self):
+        rng = np.random.default_rng(1)
+        previous = rng.integers(0, 256, (100, 150, 3), dtype=np.uint8)
+        current = previous.copy()
+        current[5, 7, 1] ^= 1
+        current[99, 149, 0] ^= 20
+        current[40:45, 70:90] = 0
+        for tolerance in (0, 10):
+            with self.subTest(tolerance=tolerance):
+                grid = changed_tiles(previous, current, 32, tolerance)
+                expected = np.zeros((4, 5), dtype=bool)
+                for y, x in zip(*np.nonzero((np.abs(previous.astype(int) - current) > tolerance).any(axis=2))):
+                    expected[y // 32, x // 32] = True
+                np.testing.assert_array_equal(grid, expected)
+                self.assertEqual(bool(grid[0, 0]), tolerance == 0)
+
+    def test_tile_regions_cover_changed_tiles(self):
+        rng = np.random.default_rng(2)
+        for trial in range(30):
+            grid = rng.random((rng.integers(1, 9), rng.integers(1, 9))) < 0.3
+            with self.subTest(trial=trial):
+                covered = np.zeros_like(grid, dtype=int)
+                for left, top, right, bottom in tile_regions(grid):
+                    covered[top:bottom, left:right] += 1
+                np.testing.assert_array_equal(covered, grid.astype(int))
+        grid = np.zeros((4, 6), dtype=bool)
+        grid[1:3, 2:4] = True
+        self.assertEqual(tile_regions(grid), [(2, 1, 4, 3)])
+
+    async def test_diff_returns_changed_regions(self):
+        backend = SyntheticBackend(640, 480, seed=4)
+        service = ScreenshotService(backend)
+        first = await service.capture("pcb", diff=True)
+        self.assertEqual(first["diff"], "full")
+        self.assertEqual((await service.capture("pcb", diff=True))["diff"], "unchanged")
+        backend.move(3, 5, 0)
+        result = await service.capture("pcb", diff=True, tile_size=32)
+        self.assertEqual(result["diff"], "tiles")
+        self.assertNotIn("image", result)
+        self.assertLess(result["changed_tile_count"], result["tile_count"] / 20)
+        self.assertLess(result["image_bytes"], first["image_bytes"])
+        # the regions pasted over the old frame give the new one
+        frame = np.asarray(Image.open(io.BytesIO(first["image"]))).copy()
+        for region in result["regions"]:
+            tile = np.asarray(Image.open(io.BytesIO(region["image"])))
+            self.assertEqual(tile.shape[:2], (region["height"], region["width"]))
+            frame[region["y"]:region["y"] + region["height"], region["x"]:region["x"] + region["width"]] = tile
+        np.testing.assert_array_equal(frame, backend.render()[..., 2::-1])
+
+    async def test_diff_falls_back_to_full_frame(self):
+        backend = SyntheticBackend(320, 240, seed=5)
+        service = ScreenshotService(backend)
+        await service.capture("pcb")  # a plain screenshot is remembered too
+        self.assertEqual((await service.capture("pcb", diff=True))["diff"], "unchanged")
+        # another size or crop, or another view type, has nothing to compare with
+        self.assertEqual((await service.capture("pcb", max_dimension=100, diff=True))["diff"], "full")
+        self.assertEqual((await service.capture("pcb", zoom=(1, 1), diff=True))["diff"], "full")
+        self.assertEqual((await service.capture("sch", diff=True))["diff"], "full")
+        # most of the frame changed
+        await service.capture("pcb", diff=True)
+        backend.boxes[:, :2] += 7
+        backend.traces[:, :2] += 7
+        changed = await service.capture("pcb", diff=True)
+        self.assertEqual(changed["diff"], "full")
+        self.assertIn("image", changed)
+
+
+class BackendSelectionTest(unittest.TestCase):
+
+    def test_make_backend(self):
+        self.assertEqual(make_backend("synthetic").name, "synthetic")
+        with self.assertLogs("AltiumMCPServer", level="WARNING"):
+            self.assertIn(make_backend("bogus").name, ("gdi", "unavailable"))
+        if sys.platform != "win32":
+            for kind in ("auto", "gdi"):
+                with self.subTest(kind=kind), self.assertLogs("AltiumMCPServer", level="WARNING"):
+                    self.assertEqual(make_backend(kind).name, "unavailable")
+
+    def test_unavailable_capture_fails(self):
+        service = ScreenshotService(UnavailableBackend("no GDI"))
+        try:
+            result = asyncio.run(service.capture("pcb"))
+        finally:
+            service.shutdown()
+        self.assertEqual(result, {"success": False, "error": "Screenshot capture failed: no GDI"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Spatial index tests: region, nearest and close-pair queries against brute
+force on random boxes (including oversized and off-grid ones), and the
+board-level wrapper's sides, pads and pair ordering.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+import numpy as np
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from altium_sim import SyntheticBoard
+from spatial import BoardIndex, SpatialIndex
+
+
+def random_boxes(n, seed=0):
+    rng = random.Random(seed)
+    boxes = []
+    for i in range(n):
+        x, y = rng.uniform(0, 5000), rng.uniform(0, 4000)
+        # mostly small parts, a few connectors and one board-sized outline
+        w, h = (3000, 2000) if i == 7 else (rng.uniform(300, 900), rng.uniform(50, 200)) if i % 50 == 0 \
+            else (rng.uniform(10, 80), rng.uniform(10, 80))
+        boxes.append((x, y, x + w, y + h))
+    return np.array(boxes)
+
+
+def brute_pairs(boxes, items, distance):
+    found = set()
+    for i in items:
+        a = boxes[i]
+        for j, b in enumerate(boxes):
+            ox = min(a[2], b[2]) - max(a[0], b[0])
+            oy = min(a[3], b[3]) - max(a[1], b[1])
+            if ox > -distance and oy > -distance:
+                found.add((int(i), j))
+    return found
+
+
+class SpatialIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.boxes = random_boxes(600)
+        self.index = SpatialIndex(self.boxes)
+
+    def test_query_matches_brute_force(self):
+        rng = random.Random(1)
+        b = self.boxes
+        for trial in range(200):
+            x, y = rng.uniform(-500, 5500), rng.uniform(-500, 4500)
+            size = rng.choice([0, 20, 300, 4000])  # points up to board-sized (scan path)
+            x2, y2 = x + rng.uniform(0, size), y + rng.uniform(0, size)
+            with self.subTest(trial=trial):
+                expected = np.nonzero((b[:, 0] <= x2) & (b[:, 2] >= x) & (b[:, 1] <= y2) & (b[:, 3] >= y))[0]
+                self.assertEqual(self.index.query(x, y, x2, y2).tolist(), expected.tolist())
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(2)
+        mask = np.array([i % 3 != 0 for i in range(len(self.boxes))])
+        for trial in range(100):
+            x, y = rng.uniform(-3000, 8000), rng.uniform(-3000, 7000)  # also far off the board
+            k = rng.choice([1, 5, 40])
+            use = mask if trial % 2 else None
+            with self.subTest(trial=trial):
+                found, dist = self.index.nearest(x, y, k, use)
+                candidates = np.nonzero(use)[0] if use is not None else np.arange(len(self.boxes))
+                every = self.index.distances(x, y, candidates)
+                order = np.lexsort((candidates, every))[:k]
+                self.assertEqual(found.tolist(), candidates[order].tolist())
+                np.testing.assert_allclose(dist, every[order])
+
+    def test_pairs_match_brute_force(self):
+        rng = random.Random(3)
+        for distance in (1.0, 31.0, 400.0):
+            items = np.array(rng.sample(range(len(self.boxes)), 80))
+            a, b = self.index.pairs(items, distance)
+            got = list(zip(a.tolist(), b.tolist()))
+            self.assertEqual(len(got), len(set(got)))
+            self.assertEqual(set(got), brute_pairs(self.boxes, items, distance))
+
+    def test_degenerate(self):
+        empty = SpatialIndex(np.zeros((0, 4)))
+        self.assertEqual(empty.query(0, 0, 10, 10).tolist(), [])
+        self.assertEqual(empty.nearest(0, 0, 3)[0].tolist(), [])
+        self.assertEqual(empty.pairs([], 10)[0].tolist(), [])
+        # coincident points: zero extent, one cell
+        points = SpatialIndex([(5, 5, 5, 5)] * 4)
+        self.assertEqual(points.query(5, 5, 5, 5).tolist(), [0, 1, 2, 3])
+        self.assertEqual(points.nearest(0, 0, 2)[1].tolist(), [np.hypot(5, 5)] * 2)
+
+
+class BoardIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.board = SyntheticBoard(count=500, seed=4)
+        self.components = list(self.board.components.values())
+        self.index = BoardIndex(self.components, self.board.get_component_pins({}))
+
+    def test_region_sides_and_pads(self):
+        result = self.index.region(3000, 2000, 2000, 3000, layer="bottom", include_pads=True)
+        self.assertEqual(result["region"], [2000.0, 2000.0, 3000.0, 3000.0])
+        expected = sorted(c["designator"] for c in self.components if c["layer"] == "BottomLayer"
+                          and abs(c["x"] - 2500) <= 520 and abs(c["y"] - 2500) <= 510)
+        self.assertEqual(sorted(c["designator"] for c in result["components"]), expected)
+        self.assertEqual(result["component_count"], len(expected))
+        for pad in result["pads"]:
+            self.assertTrue(2000 <= pad["x"] <= 3000 and 2000 <= pad["y"] <= 3000)
+            self.assertEqual(self.board.components[pad["designator"]]["layer"], "BottomLayer")
+        every = [p for d in self.board.components for p in self.board.pins_of(d)
+                 if self.board.components[d]["layer"] == "BottomLayer"
+                 and 2000 <= p["x"] <= 3000 and 2000 <= p["y"] <= 3000]
+        self.assertEqual(result["pad_count"], len(every))
+        with self.assertRaises(ValueError):
+            self.index.region(0, 0, 1, 1, layer="inner")
+
+    def test_box_position_from_script(self):
+        index = BoardIndex([{"designator": "J1", "x": 0, "y": 0, "width": 100, "height": 40,
+                             "box_left": -10, "box_bottom": -5, "layer": "TopLayer"}])
+        self.assertEqual(index.region(80, 30, 85, 34)["components"][0]["box"], [-10.0, -5.0, 90.0, 35.0])
+        self.assertEqual(index.nearest(-40, 15, k=1)[0]["distance_mils"], 30.0)
+
+    def test_close_pairs_once_per_pair(self):
+        parts = [
+            {"designator": "R1", "x": 0, "y": 0, "width": 40, "height": 20, "layer": "TopLayer"},
+            {"designator": "R2", "x": 60, "y": 0, "width": 40, "height": 20, "layer": "TopLayer"},
+            {"designator": "R3", "x": 0, "y": 0, "width": 40, "height": 20, "layer": "BottomLayer"},
+            {"designator": "R4", "x": 0, "y": 200, "width": 40, "height": 20, "layer": "TopLayer"},
+            {"designator": "R5", "x": -45, "y": 0, "width": 40, "height": 20, "layer": "TopLayer"},
+        ]
+        index = BoardIndex(parts)
+        named = lambda pairs: [(index.designators[a], index.designators[b]) for a, b in pairs]
+        # R2 is 20 mils from R1, R5 5 mils; R3 is on the other side, R4 far away
+        self.assertEqual(named(index.close_pairs([1, 0], 25)), [("R2", "R1"), ("R1", "R5")])
+        self.assertEqual(named(index.close_pairs([0], 10)), [("R1", "R5")])
+        self.assertEqual(named(index.close_pairs(range(5), 31)),
+                         [("R1", "R2"), ("R1", "R5")])
+
+    def test_close_pairs_match_brute_force(self):
+        index = self.index
+        distance = 31.0
+        targets = list(range(0, len(index), 7))
+        got = index.close_pairs(targets, distance)
+        self.assertEqual(len(got), len(set(frozenset(p) for p in got)))
+        expected = {frozenset((a, b)) for a, b in brute_pairs(index.grid.boxes, targets, distance)
+                    if a != b and index.bottom[a] == index.bottom[b]}
+        self.assertEqual({frozenset(p) for p in got}, expected)
+
+    def test_memoized_on_snapshot(self):
+        pins = self.board.get_component_pins({})
+        first = BoardIndex.of(self.components, pins)
+        self.assertIs(BoardIndex.of(self.components, pins), first)
+        self.assertIsNot(BoardIndex.of(self.components), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
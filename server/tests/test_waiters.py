@@ -0,0 +1,90 @@
+"""
+Completion waiter tests: response detection latency, timeouts and stats.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the parent directory to the path so we can import modules from the main project
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from waiters import NotifyWaiter, PollWaiter, make_waiter
+from altium_sim import make_bridge
+
+
+async def create_later(path: Path, delay: float):
+    await asyncio.sleep(delay)
+    path.write_text("{}")
+
+
+class WaiterTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def waiters(self):
+        yield PollWaiter()
+        if NotifyWaiter.available():
+            yield NotifyWaiter()
+
+    async def test_detects_file_promptly(self):
+        for waiter in self.waiters():
+            with self.subTest(waiter=waiter.name):
+                path = self.tmp / f"{waiter.name}.json"
+                task = asyncio.create_task(create_later(path, 0.05))
+                start = time.perf_counter()
+                self.assertTrue(await waiter.wait(path, timeout=5))
+                elapsed = time.perf_counter() - start
+                await task
+                # The old loop slept a fixed 0.5 s before its first check
+                self.assertLess(elapsed, 0.15)
+                self.assertEqual(waiter.stats.count, 1)
+
+    async def test_detects_removal(self):
+        for waiter in self.waiters():
+            with self.subTest(waiter=waiter.name):
+                path = self.tmp / f"{waiter.name}.json"
+                path.write_text("{}")
+                asyncio.get_running_loop().call_later(0.05, path.unlink)
+                self.assertTrue(await waiter.wait(path, timeout=5, exists=False))
+
+    async def test_timeout(self):
+        for waiter in self.waiters():
+            with self.subTest(waiter=waiter.name):
+                self.assertFalse(await waiter.wait(self.tmp / "never.json", timeout=0.1))
+                self.assertEqual(waiter.stats.timeouts, 1)
+
+    async def test_already_present_returns_immediately(self):
+        path = self.tmp / "ready.json"
+        path.write_text("{}")
+        waiter = make_waiter("auto")
+        self.assertTrue(await waiter.wait(path, timeout=0))
+
+    def test_make_waiter(self):
+        self.assertIsInstance(make_waiter("poll"), PollWaiter)
+        self.assertIsInstance(make_waiter("bogus"), (PollWaiter, NotifyWaiter))
+        if NotifyWaiter.available():
+            self.assertIsInstance(make_waiter("auto"), NotifyWaiter)
+
+    async def test_bridge_round_trip_without_fixed_poll_delay(self):
+        bridge, _ = make_bridge(self.tmp, {"get_all_nets": lambda req: ["GND"]})
+        start = time.perf_counter()
+        for _ in range(5):
+            response = await bridge.execute_command("get_all_nets", {}, use_cache=False)
+            self.assertEqual(response["result"], ["GND"])
+        per_call = (time.perf_counter() - start) / 5
+        self.assertLess(per_call, 0.1)
+        self.assertEqual(bridge.status()["response_waits"]["count"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,232 @@
+"""
+Completion waiters: wait for a bridge file to appear (or disappear).
+
+The bridge used to poll with a fixed asyncio.sleep(0.5), adding up to half a
+second of dead time to every command. A waiter returns as soon as the file
+changes:
+- NotifyWaiter uses OS file-change notifications on the exchange directory
+  (Windows change notifications via pywin32, inotify on Linux).
+- PollWaiter polls with an adaptive backoff - a few ms at first, growing to
+  the old 0.5 s interval for long-running commands.
+
+Every wait is timed; WaitStats keeps the recent durations for
+get_server_status.
+"""
+
+import asyncio
+import collections
+import ctypes
+import ctypes.util
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any
+
+logger = logging.getLogger("AltiumMCPServer")
+
+WAITER_KINDS = ("auto", "notify", "poll")
+
+
+class WaitStats:
+    """Durations of recent waits, per waiter"""
+
+    def __init__(self, keep: int = 200):
+        self.count = 0
+        self.timeouts = 0
+        self.recent = collections.deque(maxlen=keep)
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.count += 1
+        if not ok:
+            self.timeouts += 1
+        self.recent.append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        durations = sorted(self.recent)
+        if not durations:
+            return {"count": self.count, "timeouts": self.timeouts}
+        return {
+            "count": self.count,
+            "timeouts": self.timeouts,
+            "last_ms": round(self.recent[-1] * 1000, 1),
+            "median_ms": round(durations[len(durations) // 2] * 1000, 1),
+            "max_ms": round(durations[-1] * 1000, 1),
+        }
+
+
+class CompletionWaiter:
+    """Base class: subclasses implement _wait_for"""
+
+    name = "base"
+
+    def __init__(self):
+        self.stats = WaitStats()
+
+    async def wait_for(self, directory: Path, predicate: Callable[[], bool], timeout: float) -> bool:
+        """Wait until predicate() is true; changes are watched in directory.
+
+        Returns False on timeout. The predicate is always re-checked, so a
+        missed or spurious notification only costs a recheck interval.
+        """
+        start = time.perf_counter()
+        ok = predicate() or await self._wait_for(Path(directory), predicate, timeout)
+        self.stats.record(time.perf_counter() - start, ok)
+        return ok
+
+    async def wait(self, path: Path, timeout: float, exists: bool = True) -> bool:
+        """Wait until path exists (or, with exists=False, is gone)"""
+        path = Path(path)
+        return await self.wait_for(path.parent, lambda: path.exists() == exists, timeout)
+
+    async def _wait_for(self, directory: Path, predicate: Callable[[], bool], timeout: float) -> bool:
+        raise NotImplementedError
+
+
+class PollWaiter(CompletionWaiter):
+    """Polls with a delay that starts small and grows to max_interval"""
+
+    name = "poll"
+
+    def __init__(self, initial_interval: float = 0.005, max_interval: float = 0.5, growth: float = 1.5):
+        super().__init__()
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.growth = growth
+
+    async def _wait_for(self, directory, predicate, timeout):
+        deadline = time.monotonic() + timeout
+        interval = self.initial_interval
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return predicate()
+            await asyncio.sleep(min(interval, remaining))
+            if predicate():
+                return True
+            interval = min(interval * self.growth, self.max_interval)
+
+
+class NotifyWaiter(CompletionWaiter):
+    """Wakes on directory change notifications, rechecking at least every
+    recheck_interval in case a notification is lost."""
+
+    name = "notify"
+
+    def __init__(self, recheck_interval: float = 0.5):
+        super().__init__()
+        self.recheck_interval = recheck_interval
+
+    @staticmethod
+    def available() -> bool:
+        if sys.platform == "win32":
+            try:
+                import win32file  # noqa: F401
+                import win32event  # noqa: F401
+                return True
+            except ImportError:
+                return False
+        return _libc_inotify() is not None
+
+    async def _wait_for(self, directory, predicate, timeout):
+        if sys.platform == "win32":
+            return await self._wait_windows(directory, predicate, timeout)
+        return await self._wait_inotify(directory, predicate, timeout)
+
+    async def _wait_windows(self, directory, predicate, timeout):
+        import win32con
+        import win32event
+        import win32file
+
+        deadline = time.monotonic() + timeout
+        handle = win32file.FindFirstChangeNotification(
+            str(directory), False,
+            win32con.FILE_NOTIFY_CHANGE_FILE_NAME | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE)
+        try:
+            while True:
+                if predicate():
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                # WaitForSingleObject blocks, so it runs on a worker thread
+                rc = await asyncio.to_thread(
+                    win32event.WaitForSingleObject, handle,
+                    int(min(remaining, self.recheck_interval) * 1000))
+                if rc == win32event.WAIT_OBJECT_0:
+                    win32file.FindNextChangeNotification(handle)
+        finally:
+            win32file.FindCloseChangeNotification(handle)
+
+    async def _wait_inotify(self, directory, predicate, timeout):
+        libc = _libc_inotify()
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def on_readable():
+            try:
+                while os.read(fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+            changed.set()
+
+        try:
+            if libc.inotify_add_watch(fd, os.fsencode(str(directory)), _INOTIFY_MASK) < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            loop.add_reader(fd, on_readable)
+            try:
+                deadline = time.monotonic() + timeout
+                while True:
+                    if predicate():
+                        return True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    changed.clear()
+                    try:
+                        await asyncio.wait_for(changed.wait(), min(remaining, self.recheck_interval))
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                loop.remove_reader(fd)
+        finally:
+            os.close(fd)
+
+
+# IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_INOTIFY_MASK = 0x002 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200
+_libc = None
+
+
+def _libc_inotify():
+    """libc with the inotify calls, or None where inotify does not exist"""
+    global _libc
+    if _libc is None:
+        if not sys.platform.startswith("linux"):
+            _libc = False
+        else:
+            try:
+                lib = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+                lib.inotify_init1.argtypes = [ctypes.c_int]
+                lib.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+                _libc = lib
+            except (OSError, AttributeError):
+                _libc = False
+    return _libc or None
+
+
+def make_waiter(kind: str = "auto") -> CompletionWaiter:
+    """Build a waiter: "notify", "poll", or "auto" (notify where supported)"""
+    if kind not in WAITER_KINDS:
+        logger.warning(f"Unknown waiter '{kind}', using 'auto'")
+        kind = "auto"
+    if kind != "poll" and NotifyWaiter.available():
+        return NotifyWaiter()
+    if kind == "notify":
+        logger.warning("File change notifications unavailable, polling instead")
+    return PollWaiter()
@@ -6,6 +6,7 @@ SCRIPT_DIR = Path(__file__).parent
 VENV_DIR = SCRIPT_DIR / "server" / ".venv"
 REQUIREMENTS = [
     "mcp[cli]==1.5.0",
+    "numpy>=2.2.0",
     "pillow>=11.1.0",
     "pywin32>=310",
 ]